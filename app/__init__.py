@@ -9,6 +9,7 @@ from app.config import (
     LOG_MAX_BYTES,
     RUN_LOG_PATH,
     WORKFLOW_DEBUG_LOG_PATH,
+    WORKFLOW_FRAME_LOGS_ENABLED,
     WORKFLOW_LOG_PATH,
 )
 
@@ -123,3 +124,14 @@ def create_rotating_file_handler(filename, level):
     handler.setLevel(level)
     handler.setFormatter(logging.Formatter(LOG_CONF['formatters']['verbose']['format']))
     return handler
+
+
+def get_frame_logger(name):
+    """返回 name 的逐帧热路径子 logger（``<name>.frame``）。
+
+    子 logger 沿用父 logger 的 handler；WORKFLOW_FRAME_LOGS_ENABLED 关闭时级别为 INFO，
+    逐帧 debug 调用在 isEnabledFor 处直接短路，不会格式化参数。
+    """
+    frame_logger = logging.getLogger(f"{name}.frame")
+    frame_logger.setLevel(logging.DEBUG if WORKFLOW_FRAME_LOGS_ENABLED else logging.INFO)
+    return frame_logger
@@ -268,6 +268,16 @@ SHARED_INFERENCE_STARTUP_TIMEOUT_SECONDS = max(
 SHARED_INFERENCE_IDLE_SECONDS = max(
     10, int(os.getenv('SHARED_INFERENCE_IDLE_SECONDS', '120'))
 )
+# 每个共享推理客户端保留的空闲共享内存帧槽数量。槽在请求间复用，避免每帧
+# shm_open/ftruncate/mmap/unlink；模型子进程直接在槽视图上推理。
+SHARED_INFERENCE_SLAB_POOL_SIZE = max(
+    1, int(os.getenv('SHARED_INFERENCE_SLAB_POOL_SIZE', '4'))
+)
+# 每个共享推理客户端可同时挂起的请求数。请求按 call_id 复用同一连接，
+# 一个 source host 可连续提交多帧/多裁剪图，让模型子进程攒满批次。
+SHARED_INFERENCE_MAX_IN_FLIGHT = max(
+    1, int(os.getenv('SHARED_INFERENCE_MAX_IN_FLIGHT', '4'))
+)
 
 # X86 CUDA shared-model placement.  The effective runtime configuration turns
 # this off automatically unless at least two NVIDIA devices are visible.
@@ -354,19 +364,40 @@ INFERENCE_MODEL_MEMORY_MARGIN_PERCENT = min(
 RESOURCE_PROFILING_ENABLED = os.getenv('RESOURCE_PROFILING_ENABLED', 'false').lower() in ('true', '1', 'yes')
 RESOURCE_PROFILE_LOG_INTERVAL_SECONDS = max(1.0, float(os.getenv('RESOURCE_PROFILE_LOG_INTERVAL_SECONDS', '30')))
 
+# ROI 掩码进程内缓存的内存上限（MB）。掩码按帧尺寸与热区坐标缓存，热区只在编辑工作流时变化。
+ROI_MASK_CACHE_MAX_MB = max(0, int(os.getenv('ROI_MASK_CACHE_MAX_MB', '128')))
+
 # 实时帧热路径诊断日志。默认关闭，避免多路视频把逐节点、逐推理日志
 # 同时写入控制台和轮转文件；排障时可临时开启。
+# 关闭时 workflow_executor.frame / aj.frame 子 logger 的 DEBUG 调用不会格式化参数。
 WORKFLOW_FRAME_LOGS_ENABLED = os.getenv(
     'WORKFLOW_FRAME_LOGS_ENABLED', 'false'
 ).lower() in ('true', '1', 'yes', 'on')
 
-# Source host 读取分析缓冲区时是否使用共享内存只读视图，避免复制最新帧。
-# 注意：只读视图可能在 buffer 环绕后被新帧覆盖，只有在 workflow 处理耗时稳定小于 buffer 时长时才建议开启。
-WORKFLOW_ZERO_COPY_FRAMES = os.getenv('WORKFLOW_ZERO_COPY_FRAMES', 'false').lower() in ('true', '1', 'yes')
+# Source host 读取分析缓冲区时是否钉住最新帧所在槽位并共享只读视图，避免复制最新帧。
+# 钉住期间写端跳过该槽位，慢工作流也不会读到被覆盖的帧；关闭后每帧复制一次。
+WORKFLOW_ZERO_COPY_FRAMES = os.getenv('WORKFLOW_ZERO_COPY_FRAMES', 'true').lower() in ('true', '1', 'yes')
+
+# Source host 内同一帧的 RGB/BGR/缩放图在各 workflow 之间共享，每种转换只做一次。
+# 共享图像为只读；若自定义脚本需要原地修改 context 中的帧，可关闭。
+SOURCE_HOST_SHARED_FRAME_CACHE = os.getenv('SOURCE_HOST_SHARED_FRAME_CACHE', 'true').lower() in ('true', '1', 'yes')
+
+# Source host 按各 workflow 实测 run_once 耗时自适应降频：重节点每 N 帧执行一次，仍超出每帧预算时降低该 workflow 的帧率。
+# 关闭后只统计实际帧率、丢帧与延迟，不调整步长。
+SOURCE_HOST_ADAPTIVE_SCHEDULING = os.getenv('SOURCE_HOST_ADAPTIVE_SCHEDULING', 'true').lower() in ('true', '1', 'yes')
+# Source host 向 orchestrator 报告各 workflow 调度状态（目标/实际帧率、丢帧、延迟）的间隔（秒）
+SOURCE_HOST_STATUS_INTERVAL_SECONDS = float(os.getenv('SOURCE_HOST_STATUS_INTERVAL_SECONDS', '5'))
+# 工作流增删或配置变更时，通过 source host 的 stdin 控制通道就地替换单个 workflow，
+# 其余 workflow 的模型与窗口/跟踪状态保持不变；关闭后仍按旧方式重启整个 source host。
+SOURCE_HOST_HOT_RELOAD = os.getenv('SOURCE_HOST_HOT_RELOAD', 'true').lower() in ('true', '1', 'yes')
 
 # 实时 workflow 内同层节点并行 worker 数。0 表示保持当前串行行为。
 SOURCE_HOST_WORKFLOW_NODE_WORKERS = max(0, int(os.getenv('SOURCE_HOST_WORKFLOW_NODE_WORKERS', '0')))
 
+# 外部 API 节点每个 endpoint 同时在途的请求数上限（source host 进程内各工作流共享 keep-alive 连接池）；
+# 节点配置 max_in_flight 可覆盖。
+EXTERNAL_API_MAX_IN_FLIGHT = max(1, int(os.getenv('EXTERNAL_API_MAX_IN_FLIGHT', '4')))
+
 # 视频源轮转运行时保护参数。开关、路数和单批时长存储在 SystemSetting，支持在线修改。
 SOURCE_ROTATION_STARTUP_TIMEOUT_SECONDS = max(
     10,
@@ -411,11 +442,36 @@ RECORDING_BUFFER_DURATION = int(
 )
 RECORDING_JPEG_QUALITY = int(os.getenv('RECORDING_JPEG_QUALITY', '85'))
 RECORDING_COMPRESSED_MAX_BYTES = int(os.getenv('RECORDING_COMPRESSED_MAX_BYTES', str(512 * 1024)))
+# 录制缓冲区模式：
+# - jpeg：解码后逐帧 JPEG 编码缓存，录像时再解码并编码为 H.264
+# - packet：直接缓存拉流得到的 H.264/H.265 码流，录像按 GOP 边界截取后 -c copy 封装，
+#   不占用解码和编码算力；MJPEG 等其他编码格式自动回退 jpeg 模式
+RECORDING_BUFFER_MODE = os.getenv('RECORDING_BUFFER_MODE', 'jpeg').strip().lower()
+if RECORDING_BUFFER_MODE not in ('jpeg', 'packet'):
+    RECORDING_BUFFER_MODE = 'jpeg'
+# packet 模式码流数据区大小（MB），需覆盖 码率 × RECORDING_BUFFER_DURATION
+RECORDING_PACKET_BUFFER_MB = int(os.getenv('RECORDING_PACKET_BUFFER_MB', '32'))
 
 # ============ 告警抑制配置 ============
 # 告警抑制时长（秒）- 同一任务的同一算法在此时间内不会重复预警
 ALERT_SUPPRESSION_DURATION = int(os.getenv('ALERT_SUPPRESSION_DURATION', '10'))
 
+# ============ 告警异步投递（outbox）============
+# 每次从 alert_delivery_tasks 批量认领的任务数；PostgreSQL 使用 FOR UPDATE SKIP LOCKED，
+# 多个 worker 互不阻塞。
+ALERT_DELIVERY_BATCH_SIZE = max(1, int(os.getenv('ALERT_DELIVERY_BATCH_SIZE', '32')))
+# 每个投递通道的并发发送数；RabbitMQ 的 BlockingConnection 不支持多线程，固定为 1。
+ALERT_DELIVERY_CONCURRENCY = max(1, int(os.getenv('ALERT_DELIVERY_CONCURRENCY', '4')))
+
+# ============ 告警异步落库（source host 内）============
+# 告警图片绘制/编码/写盘与 Alert、outbox 入库交给 host 内的 worker 线程，runner 只做判定。
+# 同一 (source, workflow, 告警节点) 固定由同一个 worker 按提交顺序处理。0 表示在 runner 线程同步执行。
+ALERT_SINK_WORKERS = max(0, int(os.getenv('ALERT_SINK_WORKERS', '2')))
+# 每个 worker 的待处理队列上限；队列满时 runner 阻塞等待（背压），不丢告警
+ALERT_SINK_QUEUE_SIZE = max(1, int(os.getenv('ALERT_SINK_QUEUE_SIZE', '64')))
+# 每个事务最多合并写入的告警数
+ALERT_SINK_BATCH_SIZE = max(1, int(os.getenv('ALERT_SINK_BATCH_SIZE', '16')))
+
 # ============ 平台节点身份（集群 / MQ 来源标识）============
 # 当前实例的唯一编码。集群或多盒子部署时必须保证全局唯一（如 box-01、edge-sh-03）。
 # 留空时按以下优先级解析（见 app/core/node_identity.py）：
@@ -7,16 +7,18 @@ import io
 import logging
 import os
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from PIL import Image
-from peewee import fn
+from peewee import PostgresqlDatabase, fn
 
-from app.config import FRAME_SAVE_PATH
-from app.core.database_models import Alert, AlertDeliveryTask, db
+from app.config import ALERT_DELIVERY_BATCH_SIZE, ALERT_DELIVERY_CONCURRENCY, FRAME_SAVE_PATH
+from app.core.database_models import Alert, AlertDeliveryTask
 from app.core.message_queue_config import get_message_queue_config
-from app.core.message_queue_publisher import publish_alert_to_mq
+from app.core.message_queue_publisher import load_provider_config, publish_alert_to_mq
 from app.core.node_identity import get_node_id
 from app.core.object_storage import build_alert_object_key, upload_alert_image
 from app.core.public_media_config import PublicMediaConfig, get_public_media_config
@@ -25,6 +27,11 @@ from app.core.rabbitmq_publisher import format_alert_message
 
 logger = logging.getLogger(__name__)
 _LEASE_SECONDS = 300
+_CLAIMABLE_STATUSES = ("pending", "retrying")
+_STATS_WINDOW_SECONDS = 300
+_STATS_LATENCY_SAMPLES = 1000
+# pika's BlockingConnection is not thread safe, so RabbitMQ publishes stay serial.
+_PROVIDER_MAX_CONCURRENCY = {"rabbitmq": 1}
 
 
 def enqueue_alert_delivery(alert: Alert, *, delivery_mode: Optional[str] = None) -> Optional[AlertDeliveryTask]:
@@ -47,7 +54,38 @@ def enqueue_alert_delivery(alert: Alert, *, delivery_mode: Optional[str] = None)
     return task
 
 
-def get_delivery_stats() -> Dict[str, int]:
+def enqueue_alert_deliveries(alerts: List[Alert], *, delivery_mode: Optional[str] = None) -> None:
+    """Bulk variant of enqueue_alert_delivery: one multi-row INSERT for a batch of alerts.
+
+    Call inside the transaction that created the alerts so the worker never sees half a batch.
+    """
+    if not alerts or not get_message_queue_config().enabled:
+        return
+    mode = delivery_mode or get_public_media_config().delivery_mode
+    now = datetime.now()
+    rows = [
+        {
+            "alert": alert.id,
+            "event_type": "alert.created",
+            "delivery_mode": mode,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for alert in alerts
+    ]
+    AlertDeliveryTask.insert_many(rows).on_conflict_ignore().execute()
+
+
+def get_delivery_stats() -> Dict[str, Any]:
+    """Outbox counts plus backlog, recent throughput and end-to-end latency.
+
+    Derived from the task table so the web process sees what the orchestrator's
+    worker is doing; latency is created_at -> completed_at of recently delivered tasks.
+    """
+    now = datetime.now()
     counts = {"pending": 0, "processing": 0, "retrying": 0, "failed": 0}
     query = (
         AlertDeliveryTask.select(AlertDeliveryTask.status, fn.COUNT(AlertDeliveryTask.id).alias("count"))
@@ -56,7 +94,36 @@ def get_delivery_stats() -> Dict[str, int]:
     )
     for row in query:
         counts[row.status] = int(row.count)
-    return counts
+    stats: Dict[str, Any] = dict(counts)
+
+    due = AlertDeliveryTask.select().where(
+        AlertDeliveryTask.status.in_(_CLAIMABLE_STATUSES) & (AlertDeliveryTask.next_attempt_at <= now)
+    )
+    oldest_due = due.order_by(AlertDeliveryTask.next_attempt_at).first()
+    stats["backlog"] = due.count()
+    stats["oldest_due_age_seconds"] = (
+        round(max(0.0, (now - oldest_due.next_attempt_at).total_seconds()), 1) if oldest_due else 0.0
+    )
+
+    since = now - timedelta(seconds=_STATS_WINDOW_SECONDS)
+    recent = AlertDeliveryTask.select(AlertDeliveryTask.created_at, AlertDeliveryTask.completed_at).where(
+        (AlertDeliveryTask.status == "succeeded") & (AlertDeliveryTask.completed_at >= since)
+    )
+    delivered = recent.count()
+    latencies = sorted(
+        max(0.0, (completed_at - created_at).total_seconds())
+        for created_at, completed_at in recent.order_by(AlertDeliveryTask.completed_at.desc())
+        .limit(_STATS_LATENCY_SAMPLES)
+        .tuples()
+    )
+    stats["window_seconds"] = _STATS_WINDOW_SECONDS
+    stats["delivered_in_window"] = delivered
+    stats["throughput_per_minute"] = round(delivered * 60.0 / _STATS_WINDOW_SECONDS, 2)
+    stats["latency_avg_seconds"] = round(sum(latencies) / len(latencies), 3) if latencies else None
+    stats["latency_p95_seconds"] = (
+        round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3) if latencies else None
+    )
+    return stats
 
 
 def retry_failed_deliveries() -> int:
@@ -139,8 +206,8 @@ def _event_id(message: Dict[str, Any], event_type: str) -> str:
     return f"{message['external_alert_id']}:{event_type.replace('.', '-')}"
 
 
-def _base_event(alert: Alert, *, event_type: str, delivery_mode: str) -> Dict[str, Any]:
-    message = format_alert_message(alert)
+def _base_event(message: Dict[str, Any], *, event_type: str, delivery_mode: str) -> Dict[str, Any]:
+    message = dict(message)
     message.update({
         "event_id": _event_id(message, event_type),
         "event_type": event_type,
@@ -149,13 +216,18 @@ def _base_event(alert: Alert, *, event_type: str, delivery_mode: str) -> Dict[st
     return message
 
 
-def _publish_or_raise(event: Dict[str, Any]) -> None:
-    if not publish_alert_to_mq(event):
+def _publish_or_raise(event: Dict[str, Any], **delivery_config: Any) -> None:
+    if not publish_alert_to_mq(event, **delivery_config):
         raise RuntimeError("消息投递失败或已停用")
 
 
-def _created_event(task: AlertDeliveryTask, alert: Alert, config: PublicMediaConfig) -> Dict[str, Any]:
-    event = _base_event(alert, event_type="alert.created", delivery_mode=task.delivery_mode)
+def _created_event(
+    task: AlertDeliveryTask,
+    alert: Alert,
+    config: PublicMediaConfig,
+    message: Dict[str, Any],
+) -> Dict[str, Any]:
+    event = _base_event(message, event_type="alert.created", delivery_mode=task.delivery_mode)
     if task.delivery_mode == "url":
         event["media"] = {
             "status": "ready" if event.get("alert_image_url") else "unavailable",
@@ -197,18 +269,22 @@ def _created_event(task: AlertDeliveryTask, alert: Alert, config: PublicMediaCon
     return event
 
 
-def _media_ready_event(task: AlertDeliveryTask, alert: Alert, config: PublicMediaConfig) -> Dict[str, Any]:
+def _media_ready_event(
+    task: AlertDeliveryTask,
+    alert: Alert,
+    config: PublicMediaConfig,
+    message: Dict[str, Any],
+) -> Dict[str, Any]:
     local_path = _local_alert_image_path(alert)
-    base_message = format_alert_message(alert)
     occurred_at = alert.alert_time if isinstance(alert.alert_time, datetime) else datetime.now()
     object_key = build_alert_object_key(
         config,
         node_id=get_node_id(),
-        external_alert_id=base_message["external_alert_id"],
+        external_alert_id=message["external_alert_id"],
         occurred_at=occurred_at,
     )
     uploaded = upload_alert_image(config, local_path=local_path, object_key=object_key)
-    event = _base_event(alert, event_type="alert.media.ready", delivery_mode="object_storage")
+    event = _base_event(message, event_type="alert.media.ready", delivery_mode="object_storage")
     event["alert_image_url"] = uploaded.url
     event["alert_image_ori_url"] = None
     event["alert_video_url"] = None
@@ -225,10 +301,27 @@ def _media_ready_event(task: AlertDeliveryTask, alert: Alert, config: PublicMedi
 
 
 class AlertDeliveryWorker:
-    def __init__(self, *, poll_interval_seconds: float = 1.0):
+    """Claims due outbox tasks in batches and publishes them concurrently.
+
+    Database work (claiming, loading alerts, recording outcomes) stays on the
+    worker thread; only event building and publishing run in the per-provider
+    sender pool, so a slow endpoint no longer serializes the whole outbox.
+    """
+
+    def __init__(
+        self,
+        *,
+        poll_interval_seconds: float = 1.0,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ):
         self.poll_interval_seconds = poll_interval_seconds
+        self.batch_size = max(1, int(batch_size or ALERT_DELIVERY_BATCH_SIZE))
+        self.concurrency = max(1, int(concurrency or ALERT_DELIVERY_CONCURRENCY))
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        self._senders: Dict[str, ThreadPoolExecutor] = {}
+        self._senders_lock = threading.Lock()
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
@@ -242,6 +335,10 @@ class AlertDeliveryWorker:
         self._stop_event.set()
         if self._thread:
             self._thread.join(timeout=5)
+        with self._senders_lock:
+            senders, self._senders = self._senders, {}
+        for sender in senders.values():
+            sender.shutdown(wait=False, cancel_futures=True)
 
     def _recover_stale_tasks(self, *, force: bool = False) -> None:
         now = datetime.now()
@@ -259,43 +356,76 @@ class AlertDeliveryWorker:
             .execute()
         )
 
-    def _claim_next(self) -> Optional[AlertDeliveryTask]:
+    def _claim_batch(self, limit: int) -> List[AlertDeliveryTask]:
         now = datetime.now()
-        with db.atomic():
-            task = (
-                AlertDeliveryTask.select()
-                .where(
-                    AlertDeliveryTask.status.in_(("pending", "retrying"))
-                    & (AlertDeliveryTask.next_attempt_at <= now)
-                )
-                .order_by(AlertDeliveryTask.next_attempt_at, AlertDeliveryTask.id)
-                .first()
+        database = AlertDeliveryTask._meta.database
+        due = (
+            AlertDeliveryTask.select(AlertDeliveryTask.id)
+            .where(
+                AlertDeliveryTask.status.in_(_CLAIMABLE_STATUSES)
+                & (AlertDeliveryTask.next_attempt_at <= now)
             )
-            if task is None:
-                return None
-            updated = (
+            .order_by(AlertDeliveryTask.next_attempt_at, AlertDeliveryTask.id)
+            .limit(limit)
+        )
+        with database.atomic():
+            if isinstance(database, PostgresqlDatabase):
+                # Concurrent workers skip rows another worker is claiming instead of waiting on them.
+                due = due.for_update(skip_locked=True)
+            task_ids = [row.id for row in due]
+            if not task_ids:
+                return []
+            (
                 AlertDeliveryTask.update(status="processing", locked_at=now, updated_at=now)
                 .where(
-                    (AlertDeliveryTask.id == task.id)
-                    & AlertDeliveryTask.status.in_(("pending", "retrying"))
+                    AlertDeliveryTask.id.in_(task_ids)
+                    & AlertDeliveryTask.status.in_(_CLAIMABLE_STATUSES)
                 )
                 .execute()
             )
-            if not updated:
-                return None
-        return AlertDeliveryTask.get_by_id(task.id)
-
-    def _complete(self, task: AlertDeliveryTask) -> None:
-        now = datetime.now()
-        task.status = "succeeded"
-        task.locked_at = None
-        task.last_error = None
-        task.updated_at = now
-        task.completed_at = now
-        task.save()
+        # SQLite has no row locks: the status guard keeps the claim exclusive and the
+        # lease timestamp filters out rows another worker claimed in between.
+        return list(
+            AlertDeliveryTask.select()
+            .where(
+                AlertDeliveryTask.id.in_(task_ids)
+                & (AlertDeliveryTask.status == "processing")
+                & (AlertDeliveryTask.locked_at == now)
+            )
+            .order_by(AlertDeliveryTask.next_attempt_at, AlertDeliveryTask.id)
+        )
 
-    def _fail(self, task: AlertDeliveryTask, exc: Exception, config: PublicMediaConfig) -> None:
-        now = datetime.now()
+    def _sender_pool(self, provider: str) -> ThreadPoolExecutor:
+        with self._senders_lock:
+            sender = self._senders.get(provider)
+            if sender is None:
+                workers = min(self.concurrency, _PROVIDER_MAX_CONCURRENCY.get(provider, self.concurrency))
+                sender = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"alert-delivery-{provider}")
+                self._senders[provider] = sender
+            return sender
+
+    def _prepare(
+        self,
+        task: AlertDeliveryTask,
+        config: PublicMediaConfig,
+        publish: Callable[[Dict[str, Any]], None],
+    ) -> Tuple[Alert, Callable[[], None]]:
+        """Load everything that needs the database and return the send step for the pool."""
+        alert = Alert.get_by_id(task.alert_id)
+        message = format_alert_message(alert)
+        if task.event_type == "alert.created":
+            return alert, lambda: publish(_created_event(task, alert, config, message))
+        if task.event_type == "alert.media.ready":
+            return alert, lambda: publish(_media_ready_event(task, alert, config, message))
+        raise ValueError(f"不支持的投递事件类型: {task.event_type}")
+
+    def _apply_failure(
+        self,
+        task: AlertDeliveryTask,
+        exc: Exception,
+        config: PublicMediaConfig,
+        now: datetime,
+    ) -> AlertDeliveryTask:
         attempts = task.attempts + 1
         task.attempts = attempts
         task.locked_at = None
@@ -313,45 +443,91 @@ class AlertDeliveryWorker:
             task.status = "retrying"
             task.next_attempt_at = now + timedelta(seconds=delay)
             logger.warning("告警异步投递待重试 task=%s attempt=%s: %s", task.id, attempts, exc)
-        task.save()
-
-    def _process(self, task: AlertDeliveryTask) -> None:
-        alert = Alert.get_by_id(task.alert_id)
-        config = get_public_media_config()
-        if task.event_type == "alert.created":
-            event = _created_event(task, alert, config)
-            _publish_or_raise(event)
-            if task.delivery_mode == "object_storage" and alert.alert_image:
-                now = datetime.now()
-                AlertDeliveryTask.get_or_create(
-                    alert=alert,
-                    event_type="alert.media.ready",
-                    defaults={
-                        "delivery_mode": "object_storage",
-                        "status": "pending",
-                        "attempts": 0,
-                        "next_attempt_at": now,
-                        "created_at": now,
-                        "updated_at": now,
-                    },
+        return task
+
+    def _finish(
+        self,
+        outcomes: List[Tuple[AlertDeliveryTask, Optional[Alert], Optional[Exception]]],
+        config: PublicMediaConfig,
+    ) -> None:
+        """Record a whole batch: one UPDATE for the delivered tasks, one bulk UPDATE for the rest."""
+        now = datetime.now()
+        delivered = [(task, alert) for task, alert, exc in outcomes if exc is None]
+        failed = [self._apply_failure(task, exc, config, now) for task, _, exc in outcomes if exc is not None]
+        with AlertDeliveryTask._meta.database.atomic():
+            if delivered:
+                (
+                    AlertDeliveryTask.update(
+                        status="succeeded",
+                        locked_at=None,
+                        last_error=None,
+                        updated_at=now,
+                        completed_at=now,
+                    )
+                    .where(AlertDeliveryTask.id.in_([task.id for task, _ in delivered]))
+                    .execute()
+                )
+            for task, alert in delivered:
+                if task.event_type == "alert.created" and task.delivery_mode == "object_storage" and alert.alert_image:
+                    AlertDeliveryTask.get_or_create(
+                        alert=alert,
+                        event_type="alert.media.ready",
+                        defaults={
+                            "delivery_mode": "object_storage",
+                            "status": "pending",
+                            "attempts": 0,
+                            "next_attempt_at": now,
+                            "created_at": now,
+                            "updated_at": now,
+                        },
+                    )
+            if failed:
+                AlertDeliveryTask.bulk_update(
+                    failed,
+                    fields=[
+                        AlertDeliveryTask.attempts,
+                        AlertDeliveryTask.status,
+                        AlertDeliveryTask.locked_at,
+                        AlertDeliveryTask.last_error,
+                        AlertDeliveryTask.next_attempt_at,
+                        AlertDeliveryTask.updated_at,
+                        AlertDeliveryTask.completed_at,
+                    ],
                 )
-        elif task.event_type == "alert.media.ready":
-            _publish_or_raise(_media_ready_event(task, alert, config))
-        else:
-            raise ValueError(f"不支持的投递事件类型: {task.event_type}")
-        self._complete(task)
 
     def run_once(self) -> bool:
         # Recover tasks stranded by database errors without requiring a process restart.
         # A lease prevents another healthy worker from having its active task stolen.
         self._recover_stale_tasks()
-        task = self._claim_next()
-        if task is None:
+        tasks = self._claim_batch(self.batch_size)
+        if not tasks:
             return False
-        try:
-            self._process(task)
-        except Exception as exc:
-            self._fail(task, exc, get_public_media_config())
+        config = get_public_media_config()
+        # Channel settings are read once per batch here, so sender threads never query the database.
+        mq_config = get_message_queue_config()
+        publish = partial(
+            _publish_or_raise,
+            config=mq_config,
+            provider_config=load_provider_config(mq_config.provider),
+        )
+        sender = self._sender_pool(mq_config.provider)
+        outcomes: List[Tuple[AlertDeliveryTask, Optional[Alert], Optional[Exception]]] = []
+        sending = []
+        for task in tasks:
+            try:
+                alert, send = self._prepare(task, config, publish)
+            except Exception as exc:
+                outcomes.append((task, None, exc))
+                continue
+            sending.append((task, alert, sender.submit(send)))
+        for task, alert, future in sending:
+            try:
+                future.result()
+            except Exception as exc:
+                outcomes.append((task, alert, exc))
+            else:
+                outcomes.append((task, alert, None))
+        self._finish(outcomes, config)
         return True
 
     def _run(self) -> None:
@@ -0,0 +1,356 @@
+"""
+source host 内的告警异步落库
+
+告警触发后的重活（可视化绘制、JPEG 编码写盘、Alert/outbox 入库、启动录像）不再占用
+WorkflowRunner 线程：runner 只完成触发判定，把写盘动作和告警字段封装成 AlertJob 提交到这里。
+
+- 每个 worker 一个有界队列，job 按 key（source、workflow、告警节点）固定分片，
+  同一告警节点的图片写盘与告警入库严格按提交顺序执行；
+- worker 一次取出队列中已就绪的多个 job，先依次写图片，再在一个事务内批量写入
+  Alert（PostgreSQL 多行 INSERT ... RETURNING）；提交后启动录像，最后在一个短事务内
+  回写录像路径并批量创建 AlertDeliveryTask；
+- 队列满时提交方阻塞等待而不是丢弃或改为同步执行，否则会打乱同一节点的顺序；
+  等待次数与耗时、队列深度、落库延迟随 source host 状态行上报。
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from peewee import PostgresqlDatabase
+
+from app import logger
+from app.core.alert_delivery import enqueue_alert_deliveries
+from app.core.database_models import Alert
+
+
+# 关闭/刷新时等待 worker 处理完积压 job 的最长时间
+DEFAULT_FLUSH_TIMEOUT_SECONDS = 30.0
+# 提交方阻塞等待队列空位时，每隔这么久检查一次 sink 是否已关闭
+_SUBMIT_POLL_SECONDS = 0.5
+
+
+class AlertJob:
+    """一次告警落库动作：按顺序执行的写盘动作，以及可选的告警记录。
+
+    media 中的可调用对象在 worker 线程执行，必须只引用提交时已复制的帧数据。
+    alert_fields 为 None 时只写图片（窗口检测的逐帧图片序列）。
+    """
+
+    __slots__ = (
+        'key', 'media', 'alert_fields', 'recorder', 'recording', 'publish',
+        'log_prefix', 'submitted_at', 'alert',
+    )
+
+    def __init__(
+        self,
+        key: Tuple[Any, ...],
+        media: Sequence[Callable[[], Any]] = (),
+        alert_fields: Optional[Dict[str, Any]] = None,
+        recorder=None,
+        recording: Optional[Dict[str, Any]] = None,
+        publish: bool = False,
+        log_prefix: str = '',
+    ):
+        self.key = key
+        self.media = tuple(media)
+        self.alert_fields = alert_fields
+        self.recorder = recorder
+        self.recording = recording
+        self.publish = publish
+        self.log_prefix = log_prefix
+        self.submitted_at = time.monotonic()
+        self.alert: Optional[Alert] = None
+
+
+def _write_media(job: AlertJob):
+    for write in job.media:
+        try:
+            write()
+        except Exception as exc:
+            logger.warning(f"{job.log_prefix} 写入告警图片失败: {exc}", exc_info=True)
+
+
+def _insert_alerts(rows: List[Dict[str, Any]]) -> List[Alert]:
+    database = Alert._meta.database
+    if len(rows) > 1 and isinstance(database, PostgresqlDatabase):
+        # 多行 INSERT ... RETURNING 按 VALUES 顺序返回主键
+        cursor = Alert.insert_many(rows).returning(Alert.id).tuples().execute()
+        alerts = []
+        for (alert_id,), fields in zip(cursor, rows):
+            alert = Alert(id=alert_id, **fields)
+            alert._dirty.clear()
+            alerts.append(alert)
+        return alerts
+    # SQLite 的 RETURNING 不保证顺序；同一事务内逐行插入的开销很小
+    return [Alert.create(**fields) for fields in rows]
+
+
+def _insert_alert_rows(jobs: List[AlertJob]):
+    with Alert._meta.database.atomic():
+        alerts = _insert_alerts([job.alert_fields for job in jobs])
+    for job, alert in zip(jobs, alerts):
+        job.alert = alert
+
+
+def _start_recordings(jobs: List[AlertJob]) -> List[Alert]:
+    """在告警事务提交后启动录像；此后不会再回滚，录像文件名中的告警 ID 一定存在。"""
+    recorded = []
+    for job in jobs:
+        if job.alert is None or job.recorder is None or job.recording is None:
+            continue
+        try:
+            job.alert.alert_video = job.recorder.start_recording(alert_id=job.alert.id, **job.recording)
+            recorded.append(job.alert)
+            logger.info(f"{job.log_prefix} 已启动视频录制任务: {job.alert.alert_video}")
+        except Exception as rec_err:
+            logger.error(f"{job.log_prefix} 启动视频录制失败: {rec_err}", exc_info=True)
+    return recorded
+
+
+def _finalize_alerts(recorded: List[Alert], published: List[Alert]):
+    """回写录像路径并创建 outbox 任务。
+
+    两者在同一个短事务内完成，事务提交前 delivery worker 看不到任务，
+    因此 URL 模式不会发布缺少 alert_video_url 的半成品消息。
+    """
+    with Alert._meta.database.atomic():
+        if recorded:
+            Alert.bulk_update(recorded, fields=[Alert.alert_video])
+        enqueue_alert_deliveries(published)
+
+
+def persist_alert_jobs(jobs: List[AlertJob]):
+    """按提交顺序写图片，再批量写入其中的告警记录、启动录像并创建投递任务。
+
+    告警入库与录像路径回写/outbox 分两个事务：录像在第一个事务提交后才启动，
+    任一阶段批量失败时只逐条重试该阶段，已启动的录像不会重复启动。
+    只有一个告警且入库失败时异常向上抛出。
+    """
+    for job in jobs:
+        _write_media(job)
+
+    alert_jobs = [job for job in jobs if job.alert_fields is not None]
+    if not alert_jobs:
+        return
+    if len(alert_jobs) == 1:
+        _insert_alert_rows(alert_jobs)
+    else:
+        try:
+            _insert_alert_rows(alert_jobs)
+        except Exception as exc:
+            logger.warning(f"[AlertSink] 批量写入 {len(alert_jobs)} 条告警失败，改为逐条写入: {exc}")
+            for job in alert_jobs:
+                job.alert = None
+                try:
+                    _insert_alert_rows([job])
+                except Exception as single_exc:
+                    logger.error(f"{job.log_prefix} 创建告警失败: {single_exc}", exc_info=True)
+
+    created = [job for job in alert_jobs if job.alert is not None]
+    if not created:
+        return
+    recorded = _start_recordings(created)
+    published = [job.alert for job in created if job.publish]
+    try:
+        _finalize_alerts(recorded, published)
+    except Exception as exc:
+        if len(created) == 1:
+            logger.error(f"{created[0].log_prefix} 告警 {created[0].alert.id} 回写录像或创建投递任务失败: {exc}", exc_info=True)
+            return
+        logger.warning(f"[AlertSink] 批量回写 {len(created)} 条告警失败，改为逐条写入: {exc}")
+        recorded_ids = {alert.id for alert in recorded}
+        for job in created:
+            try:
+                _finalize_alerts(
+                    [job.alert] if job.alert.id in recorded_ids else [],
+                    [job.alert] if job.publish else [],
+                )
+            except Exception as single_exc:
+                logger.error(
+                    f"{job.log_prefix} 告警 {job.alert.id} 回写录像或创建投递任务失败: {single_exc}",
+                    exc_info=True,
+                )
+
+
+class AlertSink:
+    """按 key 分片的有界告警落库队列与 worker 线程。"""
+
+    def __init__(self, workers: int, queue_size: int, batch_size: int, name: str = 'alert-sink'):
+        self.name = name
+        self.batch_size = max(1, int(batch_size))
+        self.queue_size = max(1, int(queue_size))
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in range(max(1, int(workers)))]
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+        self._threads = [
+            threading.Thread(target=self._run, args=(jobs,), name=f"{name}-{index}", daemon=True)
+            for index, jobs in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _reset_stats(self):
+        self._submitted = 0
+        self._alerts_persisted = 0
+        self._alerts_failed = 0
+        self._batches = 0
+        self._batched_alerts = 0
+        self._max_depth = 0
+        self._backpressure_waits = 0
+        self._backpressure_wait_ms = 0.0
+        self._backpressure_max_wait_ms = 0.0
+        self._latency_total_ms = 0.0
+        self._latency_max_ms = 0.0
+
+    def _shard(self, key) -> queue.Queue:
+        return self._queues[hash(key) % len(self._queues)]
+
+    def submit(self, job: AlertJob):
+        """提交 job；队列满时阻塞等待空位。sink 已关闭时在调用线程同步执行。"""
+        if self._closed:
+            persist_alert_jobs([job])
+            return
+        shard = self._shard(job.key)
+        waited_ms = None
+        try:
+            shard.put_nowait(job)
+        except queue.Full:
+            started_at = time.perf_counter()
+            while True:
+                if self._closed:
+                    persist_alert_jobs([job])
+                    return
+                try:
+                    shard.put(job, timeout=_SUBMIT_POLL_SECONDS)
+                    break
+                except queue.Full:
+                    continue
+            waited_ms = (time.perf_counter() - started_at) * 1000.0
+
+        with self._stats_lock:
+            self._submitted += 1
+            self._max_depth = max(self._max_depth, shard.qsize())
+            if waited_ms is not None:
+                self._backpressure_waits += 1
+                self._backpressure_wait_ms += waited_ms
+                self._backpressure_max_wait_ms = max(self._backpressure_max_wait_ms, waited_ms)
+
+    def flush(self, timeout: float = DEFAULT_FLUSH_TIMEOUT_SECONDS) -> bool:
+        """等待此前提交的 job 全部处理完；超时返回 False。"""
+        if self._closed:
+            return True
+        deadline = time.monotonic() + timeout
+        markers = []
+        for shard in self._queues:
+            marker = threading.Event()
+            try:
+                shard.put(marker, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                return False
+            markers.append(marker)
+        return all(marker.wait(max(0.0, deadline - time.monotonic())) for marker in markers)
+
+    def close(self, timeout: float = DEFAULT_FLUSH_TIMEOUT_SECONDS):
+        if self._closed:
+            return
+        if not self.flush(timeout):
+            logger.warning(f"[AlertSink] {self.name} 关闭时仍有告警未写入，剩余 {self.depth} 个")
+        self._closed = True
+        for shard in self._queues:
+            try:
+                shard.put_nowait(None)
+            except queue.Full:
+                pass
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    @property
+    def depth(self) -> int:
+        return sum(shard.qsize() for shard in self._queues)
+
+    def _run(self, shard: queue.Queue):
+        while True:
+            item = shard.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = shard.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            jobs = []
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    # flush 标记：先处理完排在它前面的 job 再通知等待方
+                    self._process(jobs)
+                    jobs = []
+                    item.set()
+                else:
+                    jobs.append(item)
+            self._process(jobs)
+            if stop:
+                return
+
+    def _process(self, jobs: List[AlertJob]):
+        if not jobs:
+            return
+        try:
+            persist_alert_jobs(jobs)
+        except Exception as exc:
+            for job in jobs:
+                if job.alert_fields is not None:
+                    logger.error(f"{job.log_prefix} 创建告警失败: {exc}", exc_info=True)
+
+        now = time.monotonic()
+        alert_jobs = [job for job in jobs if job.alert_fields is not None]
+        with self._stats_lock:
+            if alert_jobs:
+                self._batches += 1
+                self._batched_alerts += len(alert_jobs)
+            for job in alert_jobs:
+                if job.alert is None:
+                    self._alerts_failed += 1
+                    continue
+                self._alerts_persisted += 1
+                latency_ms = (now - job.submitted_at) * 1000.0
+                self._latency_total_ms += latency_ms
+                self._latency_max_ms = max(self._latency_max_ms, latency_ms)
+
+        for job in alert_jobs:
+            if job.alert is not None:
+                logger.info(f"{job.log_prefix} Alert 创建成功，ID: {job.alert.id}")
+
+    def get_stats(self, reset: bool = False) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = {
+                'workers': len(self._queues),
+                'queue_size': self.queue_size,
+                'depth': self.depth,
+                'max_depth': self._max_depth,
+                'submitted': self._submitted,
+                'alerts_persisted': self._alerts_persisted,
+                'alerts_failed': self._alerts_failed,
+                'avg_batch_size': (
+                    round(self._batched_alerts / self._batches, 2) if self._batches else None
+                ),
+                'backpressure_waits': self._backpressure_waits,
+                'backpressure_wait_ms': round(self._backpressure_wait_ms, 2),
+                'backpressure_max_wait_ms': round(self._backpressure_max_wait_ms, 2),
+                'avg_latency_ms': (
+                    round(self._latency_total_ms / self._alerts_persisted, 2)
+                    if self._alerts_persisted else None
+                ),
+                'max_latency_ms': round(self._latency_max_ms, 2),
+            }
+            if reset:
+                self._reset_stats()
+        return stats
@@ -7,6 +7,7 @@ from PIL import Image, ImageDraw, ImageFont
 
 from app import logger
 from app.core.cv2_compat import cv2, require_cv2
+from app.core.roi_mask_cache import RoiMask, roi_mask_cache
 
 
 class BaseAlgorithm(ABC):
@@ -70,26 +71,42 @@ class BaseAlgorithm(ABC):
             roi_regions: ROI热区配置列表
 
         Returns:
-            mask: 二值掩码，热区内为255，热区外为0
+            mask: 二值掩码，热区内为255，热区外为0。
+                  掩码按帧尺寸与热区坐标在进程内缓存并共享，是只读数组；需要修改时先 copy()
         """
-        if not roi_regions:
+        return BaseAlgorithm.get_roi_mask(frame_shape, roi_regions).mask
+
+    @staticmethod
+    def get_roi_mask(frame_shape: tuple, roi_regions: list) -> RoiMask:
+        """返回缓存的 RoiMask（只读掩码及按需计算的积分图）。"""
+        height, width = int(frame_shape[0]), int(frame_shape[1])
+        resolved = []
+        for region in roi_regions or []:
+            pts = BaseAlgorithm._resolve_roi_points(region, width, height)
+            if pts is not None:
+                resolved.append(np.ascontiguousarray(pts))
+        # 无热区配置时为全画面掩码；有配置但顶点全部无效时为全黑掩码
+        key = (height, width, bool(roi_regions), tuple(pts.tobytes() for pts in resolved))
+        return roi_mask_cache.get(
+            key,
+            lambda: BaseAlgorithm._rasterize_roi_mask(height, width, resolved, bool(roi_regions)),
+        )
+
+    @staticmethod
+    def _rasterize_roi_mask(height: int, width: int, polygons: list, has_regions: bool) -> np.ndarray:
+        if not has_regions:
             # 如果没有ROI配置，返回全白掩码（全画面检测）
-            return np.ones((frame_shape[0], frame_shape[1]), dtype=np.uint8) * 255
+            return np.full((height, width), 255, dtype=np.uint8)
 
         # 创建黑色掩码
-        mask = np.zeros((frame_shape[0], frame_shape[1]), dtype=np.uint8)
-        height, width = frame_shape[0], frame_shape[1]
+        mask = np.zeros((height, width), dtype=np.uint8)
         try:
             cv2_impl = require_cv2()
         except ImportError:
             cv2_impl = None
 
         # 在每个ROI区域绘制白色多边形
-        for region in roi_regions:
-            pts = BaseAlgorithm._resolve_roi_points(region, width, height)
-            if pts is None:
-                continue
-
+        for pts in polygons:
             if cv2_impl is not None:
                 cv2_impl.fillPoly(mask, [pts.astype(np.int32)], 255)
             else:
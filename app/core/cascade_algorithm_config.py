@@ -28,6 +28,7 @@ _INFERENCE_KEYS = {
     "input_height",
     "rknn_input_format",
     "rknn_core_mask",
+    "rknn_batch_size",
     "onnx_input_format",
     "onnx_input_layout",
     "onnx_input_dtype",
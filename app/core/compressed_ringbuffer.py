@@ -19,6 +19,7 @@ from app.core.frame_utils import (
     normalize_pixel_format,
     nv12_to_bgr,
 )
+from app.core.ringbuffer import find_time_range_positions
 
 try:
     import fcntl
@@ -171,6 +172,14 @@ class CompressedVideoRingBuffer:
             + (index % self.capacity) * self.max_frame_bytes
         )
 
+    def _timestamp_array(self) -> np.ndarray:
+        return np.ndarray(
+            shape=(self.capacity,),
+            dtype=np.dtype(self.TIMESTAMP_FORMAT[0] + 'f8'),
+            buffer=self.shm.buf,
+            offset=self.metadata_size,
+        )
+
     def _write_timestamp(self, index: int, timestamp: float):
         struct.pack_into(self.TIMESTAMP_FORMAT, self.shm.buf, self._get_timestamp_offset(index), timestamp)
 
@@ -300,45 +309,40 @@ class CompressedVideoRingBuffer:
 
     def get_recent_frames(self, seconds: float) -> List[Tuple[np.ndarray, float]]:
         with self._guard():
-            write_idx, read_idx, count, _, _, _ = self._read_metadata()
+            write_idx, _, count, _, _, _ = self._read_metadata()
             if count == 0:
                 return []
-
-            latest_idx = (write_idx - 1) % self.capacity
-            latest_timestamp = self._read_timestamp(latest_idx)
-            cutoff_time = latest_timestamp - seconds
-
-            frames: List[Tuple[np.ndarray, float]] = []
-            for i in range(count):
-                actual_idx = (read_idx + i) % self.capacity
-                timestamp = self._read_timestamp(actual_idx)
-                if timestamp >= cutoff_time:
-                    frames.append((self._read_frame_at(actual_idx), timestamp))
-            return frames
+            latest_timestamp = self._read_timestamp((write_idx - 1) % self.capacity)
+        return list(self.iter_frames_in_time_range(latest_timestamp - seconds, latest_timestamp))
 
     def get_frames_in_time_range(self, start_time: float, end_time: float) -> List[Tuple[np.ndarray, float]]:
         return list(self.iter_frames_in_time_range(start_time, end_time))
 
+    def _read_payload_if_unchanged(self, actual_idx: int, expected_timestamp: float) -> Optional[bytes]:
+        with self._guard():
+            # 定位之后槽位可能已被新帧覆盖
+            if self._read_timestamp(actual_idx) != expected_timestamp:
+                return None
+            length = self._read_length(actual_idx)
+            if length <= 0:
+                return None
+            offset = self._get_frame_offset(actual_idx)
+            return bytes(self.shm.buf[offset:offset + length])
+
     def iter_frames_in_time_range(self, start_time: float, end_time: float):
-        payloads: List[Tuple[bytes, float]] = []
+        """二分定位时间范围后逐帧拷贝、解码；锁只在拷贝单帧负载时持有。"""
         with self._guard():
             _, read_idx, count, _, _, _ = self._read_metadata()
-            if count == 0:
-                return iter(())
-
-            for i in range(count):
-                actual_idx = (read_idx + i) % self.capacity
-                timestamp = self._read_timestamp(actual_idx)
-                if start_time <= timestamp <= end_time:
-                    length = self._read_length(actual_idx)
-                    if length <= 0:
-                        continue
-                    offset = self._get_frame_offset(actual_idx)
-                    payloads.append((bytes(self.shm.buf[offset:offset + length]), timestamp))
+            positions, ordered = find_time_range_positions(
+                self._timestamp_array(), read_idx, count, start_time, end_time
+            )
 
         def _generator():
-            for payload, timestamp in payloads:
-                yield self._decode_frame(payload), timestamp
+            for position in positions:
+                timestamp = float(ordered[position])
+                payload = self._read_payload_if_unchanged((read_idx + position) % self.capacity, timestamp)
+                if payload is not None:
+                    yield self._decode_frame(payload), timestamp
 
         return _generator()
 
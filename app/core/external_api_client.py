@@ -0,0 +1,263 @@
+"""
+外部 API 节点的 HTTP 客户端
+
+同一进程（source host）内每个外部 API endpoint 共享一个客户端：
+- requests.Session 保持 keep-alive 连接池，不再每帧重新建立 TCP/TLS 连接；
+- 限制同时在途的请求数，慢接口不会被多个工作流/节点同时压垮；
+- 可选 TTL 缓存：请求体（去掉 frame_timestamp）相同则直接复用响应；
+- 按 endpoint 统计请求延迟直方图，随 source host 状态行上报。
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+DEFAULT_CACHE_ENTRIES = 256
+# 每帧都会变化、但不影响接口结果的字段，不参与缓存键
+_VOLATILE_PAYLOAD_KEYS = ('frame_timestamp',)
+
+
+class ExternalApiBusyError(RuntimeError):
+    """endpoint 在途请求数已达上限。"""
+
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图（毫秒），最后一个桶为 +inf。"""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, latency_ms: float):
+        index = len(self.buckets_ms)
+        for position, bound in enumerate(self.buckets_ms):
+            if latency_ms <= bound:
+                index = position
+                break
+        self.counts[index] += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """返回第 q 分位所在桶的上界（+inf 桶返回最大值）。"""
+        count = sum(self.counts)
+        if not count:
+            return None
+        target = q * count
+        seen = 0
+        for position, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return float(self.buckets_ms[position]) if position < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        count = sum(self.counts)
+        labels = [f"le_{bound}" for bound in self.buckets_ms] + ['le_inf']
+        return {
+            'count': count,
+            'avg_ms': round(self.total_ms / count, 2) if count else None,
+            'max_ms': round(self.max_ms, 2),
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+def request_cache_key(method: str, url: str, payload: Dict[str, Any]) -> str:
+    body = {key: value for key, value in (payload or {}).items() if key not in _VOLATILE_PAYLOAD_KEYS}
+    encoded = json.dumps([method, url, body], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+class ExternalApiClient:
+    """单个 endpoint 的连接池客户端，可被多个工作流线程并发调用。"""
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        max_in_flight: int,
+        session: Optional[requests.Session] = None,
+        cache_entries: int = DEFAULT_CACHE_ENTRIES,
+    ):
+        self.endpoint_url = endpoint_url
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.cache_entries = max(1, int(cache_entries))
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._cache: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._histogram = LatencyHistogram()
+        self._errors = 0
+        self._busy_rejections = 0
+        self._cache_hits = 0
+
+    def set_max_in_flight(self, max_in_flight: int):
+        with self._condition:
+            self.max_in_flight = max(1, int(max_in_flight))
+            self._condition.notify_all()
+
+    def request(
+        self,
+        method: str,
+        headers: Dict[str, Any],
+        payload: Dict[str, Any],
+        timeout: float,
+        cache_ttl_seconds: float = 0,
+        block: bool = True,
+    ) -> Dict[str, Any]:
+        """发送请求并返回 {status_code, headers, body}。
+
+        block=False 时在途请求已满立即抛 ExternalApiBusyError；否则最多等待 timeout 秒。
+        timeout 是等待空位与请求本身共用的总预算，请求只使用等待后剩余的时间。
+        命中缓存的结果被多个调用方共享，调用方不得原地修改。
+        """
+        cache_key = request_cache_key(method, self.endpoint_url, payload) if cache_ttl_seconds > 0 else None
+        if cache_key is not None:
+            cached = self._cached(cache_key)
+            if cached is not None:
+                return cached
+
+        deadline = time.monotonic() + timeout
+        self._acquire(block, timeout)
+        started_at = time.perf_counter()
+        try:
+            response_payload = self._send(method, headers, payload, max(0.001, deadline - time.monotonic()))
+        except Exception:
+            with self._condition:
+                self._errors += 1
+            raise
+        finally:
+            latency_ms = (time.perf_counter() - started_at) * 1000.0
+            self._release(latency_ms)
+
+        if cache_key is not None:
+            with self._condition:
+                self._cache[cache_key] = (time.monotonic() + cache_ttl_seconds, response_payload)
+                self._cache.move_to_end(cache_key)
+                while len(self._cache) > self.cache_entries:
+                    self._cache.popitem(last=False)
+        return response_payload
+
+    def _cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        with self._condition:
+            entry = self._cache.get(cache_key)
+            if entry is None:
+                return None
+            expires_at, response_payload = entry
+            if expires_at <= time.monotonic():
+                del self._cache[cache_key]
+                return None
+            self._cache.move_to_end(cache_key)
+            self._cache_hits += 1
+            return response_payload
+
+    def _acquire(self, block: bool, timeout: float):
+        with self._condition:
+            if block:
+                acquired = self._condition.wait_for(
+                    lambda: self._in_flight < self.max_in_flight,
+                    timeout=timeout,
+                )
+            else:
+                acquired = self._in_flight < self.max_in_flight
+            if not acquired:
+                self._busy_rejections += 1
+                raise ExternalApiBusyError(
+                    f"外部 API 在途请求已达上限 {self.max_in_flight}: {self.endpoint_url}"
+                )
+            self._in_flight += 1
+
+    def _release(self, latency_ms: float):
+        with self._condition:
+            self._in_flight -= 1
+            self._histogram.observe(latency_ms)
+            self._condition.notify()
+
+    def _send(self, method: str, headers: Dict[str, Any], payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        response = self.session.request(
+            method=method,
+            url=self.endpoint_url,
+            headers=headers,
+            json=payload,
+            timeout=timeout,
+        )
+        try:
+            response.raise_for_status()
+            content_type = (response.headers.get('Content-Type') or '').lower()
+            if 'json' in content_type:
+                body = response.json()
+            else:
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = {'raw_text': response.text}
+            return {
+                'status_code': response.status_code,
+                'headers': dict(response.headers),
+                'body': body,
+            }
+        finally:
+            response.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'endpoint_url': self.endpoint_url,
+                'max_in_flight': self.max_in_flight,
+                'in_flight': self._in_flight,
+                'errors': self._errors,
+                'busy_rejections': self._busy_rejections,
+                'cache_hits': self._cache_hits,
+                'cache_entries': len(self._cache),
+                'latency': self._histogram.snapshot(),
+            }
+
+    def close(self):
+        self.session.close()
+
+
+_clients: Dict[Tuple[Any, str], ExternalApiClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_external_api_client(api_id: Any, endpoint_url: str, max_in_flight: int) -> ExternalApiClient:
+    """进程内按 (api_id, endpoint_url) 共享客户端；在途上限以最后一次加载的配置为准。"""
+    key = (api_id, endpoint_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = ExternalApiClient(endpoint_url, max_in_flight)
+            _clients[key] = client
+            return client
+    if client.max_in_flight != max(1, int(max_in_flight)):
+        client.set_max_in_flight(max_in_flight)
+    return client
+
+
+def get_external_api_stats() -> List[Dict[str, Any]]:
+    with _clients_lock:
+        clients = list(_clients.items())
+    return [{'external_api_id': api_id, **client.get_stats()} for (api_id, _), client in clients]
+
+
+def close_external_api_clients():
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
@@ -0,0 +1,300 @@
+"""
+按帧共享的派生图像缓存
+
+SourceWorkflowHost 把同一帧分发给该 source 下的全部工作流。各工作流的
+FrameExecutionContext 需要 RGB/BGR 全图或缩小图时先查这里，同一帧的同一种
+转换在进程内只做一次。每帧按时间戳建立一个条目，引用计数等于收到该帧的
+工作流数；最后一个工作流执行完（或该帧被更新的帧替换而未执行）时释放条目。
+缓存的图像被多个工作流共享，因此统一设为只读。
+
+除派生图像外，条目还保存同一帧上可复用的推理结果（shared_result）。执行器在
+调用算法节点时通过 frame_scope 标记当前处理的共享帧，推理后端据此判断输入是否
+就是这一帧，相同模型、相同预处理的请求只推理一次。
+"""
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.cv2_compat import cv2, require_cv2
+from app.core.frame_utils import frame_to_bgr, frame_to_rgb, infer_frame_dimensions
+
+
+DEFAULT_MAX_FRAMES = 4
+
+
+def _read_only(image: np.ndarray) -> np.ndarray:
+    image.setflags(write=False)
+    return image
+
+
+class DerivedFrameImages:
+    """单帧的派生图像；同一种图像被并发请求时只有一个线程做转换。"""
+
+    def __init__(
+        self,
+        frame: np.ndarray,
+        timestamp: float,
+        pixel_format: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        refs: int = 1,
+        cache: Optional['SharedFrameCache'] = None,
+        on_release: Optional[Callable[[], None]] = None,
+    ):
+        """on_release 在最后一个引用释放时调用一次（例如解除 ring buffer 槽位的钉住）。"""
+        if width is None or height is None:
+            width, height = infer_frame_dimensions(frame, pixel_format=pixel_format)
+        self.frame = frame
+        self.timestamp = timestamp
+        self.pixel_format = pixel_format
+        self.width = int(width)
+        self.height = int(height)
+        self._cache = cache
+        self._on_release = on_release
+        self._refs = max(0, int(refs))
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self._images: Dict[Tuple, np.ndarray] = {}
+        self._results: Dict[Tuple, Any] = {}
+
+    def rgb(self) -> np.ndarray:
+        return self._get(('rgb', self.width, self.height), self._convert_rgb)
+
+    def bgr(self) -> np.ndarray:
+        return self._get(('bgr', self.width, self.height), self._convert_bgr)
+
+    def resized(self, width: int, height: int, color: str = 'rgb') -> np.ndarray:
+        """按目标尺寸缩放的 RGB/BGR 图像，同一尺寸只缩放一次。"""
+        color = 'bgr' if str(color).lower() == 'bgr' else 'rgb'
+        width, height = int(width), int(height)
+        if (width, height) == (self.width, self.height):
+            return self.bgr() if color == 'bgr' else self.rgb()
+        return self._get((color, width, height), lambda: self._resize(color, width, height))
+
+    def shared_result(self, key: Tuple, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """同一帧上 key 相同的计算只执行一次，返回 (结果, 是否复用)。
+
+        并发请求同一 key 时其余线程等待第一个计算完成；计算抛异常时不缓存，
+        等待的线程会各自重试。结果被多个工作流共享，调用方不得原地修改。
+        """
+        result, hit = self._get_or_compute(self._results, ('result', *key), compute)
+        if self._cache is not None:
+            self._cache._record_inference(hit)
+        return result, hit
+
+    def image_kind(self, array: np.ndarray) -> Optional[str]:
+        """array 与本帧共用内存时返回 'frame'（原始帧）、'rgb' 或 'bgr'，否则返回 None。
+
+        只比较已经存在的图像，不会为此触发转换。
+        """
+        if not isinstance(array, np.ndarray):
+            return None
+        if _same_memory(array, self.frame):
+            return 'frame'
+        for color in ('rgb', 'bgr'):
+            image = self._images.get((color, self.width, self.height))
+            if image is not None and _same_memory(array, image):
+                return color
+        return None
+
+    def _get(self, key: Tuple, convert) -> np.ndarray:
+        image, hit = self._get_or_compute(self._images, key, lambda: _read_only(convert()))
+        self._record(hit)
+        return image
+
+    def _get_or_compute(self, store: Dict[Tuple, Any], key: Tuple, compute) -> Tuple[Any, bool]:
+        value = store.get(key)
+        if value is not None:
+            return value, True
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            value = store.get(key)
+            if value is not None:
+                return value, True
+            value = compute()
+            if self._refs > 0 or self._cache is None:
+                store[key] = value
+            return value, False
+
+    def _record(self, hit: bool):
+        if self._cache is not None:
+            self._cache._record(hit)
+
+    def _convert_rgb(self) -> np.ndarray:
+        return frame_to_rgb(self.frame, pixel_format=self.pixel_format, width=self.width, height=self.height)
+
+    def _convert_bgr(self) -> np.ndarray:
+        return frame_to_bgr(self.frame, pixel_format=self.pixel_format, width=self.width, height=self.height)
+
+    def _resize(self, color: str, width: int, height: int) -> np.ndarray:
+        require_cv2()
+        source = self.bgr() if color == 'bgr' else self.rgb()
+        interpolation = cv2.INTER_AREA if width < self.width and height < self.height else cv2.INTER_LINEAR
+        return cv2.resize(source, (width, height), interpolation=interpolation)
+
+    def release(self):
+        """一个工作流用完该帧；引用归零后丢弃派生图像并从缓存移除。"""
+        with self._lock:
+            if self._refs <= 0:
+                return
+            self._refs -= 1
+            if self._refs > 0:
+                return
+            self._images.clear()
+            self._results.clear()
+            on_release, self._on_release = self._on_release, None
+        if self._cache is not None:
+            self._cache._discard(self)
+        if on_release is not None:
+            on_release()
+
+    @property
+    def refs(self) -> int:
+        return self._refs
+
+
+def _same_memory(left: np.ndarray, right: np.ndarray) -> bool:
+    return (
+        left.__array_interface__['data'][0] == right.__array_interface__['data'][0]
+        and left.nbytes == right.nbytes
+        and left.dtype == right.dtype
+        and left.flags.c_contiguous
+        and right.flags.c_contiguous
+    )
+
+
+class FrameScope:
+    """一次算法调用所处理的共享帧，并统计其中推理请求的复用情况。"""
+
+    __slots__ = ('images', 'inference_requests', 'inference_dedup_hits')
+
+    def __init__(self, images: DerivedFrameImages):
+        self.images = images
+        self.inference_requests = 0
+        self.inference_dedup_hits = 0
+
+    def shared_result(self, key: Tuple, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        result, hit = self.images.shared_result(key, compute)
+        self.inference_requests += 1
+        if hit:
+            self.inference_dedup_hits += 1
+        return result, hit
+
+
+_current_frame_scope: ContextVar[Optional[FrameScope]] = ContextVar('frame_scope', default=None)
+
+
+def current_frame_scope() -> Optional[FrameScope]:
+    return _current_frame_scope.get()
+
+
+@contextmanager
+def frame_scope(images: Optional[DerivedFrameImages]):
+    """在 with 块内把 images 标记为当前处理的共享帧；images 为 None 时不做任何事。"""
+    if images is None:
+        yield None
+        return
+    scope = FrameScope(images)
+    token = _current_frame_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_frame_scope.reset(token)
+
+
+class SharedFrameCache:
+    """source host 级别的派生图像缓存，按帧时间戳索引。
+
+    max_frames 只是兜底：正常情况下条目在最后一个引用释放时移除，超过上限时
+    丢弃最旧的条目（仍持有它的工作流可以继续使用，只是不再共享新转换）。
+    """
+
+    def __init__(self, max_frames: int = DEFAULT_MAX_FRAMES):
+        self.max_frames = max(1, int(max_frames))
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[float, DerivedFrameImages]' = OrderedDict()
+        self._hits = 0
+        self._conversions = 0
+        self._frames_published = 0
+        self._inference_requests = 0
+        self._inference_dedup_hits = 0
+
+    def publish(
+        self,
+        frame: np.ndarray,
+        timestamp: float,
+        pixel_format: str,
+        refs: int,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        on_release: Optional[Callable[[], None]] = None,
+    ) -> DerivedFrameImages:
+        entry = DerivedFrameImages(
+            frame,
+            timestamp,
+            pixel_format,
+            width=width,
+            height=height,
+            refs=refs,
+            cache=self,
+            on_release=on_release,
+        )
+        with self._lock:
+            self._frames_published += 1
+            self._entries[timestamp] = entry
+            self._entries.move_to_end(timestamp)
+            while len(self._entries) > self.max_frames:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get(self, timestamp: float) -> Optional[DerivedFrameImages]:
+        with self._lock:
+            return self._entries.get(timestamp)
+
+    def _discard(self, entry: DerivedFrameImages):
+        with self._lock:
+            if self._entries.get(entry.timestamp) is entry:
+                del self._entries[entry.timestamp]
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._conversions += 1
+
+    def _record_inference(self, hit: bool):
+        with self._lock:
+            self._inference_requests += 1
+            if hit:
+                self._inference_dedup_hits += 1
+
+    def get_stats(self, reset: bool = False) -> dict:
+        with self._lock:
+            lookups = self._hits + self._conversions
+            stats = {
+                'live_frames': len(self._entries),
+                'frames_published': self._frames_published,
+                'conversions': self._conversions,
+                'hits': self._hits,
+                'hit_rate': (self._hits / lookups) if lookups else 0.0,
+                'inference_requests': self._inference_requests,
+                'inference_dedup_hits': self._inference_dedup_hits,
+                'inference_dedup_rate': (
+                    self._inference_dedup_hits / self._inference_requests
+                    if self._inference_requests
+                    else 0.0
+                ),
+            }
+            if reset:
+                self._hits = 0
+                self._conversions = 0
+                self._frames_published = 0
+                self._inference_requests = 0
+                self._inference_dedup_hits = 0
+        return stats
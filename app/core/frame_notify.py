@@ -0,0 +1,129 @@
+"""
+跨进程帧到达通知 - 基于共享内存中的 32 位序号
+
+写端每写入一帧把序号加一并唤醒等待者；读端先读序号、再检查缓冲区，
+没有新帧时阻塞等待序号变化。Linux 上使用 futex（共享映射上的非 PRIVATE
+futex 天然跨进程），其他平台退化为短间隔轮询。
+"""
+import ctypes
+import errno
+import os
+import platform
+import struct
+import time
+from typing import Optional
+
+from app import logger
+
+SEQUENCE_FORMAT = 'I'
+SEQUENCE_SIZE = struct.calcsize(SEQUENCE_FORMAT)
+
+# 非 futex 平台的轮询间隔
+FALLBACK_POLL_INTERVAL_SECONDS = 0.005
+
+_FUTEX_WAIT = 0
+_FUTEX_WAKE = 1
+_FUTEX_WAKE_ALL = 0x7FFFFFFF
+_SYS_FUTEX_BY_MACHINE = {
+    'x86_64': 202,
+    'amd64': 202,
+    'aarch64': 98,
+    'arm64': 98,
+    'riscv64': 98,
+    'armv7l': 240,
+    'armv8l': 240,
+    'i386': 240,
+    'i686': 240,
+}
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+def _load_futex_syscall():
+    if platform.system() != 'Linux':
+        return None, None
+    syscall_number = _SYS_FUTEX_BY_MACHINE.get(platform.machine().lower())
+    if syscall_number is None:
+        return None, None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        syscall = libc.syscall
+    except (OSError, AttributeError):
+        return None, None
+    syscall.restype = ctypes.c_long
+    return syscall, syscall_number
+
+
+_futex_syscall, _SYS_FUTEX = _load_futex_syscall()
+
+
+def futex_available() -> bool:
+    return _futex_syscall is not None
+
+
+class SharedSequenceNotifier:
+    """共享内存中一个 4 字节对齐的序号字，提供 publish / wait_for_change。"""
+
+    def __init__(self, buf: memoryview, offset: int, use_futex: Optional[bool] = None):
+        if offset % SEQUENCE_SIZE:
+            raise ValueError(f"sequence offset {offset} must be {SEQUENCE_SIZE}-byte aligned")
+        self._buf = buf
+        self._offset = offset
+        self._use_futex = futex_available() if use_futex is None else (use_futex and futex_available())
+        self._address = None
+        if self._use_futex:
+            word = ctypes.c_uint32.from_buffer(buf, offset)
+            self._address = ctypes.addressof(word)
+            # 只保留地址，不持有导出缓冲区，避免 SharedMemory.close() 报 BufferError
+            del word
+
+    def load(self) -> int:
+        return struct.unpack_from(SEQUENCE_FORMAT, self._buf, self._offset)[0]
+
+    def publish(self) -> int:
+        """序号加一并唤醒所有等待者；只应由单一写端在写锁内调用。"""
+        sequence = (self.load() + 1) & 0xFFFFFFFF
+        struct.pack_into(SEQUENCE_FORMAT, self._buf, self._offset, sequence)
+        if self._use_futex:
+            _futex_syscall(_SYS_FUTEX, ctypes.c_void_p(self._address), _FUTEX_WAKE, _FUTEX_WAKE_ALL, None, None, 0)
+        return sequence
+
+    def wait_for_change(self, expected: int, timeout: float) -> bool:
+        """阻塞到序号不再等于 expected 或超时；返回序号是否已变化。"""
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            if self.load() != expected:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self._use_futex:
+                self._futex_wait(expected, remaining)
+            else:
+                time.sleep(min(FALLBACK_POLL_INTERVAL_SECONDS, remaining))
+
+    def _futex_wait(self, expected: int, timeout: float):
+        seconds = int(timeout)
+        timespec = _Timespec(seconds, int((timeout - seconds) * 1_000_000_000))
+        result = _futex_syscall(
+            _SYS_FUTEX,
+            ctypes.c_void_p(self._address),
+            _FUTEX_WAIT,
+            ctypes.c_uint32(expected),
+            ctypes.byref(timespec),
+            None,
+            0,
+        )
+        if result == -1:
+            error = ctypes.get_errno()
+            # EAGAIN: 序号已变化；ETIMEDOUT: 超时；EINTR: 被信号打断，交由调用方重新检查
+            if error not in (errno.EAGAIN, errno.ETIMEDOUT, errno.EINTR):
+                logger.warning(f"futex 等待失败，退化为轮询: {os.strerror(error)}")
+                self._use_futex = False
+
+    def close(self):
+        self._address = None
+        self._use_futex = False
+        self._buf = None
@@ -130,18 +130,17 @@ def ensure_frame_array(
     return reshape_frame(frame, width, height, pixel_format)
 
 
-def _bgr_to_yuv_i420(frame_bgr: np.ndarray) -> np.ndarray:
+def bgr_to_nv12(frame_bgr: np.ndarray) -> np.ndarray:
     require_cv2()
-    return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2YUV_I420)
+    return _i420_to_nv12(frame_bgr, cv2.COLOR_BGR2YUV_I420)
 
 
-def bgr_to_nv12(frame_bgr: np.ndarray) -> np.ndarray:
-    require_cv2()
-    height, width = frame_bgr.shape[:2]
+def _i420_to_nv12(frame: np.ndarray, code: int) -> np.ndarray:
+    height, width = frame.shape[:2]
     if height % 2 != 0 or width % 2 != 0:
         raise ValueError(f"NV12 requires even dimensions, got {width}x{height}")
 
-    yuv_i420 = _bgr_to_yuv_i420(frame_bgr)
+    yuv_i420 = cv2.cvtColor(frame, code)
     flat = yuv_i420.reshape(-1)
     y_size = width * height
     uv_plane_size = y_size // 4
@@ -158,23 +157,41 @@ def bgr_to_nv12(frame_bgr: np.ndarray) -> np.ndarray:
 
 def rgb_to_nv12(frame_rgb: np.ndarray) -> np.ndarray:
     require_cv2()
-    frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
-    return bgr_to_nv12(frame_bgr)
+    return _i420_to_nv12(frame_rgb, cv2.COLOR_RGB2YUV_I420)
 
 
 def bgr_to_yuv420p(frame_bgr: np.ndarray) -> np.ndarray:
     require_cv2()
-    height, width = frame_bgr.shape[:2]
+    return _to_yuv420p(frame_bgr, cv2.COLOR_BGR2YUV_I420)
+
+
+def rgb_to_yuv420p(frame_rgb: np.ndarray) -> np.ndarray:
+    require_cv2()
+    return _to_yuv420p(frame_rgb, cv2.COLOR_RGB2YUV_I420)
+
+
+def _to_yuv420p(frame: np.ndarray, code: int) -> np.ndarray:
+    height, width = frame.shape[:2]
     if height % 2 != 0 or width % 2 != 0:
         raise ValueError(f"YUV420P requires even dimensions, got {width}x{height}")
-    yuv_i420 = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2YUV_I420)
+    yuv_i420 = cv2.cvtColor(frame, code)
     return yuv_i420.reshape((height * 3 // 2, width))
 
 
-def rgb_to_yuv420p(frame_rgb: np.ndarray) -> np.ndarray:
-    require_cv2()
-    frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
-    return bgr_to_yuv420p(frame_bgr)
+def _yuv_frame_array(
+    frame: np.ndarray | bytes | bytearray | memoryview,
+    pixel_format: str,
+    width: Optional[int],
+    height: Optional[int],
+) -> np.ndarray:
+    if isinstance(frame, np.ndarray):
+        if width is None or height is None:
+            width, height = infer_frame_dimensions(frame, pixel_format=pixel_format)
+        return ensure_frame_array(frame, width, height, pixel_format)
+    if width is None or height is None:
+        label = "NV12" if pixel_format == "nv12" else "YUV420P"
+        raise ValueError(f"width and height are required for {label} byte buffers")
+    return reshape_frame(frame, width, height, pixel_format)
 
 
 def nv12_to_bgr(
@@ -183,15 +200,7 @@ def nv12_to_bgr(
     height: Optional[int] = None,
 ) -> np.ndarray:
     require_cv2()
-    if isinstance(frame_nv12, np.ndarray):
-        if width is None or height is None:
-            width, height = infer_frame_dimensions(frame_nv12, pixel_format="nv12")
-        frame_nv12 = ensure_frame_array(frame_nv12, width, height, "nv12")
-    else:
-        if width is None or height is None:
-            raise ValueError("width and height are required for NV12 byte buffers")
-        frame_nv12 = reshape_frame(frame_nv12, width, height, "nv12")
-
+    frame_nv12 = _yuv_frame_array(frame_nv12, "nv12", width, height)
     return cv2.cvtColor(frame_nv12, cv2.COLOR_YUV2BGR_NV12)
 
 
@@ -201,8 +210,8 @@ def nv12_to_rgb(
     height: Optional[int] = None,
 ) -> np.ndarray:
     require_cv2()
-    frame_bgr = nv12_to_bgr(frame_nv12, width=width, height=height)
-    return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    frame_nv12 = _yuv_frame_array(frame_nv12, "nv12", width, height)
+    return cv2.cvtColor(frame_nv12, cv2.COLOR_YUV2RGB_NV12)
 
 
 def yuv420p_to_bgr(
@@ -211,15 +220,7 @@ def yuv420p_to_bgr(
     height: Optional[int] = None,
 ) -> np.ndarray:
     require_cv2()
-    if isinstance(frame_yuv420p, np.ndarray):
-        if width is None or height is None:
-            width, height = infer_frame_dimensions(frame_yuv420p, pixel_format="yuv420p")
-        frame_yuv420p = ensure_frame_array(frame_yuv420p, width, height, "yuv420p")
-    else:
-        if width is None or height is None:
-            raise ValueError("width and height are required for YUV420P byte buffers")
-        frame_yuv420p = reshape_frame(frame_yuv420p, width, height, "yuv420p")
-
+    frame_yuv420p = _yuv_frame_array(frame_yuv420p, "yuv420p", width, height)
     return cv2.cvtColor(frame_yuv420p, cv2.COLOR_YUV2BGR_I420)
 
 
@@ -229,8 +230,8 @@ def yuv420p_to_rgb(
     height: Optional[int] = None,
 ) -> np.ndarray:
     require_cv2()
-    frame_bgr = yuv420p_to_bgr(frame_yuv420p, width=width, height=height)
-    return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    frame_yuv420p = _yuv_frame_array(frame_yuv420p, "yuv420p", width, height)
+    return cv2.cvtColor(frame_yuv420p, cv2.COLOR_YUV2RGB_I420)
 
 
 def frame_to_bgr(
@@ -296,6 +297,56 @@ def frame_to_rgb(
     raise ValueError(f"Unsupported pixel format: {pixel_format}")
 
 
+def crop_frame_to_rgb(
+    frame: np.ndarray,
+    crop_box,
+    pixel_format: str,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+) -> np.ndarray:
+    """裁剪 crop_box=[x1, y1, x2, y2] 区域并转为 RGB，YUV420 帧只转换该区域。
+
+    NV12/I420 每个 2x2 块共用一组色度，先把区域外扩到偶数边界再转换，最后切掉
+    外扩的像素，结果与整帧转 RGB 后再裁剪逐像素一致。
+    """
+    pixel_format = normalize_pixel_format(pixel_format)
+    x1, y1, x2, y2 = [int(value) for value in crop_box[:4]]
+    if pixel_format not in {"nv12", "yuv420p"}:
+        frame = np.asarray(frame)
+        if pixel_format == "rgb24":
+            return frame[y1:y2, x1:x2]
+        return frame_to_rgb(frame[y1:y2, x1:x2], pixel_format=pixel_format)
+
+    require_cv2()
+    frame = _yuv_frame_array(frame, pixel_format, width, height)
+    frame_height, frame_width = frame.shape[0] * 2 // 3, frame.shape[1]
+    even_x1, even_y1 = x1 & ~1, y1 & ~1
+    even_x2 = min(frame_width, (x2 + 1) & ~1)
+    even_y2 = min(frame_height, (y2 + 1) & ~1)
+    region_w, region_h = even_x2 - even_x1, even_y2 - even_y1
+    if region_w <= 0 or region_h <= 0:
+        return np.zeros((max(0, y2 - y1), max(0, x2 - x1), 3), dtype=np.uint8)
+
+    luma = frame[even_y1:even_y2, even_x1:even_x2]
+    if pixel_format == "nv12":
+        chroma = frame[frame_height + even_y1 // 2:frame_height + even_y2 // 2, even_x1:even_x2]
+        region = np.vstack((luma, chroma))
+        code = cv2.COLOR_YUV2RGB_NV12
+    else:
+        plane_size = frame_height * frame_width // 4
+        flat = frame.reshape(-1)[frame_height * frame_width:]
+        rows = slice(even_y1 // 2, even_y2 // 2)
+        cols = slice(even_x1 // 2, even_x2 // 2)
+        u_plane = flat[:plane_size].reshape(frame_height // 2, frame_width // 2)[rows, cols]
+        v_plane = flat[plane_size:].reshape(frame_height // 2, frame_width // 2)[rows, cols]
+        region = np.concatenate(
+            (luma.reshape(-1), u_plane.reshape(-1), v_plane.reshape(-1))
+        ).reshape(region_h * 3 // 2, region_w)
+        code = cv2.COLOR_YUV2RGB_I420
+    region_rgb = cv2.cvtColor(region, code)
+    return region_rgb[y1 - even_y1:y2 - even_y1, x1 - even_x1:x2 - even_x1]
+
+
 def rgb_to_frame_format(frame_rgb: np.ndarray, pixel_format: str) -> np.ndarray:
     pixel_format = normalize_pixel_format(pixel_format)
 
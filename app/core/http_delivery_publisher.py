@@ -115,22 +115,26 @@ class HttpDeliveryPublisher:
                 pass
             self._session = None
 
-    def publish_alert(self, alert_data: Dict[str, Any]) -> bool:
-        config = self._config_provider()
+    def publish_alert(self, alert_data: Dict[str, Any], config: Optional[HttpDeliveryConfig] = None) -> bool:
+        if config is None:
+            config = self._config_provider()
         try:
             validate_http_delivery_config(config)
             body = serialize_http_event(alert_data)
             headers = build_http_headers(config, alert_data, body=body)
+            # Only the session swap is locked: the outbox worker sends from several
+            # threads and the session's connection pool handles concurrent posts.
             with self._lock:
                 if self._session is None:
                     self._session = requests.Session()
-                response = self._session.post(
-                    config.endpoint_url,
-                    headers=headers,
-                    data=body,
-                    timeout=config.timeout_seconds,
-                    allow_redirects=False,
-                )
+                session = self._session
+            response = session.post(
+                config.endpoint_url,
+                headers=headers,
+                data=body,
+                timeout=config.timeout_seconds,
+                allow_redirects=False,
+            )
             try:
                 status_code = int(response.status_code)
                 response_text = str(getattr(response, "text", "") or "")
@@ -200,5 +204,5 @@ def reload_http_delivery_publisher() -> None:
     http_delivery_publisher.close()
 
 
-def publish_alert_to_http(alert_data: Dict[str, Any]) -> bool:
-    return http_delivery_publisher.publish_alert(alert_data)
+def publish_alert_to_http(alert_data: Dict[str, Any], config: Optional[HttpDeliveryConfig] = None) -> bool:
+    return http_delivery_publisher.publish_alert(alert_data, config)
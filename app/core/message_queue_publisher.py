@@ -4,11 +4,14 @@ from __future__ import annotations
 
 import logging
 import threading
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from app.core.message_queue_config import get_message_queue_config
+from app.core.http_delivery_config import get_http_delivery_config
+from app.core.message_queue_config import MessageQueueConfig, get_message_queue_config
 from app.core.http_delivery_publisher import publish_alert_to_http, reload_http_delivery_publisher
+from app.core.mqtt_config import get_mqtt_config
 from app.core.mqtt_publisher import publish_alert_to_mqtt, reload_mqtt_publisher
+from app.core.rabbitmq_config import get_rabbitmq_config
 from app.core.rabbitmq_publisher import publish_alert_to_rabbitmq, reload_rabbitmq_publisher
 
 
@@ -40,18 +43,40 @@ def _apply_selector_transition(enabled: bool, provider: str) -> None:
         _last_selector_fingerprint = fingerprint
 
 
-def publish_alert_to_mq(alert_data: Dict[str, Any]) -> bool:
-    config = get_message_queue_config()
+def load_provider_config(provider: str) -> Optional[Any]:
+    """Settings of the selected delivery channel, read from the database."""
+    if provider == "mqtt":
+        return get_mqtt_config()
+    if provider == "rabbitmq":
+        return get_rabbitmq_config()
+    if provider == "http":
+        return get_http_delivery_config()
+    return None
+
+
+def publish_alert_to_mq(
+    alert_data: Dict[str, Any],
+    *,
+    config: Optional[MessageQueueConfig] = None,
+    provider_config: Optional[Any] = None,
+) -> bool:
+    """Publish through the selected channel.
+
+    Callers sending from pool threads pass config/provider_config read on their own
+    thread, so publishing itself does not touch the database.
+    """
+    if config is None:
+        config = get_message_queue_config()
     _apply_selector_transition(config.enabled, config.provider)
     if not config.enabled:
         logger.debug("消息队列发布未启用")
         return False
     if config.provider == "mqtt":
-        return publish_alert_to_mqtt(alert_data)
+        return publish_alert_to_mqtt(alert_data, config=provider_config)
     if config.provider == "rabbitmq":
-        return publish_alert_to_rabbitmq(alert_data)
+        return publish_alert_to_rabbitmq(alert_data, config=provider_config)
     if config.provider == "http":
-        return publish_alert_to_http(alert_data)
+        return publish_alert_to_http(alert_data, config=provider_config)
     logger.error("不支持的消息投递通道: %s", config.provider)
     return False
 
@@ -58,11 +58,12 @@ class MQTTPublisher:
             )
         return mqtt.Client(client_id=client_id, protocol=mqtt.MQTTv311)
 
-    def connect(self) -> bool:
+    def connect(self, config: Optional[MqttConfig] = None) -> bool:
         if mqtt is None:
             logger.warning("paho-mqtt 未安装，无法连接 MQTT")
             return False
-        config = self._config_provider()
+        if config is None:
+            config = self._config_provider()
         validate_mqtt_config(config)
         fingerprint = self._fingerprint(config)
 
@@ -120,12 +121,12 @@ class MQTTPublisher:
             except Exception:
                 pass
 
-    def publish_alert(self, alert_data: Dict[str, Any]) -> bool:
-        config = self._config_provider()
+    def publish_alert(self, alert_data: Dict[str, Any], config: Optional[MqttConfig] = None) -> bool:
+        if config is None:
+            config = self._config_provider()
         if self._fingerprint(config) != self._config_fingerprint or not self._connected.is_set():
-            if not self.connect():
+            if not self.connect(config):
                 return False
-            config = self._config_provider()
 
         try:
             payload = json.dumps(alert_data, ensure_ascii=False, default=str)
@@ -173,5 +174,5 @@ def reload_mqtt_publisher() -> None:
     mqtt_publisher.disconnect()
 
 
-def publish_alert_to_mqtt(alert_data: Dict[str, Any]) -> bool:
-    return mqtt_publisher.publish_alert(alert_data)
+def publish_alert_to_mqtt(alert_data: Dict[str, Any], config: Optional[MqttConfig] = None) -> bool:
+    return mqtt_publisher.publish_alert(alert_data, config)
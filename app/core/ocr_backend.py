@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 
@@ -121,6 +121,79 @@ def filter_ocr_detections(
     return filtered
 
 
+def pack_ocr_crops(crops: Sequence[np.ndarray]) -> Tuple[np.ndarray, List[List[int]]]:
+    """把多张 uint8 裁剪图首尾相接放进一个一维缓冲区，便于一次共享内存传输。"""
+    images = [np.ascontiguousarray(crop, dtype=np.uint8) for crop in crops]
+    shapes = [list(image.shape) for image in images]
+    packed = np.empty(sum(image.size for image in images), dtype=np.uint8)
+    offset = 0
+    for image in images:
+        packed[offset:offset + image.size] = image.reshape(-1)
+        offset += image.size
+    return packed, shapes
+
+
+def unpack_ocr_crops(packed: np.ndarray, shapes: Sequence[Sequence[int]]) -> List[np.ndarray]:
+    """按 shapes 从打包缓冲区切出各裁剪图的视图（不复制）。"""
+    flat = np.asarray(packed).reshape(-1)
+    crops = []
+    offset = 0
+    for shape in shapes:
+        shape = tuple(int(value) for value in shape)
+        size = int(np.prod(shape))
+        if offset + size > flat.size:
+            raise ValueError("OCR 裁剪打包数据长度与 shape 不符")
+        crops.append(flat[offset:offset + size].reshape(shape))
+        offset += size
+    return crops
+
+
+def infer_ocr_crops(backend: Any, crops: Sequence[np.ndarray]) -> list:
+    """后端支持批量裁剪接口时一次推理全部裁剪图，否则逐张调用 infer。"""
+    infer_crops = getattr(backend, "infer_crops", None)
+    if callable(infer_crops):
+        return list(infer_crops(crops))
+    return [backend.infer(crop) for crop in crops]
+
+
+def merge_ocr_crop_results(results: Sequence[Tuple[list, list, Dict[str, Any]]]):
+    """把逐裁剪图结果合并成一条共享推理响应；各图结果数记录在 metadata 中，由客户端拆回。"""
+    detections: List[Dict[str, Any]] = []
+    details: List[Dict[str, Any]] = []
+    crop_results = []
+    for crop_detections, crop_details, crop_metadata in results:
+        crop_detections = list(crop_detections or [])
+        crop_details = list(crop_details or [])
+        detections.extend(crop_detections)
+        details.extend(crop_details)
+        crop_results.append({
+            "detection_count": len(crop_detections),
+            "detail_count": len(crop_details),
+            "metadata": dict(crop_metadata or {}),
+        })
+    return detections, details, {"crop_results": crop_results}
+
+
+def split_ocr_crop_results(response: Dict[str, Any]) -> List[Tuple[list, list, Dict[str, Any]]]:
+    metadata = dict(response.get("metadata") or {})
+    crop_results = metadata.pop("crop_results", None) or []
+    detections = list(response.get("detections") or [])
+    details = list(response.get("details") or [])
+    results = []
+    detection_offset = detail_offset = 0
+    for crop_result in crop_results:
+        detection_count = int(crop_result.get("detection_count") or 0)
+        detail_count = int(crop_result.get("detail_count") or 0)
+        results.append((
+            detections[detection_offset:detection_offset + detection_count],
+            details[detail_offset:detail_offset + detail_count],
+            {**metadata, **(crop_result.get("metadata") or {})},
+        ))
+        detection_offset += detection_count
+        detail_offset += detail_count
+    return results
+
+
 def _file_stat(path: str) -> Tuple[int, int]:
     try:
         stat_result = os.stat(path)
@@ -329,7 +402,23 @@ class PaddleOCRBackend:
 
     def infer(self, frame: np.ndarray):
         raw_results = self.pipeline.predict(input=_frame_to_bgr(frame))
-        normalized = normalize_ocr_output(raw_results, score_threshold=0)
+        return self._result(normalize_ocr_output(raw_results, score_threshold=0))
+
+    def infer_crops(self, crops: Sequence[np.ndarray]) -> list:
+        """一次 predict 处理全部裁剪图，识别阶段由 PaddleOCR 按 text_recognition_batch_size 成批执行。"""
+        if not crops:
+            return []
+        raw_results = list(self.pipeline.predict(input=[_frame_to_bgr(crop) for crop in crops]))
+        if len(raw_results) != len(crops):
+            raise RuntimeError(
+                f"PaddleOCR 返回 {len(raw_results)} 个结果，与裁剪图数量 {len(crops)} 不符"
+            )
+        return [
+            self._result(normalize_ocr_output([raw_result], score_threshold=0))
+            for raw_result in raw_results
+        ]
+
+    def _result(self, normalized: Dict[str, Any]):
         detections = normalized["detections"]
         return detections, detections, {
             "full_text": normalized["full_text"],
@@ -357,13 +446,43 @@ class SharedOCRBackend:
         self._last_overload_log_at = float("-inf")
 
     def infer(self, frame: np.ndarray):
+        response = self._request(frame, {})
+        if response is None:
+            return self._overloaded_result()
+        metadata = dict(response.get("metadata") or {})
+        metadata["shared_inference"] = True
+        metadata["model_key"] = self.client.model_key
+        return response.get("detections") or [], response.get("details") or [], metadata
+
+    def infer_crops(self, crops: Sequence[np.ndarray]) -> list:
+        """全部裁剪图打包成一个共享内存请求，一次往返后按裁剪图拆分结果。"""
+        from app.core.shared_inference import OCR_CROP_SHAPES_KEY
+
+        if not crops:
+            return []
+        packed, shapes = pack_ocr_crops(crops)
+        response = self._request(packed, {OCR_CROP_SHAPES_KEY: shapes})
+        if response is None:
+            return [self._overloaded_result() for _ in crops]
+        results = split_ocr_crop_results(response)
+        if len(results) != len(crops):
+            raise RuntimeError(
+                f"共享 OCR 返回 {len(results)} 个裁剪结果，与裁剪图数量 {len(crops)} 不符"
+            )
+        for _detections, _details, metadata in results:
+            metadata["shared_inference"] = True
+            metadata["model_key"] = self.client.model_key
+        return results
+
+    def _request(self, frame: np.ndarray, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """发送一次共享推理请求；队列已满时返回 None。"""
         import time
 
         from app import logger
         from app.core.shared_inference import SharedInferenceOverloaded
 
         try:
-            response = self.client.infer(frame, {})
+            return self.client.infer(frame, config)
         except SharedInferenceOverloaded as exc:
             self._overload_count += 1
             now = time.monotonic()
@@ -375,15 +494,14 @@ class SharedOCRBackend:
                 )
                 self._overload_count = 0
                 self._last_overload_log_at = now
-            return [], [], {
-                "shared_inference": True,
-                "overloaded": True,
-                "device": self.device,
-            }
-        metadata = dict(response.get("metadata") or {})
-        metadata["shared_inference"] = True
-        metadata["model_key"] = self.client.model_key
-        return response.get("detections") or [], response.get("details") or [], metadata
+            return None
+
+    def _overloaded_result(self):
+        return [], [], {
+            "shared_inference": True,
+            "overloaded": True,
+            "device": self.device,
+        }
 
     def cleanup(self):
         if getattr(self, "client", None) is not None:
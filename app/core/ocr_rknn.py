@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
@@ -17,32 +17,24 @@ from app.core.ocr_postprocess import (
     load_character_dict,
     parse_input_size,
     prepare_recognition_image,
-    resize_detection_image,
     resolve_rknn_model_path,
     sort_text_polygons,
 )
 
 
-def _frame_to_bgr(frame: np.ndarray) -> np.ndarray:
+def _frame_to_model_color(frame: np.ndarray, input_format: str) -> np.ndarray:
+    """RGB 帧转换为模型输入颜色；模型本身接收 RGB 时直接复用原帧，不再经 BGR 中转。"""
     from app.core.cv2_compat import cv2, require_cv2
 
-    require_cv2()
     if frame.ndim == 2:
-        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-    if frame.ndim == 3 and frame.shape[2] == 3:
+        require_cv2()
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR if input_format == "bgr" else cv2.COLOR_GRAY2RGB)
+    if frame.ndim == 3 and frame.shape[2] == 3 and input_format == "bgr":
+        require_cv2()
         return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
     return frame
 
 
-def _to_model_color(image_bgr: np.ndarray, input_format: str) -> np.ndarray:
-    from app.core.cv2_compat import cv2, require_cv2
-
-    if input_format == "bgr":
-        return image_bgr
-    require_cv2()
-    return cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-
-
 def _config_value(config: Dict[str, Any], key: str, default: Any) -> Any:
     value = config.get(key)
     return default if value in (None, "") else value
@@ -113,6 +105,7 @@ class RKNNOcrBackend:
             self._det_entry = None
             raise
         self.model = self._det_entry.runtime if self._det_entry is not None else None
+        self._det_preprocessor = None
 
     @classmethod
     def from_worker_spec(cls, spec: Dict[str, Any], base_config: Optional[Dict[str, Any]] = None):
@@ -132,6 +125,16 @@ class RKNNOcrBackend:
             recognition_input_shape=spec.get("recognition_input_shape"),
         )
 
+    def _detection_preprocessor(self):
+        from app.user_scripts.common.yolo_backends import InputPreprocessor
+
+        preprocessor = getattr(self, "_det_preprocessor", None)
+        if preprocessor is None or (preprocessor.width, preprocessor.height) != (self.det_width, self.det_height):
+            # model_image 已是模型颜色，这里只做拉伸缩放，结果写入复用的输入缓冲区
+            preprocessor = InputPreprocessor(self.det_width, self.det_height, keep_ratio=False)
+            self._det_preprocessor = preprocessor
+        return preprocessor
+
     def _infer_runtime(self, entry, image: np.ndarray) -> Sequence[np.ndarray]:
         from app.user_scripts.common.yolo_backends import _rknn_native_call_lock
 
@@ -142,16 +145,33 @@ class RKNNOcrBackend:
         return outputs or []
 
     def infer(self, frame: np.ndarray):
+        return self.infer_crops([frame])[0]
+
+    def infer_crops(self, crops: Sequence[np.ndarray]) -> list:
+        """逐张检测文本行，再把全部裁剪图的文本行集中到一个识别批次。
+
+        RKNN 识别模型是静态输入（固定宽度、batch=1），所有文本行统一缩放并右侧
+        补零到模型宽度，写入复用的批次缓冲区后依次送入 NPU。
+        """
         if self._det_entry is None or self._rec_entry is None:
             raise RuntimeError("RKNN OCR backend 已关闭")
 
-        image_bgr = _frame_to_bgr(frame)
-        source_h, source_w = image_bgr.shape[:2]
-        model_image = _to_model_color(image_bgr, self.rknn_input_format)
-        det_input = resize_detection_image(model_image, self.det_width, self.det_height)
+        crop_lines = [self._detect_lines(crop) for crop in crops]
+        line_images = [line[2] for lines in crop_lines for line in lines]
+        recognized = iter(self._recognize_lines(line_images))
+        return [
+            self._build_result(lines, [next(recognized) for _ in lines])
+            for lines in crop_lines
+        ]
+
+    def _detect_lines(self, frame: np.ndarray) -> List[Tuple[Any, float, np.ndarray]]:
+        """返回 [(四点多边形, 检测分数, 矫正后的文本行图像)]，按阅读顺序排列。"""
+        model_image = _frame_to_model_color(frame, self.rknn_input_format)
+        source_h, source_w = model_image.shape[:2]
+        det_input, _, _, _ = self._detection_preprocessor().prepare(model_image)
         det_outputs = self._infer_runtime(self._det_entry, det_input)
         if not det_outputs:
-            return [], [], self._metadata(0)
+            return []
 
         thresh = float(_config_value(self.ocr_config, "detection_threshold", 0.3))
         box_thresh = float(_config_value(self.ocr_config, "box_threshold", 0.6))
@@ -166,20 +186,43 @@ class RKNNOcrBackend:
             unclip_ratio=unclip_ratio,
             max_candidates=max_candidates,
         ))
-
-        detections: List[Dict[str, Any]] = []
+        lines = []
         for points, det_score in polygons:
             try:
-                crop = get_rotate_crop_image(model_image, points)
+                lines.append((points, det_score, get_rotate_crop_image(model_image, points)))
             except ValueError:
                 continue
-            rec_input = prepare_recognition_image(crop, self.rec_width, self.rec_height)
-            rec_tensor = rec_input.astype(np.float32) / 255.0
-            rec_outputs = self._infer_runtime(self._rec_entry, rec_tensor)
+        return lines
+
+    def _recognition_batch(self, count: int) -> np.ndarray:
+        shape = (self.rec_height, self.rec_width, 3)
+        batch = getattr(self, "_rec_batch", None)
+        if batch is None or batch.shape[1:] != shape or batch.shape[0] < count:
+            batch = np.empty((max(count, 1),) + shape, dtype=np.float32)
+            self._rec_batch = batch
+        return batch
+
+    def _recognize_lines(self, line_images: Sequence[np.ndarray]) -> List[Tuple[str, float]]:
+        if not line_images:
+            return []
+        batch = self._recognition_batch(len(line_images))
+        for index, line_image in enumerate(line_images):
+            rec_input = prepare_recognition_image(line_image, self.rec_width, self.rec_height)
+            np.divide(rec_input, np.float32(255.0), out=batch[index], dtype=np.float32, casting="unsafe")
+
+        recognized = []
+        for index in range(len(line_images)):
+            rec_outputs = self._infer_runtime(self._rec_entry, batch[index])
             if not rec_outputs:
+                recognized.append(("", 0.0))
                 continue
             text, rec_score = ctc_greedy_decode(rec_outputs[0], self.characters)
-            text = str(text or "").strip()
+            recognized.append((str(text or "").strip(), rec_score))
+        return recognized
+
+    def _build_result(self, lines, recognized):
+        detections: List[Dict[str, Any]] = []
+        for (points, det_score, _image), (text, rec_score) in zip(lines, recognized):
             if not text:
                 continue
             xs = [point[0] for point in points]
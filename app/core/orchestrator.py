@@ -1,3 +1,4 @@
+import json
 import random
 import signal
 import logging
@@ -23,6 +24,7 @@ from app.config import (
     RECORDING_COMPRESSED_MAX_BYTES,
     RECORDING_FPS,
     RECORDING_JPEG_QUALITY,
+    RECORDING_PACKET_BUFFER_MB,
     NO_FRAME_WARNING_THRESHOLD,
     NO_FRAME_CRITICAL_THRESHOLD,
     HIGH_ERROR_COUNT_THRESHOLD,
@@ -46,10 +48,12 @@ from app.config import (
     SOURCE_RESTART_BACKOFF_MAX_SECONDS,
     SOURCE_MAX_CONCURRENT_STARTS,
     SHARED_INFERENCE_SOCKET_PATH,
+    SOURCE_HOST_HOT_RELOAD,
 )
 from app.core.alert_media_cleaner import AlertMediaCleaner
 from app.core.alert_delivery import alert_delivery_worker
 from app.core.compressed_ringbuffer import CompressedVideoRingBuffer
+from app.core.packet_ringbuffer import PacketRingBuffer, packet_recording_enabled
 from app.core.decoder.async_dec import SOFTWARE_DECODE_FALLBACK_EXIT_CODE
 from app.core.database_models import (
     db,
@@ -96,6 +100,7 @@ from app.core.video_decode_config import (
 )
 from app.core.workflow_runtime import (
     build_workflow_signature,
+    diff_workflow_signatures,
     extract_algorithm_ids,
     extract_source_id_from_workflow_data,
     get_node_type,
@@ -187,7 +192,9 @@ class OutputReader(threading.Thread):
                     log_msg = line.rstrip('\n\r')
                     if self.on_line is not None:
                         try:
-                            self.on_line(log_msg)
+                            # 回调返回 True 表示该行是已处理的状态消息，不再写入日志
+                            if self.on_line(log_msg) is True:
+                                continue
                         except Exception as exc:
                             logger.warning(f"[{self.log_label}] 处理子进程状态消息失败: {exc}")
                     if self.stream_type == 'stderr':
@@ -565,6 +572,7 @@ class Orchestrator:
             "gpu_scheduler": stats.get("gpu_scheduler") or {},
             "gpus": stats.get("gpus") or [],
             "source_host_count": len(self.workflow_hosts),
+            "source_hosts": self._collect_source_host_status(),
             "memory": collect_portable_memory_status(),
             "reconcile_error": self.inference_reconcile_error,
         }
@@ -573,6 +581,15 @@ class Orchestrator:
         except Exception as exc:
             logger.warning(f"发布推理资源运行状态失败: {exc}")
 
+    def _collect_source_host_status(self) -> list:
+        """各 source host 最近一次上报的工作流调度状态（目标/实际帧率、丢帧、延迟）。"""
+        hosts = []
+        for source_id, process_info in list(self.workflow_hosts.items()):
+            status = dict(process_info.get('status') or {})
+            if status:
+                hosts.append({**status, 'source_id': source_id})
+        return hosts
+
     def _stop_process(self, process_info: dict, wait_timeout: float = 3.0):
         if not process_info:
             return
@@ -1617,24 +1634,39 @@ class Orchestrator:
                 + self.recording_config.post_alert_seconds
                 + 2,
             )
-            recording_buffer = CompressedVideoRingBuffer(
-                name=source.recording_buffer_name,
-                create=True,
-                width=source.source_decode_width,
-                height=source.source_decode_height,
-                pixel_format=VIDEO_FRAME_PIXEL_FORMAT,
-                fps=self.recording_config.recording_fps,
-                duration_seconds=recording_buffer_duration,
-                max_frame_bytes=RECORDING_COMPRESSED_MAX_BYTES,
-                jpeg_quality=RECORDING_JPEG_QUALITY,
-            )
-            self.recording_buffers[source.id] = recording_buffer
-            logger.debug(
-                f"创建录制CompressedRingBuffer: fps={self.recording_config.recording_fps}, "
-                f"duration={recording_buffer_duration}s, "
-                f"capacity={recording_buffer.capacity}帧, frame_shape={recording_buffer.frame_shape}, "
-                f"pixel_format={recording_buffer.pixel_format}"
-            )
+            if packet_recording_enabled(input_format):
+                recording_buffer = PacketRingBuffer(
+                    name=source.recording_buffer_name,
+                    codec=input_format,
+                    duration_seconds=recording_buffer_duration,
+                    data_capacity_bytes=RECORDING_PACKET_BUFFER_MB * 1024 * 1024,
+                    create=True,
+                )
+                self.recording_buffers[source.id] = recording_buffer
+                logger.debug(
+                    f"创建录制PacketRingBuffer: codec={recording_buffer.codec}, "
+                    f"duration={recording_buffer_duration}s, capacity={recording_buffer.capacity}个访问单元, "
+                    f"data={RECORDING_PACKET_BUFFER_MB}MB"
+                )
+            else:
+                recording_buffer = CompressedVideoRingBuffer(
+                    name=source.recording_buffer_name,
+                    create=True,
+                    width=source.source_decode_width,
+                    height=source.source_decode_height,
+                    pixel_format=VIDEO_FRAME_PIXEL_FORMAT,
+                    fps=self.recording_config.recording_fps,
+                    duration_seconds=recording_buffer_duration,
+                    max_frame_bytes=RECORDING_COMPRESSED_MAX_BYTES,
+                    jpeg_quality=RECORDING_JPEG_QUALITY,
+                )
+                self.recording_buffers[source.id] = recording_buffer
+                logger.debug(
+                    f"创建录制CompressedRingBuffer: fps={self.recording_config.recording_fps}, "
+                    f"duration={recording_buffer_duration}s, "
+                    f"capacity={recording_buffer.capacity}帧, frame_shape={recording_buffer.frame_shape}, "
+                    f"pixel_format={recording_buffer.pixel_format}"
+                )
 
         # 启动解码器进程
         decoder_args = self._build_decoder_args(
@@ -2153,6 +2185,8 @@ class Orchestrator:
         try:
             workflow_p = subprocess.Popen(
                 workflow_args,
+                # stdin 作为控制通道，下发单个工作流的 add/remove/replace 命令
+                stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 universal_newlines=True,
@@ -2162,12 +2196,29 @@ class Orchestrator:
             )
 
             ready_event = threading.Event()
+            host_status = {}
+            status_prefix = f"SOURCE_HOST_STATUS:{source_id}:"
+            ack_prefix = f"SOURCE_HOST_ACK:{source_id}:"
 
             def handle_stdout_line(line: str):
                 if line.strip() == f"SOURCE_HOST_READY:{source_id}":
                     ready_event.set()
                     self.inference_admission.mark_source_ready(source_id)
                     logger.info(f"Source host {source_id} 已完成检测就绪")
+                elif line.startswith(status_prefix):
+                    status = json.loads(line[len(status_prefix):])
+                    status['reported_at_epoch'] = time.time()
+                    host_status.clear()
+                    host_status.update(status)
+                    return True
+                elif line.startswith(ack_prefix):
+                    ack = json.loads(line[len(ack_prefix):])
+                    if ack.get('ok'):
+                        self.inference_admission.mark_source_ready(source_id)
+                        logger.info(f"Source host {source_id} 已完成工作流热更新: {ack}")
+                    else:
+                        logger.warning(f"Source host {source_id} 工作流热更新失败: {ack}")
+                    return True
 
             # 启动输出读取线程
             log_label = f"SourceHost-{source_id}"
@@ -2186,6 +2237,7 @@ class Orchestrator:
                 'stdout_reader': stdout_reader,
                 'stderr_reader': stderr_reader,
                 'ready_event': ready_event,
+                'status': host_status,
                 'oom_kill_count_at_start': read_cgroup_oom_kill_count(),
                 'shared_model_ids': set(shared_model_ids or ()),
                 'local_model_ids': tuple(local_model_ids or ()),
@@ -2226,7 +2278,56 @@ class Orchestrator:
         del self.workflow_hosts[source_id]
         self.workflow_host_signatures.pop(source_id, None)
         self.inference_admission.release(source_id)
-    
+
+    def _reload_source_host_workflows(self, source_id: int, running_signature, workflows) -> bool:
+        """让运行中的 source host 就地增删/替换变更的工作流。
+
+        返回 False 表示无法下发命令（host 已退出或控制通道断开），调用方回退到整体重启。
+        准入检查只计入新增和配置变更的工作流，未变更工作流的模型已经在内存中。
+        """
+        process_info = self.workflow_hosts.get(source_id) or {}
+        process = process_info.get('process')
+        control = getattr(process, 'stdin', None)
+        if control is None or self._get_process_exit_code(process) is not None:
+            return False
+
+        signature = build_workflow_signature(workflows)
+        commands = diff_workflow_signatures(running_signature, signature)
+        changed_ids = {command['workflow_id'] for command in commands if command['command'] != 'remove'}
+        if changed_ids:
+            allowed, _, _ = self._workflow_start_allowed(
+                source_id,
+                [workflow for workflow in workflows if workflow.id in changed_ids],
+            )
+            if not allowed:
+                return True
+
+        try:
+            for command in commands:
+                control.write(json.dumps(command) + "\n")
+            control.flush()
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Source host {source_id} 控制通道写入失败，改为重启: {exc}")
+            return False
+
+        shared_model_ids, local_model_ids = self._workflow_model_requirements(workflows)
+        process_info['workflow_ids'] = [workflow.id for workflow in workflows]
+        process_info['shared_model_ids'] = set(shared_model_ids)
+        process_info['local_model_ids'] = tuple(local_model_ids)
+        self.workflow_host_signatures[source_id] = signature
+        if changed_ids:
+            self.inference_admission.commit(
+                source_id,
+                shared_model_ids,
+                local_model_ids=local_model_ids,
+            )
+        logger.info(
+            f"🔁 Source {source_id} 的工作流集合已变更 "
+            f"({running_signature} -> {signature})，就地更新: "
+            f"{[(command['command'], command['workflow_id']) for command in commands]}"
+        )
+        return True
+
     def manage_workflows(self):
         active_groups = self._build_active_workflow_groups()
         entitlements = getattr(self, 'license_entitlements', None) or runtime_entitlements()
@@ -2278,6 +2379,10 @@ class Orchestrator:
 
             running_signature = self.workflow_host_signatures.get(source_id)
             if running_signature != signature:
+                if SOURCE_HOST_HOT_RELOAD and self._reload_source_host_workflows(
+                    source_id, running_signature, workflows
+                ):
+                    continue
                 allowed, shared_model_ids, local_model_ids = self._workflow_start_allowed(
                     source_id, workflows
                 )
@@ -0,0 +1,447 @@
+"""
+压缩域录制缓冲区 - 直接缓存拉流得到的 H.264/H.265 码流
+
+BaseStreamer 分发的是 Annex-B 字节流分块。AnnexBAccessUnitParser 把分块切成
+访问单元（一帧对应的全部 NAL），PacketRingBuffer 在共享内存中按到达顺序保存
+访问单元、时间戳和关键帧标记。告警录像从关键帧（GOP 边界）开始截取窗口，
+再用 ffmpeg ``-c copy`` 直接封装成 MP4，整条录制链路不再解码或重新编码。
+"""
+import os
+import struct
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from threading import Lock
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app import logger
+from app.config import RECORDING_BUFFER_MODE
+from app.core.ringbuffer import find_time_range_positions
+from app.core.video_probe import normalize_video_codec
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows fallback
+    fcntl = None
+
+
+PACKET_CODECS = frozenset({'h264', 'h265'})
+# 索引容量按每秒最多 60 个访问单元估算
+MAX_ACCESS_UNITS_PER_SECOND = 60
+
+_START_CODE = b'\x00\x00\x01'
+_ANNEX_B_PREFIX = b'\x00\x00\x00\x01'
+
+_H264_VCL_TYPES = frozenset(range(1, 6))
+_H264_IDR = 5
+_H264_PARAMETER_SET_TYPES = frozenset({7, 8})
+_H264_SPS = 7
+# 出现在 VCL 之后即意味着新访问单元开始的 NAL 类型（AUD/SEI/SPS/PPS/14-18）
+_H264_AU_DELIMITING_TYPES = frozenset({6, 7, 8, 9, 14, 15, 16, 17, 18})
+
+_H265_VCL_TYPES = frozenset(range(0, 32))
+_H265_IRAP_TYPES = frozenset(range(16, 22))
+_H265_PARAMETER_SET_TYPES = frozenset({32, 33, 34})
+_H265_SPS = 33
+_H265_AU_DELIMITING_TYPES = frozenset({32, 33, 34, 35, 39, 41, 42, 43, 44, *range(48, 56)})
+
+
+def packet_recording_enabled(codec: Optional[str]) -> bool:
+    """当前配置下该编码格式是否使用压缩域录制缓冲区。"""
+    if RECORDING_BUFFER_MODE != 'packet':
+        return False
+    try:
+        return normalize_video_codec(codec) in PACKET_CODECS
+    except ValueError:
+        return False
+
+
+def attach_packet_ringbuffer(name: str) -> Optional['PacketRingBuffer']:
+    """按名称连接压缩域录制缓冲区；非 packet 模式或该共享内存不是压缩域缓冲区时返回 None。
+
+    共享内存不存在时抛出 FileNotFoundError，与其他缓冲区的连接行为一致。
+    """
+    if RECORDING_BUFFER_MODE != 'packet':
+        return None
+    try:
+        return PacketRingBuffer(name=name, create=False)
+    except ValueError:
+        return None
+
+
+class AnnexBAccessUnitParser:
+    """把 Annex-B 字节流分块切分为访问单元。
+
+    feed() 返回已经完整的访问单元 (payload, keyframe, timestamp)；最后一个
+    访问单元要等下一帧的首个 NAL 到达才能确定边界。关键帧缺少参数集时补上
+    最近一次看到的 SPS/PPS(/VPS)，保证从该帧开始的片段可以独立解码。
+    """
+
+    def __init__(self, codec: str):
+        self.codec = normalize_video_codec(codec)
+        if self.codec not in PACKET_CODECS:
+            raise ValueError(f"压缩域录制不支持编码格式: {codec}")
+        self._is_h264 = self.codec == 'h264'
+        self._pending = bytearray()
+        # 已确认不含起始码的前缀长度，跨多个分块的大 NAL 不必重复扫描
+        self._scanned = 0
+        self._au_nals: List[bytes] = []
+        self._au_has_vcl = False
+        self._au_keyframe = False
+        self._au_has_sps = False
+        self._au_started_at = 0.0
+        self._parameter_sets = {}
+
+    def _nal_type(self, nal: bytes) -> int:
+        if self._is_h264:
+            return nal[0] & 0x1F
+        return (nal[0] >> 1) & 0x3F
+
+    def _starts_new_picture(self, nal: bytes, nal_type: int) -> bool:
+        """VCL NAL 是否为一帧的首个 slice（first_mb_in_slice == 0 / first_slice_segment_in_pic_flag）。"""
+        if self._is_h264:
+            return nal_type in _H264_VCL_TYPES and len(nal) > 1 and bool(nal[1] & 0x80)
+        return nal_type in _H265_VCL_TYPES and len(nal) > 2 and bool(nal[2] & 0x80)
+
+    def _classify(self, nal_type: int) -> Tuple[bool, bool, bool, bool]:
+        """返回 (是否 VCL, 是否关键帧, 是否参数集, 是否 VCL 后的访问单元分隔 NAL)。"""
+        if self._is_h264:
+            return (
+                nal_type in _H264_VCL_TYPES,
+                nal_type == _H264_IDR,
+                nal_type in _H264_PARAMETER_SET_TYPES,
+                nal_type in _H264_AU_DELIMITING_TYPES,
+            )
+        return (
+            nal_type in _H265_VCL_TYPES,
+            nal_type in _H265_IRAP_TYPES,
+            nal_type in _H265_PARAMETER_SET_TYPES,
+            nal_type in _H265_AU_DELIMITING_TYPES,
+        )
+
+    def feed(self, chunk: bytes, now: Optional[float] = None) -> List[Tuple[bytes, bool, float]]:
+        now = time.time() if now is None else now
+        self._pending += chunk
+        completed = []
+        start = self._pending.find(_START_CODE)
+        if start < 0:
+            # 保留结尾可能被截断的起始码
+            del self._pending[:max(0, len(self._pending) - 3)]
+            return completed
+
+        search_from = max(start + 3, self._scanned)
+        while True:
+            next_start = self._pending.find(_START_CODE, search_from)
+            if next_start < 0:
+                break
+            self._append_nal(bytes(self._pending[start + 3:next_start]).rstrip(b'\x00'), now, completed)
+            start = next_start
+            search_from = start + 3
+        del self._pending[:start]
+        self._scanned = max(3, len(self._pending) - 2)
+        return completed
+
+    def flush(self, now: Optional[float] = None) -> List[Tuple[bytes, bool, float]]:
+        """流结束时输出剩余的 NAL 与访问单元。"""
+        now = time.time() if now is None else now
+        completed = []
+        if len(self._pending) > 3 and self._pending.startswith(_START_CODE):
+            self._append_nal(bytes(self._pending[3:]).rstrip(b'\x00'), now, completed)
+        self._pending.clear()
+        self._scanned = 0
+        self._emit_access_unit(completed)
+        return completed
+
+    def _append_nal(self, nal: bytes, now: float, completed: list):
+        if not nal:
+            return
+        nal_type = self._nal_type(nal)
+        is_vcl, is_keyframe, is_parameter_set, delimits = self._classify(nal_type)
+        if self._au_has_vcl and (delimits or (is_vcl and self._starts_new_picture(nal, nal_type))):
+            self._emit_access_unit(completed)
+
+        if not self._au_nals:
+            self._au_started_at = now
+        self._au_nals.append(nal)
+        if is_parameter_set:
+            self._parameter_sets[nal_type] = nal
+            if nal_type == (_H264_SPS if self._is_h264 else _H265_SPS):
+                self._au_has_sps = True
+        if is_vcl:
+            self._au_has_vcl = True
+            self._au_keyframe = self._au_keyframe or is_keyframe
+
+    def _emit_access_unit(self, completed: list):
+        if not self._au_has_vcl:
+            # 没有图像数据的 NAL（如开头的参数集）并入下一个访问单元
+            return
+        nals = self._au_nals
+        keyframe = self._au_keyframe
+        if keyframe and not self._au_has_sps:
+            if self._parameter_sets:
+                nals = [self._parameter_sets[nal_type] for nal_type in sorted(self._parameter_sets)] + nals
+            else:
+                # 从未见过参数集，无法从该帧开始解码
+                keyframe = False
+        payload = b''.join(_ANNEX_B_PREFIX + nal for nal in nals)
+        completed.append((payload, keyframe, self._au_started_at))
+        self._au_nals = []
+        self._au_has_vcl = False
+        self._au_keyframe = False
+        self._au_has_sps = False
+
+
+class PacketRingBuffer:
+    """
+    基于共享内存的压缩域（访问单元）环形缓冲区。
+
+    布局：头部 | 索引表（每个访问单元的字节位置、长度、标记、时间戳）| 循环数据区。
+    数据区按累计字节位置循环写入，索引项引用的数据被覆盖后自动失效。
+    读写都通过进程内锁 + flock 串行化，与 CompressedVideoRingBuffer 一致。
+    """
+
+    MAGIC = b'VBAPKT01'
+    HEADER_FORMAT = '<8s8sQQQQd'
+    ENTRY_DTYPE = np.dtype([
+        ('offset', '<u8'),
+        ('length', '<u4'),
+        ('flags', '<u4'),
+        ('timestamp', '<f8'),
+    ])
+    FLAG_KEYFRAME = 1
+
+    def __init__(
+        self,
+        name: str,
+        codec: str = 'h264',
+        duration_seconds: int = 30,
+        data_capacity_bytes: int = 32 * 1024 * 1024,
+        create: bool = True,
+    ):
+        self.name = name
+        self.header_size = struct.calcsize(self.HEADER_FORMAT)
+
+        if create:
+            self.codec = normalize_video_codec(codec)
+            if self.codec not in PACKET_CODECS:
+                raise ValueError(f"压缩域录制不支持编码格式: {codec}")
+            self.capacity = max(1, int(duration_seconds) * MAX_ACCESS_UNITS_PER_SECOND)
+            self.data_capacity = max(1024 * 1024, int(data_capacity_bytes))
+            try:
+                existing = shared_memory.SharedMemory(name=name)
+                existing.close()
+                existing.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=self._layout_size())
+            self._write_header(0, 0, 0.0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            magic, codec_bytes, capacity, data_capacity, _, _, _ = struct.unpack_from(
+                self.HEADER_FORMAT, self.shm.buf, 0
+            )
+            if magic != self.MAGIC:
+                self.shm.close()
+                raise ValueError(f"共享内存 {name} 不是压缩域录制缓冲区")
+            self.codec = codec_bytes.rstrip(b'\x00').decode('ascii')
+            self.capacity = int(capacity)
+            self.data_capacity = int(data_capacity)
+
+        self.entry_base = self.header_size
+        self.data_base = self.entry_base + self.ENTRY_DTYPE.itemsize * self.capacity
+        self.total_size = self._layout_size()
+        self._lock = Lock()
+        lock_dir = '/tmp/video_ba_pipe_locks'
+        os.makedirs(lock_dir, exist_ok=True)
+        self._lock_file = open(os.path.join(lock_dir, f"{self.name.replace('/', '_')}.lock"), 'a+b')
+
+    def _layout_size(self) -> int:
+        return self.header_size + self.ENTRY_DTYPE.itemsize * self.capacity + self.data_capacity
+
+    @classmethod
+    def size_bytes(cls, duration_seconds: int, data_capacity_bytes: int) -> int:
+        capacity = max(1, int(duration_seconds) * MAX_ACCESS_UNITS_PER_SECOND)
+        return (
+            struct.calcsize(cls.HEADER_FORMAT)
+            + cls.ENTRY_DTYPE.itemsize * capacity
+            + max(1024 * 1024, int(data_capacity_bytes))
+        )
+
+    @contextmanager
+    def _guard(self):
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _write_header(self, write_seq: int, data_head: int, last_write_time: float):
+        struct.pack_into(
+            self.HEADER_FORMAT,
+            self.shm.buf,
+            0,
+            self.MAGIC,
+            self.codec.encode('ascii'),
+            self.capacity,
+            self.data_capacity,
+            write_seq,
+            data_head,
+            last_write_time,
+        )
+
+    def _read_header(self) -> Tuple[int, int, float]:
+        _, _, _, _, write_seq, data_head, last_write_time = struct.unpack_from(
+            self.HEADER_FORMAT, self.shm.buf, 0
+        )
+        return write_seq, data_head, last_write_time
+
+    def _entries(self) -> np.ndarray:
+        return np.ndarray(
+            shape=(self.capacity,),
+            dtype=self.ENTRY_DTYPE,
+            buffer=self.shm.buf,
+            offset=self.entry_base,
+        )
+
+    def _copy_data(self, position: int, length: int) -> bytes:
+        start = position % self.data_capacity
+        first = min(length, self.data_capacity - start)
+        chunk = bytes(self.shm.buf[self.data_base + start:self.data_base + start + first])
+        if first == length:
+            return chunk
+        return chunk + bytes(self.shm.buf[self.data_base:self.data_base + length - first])
+
+    def write(self, payload: bytes, timestamp: float, keyframe: bool) -> bool:
+        length = len(payload)
+        if length <= 0:
+            return False
+        if length > self.data_capacity // 4:
+            raise ValueError(f"访问单元大小 {length} 超过录制数据区的 1/4 ({self.data_capacity})")
+
+        with self._guard():
+            write_seq, data_head, _ = self._read_header()
+            start = data_head % self.data_capacity
+            first = min(length, self.data_capacity - start)
+            self.shm.buf[self.data_base + start:self.data_base + start + first] = payload[:first]
+            if first < length:
+                self.shm.buf[self.data_base:self.data_base + length - first] = payload[first:]
+
+            entries = self._entries()
+            entries[write_seq % self.capacity] = (
+                data_head,
+                length,
+                self.FLAG_KEYFRAME if keyframe else 0,
+                timestamp,
+            )
+            del entries
+            self._write_header(write_seq + 1, data_head + length, timestamp)
+        return True
+
+    def _valid_window(self, entries: np.ndarray, write_seq: int, data_head: int) -> Tuple[int, int]:
+        """返回仍然有效的 (起始槽位, 数量)：索引未被覆盖且数据未被循环写覆盖。"""
+        count = min(write_seq, self.capacity)
+        read_idx = (write_seq - count) % self.capacity
+        if count == 0:
+            return read_idx, 0
+        head_length = min(count, self.capacity - read_idx)
+        offsets = np.concatenate((entries['offset'][read_idx:read_idx + head_length], entries['offset'][:count - head_length]))
+        stale = int(np.searchsorted(offsets, data_head - self.data_capacity, side='left'))
+        return (read_idx + stale) % self.capacity, count - stale
+
+    def get_packets_in_time_range(
+        self,
+        start_time: float,
+        end_time: float,
+        align_to_keyframe: bool = True,
+    ) -> List[Tuple[bytes, float, bool]]:
+        """返回时间范围内的访问单元 (payload, timestamp, keyframe)。
+
+        align_to_keyframe 时起点回退到 start_time 之前最近的关键帧；若窗口前没有
+        关键帧，则从窗口内第一个关键帧开始，保证输出可以独立解码。
+        """
+        with self._guard():
+            write_seq, data_head, _ = self._read_header()
+            entries = self._entries()
+            read_idx, count = self._valid_window(entries, write_seq, data_head)
+            positions, _ = find_time_range_positions(entries['timestamp'], read_idx, count, start_time, end_time)
+            positions = list(positions)
+            if not positions:
+                del entries
+                return []
+
+            first, last = positions[0], positions[-1]
+            if align_to_keyframe:
+                keyframe = None
+                for position in range(first, -1, -1):
+                    if entries['flags'][(read_idx + position) % self.capacity] & self.FLAG_KEYFRAME:
+                        keyframe = position
+                        break
+                if keyframe is None:
+                    for position in range(first, last + 1):
+                        if entries['flags'][(read_idx + position) % self.capacity] & self.FLAG_KEYFRAME:
+                            keyframe = position
+                            break
+                if keyframe is None:
+                    del entries
+                    return []
+                first = keyframe
+
+            packets = []
+            for position in range(first, last + 1):
+                offset, length, flags, timestamp = entries[(read_idx + position) % self.capacity].tolist()
+                packets.append((self._copy_data(offset, length), float(timestamp), bool(flags & self.FLAG_KEYFRAME)))
+            del entries
+            return packets
+
+    def get_stats(self) -> dict:
+        with self._guard():
+            write_seq, data_head, last_write = self._read_header()
+            entries = self._entries()
+            _, count = self._valid_window(entries, write_seq, data_head)
+            del entries
+        return {
+            'capacity': self.capacity,
+            'count': count,
+            'codec': self.codec,
+            'data_capacity_bytes': self.data_capacity,
+            'data_used_bytes': min(data_head, self.data_capacity),
+            'total_packets_written': write_seq,
+            'last_write_time': last_write,
+            'is_empty': count == 0,
+        }
+
+    def close(self):
+        try:
+            self._lock_file.close()
+        except Exception:
+            pass
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class PacketRecordingSink:
+    """BaseStreamer 包处理器：把码流分块切成访问单元写入 PacketRingBuffer。"""
+
+    def __init__(self, buffer: PacketRingBuffer, codec: Optional[str] = None):
+        self.buffer = buffer
+        self.parser = AnnexBAccessUnitParser(codec or buffer.codec)
+        self.access_units_written = 0
+        self.keyframes_written = 0
+
+    def send_packet(self, packet: bytes):
+        for payload, keyframe, timestamp in self.parser.feed(packet):
+            try:
+                self.buffer.write(payload, timestamp=timestamp, keyframe=keyframe)
+            except ValueError as exc:
+                logger.warning(f"压缩域录制缓冲区写入失败，已跳过当前访问单元: {exc}")
+                continue
+            self.access_units_written += 1
+            if keyframe:
+                self.keyframes_written += 1
@@ -45,14 +45,18 @@ class RabbitMQPublisher:
     def _config(self) -> RabbitMqConfig:
         return self._config_provider()
 
-    def connect(self) -> bool:
+    def connect(self, config: Optional[RabbitMqConfig] = None) -> bool:
         """
         连接到RabbitMQ服务器
 
+        Args:
+            config: 已读取的连接配置；为空时从数据库读取
+
         Returns:
             bool: 连接是否成功
         """
-        config = self._config()
+        if config is None:
+            config = self._config()
 
         if not config.enabled:
             logger.info("RabbitMQ功能未启用，跳过连接")
@@ -126,17 +130,19 @@ class RabbitMQPublisher:
         except Exception:
             return False
 
-    def publish_alert(self, alert_data: Dict[str, Any]) -> bool:
+    def publish_alert(self, alert_data: Dict[str, Any], config: Optional[RabbitMqConfig] = None) -> bool:
         """
         发布预警消息到RabbitMQ
 
         Args:
             alert_data: 预警数据字典
+            config: 已读取的连接配置；为空时从数据库读取
 
         Returns:
             bool: 发布是否成功
         """
-        config = self._config()
+        if config is None:
+            config = self._config()
 
         if not config.enabled:
             logger.debug("RabbitMQ功能未启用，跳过预警发布")
@@ -155,11 +161,9 @@ class RabbitMQPublisher:
         # 检查连接状态，如果断开则尝试重连
         if not self.is_connected():
             logger.info("RabbitMQ连接已断开，尝试重新连接...")
-            if not self.connect():
+            if not self.connect(config):
                 logger.error("重新连接RabbitMQ失败，无法发布预警消息")
                 return False
-            # connect 内部会再次读取 config，这里重新取一次保证一致
-            config = self._config()
 
         try:
             # 准备消息
@@ -230,17 +234,18 @@ def reload_rabbitmq_publisher() -> None:
         logger.warning(f"重置 RabbitMQ 发布器连接时出错: {exc}")
 
 
-def publish_alert_to_rabbitmq(alert_data: Dict[str, Any]) -> bool:
+def publish_alert_to_rabbitmq(alert_data: Dict[str, Any], config: Optional[RabbitMqConfig] = None) -> bool:
     """
     便捷函数：发布预警消息到RabbitMQ
 
     Args:
         alert_data: 预警数据字典
+        config: 已读取的连接配置；为空时从数据库读取
 
     Returns:
         bool: 发布是否成功
     """
-    return rabbitmq_publisher.publish_alert(alert_data)
+    return rabbitmq_publisher.publish_alert(alert_data, config)
 
 
 def format_alert_message(alert) -> Dict[str, Any]:
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from typing import Iterable, List
 
 from app.core.frame_utils import get_frame_size_bytes, normalize_pixel_format
+from app.core.packet_ringbuffer import PacketRingBuffer
 
 
 COMPRESSED_METADATA_FORMAT = '<QQQ?dd'
@@ -28,6 +29,8 @@ class ResourceSettings:
     recording_fps: int
     recording_buffer_duration: int
     recording_compressed_max_bytes: int
+    recording_buffer_mode: str = 'jpeg'
+    recording_packet_buffer_bytes: int = 32 * 1024 * 1024
 
 
 @dataclass(frozen=True)
@@ -99,11 +102,16 @@ def estimate_source_resources(
     analysis_fps = max(1, min(source_fps, int(settings.analysis_target_fps)))
     frame_size = get_frame_size_bytes(width, height, pixel_format)
     analysis_capacity = analysis_fps * max(0, int(settings.analysis_buffer_seconds))
-    analysis_metadata_bytes = struct.calcsize('QQQ?dd') + 8 * analysis_capacity
+    analysis_metadata_bytes = struct.calcsize('QQQ?dd') + 8 + 16 * analysis_capacity
     analysis_buffer_bytes = analysis_metadata_bytes + frame_size * analysis_capacity
     decoder_queue_bytes = frame_size * max(1, int(settings.decoder_output_queue_size))
     recording_buffer_bytes = 0
-    if settings.recording_enabled:
+    if settings.recording_enabled and settings.recording_buffer_mode == 'packet':
+        recording_buffer_bytes = PacketRingBuffer.size_bytes(
+            duration_seconds=settings.recording_buffer_duration,
+            data_capacity_bytes=settings.recording_packet_buffer_bytes,
+        )
+    elif settings.recording_enabled:
         recording_buffer_bytes = compressed_ringbuffer_size_bytes(
             fps=settings.recording_fps,
             duration_seconds=settings.recording_buffer_duration,
@@ -3,31 +3,128 @@ import time
 from multiprocessing import shared_memory
 from multiprocessing.context import BaseContext
 from threading import Lock
-from typing import Iterator, List, Optional, Tuple
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
 import numpy as np
 
 from app import logger
 from app.config import RESOURCE_PROFILING_ENABLED, RESOURCE_PROFILE_LOG_INTERVAL_SECONDS
+from app.core.frame_notify import SEQUENCE_FORMAT, SEQUENCE_SIZE, SharedSequenceNotifier
 from app.core.frame_utils import (
     ensure_frame_array,
     get_frame_size_bytes,
     get_storage_shape,
     infer_frame_dimensions,
     normalize_pixel_format,
-    reshape_frame,
 )
 
 
+# 读端在序号校验失败时的最大重试次数；超过后放弃本次读取
+SEQLOCK_MAX_READ_ATTEMPTS = 64
+SLOT_SEQUENCE_FORMAT = 'Q'
+SLOT_PIN_FORMAT = 'I'
+PIN_SKIP_FORMAT = 'Q'
+
+
+def find_time_range_positions(
+    timestamps: np.ndarray,
+    read_idx: int,
+    count: int,
+    start_time: float,
+    end_time: float,
+) -> Tuple[Sequence[int], np.ndarray]:
+    """在环形时间戳数组中定位 [start_time, end_time] 内的帧。
+
+    timestamps 按槽位存放，有效数据从 read_idx 开始共 count 个（可能回绕）。
+    返回 (positions, ordered)：positions 是相对 read_idx 的逻辑位置，ordered
+    是按写入顺序排列的时间戳快照（独立拷贝，不引用共享内存）。时间戳单调时
+    用 np.searchsorted 二分定位，出现时钟回拨等乱序时退化为向量化掩码。
+    """
+    capacity = len(timestamps)
+    if count <= 0 or capacity <= 0:
+        return range(0), np.empty(0, dtype=np.float64)
+
+    count = min(count, capacity)
+    head_length = min(count, capacity - read_idx)
+    ordered = np.concatenate((timestamps[read_idx:read_idx + head_length], timestamps[:count - head_length]))
+    if ordered.size > 1 and np.any(ordered[1:] < ordered[:-1]):
+        return np.flatnonzero((ordered >= start_time) & (ordered <= end_time)).tolist(), ordered
+
+    lower = int(np.searchsorted(ordered, start_time, side='left'))
+    upper = int(np.searchsorted(ordered, end_time, side='right'))
+    return range(lower, max(lower, upper)), ordered
+
+
+class SlotVersion(NamedTuple):
+    """零拷贝视图对应的槽位及其写入序号，用于事后校验视图是否已被覆盖。"""
+
+    slot: int
+    sequence: int
+
+
+class PinnedFrame:
+    """被钉住的槽位上的零拷贝帧。
+
+    持有期间写端跳过该槽位，frame 视图保持不变；引用计数归零时解除钉住。
+    retain/release 可在多个线程中调用，release 多于 retain 时忽略。
+    """
+
+    __slots__ = ('frame', 'timestamp', 'slot', '_buffer', '_refs', '_lock', '_pinned_at')
+
+    def __init__(self, buffer: 'VideoRingBuffer', slot: int, frame: np.ndarray, timestamp: float):
+        self.frame = frame
+        self.timestamp = timestamp
+        self.slot = slot
+        self._buffer = buffer
+        self._refs = 1
+        self._lock = Lock()
+        self._pinned_at = time.perf_counter()
+
+    def retain(self, count: int = 1) -> 'PinnedFrame':
+        with self._lock:
+            if self._refs <= 0:
+                raise RuntimeError("pinned frame has already been released")
+            self._refs += count
+        return self
+
+    def release(self):
+        with self._lock:
+            if self._refs <= 0:
+                return
+            self._refs -= 1
+            if self._refs > 0:
+                return
+        self._buffer._unpin(self.slot, (time.perf_counter() - self._pinned_at) * 1000)
+
+    @property
+    def refs(self) -> int:
+        return self._refs
+
+
 class VideoRingBuffer:
     """
     基于共享内存的原始视频帧环形缓冲区。
 
     当前主路径以 NV12 为默认像素格式，但该缓冲区保留了按像素格式
     计算 frame_size / storage_shape 的通用能力。
+
+    共享内存布局: 元数据 | 同步头 | 时间戳数组 | 槽位序号数组 | 帧数据。
+    只有一个写进程（decoder worker），读端可在任意进程中无锁读取：
+    元数据由同步头中的元数据序号保护，每个帧槽位由各自的槽位序号保护
+    （seqlock，奇数表示正在写入）。读端在拷贝前后比较序号，不一致即重试，
+    因此写端永远不会因为读端而阻塞。``self._lock`` 只用于串行化同一进程内的写操作。
+
+    读端还可以钉住最新槽位（wait_and_pin_newer）直接共享帧视图：槽位序号之后是
+    每个槽位的钉住计数和写端跳过计数。写端在标记槽位为写入中之后检查钉住计数，
+    非零时恢复序号并改写下一个未钉住的槽位；读端先增加钉住计数，再确认槽位序号
+    没有变化。被跳过的槽位保留原帧和原时间戳，直到解除钉住后的下一轮覆盖。
+    钉住计数的增减是读-改-写，只在单个读进程（source host）内通过 ``_pin_lock``
+    串行化，不支持多个进程同时钉住同一个缓冲区。
     """
 
     METADATA_FORMAT = 'QQQ?dd'
+    # 同步头：帧到达序号（4 字节）+ 元数据 seqlock 序号（4 字节），位于元数据与时间戳之间
+    NOTIFY_SIZE = 8
 
     def __init__(
         self,
@@ -55,8 +152,17 @@ class VideoRingBuffer:
 
         self.frame_size = get_frame_size_bytes(self.width, self.height, self.pixel_format)
         self.metadata_size = struct.calcsize(self.METADATA_FORMAT)
+        self.notify_offset = self.metadata_size
+        self.metadata_sequence_offset = self.notify_offset + SEQUENCE_SIZE
+        self.timestamp_base = self.notify_offset + self.NOTIFY_SIZE
         self.timestamp_size = 8 * self.capacity
-        self.total_size = self.metadata_size + self.timestamp_size + self.frame_size * self.capacity
+        self.slot_sequence_base = self.timestamp_base + self.timestamp_size
+        self.slot_sequence_size = struct.calcsize(SLOT_SEQUENCE_FORMAT) * self.capacity
+        self.slot_pin_base = self.slot_sequence_base + self.slot_sequence_size
+        self.slot_pin_size = struct.calcsize(SLOT_PIN_FORMAT) * self.capacity
+        self.pin_skip_offset = self.slot_pin_base + self.slot_pin_size
+        self.frame_base = self.pin_skip_offset + struct.calcsize(PIN_SKIP_FORMAT)
+        self.total_size = self.frame_base + self.frame_size * self.capacity
 
         if create:
             try:
@@ -71,12 +177,21 @@ class VideoRingBuffer:
         else:
             self.shm = shared_memory.SharedMemory(name=name)
 
+        self._frame_notifier = SharedSequenceNotifier(self.shm.buf, self.notify_offset)
         self._lock = mp_context.Lock() if mp_context else Lock()
         self._profile_next_log_at = time.monotonic() + RESOURCE_PROFILE_LOG_INTERVAL_SECONDS
         self._profile_peek_count = 0
         self._profile_peek_total_ms = 0.0
         self._profile_peek_max_ms = 0.0
         self._profile_peek_bytes = 0
+        self._torn_read_retries = 0
+        self._pin_lock = Lock()
+        self._pins_acquired = 0
+        self._pin_conflicts = 0
+        self._pins_released = 0
+        self._pin_hold_total_ms = 0.0
+        self._pin_hold_max_ms = 0.0
+        self._profile_pin_next_log_at = self._profile_next_log_at
 
     @staticmethod
     def _resolve_dimensions(
@@ -112,6 +227,9 @@ class VideoRingBuffer:
         last_write_time: float = 0.0,
         consecutive_errors: int = 0,
     ):
+        # 调用方持有写锁；序号先变奇数再写入，写完变回偶数
+        sequence = self._load_metadata_sequence()
+        self._store_metadata_sequence(sequence + 1)
         struct.pack_into(
             self.METADATA_FORMAT,
             self.shm.buf,
@@ -123,15 +241,129 @@ class VideoRingBuffer:
             last_write_time,
             consecutive_errors,
         )
+        self._store_metadata_sequence(sequence + 2)
 
     def _read_metadata(self) -> Tuple[int, int, int, bool, float, int]:
-        return struct.unpack_from(self.METADATA_FORMAT, self.shm.buf, 0)
+        metadata = None
+        for _ in range(SEQLOCK_MAX_READ_ATTEMPTS):
+            sequence = self._load_metadata_sequence()
+            if sequence & 1:
+                self._torn_read_retries += 1
+                time.sleep(0)
+                continue
+            metadata = struct.unpack_from(self.METADATA_FORMAT, self.shm.buf, 0)
+            if self._load_metadata_sequence() == sequence:
+                return metadata
+            self._torn_read_retries += 1
+        # 写端在写元数据期间退出会让序号停在奇数，此时返回尽力读取的结果
+        if metadata is None:
+            metadata = struct.unpack_from(self.METADATA_FORMAT, self.shm.buf, 0)
+        return metadata
+
+    def _load_metadata_sequence(self) -> int:
+        return struct.unpack_from(SEQUENCE_FORMAT, self.shm.buf, self.metadata_sequence_offset)[0]
+
+    def _store_metadata_sequence(self, sequence: int):
+        struct.pack_into(SEQUENCE_FORMAT, self.shm.buf, self.metadata_sequence_offset, sequence & 0xFFFFFFFF)
+
+    def _get_slot_sequence_offset(self, index: int) -> int:
+        return self.slot_sequence_base + (index % self.capacity) * 8
+
+    def _load_slot_sequence(self, index: int) -> int:
+        return struct.unpack_from(SLOT_SEQUENCE_FORMAT, self.shm.buf, self._get_slot_sequence_offset(index))[0]
+
+    def _store_slot_sequence(self, index: int, sequence: int):
+        struct.pack_into(SLOT_SEQUENCE_FORMAT, self.shm.buf, self._get_slot_sequence_offset(index), sequence)
+
+    def _get_slot_pin_offset(self, index: int) -> int:
+        return self.slot_pin_base + (index % self.capacity) * 4
+
+    def _load_pin_count(self, index: int) -> int:
+        return struct.unpack_from(SLOT_PIN_FORMAT, self.shm.buf, self._get_slot_pin_offset(index))[0]
+
+    def _add_pin_count(self, index: int, delta: int):
+        with self._pin_lock:
+            count = max(0, self._load_pin_count(index) + delta)
+            struct.pack_into(SLOT_PIN_FORMAT, self.shm.buf, self._get_slot_pin_offset(index), count)
+
+    def _load_pin_skips(self) -> int:
+        return struct.unpack_from(PIN_SKIP_FORMAT, self.shm.buf, self.pin_skip_offset)[0]
+
+    def _resolve_slot(self, index: int) -> Optional[int]:
+        write_idx, read_idx, count, _, _, _ = self._read_metadata()
+        if count == 0 or index >= count or index < -count:
+            return None
+        if index < 0:
+            return (write_idx + index) % self.capacity
+        return (read_idx + index) % self.capacity
+
+    def _read_slot(
+        self,
+        index: int,
+        *,
+        copy: bool,
+        last_timestamp: Optional[float] = None,
+    ) -> Optional[Tuple[Optional[np.ndarray], float, SlotVersion]]:
+        """按 seqlock 协议无锁读取一个槽位。
+
+        返回 (frame, timestamp, version)；当槽位时间戳等于 last_timestamp 时
+        frame 为 None 且不拷贝帧数据。缓冲区为空、索引越界或多次重试仍读到
+        正在写入的槽位时返回 None。
+        """
+        for _ in range(SEQLOCK_MAX_READ_ATTEMPTS):
+            actual_idx = self._resolve_slot(index)
+            if actual_idx is None:
+                return None
+            sequence = self._load_slot_sequence(actual_idx)
+            if sequence & 1:
+                self._torn_read_retries += 1
+                time.sleep(0)
+                continue
+
+            timestamp = self._read_timestamp(actual_idx)
+            frame = None
+            if last_timestamp is None or timestamp != last_timestamp:
+                offset = self._get_frame_offset(actual_idx)
+                frame = self._frame_from_shm(offset) if copy else self._frame_view_from_shm(offset)
+
+            if self._load_slot_sequence(actual_idx) == sequence:
+                return frame, timestamp, SlotVersion(actual_idx, sequence)
+            self._torn_read_retries += 1
+        return None
+
+    def is_version_current(self, version: SlotVersion) -> bool:
+        """零拷贝视图在读取后是否仍未被写端覆盖。"""
+        return self._load_slot_sequence(version.slot) == version.sequence
+
+    def _claim_write_slot(self, write_idx: int) -> Tuple[int, int, int]:
+        """从 write_idx 起找到第一个未被钉住的槽位并标记为写入中。
+
+        返回 (slot, writing_sequence, skipped)。序号先变奇数再检查钉住计数：读端在
+        此之前完成的钉住会被看到；之后的钉住会在读端复核序号时失败。全部槽位都被
+        钉住时（读端异常未释放）仍覆盖 write_idx，保证写端不阻塞。
+        """
+        for skipped in range(self.capacity):
+            slot = (write_idx + skipped) % self.capacity
+            slot_sequence = self._load_slot_sequence(slot)
+            # 奇数序号说明上次写入中途退出，直接沿用该奇数值
+            writing_sequence = slot_sequence if slot_sequence & 1 else slot_sequence + 1
+            self._store_slot_sequence(slot, writing_sequence)
+            if not self._load_pin_count(slot):
+                return slot, writing_sequence, skipped
+            # 槽位内容未动，恢复原序号，持有视图的读端不受影响
+            self._store_slot_sequence(slot, slot_sequence)
+
+        logger.warning(f"[RingBuffer:{self.name}] 全部 {self.capacity} 个槽位均被钉住，覆盖最旧槽位")
+        slot_sequence = self._load_slot_sequence(write_idx)
+        writing_sequence = slot_sequence if slot_sequence & 1 else slot_sequence + 1
+        self._store_slot_sequence(write_idx, writing_sequence)
+        return write_idx, writing_sequence, 0
 
     def _get_frame_offset(self, index: int) -> int:
-        return self.metadata_size + self.timestamp_size + (index % self.capacity) * self.frame_size
+        return self.frame_base + (index % self.capacity) * self.frame_size
 
     def _get_timestamp_offset(self, index: int) -> int:
-        return self.metadata_size + (index % self.capacity) * 8
+        return self.timestamp_base + (index % self.capacity) * 8
 
     def _write_timestamp(self, index: int, timestamp: float):
         struct.pack_into('d', self.shm.buf, self._get_timestamp_offset(index), timestamp)
@@ -140,8 +372,22 @@ class VideoRingBuffer:
         return struct.unpack_from('d', self.shm.buf, self._get_timestamp_offset(index))[0]
 
     def _frame_from_shm(self, offset: int) -> np.ndarray:
-        frame_bytes = bytes(self.shm.buf[offset:offset + self.frame_size])
-        return reshape_frame(frame_bytes, self.width, self.height, self.pixel_format).copy()
+        # 直接从共享内存视图拷贝一次，不经过中间 bytes
+        return np.array(self._frame_view_from_shm(offset))
+
+    def timestamp_array(self) -> np.ndarray:
+        """按槽位排列的时间戳数组的只读共享内存视图。
+
+        视图引用共享内存，调用方需在 close() 前释放。
+        """
+        timestamps = np.ndarray(
+            shape=(self.capacity,),
+            dtype=np.float64,
+            buffer=self.shm.buf,
+            offset=self.timestamp_base,
+        )
+        timestamps.setflags(write=False)
+        return timestamps
 
     def _frame_view_from_shm(self, offset: int) -> np.ndarray:
         frame = np.ndarray(
@@ -188,11 +434,20 @@ class VideoRingBuffer:
 
         with self._lock:
             write_idx, read_idx, count, locked, _, _ = self._read_metadata()
+            write_idx, writing_sequence, skipped = self._claim_write_slot(write_idx)
             new_write_idx = (write_idx + 1) % self.capacity
 
+            # 被跳过的钉住槽位仍算作有效帧；缓冲区写满后最旧的帧就在下一个写入位置
+            count = min(count + 1 + skipped, self.capacity)
             if count >= self.capacity:
-                read_idx = (read_idx + 1) % self.capacity
-                count = self.capacity - 1
+                read_idx = new_write_idx
+            if skipped:
+                struct.pack_into(
+                    PIN_SKIP_FORMAT,
+                    self.shm.buf,
+                    self.pin_skip_offset,
+                    self._load_pin_skips() + skipped,
+                )
 
             offset = self._get_frame_offset(write_idx)
             shm_array = np.ndarray(
@@ -204,7 +459,9 @@ class VideoRingBuffer:
             shm_array[:] = frame_data.reshape(-1)
 
             self._write_timestamp(write_idx, timestamp)
-            self._write_metadata(new_write_idx, read_idx, count + 1, locked, timestamp, 0)
+            self._store_slot_sequence(write_idx, writing_sequence + 1)
+            self._write_metadata(new_write_idx, read_idx, count, locked, timestamp, 0)
+            self._frame_notifier.publish()
             return True
 
     def read(self) -> Optional[np.ndarray]:
@@ -227,15 +484,10 @@ class VideoRingBuffer:
 
     def peek_with_timestamp(self, index: int = 0) -> Optional[Tuple[np.ndarray, float]]:
         started_at = time.perf_counter()
-        with self._lock:
-            write_idx, read_idx, count, _, _, _ = self._read_metadata()
-            if count == 0 or index >= count or index < -count:
-                return None
-
-            actual_idx = (write_idx + index) % self.capacity if index < 0 else (read_idx + index) % self.capacity
-            offset = self._get_frame_offset(actual_idx)
-            timestamp = self._read_timestamp(actual_idx)
-            frame = self._frame_from_shm(offset)
+        result = self._read_slot(index, copy=True)
+        if result is None:
+            return None
+        frame, timestamp, _ = result
 
         self._record_peek_profile((time.perf_counter() - started_at) * 1000, copied=True)
         return frame, timestamp
@@ -249,32 +501,14 @@ class VideoRingBuffer:
     ) -> Optional[Tuple[np.ndarray, float]]:
         """Return a frame only when its timestamp differs from ``last_timestamp``.
 
-        The timestamp comparison happens while holding the same lock used to
-        resolve the frame slot. This avoids copying the latest frame on every
-        polling iteration when a producer writes much less frequently than a
-        consumer polls.
+        The timestamp comparison is validated by the same slot sequence as the
+        frame read. This avoids copying the latest frame on every polling
+        iteration when a producer writes much less frequently than a consumer
+        polls.
         """
         started_at = time.perf_counter()
-        frame = None
-        timestamp = None
-        with self._lock:
-            write_idx, read_idx, count, _, _, _ = self._read_metadata()
-            if count == 0 or index >= count or index < -count:
-                return None
-
-            actual_idx = (
-                (write_idx + index) % self.capacity
-                if index < 0
-                else (read_idx + index) % self.capacity
-            )
-            timestamp = self._read_timestamp(actual_idx)
-            if last_timestamp is None or timestamp != last_timestamp:
-                offset = self._get_frame_offset(actual_idx)
-                frame = (
-                    self._frame_from_shm(offset)
-                    if copy
-                    else self._frame_view_from_shm(offset)
-                )
+        result = self._read_slot(index, copy=copy, last_timestamp=last_timestamp)
+        frame = None if result is None else result[0]
 
         self._record_peek_profile(
             (time.perf_counter() - started_at) * 1000,
@@ -282,7 +516,151 @@ class VideoRingBuffer:
         )
         if frame is None:
             return None
-        return frame, timestamp
+        return frame, result[1]
+
+    def frame_sequence(self) -> int:
+        """当前帧到达序号；每次 write 加一（32 位回绕）。"""
+        return self._frame_notifier.load()
+
+    def wait_for_newer(
+        self,
+        last_timestamp: Optional[float],
+        timeout: float,
+        index: int = -1,
+        *,
+        copy: bool = True,
+    ) -> Optional[Tuple[np.ndarray, float]]:
+        """Block until a frame newer than ``last_timestamp`` is available.
+
+        Returns the same tuple as :meth:`peek_if_newer_with_timestamp`, or None
+        when ``timeout`` seconds pass without a new frame. The arrival sequence
+        is read before each check, so a write that lands between the check and
+        the wait still wakes the caller immediately.
+        """
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            sequence = self._frame_notifier.load()
+            result = self.peek_if_newer_with_timestamp(last_timestamp, index, copy=copy)
+            if result is not None:
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._frame_notifier.wait_for_change(sequence, remaining)
+
+    def pin_if_newer(self, last_timestamp: Optional[float], index: int = -1) -> Optional[PinnedFrame]:
+        """钉住 index 处的槽位并返回其零拷贝视图；时间戳等于 last_timestamp 时返回 None。
+
+        写端在解除钉住前不会覆盖该槽位，调用方用完后必须 release()。
+        """
+        started_at = time.perf_counter()
+        for _ in range(SEQLOCK_MAX_READ_ATTEMPTS):
+            actual_idx = self._resolve_slot(index)
+            if actual_idx is None:
+                return None
+            sequence = self._load_slot_sequence(actual_idx)
+            if sequence & 1:
+                self._torn_read_retries += 1
+                time.sleep(0)
+                continue
+            timestamp = self._read_timestamp(actual_idx)
+            if last_timestamp is not None and timestamp == last_timestamp:
+                return None
+
+            self._add_pin_count(actual_idx, 1)
+            if self._load_slot_sequence(actual_idx) == sequence:
+                frame = self._frame_view_from_shm(self._get_frame_offset(actual_idx))
+                self._record_pin(started_at)
+                return PinnedFrame(self, actual_idx, frame, timestamp)
+            # 钉住前写端已开始改写该槽位，放弃后重新定位最新槽位
+            self._add_pin_count(actual_idx, -1)
+            self._pin_conflicts += 1
+        return None
+
+    def wait_and_pin_newer(
+        self,
+        last_timestamp: Optional[float],
+        timeout: float,
+        index: int = -1,
+    ) -> Optional[PinnedFrame]:
+        """wait_for_newer 的钉住版本：超时没有新帧时返回 None。"""
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            sequence = self._frame_notifier.load()
+            pinned = self.pin_if_newer(last_timestamp, index)
+            if pinned is not None:
+                return pinned
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._frame_notifier.wait_for_change(sequence, remaining)
+
+    def clear_pins(self):
+        """清零所有钉住计数，用于读进程重启后回收上次异常退出遗留的钉住。"""
+        with self._pin_lock:
+            pins = np.ndarray(
+                shape=(self.capacity,),
+                dtype=np.uint32,
+                buffer=self.shm.buf,
+                offset=self.slot_pin_base,
+            )
+            pins[:] = 0
+            del pins
+
+    def _unpin(self, slot: int, held_ms: float):
+        self._add_pin_count(slot, -1)
+        with self._pin_lock:
+            self._pins_released += 1
+            self._pin_hold_total_ms += held_ms
+            self._pin_hold_max_ms = max(self._pin_hold_max_ms, held_ms)
+
+    def _record_pin(self, started_at: float):
+        self._pins_acquired += 1
+        self._record_peek_profile((time.perf_counter() - started_at) * 1000, copied=False)
+        if not RESOURCE_PROFILING_ENABLED:
+            return
+        now = time.monotonic()
+        if now < self._profile_pin_next_log_at:
+            return
+        self._profile_pin_next_log_at = now + RESOURCE_PROFILE_LOG_INTERVAL_SECONDS
+        stats = self.get_pin_stats(reset=True)
+        logger.info(
+            f"[RingBuffer:{self.name}] pin profile: "
+            f"pins={stats['pins_acquired']}, pinned_slots={stats['pinned_slots']}, "
+            f"conflicts={stats['pin_conflicts']}, hold_avg_ms={stats['pin_hold_avg_ms']:.2f}, "
+            f"hold_max_ms={stats['pin_hold_max_ms']:.2f}, writer_skips={stats['pin_skips']}"
+        )
+
+    def get_pin_stats(self, reset: bool = False) -> dict:
+        """钉住相关指标。pin_hold_* 为槽位被占用（写端需绕开）的时长，pin_skips 为写端累计跳过次数。"""
+        pins = np.ndarray(
+            shape=(self.capacity,),
+            dtype=np.uint32,
+            buffer=self.shm.buf,
+            offset=self.slot_pin_base,
+        )
+        pinned_slots = int(np.count_nonzero(pins))
+        pin_count = int(pins.sum())
+        del pins
+        with self._pin_lock:
+            stats = {
+                'pinned_slots': pinned_slots,
+                'pin_count': pin_count,
+                'pins_acquired': self._pins_acquired,
+                'pin_conflicts': self._pin_conflicts,
+                'pin_hold_avg_ms': (
+                    self._pin_hold_total_ms / self._pins_released if self._pins_released else 0.0
+                ),
+                'pin_hold_max_ms': self._pin_hold_max_ms,
+                'pin_skips': self._load_pin_skips(),
+            }
+            if reset:
+                self._pins_acquired = 0
+                self._pin_conflicts = 0
+                self._pins_released = 0
+                self._pin_hold_total_ms = 0.0
+                self._pin_hold_max_ms = 0.0
+        return stats
 
     def peek_view_with_timestamp(self, index: int = 0) -> Optional[Tuple[np.ndarray, float]]:
         """Return a read-only shared-memory view without copying frame bytes.
@@ -291,41 +669,59 @@ class VideoRingBuffer:
         Use this for latest-frame real-time consumers, not for historical reads or
         long-lived frame ownership.
         """
-        started_at = time.perf_counter()
-        with self._lock:
-            write_idx, read_idx, count, _, _, _ = self._read_metadata()
-            if count == 0 or index >= count or index < -count:
-                return None
+        result = self.peek_view_with_version(index)
+        if result is None:
+            return None
+        return result[0], result[1]
 
-            actual_idx = (write_idx + index) % self.capacity if index < 0 else (read_idx + index) % self.capacity
-            offset = self._get_frame_offset(actual_idx)
-            timestamp = self._read_timestamp(actual_idx)
-            frame = self._frame_view_from_shm(offset)
+    def peek_view_with_version(self, index: int = 0) -> Optional[Tuple[np.ndarray, float, SlotVersion]]:
+        """Return a read-only view plus the slot version it was taken at.
+
+        After consuming the view, ``is_version_current(version)`` tells whether
+        the writer has started overwriting the slot in the meantime; a False
+        result means any data derived from the view may be torn.
+        """
+        started_at = time.perf_counter()
+        result = self._read_slot(index, copy=False)
+        if result is None:
+            return None
 
         self._record_peek_profile((time.perf_counter() - started_at) * 1000, copied=False)
-        return frame, timestamp
+        return result
 
-    def iter_frames_in_time_range(self, start_time: float, end_time: float) -> Iterator[Tuple[np.ndarray, float]]:
-        matching_slots: List[Tuple[bytes, float]] = []
-        with self._lock:
-            _, read_idx, count, _, _, _ = self._read_metadata()
-            for i in range(count):
-                actual_idx = (read_idx + i) % self.capacity
-                timestamp = self._read_timestamp(actual_idx)
-                if start_time <= timestamp <= end_time:
-                    offset = self._get_frame_offset(actual_idx)
-                    matching_slots.append((bytes(self.shm.buf[offset:offset + self.frame_size]), timestamp))
+    def _locate_time_range(self, start_time: float, end_time: float) -> Tuple[int, Sequence[int], np.ndarray]:
+        _, read_idx, count, _, _, _ = self._read_metadata()
+        positions, ordered = find_time_range_positions(
+            self.timestamp_array(), read_idx, count, start_time, end_time
+        )
+        return read_idx, positions, ordered
 
-        for frame_bytes, timestamp in matching_slots:
-            yield reshape_frame(frame_bytes, self.width, self.height, self.pixel_format).copy(), timestamp
+    def _copy_slot_if_unchanged(self, actual_idx: int, expected_timestamp: float) -> Optional[np.ndarray]:
+        """拷贝槽位帧；槽位正在写入、已被新帧覆盖或拷贝中被改写时返回 None。"""
+        sequence = self._load_slot_sequence(actual_idx)
+        if sequence & 1 or self._read_timestamp(actual_idx) != expected_timestamp:
+            return None
+        frame = self._frame_from_shm(self._get_frame_offset(actual_idx))
+        if self._load_slot_sequence(actual_idx) != sequence:
+            self._torn_read_retries += 1
+            return None
+        return frame
+
+    def iter_frames_in_time_range(self, start_time: float, end_time: float) -> Iterator[Tuple[np.ndarray, float]]:
+        """按时间顺序逐帧产出范围内的帧，每次只拷贝当前一帧。"""
+        read_idx, positions, ordered = self._locate_time_range(start_time, end_time)
+        for position in positions:
+            timestamp = float(ordered[position])
+            frame = self._copy_slot_if_unchanged((read_idx + position) % self.capacity, timestamp)
+            if frame is not None:
+                yield frame, timestamp
 
     def get_recent_frames(self, seconds: float) -> List[Tuple[np.ndarray, float]]:
-        with self._lock:
-            write_idx, _, count, _, _, _ = self._read_metadata()
-            if count == 0:
-                return []
-            latest_idx = (write_idx - 1) % self.capacity
-            latest_timestamp = self._read_timestamp(latest_idx)
+        write_idx, _, count, _, _, _ = self._read_metadata()
+        if count == 0:
+            return []
+        latest_idx = (write_idx - 1) % self.capacity
+        latest_timestamp = self._read_timestamp(latest_idx)
         return list(self.iter_frames_in_time_range(latest_timestamp - seconds, latest_timestamp))
 
     def get_frames_in_time_range(self, start_time: float, end_time: float) -> List[Tuple[np.ndarray, float]]:
@@ -349,6 +745,8 @@ class VideoRingBuffer:
             'pixel_format': self.pixel_format,
             'frame_shape': self.frame_shape,
             'frame_size': self.frame_size,
+            'torn_read_retries': self._torn_read_retries,
+            **self.get_pin_stats(),
         }
 
     def clear(self):
@@ -356,9 +754,8 @@ class VideoRingBuffer:
             self._write_metadata(0, 0, 0, False, 0.0, 0)
 
     def get_last_write_time(self) -> float:
-        with self._lock:
-            _, _, _, _, last_write, _ = self._read_metadata()
-            return last_write
+        _, _, _, _, last_write, _ = self._read_metadata()
+        return last_write
 
     def update_last_write_time(self, timestamp: float = None):
         if timestamp is None:
@@ -369,9 +766,8 @@ class VideoRingBuffer:
             self._write_metadata(write_idx, read_idx, count, locked, timestamp, errors)
 
     def get_consecutive_errors(self) -> int:
-        with self._lock:
-            _, _, _, _, _, errors = self._read_metadata()
-            return errors
+        _, _, _, _, _, errors = self._read_metadata()
+        return errors
 
     def increment_error_count(self):
         with self._lock:
@@ -399,6 +795,7 @@ class VideoRingBuffer:
         }
 
     def close(self):
+        self._frame_notifier.close()
         self.shm.close()
 
     def unlink(self):
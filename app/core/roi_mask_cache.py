@@ -0,0 +1,141 @@
+"""
+进程内 ROI 掩码缓存
+
+热区配置只在编辑工作流时变化，但掩码此前在每帧、每个热区过滤时都重新分配整帧并 fillPoly。
+这里按 (帧高, 帧宽, 归一化后的多边形顶点) 缓存栅格化结果：
+
+- 返回的掩码是只读数组，多个工作流、多个线程可直接共享；需要修改时调用方先 copy()；
+- IoA 过滤需要的积分图在首次使用时计算并随掩码一起缓存，之后每个框的 IoA 为 O(1)；
+- 按字节预算做 LRU 淘汰，命中率随资源剖析日志输出。
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+from app.config import ROI_MASK_CACHE_MAX_MB
+
+
+class RoiMask:
+    """一份缓存的只读掩码，以及按需计算的积分图。"""
+
+    __slots__ = ('mask', '_integral', '_cache')
+
+    def __init__(self, mask: np.ndarray, cache: Optional['RoiMaskCache'] = None):
+        mask.setflags(write=False)
+        self.mask = mask
+        self._integral: Optional[np.ndarray] = None
+        self._cache = cache
+
+    @property
+    def integral(self) -> np.ndarray:
+        """(h+1, w+1) 的热区像素计数积分图，integral[y, x] 为 mask[:y, :x] 中的非零像素数。"""
+        if self._integral is None:
+            height, width = self.mask.shape[:2]
+            integral = np.zeros((height + 1, width + 1), dtype=np.int32)
+            np.cumsum(
+                np.cumsum(self.mask > 0, axis=0, dtype=np.int32),
+                axis=1,
+                out=integral[1:, 1:],
+            )
+            integral.setflags(write=False)
+            cache = self._cache
+            if cache is not None:
+                cache._attach_integral(self, integral)
+            else:
+                self._integral = integral
+        return self._integral
+
+    @property
+    def nbytes(self) -> int:
+        return self.mask.nbytes + (self._integral.nbytes if self._integral is not None else 0)
+
+    def count_nonzero(self, x1: int, y1: int, x2: int, y2: int) -> int:
+        """mask[y1:y2, x1:x2] 中的非零像素数。"""
+        integral = self.integral
+        return int(integral[y2, x2]) - int(integral[y1, x2]) - int(integral[y2, x1]) + int(integral[y1, x1])
+
+
+class RoiMaskCache:
+    """按字节预算淘汰的 LRU 掩码缓存，线程安全。"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: 'OrderedDict[Hashable, RoiMask]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, build: Callable[[], np.ndarray]) -> RoiMask:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+            self._misses += 1
+
+        # 栅格化在锁外进行；并发未命中时以先写入的结果为准
+        entry = RoiMask(build(), self)
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            if entry.nbytes > self.max_bytes:
+                entry._cache = None
+                return entry
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            self._evict_locked()
+        return entry
+
+    def _attach_integral(self, entry: RoiMask, integral: np.ndarray):
+        with self._lock:
+            if entry._integral is not None:
+                return
+            entry._integral = integral
+            if entry._cache is self:
+                self._bytes += integral.nbytes
+                self._evict_locked()
+
+    def _evict_locked(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            # 已被淘汰的条目仍可能被调用方持有，之后计算的积分图不再计入预算
+            entry._cache = None
+            self._bytes -= entry.nbytes
+            self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                entry._cache = None
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self, reset: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            stats = {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': (self._hits / lookups) if lookups else 0.0,
+            }
+            if reset:
+                self._hits = 0
+                self._misses = 0
+                self._evictions = 0
+        return stats
+
+
+roi_mask_cache = RoiMaskCache(ROI_MASK_CACHE_MAX_MB * 1024 * 1024)
+
+
+def get_roi_mask_cache_stats(reset: bool = False) -> Dict[str, Any]:
+    return roi_mask_cache.get_stats(reset=reset)
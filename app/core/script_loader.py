@@ -6,10 +6,12 @@ import hashlib
 import importlib
 import importlib.util
 import os
+import inspect
 import sys
 import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, Tuple, Any
+from typing import Callable, Dict, Optional, Tuple, Any
 
 from app.config import USER_SCRIPTS_ROOT
 
@@ -24,6 +26,29 @@ class ScriptValidationError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class ScriptCallLayout:
+    """脚本入口函数的调用布局：加载时解析一次签名，逐帧只按参数名取值。"""
+
+    func: Callable
+    param_names: Tuple[str, ...]
+
+    @classmethod
+    def for_callable(cls, func: Callable) -> 'ScriptCallLayout':
+        try:
+            param_names = tuple(inspect.signature(func).parameters)
+        except (TypeError, ValueError):
+            param_names = ()
+        return cls(func=func, param_names=param_names)
+
+    def accepts(self, name: str) -> bool:
+        return name in self.param_names
+
+    def build_kwargs(self, available_args: Dict[str, Any]) -> Dict[str, Any]:
+        """按签名顺序挑出脚本声明的参数；未声明的参数（包括 **kwargs）不传递。"""
+        return {name: available_args[name] for name in self.param_names if name in available_args}
+
+
 class _ScriptSecurityValidator(ast.NodeVisitor):
     """基于 AST 的脚本安全检查，避免字符串匹配误判。"""
 
@@ -414,6 +439,7 @@ class ScriptLoader:
             'metadata': metadata,
             'state': None,  # init() 函数的状态
             'module_name': module_name,
+            'call_layouts': {},  # {function_name: ScriptCallLayout}，reload 时随条目一起替换
         }
 
         with self._lock:
@@ -442,6 +468,41 @@ class ScriptLoader:
             return self._cache[script_path]['module']
         return None
 
+    def get_call_layout(
+        self,
+        script_path: str,
+        function_name: str = 'process',
+        isolate_key: Optional[str] = None,
+    ) -> Optional[ScriptCallLayout]:
+        """
+        获取已加载脚本入口函数的调用布局（按缓存条目记忆，reload 后自动失效）
+
+        Args:
+            script_path: 脚本路径
+            function_name: 入口函数名
+            isolate_key: 隔离加载 key
+
+        Returns:
+            ScriptCallLayout，脚本未加载或缺少该函数时返回 None
+        """
+        cache_key = (script_path, str(isolate_key)) if isolate_key is not None else None
+        with self._lock:
+            if cache_key is not None:
+                cached = self._isolated_cache.get(cache_key)
+            else:
+                cached = self._cache.get(script_path)
+            if cached is None:
+                return None
+            func = getattr(cached['module'], function_name, None)
+            if func is None:
+                return None
+            layouts = cached.setdefault('call_layouts', {})
+            layout = layouts.get(function_name)
+            if layout is None or layout.func is not func:
+                layout = ScriptCallLayout.for_callable(func)
+                layouts[function_name] = layout
+            return layout
+
     def reload(self, script_path: str) -> Tuple[Any, Dict]:
         """
         重新加载脚本
@@ -1,8 +1,9 @@
 """Cross-process shared Ultralytics, RKNN, and PaddleOCR inference service.
 
-Source workflow hosts exchange frame descriptors over a Unix socket.  Pixels live
-in short-lived POSIX shared-memory segments, while exactly one model process is
-kept for each stable model key.  OCR uses one process per det+rec pair.
+Source workflow hosts exchange frame descriptors over a Unix socket; requests
+carry a ``call_id`` so one connection can keep several frames in flight.  Pixels live
+in POSIX shared-memory slabs that each client keeps and reuses across requests,
+while exactly one model process is kept for each stable model key.  OCR uses one process per det+rec pair.
 Queues are deliberately bounded: overload drops analysis work instead of
 consuming unbounded Jetson unified memory.
 """
@@ -15,16 +16,19 @@ import multiprocessing
 import os
 import queue
 import signal
+import socket
 import subprocess
 import sys
 import threading
 import time
 import traceback
 import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from multiprocessing import resource_tracker, shared_memory
 from multiprocessing.connection import Client, Listener
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 
@@ -46,8 +50,10 @@ from app.config import (
     SHARED_INFERENCE_BATCH_MAX_SIZE,
     SHARED_INFERENCE_BATCH_WAIT_MS,
     SHARED_INFERENCE_IDLE_SECONDS,
+    SHARED_INFERENCE_MAX_IN_FLIGHT,
     SHARED_INFERENCE_QUEUE_SIZE,
     SHARED_INFERENCE_REQUEST_TIMEOUT_SECONDS,
+    SHARED_INFERENCE_SLAB_POOL_SIZE,
     SHARED_INFERENCE_SOCKET_PATH,
     SHARED_INFERENCE_STARTUP_TIMEOUT_SECONDS,
 )
@@ -63,6 +69,8 @@ from app.core.gpu_placement import (
 
 
 _AUTHKEY = b"video-ba-pipe-local-inference-v1"
+# OCR 批量裁剪请求：多张裁剪图打包为一个一维 uint8 帧，该配置键给出各裁剪图的 shape
+OCR_CROP_SHAPES_KEY = "ocr_crop_shapes"
 
 
 class SharedInferenceError(RuntimeError):
@@ -254,6 +262,148 @@ def _untrack_attached_shared_memory(segment: shared_memory.SharedMemory) -> None
         pass
 
 
+# Slabs are rounded up so that crops and frames of slightly different sizes can
+# share one segment instead of missing the pool on every new shape.
+_SLAB_SIZE_ALIGNMENT = 256 * 1024
+# Upper bound of client slabs a model worker keeps mapped.  Entries are evicted
+# in LRU order between batches, when no frame view references them any more.
+_WORKER_ATTACHED_SLAB_LIMIT = 64
+
+
+def _aligned_slab_size(nbytes: int) -> int:
+    nbytes = max(1, int(nbytes))
+    return -(-nbytes // _SLAB_SIZE_ALIGNMENT) * _SLAB_SIZE_ALIGNMENT
+
+
+class _FrameSlab:
+    __slots__ = ("segment", "size")
+
+    def __init__(self, size: int):
+        self.segment = shared_memory.SharedMemory(create=True, size=size)
+        self.size = int(size)
+
+    @property
+    def name(self) -> str:
+        return self.segment.name
+
+    def destroy(self) -> None:
+        try:
+            self.segment.close()
+        except BufferError:
+            pass
+        try:
+            self.segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class _FrameSlabPool:
+    """Client-owned shared-memory slabs reused across inference requests.
+
+    A slab is checked out by exactly one in-flight request and only returned to
+    the pool once the model worker has answered for it.  Slabs whose request
+    timed out are unlinked instead, because the worker may still be reading.
+    """
+
+    def __init__(self, capacity: int = SHARED_INFERENCE_SLAB_POOL_SIZE):
+        self.capacity = max(1, int(capacity))
+        self.free: list = []
+        self.lock = threading.Lock()
+        self.closed = False
+        self.reused = 0
+        self.missed = 0
+
+    def acquire(self, nbytes: int) -> Tuple[_FrameSlab, bool]:
+        with self.lock:
+            best_index = None
+            for index, slab in enumerate(self.free):
+                if slab.size < nbytes:
+                    continue
+                if best_index is None or slab.size < self.free[best_index].size:
+                    best_index = index
+            if best_index is not None:
+                self.reused += 1
+                return self.free.pop(best_index), True
+            self.missed += 1
+        return _FrameSlab(_aligned_slab_size(nbytes)), False
+
+    def release(self, slab: _FrameSlab) -> None:
+        evicted = slab
+        with self.lock:
+            if not self.closed:
+                if len(self.free) < self.capacity:
+                    self.free.append(slab)
+                    return
+                smallest = min(range(len(self.free)), key=lambda i: self.free[i].size)
+                if self.free[smallest].size < slab.size:
+                    evicted = self.free[smallest]
+                    self.free[smallest] = slab
+        evicted.destroy()
+
+    def discard(self, slab: _FrameSlab) -> None:
+        slab.destroy()
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "slab_reuse_count": self.reused,
+                "slab_miss_count": self.missed,
+                "slab_free_count": len(self.free),
+            }
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            slabs, self.free = self.free, []
+        for slab in slabs:
+            slab.destroy()
+
+
+class _AttachedSlabCache:
+    """Worker-side LRU of client slabs, so steady-state requests never reopen shm."""
+
+    def __init__(self, limit: int = _WORKER_ATTACHED_SLAB_LIMIT):
+        self.limit = max(1, int(limit))
+        self.segments: "OrderedDict[str, shared_memory.SharedMemory]" = OrderedDict()
+
+    def frame_view(self, request: Dict[str, Any]) -> np.ndarray:
+        name = request["shm_name"]
+        segment = self.segments.get(name)
+        if segment is None:
+            segment = shared_memory.SharedMemory(name=name, create=False)
+            _untrack_attached_shared_memory(segment)
+            self.segments[name] = segment
+        else:
+            self.segments.move_to_end(name)
+        frame = np.ndarray(
+            tuple(request["shape"]),
+            dtype=np.dtype(request["dtype"]),
+            buffer=segment.buf,
+        )
+        # The slab belongs to the client and is reused for later frames.
+        frame.flags.writeable = False
+        return frame
+
+    def trim(self) -> None:
+        while len(self.segments) > self.limit:
+            name, segment = next(iter(self.segments.items()))
+            try:
+                segment.close()
+            except BufferError:
+                # A backend still holds a view; retry after the next batch.
+                self.segments.move_to_end(name)
+                return
+            self.segments.pop(name, None)
+
+    def close(self) -> None:
+        for segment in self.segments.values():
+            try:
+                segment.close()
+            except BufferError:
+                pass
+        self.segments.clear()
+
+
 def _model_worker_main(
     spec: Dict[str, Any],
     base_config: Dict[str, Any],
@@ -318,6 +468,7 @@ def _model_worker_main(
         })
         return
 
+    attached_slabs = _AttachedSlabCache()
     stop_after_batch = False
     while not stop_after_batch:
         first_request = request_queue.get()
@@ -338,18 +489,12 @@ def _model_worker_main(
                 break
             requests.append(next_request)
 
+        # Inference runs directly on the client's slab.  The client does not
+        # reuse a slab until this worker has answered for it.
         prepared = []
         for request in requests:
-            segment = None
             try:
-                segment = shared_memory.SharedMemory(name=request["shm_name"], create=False)
-                _untrack_attached_shared_memory(segment)
-                frame_view = np.ndarray(
-                    tuple(request["shape"]),
-                    dtype=np.dtype(request["dtype"]),
-                    buffer=segment.buf,
-                )
-                prepared.append((request, np.array(frame_view, copy=True)))
+                prepared.append((request, attached_slabs.frame_view(request)))
             except Exception as exc:
                 result_queue.put({
                     "kind": "result",
@@ -357,9 +502,6 @@ def _model_worker_main(
                     "ok": False,
                     "error": f"{type(exc).__name__}: {exc}",
                 })
-            finally:
-                if segment is not None:
-                    segment.close()
 
         # Requests with different NMS parameters cannot share one Ultralytics
         # predict call. Group compatible requests, while still draining one
@@ -367,6 +509,10 @@ def _model_worker_main(
         groups: Dict[str, list] = {}
         for request, frame in prepared:
             config = request["config"]
+            if config.get(OCR_CROP_SHAPES_KEY):
+                # 打包的 OCR 裁剪图自成一组，由后端一次处理全部裁剪图
+                groups[f"ocr_crops:{request['request_id']}"] = [(request, frame)]
+                continue
             signature = json.dumps(
                 {
                     "confidence": config.get("confidence"),
@@ -383,7 +529,19 @@ def _model_worker_main(
                 configs = [item[0]["config"] for item in group]
                 frames = [item[1] for item in group]
                 infer_batch = getattr(backend, "infer_batch", None)
-                if len(group) > 1 and callable(infer_batch):
+                crop_shapes = configs[0].get(OCR_CROP_SHAPES_KEY) if len(group) == 1 else None
+                if crop_shapes:
+                    from app.core.ocr_backend import (
+                        infer_ocr_crops,
+                        merge_ocr_crop_results,
+                        unpack_ocr_crops,
+                    )
+
+                    crops = unpack_ocr_crops(frames[0], crop_shapes)
+                    batch_results = [merge_ocr_crop_results(infer_ocr_crops(backend, crops))]
+                    effective_batch_size = len(crops)
+                    crops = None
+                elif len(group) > 1 and callable(infer_batch):
                     batch_results = backend.infer_batch(frames, configs)
                     effective_batch_size = len(group)
                 else:
@@ -404,7 +562,8 @@ def _model_worker_main(
                         "details": details,
                         "metadata": {
                             **metadata,
-                            "batch_size": effective_batch_size,
+                            # 原生 batch 后端按模型容量分块推理，以其上报的实际 batch 为准
+                            "batch_size": metadata.get("batch_size", effective_batch_size),
                             "shared_backend": backend.name,
                             "gpu_index": (
                                 gpu_assignment.get("gpu_index")
@@ -445,6 +604,9 @@ def _model_worker_main(
                     fatal_worker_error = True
                     stop_after_batch = True
                     break
+        # Drop every frame view before unmapping evicted slabs.
+        prepared = groups = group = frames = frame = _frame = None
+        attached_slabs.trim()
         if fatal_worker_error:
             break
 
@@ -452,6 +614,7 @@ def _model_worker_main(
         backend.cleanup()
     except Exception:
         pass
+    attached_slabs.close()
 
 
 @dataclass
@@ -487,6 +650,8 @@ class _ModelSlot:
     last_oom_at: Optional[float] = None
     oom_retry_at: float = 0.0
     dead_exit_handled: bool = False
+    slab_reuse_count: int = 0
+    slab_miss_count: int = 0
 
 
 class _ModelRegistry:
@@ -771,6 +936,11 @@ class _ModelRegistry:
             except queue.Full:
                 self.pending.pop(request_id, None)
                 return {"ok": False, "overloaded": True, "error": "model_queue_full"}
+            if "slab_reused" in request:
+                if request["slab_reused"]:
+                    slot.slab_reuse_count += 1
+                else:
+                    slot.slab_miss_count += 1
 
         if not pending.event.wait(timeout=max(0.1, float(timeout))):
             with self.lock:
@@ -1089,6 +1259,8 @@ class _ModelRegistry:
                     "backend": slot.backend or slot.spec.get("backend"),
                     "references": slot.references,
                     "queue_depth": queue_depth,
+                    "slab_reuse_count": slot.slab_reuse_count,
+                    "slab_miss_count": slot.slab_miss_count,
                     **memory_metrics,
                     "oom_failures": slot.oom_failures,
                     "oom_retry_in_seconds": max(
@@ -1096,10 +1268,21 @@ class _ModelRegistry:
                     ),
                 })
             gpu_status = self.gpu_broker.status()
+            slab_reuse_count = sum(model["slab_reuse_count"] for model in models)
+            slab_miss_count = sum(model["slab_miss_count"] for model in models)
+            slab_requests = slab_reuse_count + slab_miss_count
             return {
                 "ok": True,
                 "models": models,
                 "model_count": len(models),
+                "frame_slabs": {
+                    "reuse_count": slab_reuse_count,
+                    "miss_count": slab_miss_count,
+                    "reuse_ratio": (
+                        round(slab_reuse_count / slab_requests, 4)
+                        if slab_requests else None
+                    ),
+                },
                 "oom_policy": self.oom_policy(),
                 "gpu_scheduler": {
                     key: value for key, value in gpu_status.items() if key != "gpus"
@@ -1143,47 +1326,76 @@ class SharedInferenceServer:
         )
         self.listener = None
 
+    def _handle_request(self, request: Dict[str, Any], acquired_keys: set) -> Dict[str, Any]:
+        action = request.get("action")
+        if action == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if action == "stats":
+            return self.registry.stats()
+        if action == "configure_oom":
+            return self.registry.configure_oom_policy(request.get("policy") or {})
+        if action == "acquire":
+            response = self.registry.acquire(request["spec"], request["config"])
+            if response.get("ok") and response.get("model_key"):
+                acquired_keys.add(response["model_key"])
+            return response
+        if action == "release":
+            acquired_keys.discard(request["model_key"])
+            return self.registry.release(request["model_key"])
+        if action == "infer":
+            return self.registry.submit(
+                request["model_key"],
+                request["request"],
+                request.get("timeout", SHARED_INFERENCE_REQUEST_TIMEOUT_SECONDS),
+                request.get(
+                    "startup_timeout",
+                    SHARED_INFERENCE_STARTUP_TIMEOUT_SECONDS,
+                ),
+            )
+        return {"ok": False, "error": f"unsupported_action:{action}"}
+
     def _handle_connection(self, connection) -> None:
         acquired_keys = set()
+        send_lock = threading.Lock()
+        # Multiplexed infer calls wait for their model worker on this pool, so
+        # the receive loop keeps accepting frames while earlier ones are queued.
+        infer_pool = ThreadPoolExecutor(
+            max_workers=SHARED_INFERENCE_MAX_IN_FLIGHT,
+            thread_name_prefix="shared-infer-call",
+        )
+
+        def reply(call_id, response: Dict[str, Any]) -> None:
+            if call_id is not None:
+                response = {**response, "call_id": call_id}
+            try:
+                with send_lock:
+                    connection.send(response)
+            except (OSError, EOFError):
+                pass
+
+        def run_call(call_id, request: Dict[str, Any]) -> None:
+            try:
+                response = self._handle_request(request, acquired_keys)
+            except Exception as exc:
+                response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            reply(call_id, response)
+
         try:
             while self.running:
                 request = connection.recv()
-                action = request.get("action")
-                if action == "ping":
-                    response = {"ok": True, "pid": os.getpid()}
-                elif action == "shutdown":
-                    connection.send({"ok": True})
+                call_id = request.get("call_id")
+                if request.get("action") == "shutdown":
+                    reply(call_id, {"ok": True})
                     threading.Thread(target=self.close, daemon=True).start()
                     return
-                elif action == "stats":
-                    response = self.registry.stats()
-                elif action == "configure_oom":
-                    response = self.registry.configure_oom_policy(
-                        request.get("policy") or {}
-                    )
-                elif action == "acquire":
-                    response = self.registry.acquire(request["spec"], request["config"])
-                    if response.get("ok") and response.get("model_key"):
-                        acquired_keys.add(response["model_key"])
-                elif action == "release":
-                    response = self.registry.release(request["model_key"])
-                    acquired_keys.discard(request["model_key"])
-                elif action == "infer":
-                    response = self.registry.submit(
-                        request["model_key"],
-                        request["request"],
-                        request.get("timeout", SHARED_INFERENCE_REQUEST_TIMEOUT_SECONDS),
-                        request.get(
-                            "startup_timeout",
-                            SHARED_INFERENCE_STARTUP_TIMEOUT_SECONDS,
-                        ),
-                    )
-                else:
-                    response = {"ok": False, "error": f"unsupported_action:{action}"}
-                connection.send(response)
+                if request.get("action") == "infer" and call_id is not None:
+                    infer_pool.submit(run_call, call_id, request)
+                    continue
+                reply(call_id, self._handle_request(request, acquired_keys))
         except (EOFError, BrokenPipeError, ConnectionResetError):
             pass
         finally:
+            infer_pool.shutdown(wait=False)
             for key in acquired_keys:
                 self.registry.release(key)
             connection.close()
@@ -1223,7 +1435,9 @@ class SharedInferenceServer:
 
 def _client_request_config(spec: Dict[str, Any], config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     if spec.get("backend") in {"paddleocr", "rknn_ocr"}:
-        return {}
+        # OCR 不带推理参数，只有批量裁剪请求需要告诉 worker 如何拆分打包的图像
+        crop_shapes = (config or {}).get(OCR_CROP_SHAPES_KEY)
+        return {OCR_CROP_SHAPES_KEY: crop_shapes} if crop_shapes else {}
     return _inference_config(config or {})
 
 
@@ -1250,7 +1464,37 @@ def _service_error_message(response: Dict[str, Any], fallback: str) -> str:
     return ": ".join(parts)
 
 
+def _shutdown_connection(connection) -> None:
+    """Wake a thread blocked in ``connection.recv()`` by shutting the socket down."""
+    try:
+        peer = socket.socket(fileno=os.dup(connection.fileno()))
+    except OSError:
+        return
+    try:
+        peer.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    finally:
+        peer.close()
+
+
+def _slab_returned_by_worker(response: Dict[str, Any]) -> bool:
+    """Whether the worker can no longer touch the slab of this request.
+
+    Worker results and queue-full rejections are final.  Timeouts and worker
+    restarts are not: the request may still sit in a queue, so its slab must be
+    unlinked rather than handed to the next frame.
+    """
+    return response.get("kind") == "result" or bool(response.get("overloaded"))
+
+
 class SharedInferenceClient:
+    """Model handle multiplexing concurrent inference calls over one connection.
+
+    Every request carries a ``call_id``; a reader thread resolves the matching
+    future, so callers may keep up to ``max_in_flight`` frames outstanding.
+    """
+
     def __init__(
         self,
         model_path: str = "",
@@ -1261,6 +1505,8 @@ class SharedInferenceClient:
         socket_path: str = SHARED_INFERENCE_SOCKET_PATH,
         timeout: float = SHARED_INFERENCE_REQUEST_TIMEOUT_SECONDS,
         startup_timeout: float = SHARED_INFERENCE_STARTUP_TIMEOUT_SECONDS,
+        slab_pool_size: int = SHARED_INFERENCE_SLAB_POOL_SIZE,
+        max_in_flight: int = SHARED_INFERENCE_MAX_IN_FLIGHT,
     ):
         self.socket_path = socket_path
         self.timeout = float(timeout)
@@ -1274,6 +1520,11 @@ class SharedInferenceClient:
         self.model_key = None
         self.lock = threading.Lock()
         self.closed = False
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        self.pending_lock = threading.Lock()
+        self.pending_calls: Dict[str, Tuple[Future, Any]] = {}
+        self.slabs = _FrameSlabPool(max(int(slab_pool_size), self.max_in_flight))
         self._connect_and_acquire()
 
     def _connect(self) -> None:
@@ -1290,73 +1541,166 @@ class SharedInferenceClient:
                 _service_error_message(response, "model_acquire_failed")
             )
         self.model_key = response["model_key"]
+        threading.Thread(
+            target=self._read_responses,
+            args=(self.connection,),
+            name="shared-inference-client",
+            daemon=True,
+        ).start()
 
-    def infer(self, frame: np.ndarray, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _read_responses(self, connection) -> None:
+        while True:
+            try:
+                response = connection.recv()
+            except (EOFError, OSError):
+                break
+            with self.pending_lock:
+                pending = self.pending_calls.pop(response.get("call_id"), None)
+            if pending is not None:
+                pending[0].set_result(response)
+        with self.lock:
+            if self.connection is connection:
+                self.connection = None
+        try:
+            connection.close()
+        except OSError:
+            pass
+        with self.pending_lock:
+            lost = [
+                call_id for call_id, (_future, owner) in self.pending_calls.items()
+                if owner is connection
+            ]
+            futures = [self.pending_calls.pop(call_id)[0] for call_id in lost]
+        for future in futures:
+            future.set_exception(
+                SharedInferenceError("shared inference connection lost")
+            )
+
+    def _send_call(self, call_id: str, future: Future, message: Dict[str, Any]) -> None:
+        with self.pending_lock:
+            self.pending_calls[call_id] = (future, self.connection)
+        self.connection.send({
+            **message,
+            "model_key": self.model_key,
+            "call_id": call_id,
+        })
+
+    def _call(self, message: Dict[str, Any]) -> Future:
+        future: Future = Future()
+        call_id = uuid.uuid4().hex
+        with self.lock:
+            if self.closed:
+                raise SharedInferenceError("shared inference client is closed")
+            try:
+                if self.connection is None:
+                    self._connect_and_acquire()
+                self._send_call(call_id, future, message)
+            except (EOFError, BrokenPipeError, ConnectionResetError, OSError):
+                with self.pending_lock:
+                    self.pending_calls.pop(call_id, None)
+                if self.connection is not None:
+                    _shutdown_connection(self.connection)
+                self._connect_and_acquire()
+                self._send_call(call_id, future, message)
+        return future
+
+    def infer_async(self, frame: np.ndarray, config: Dict[str, Any]) -> Future:
+        """Submit one frame and return a future resolving to the worker response.
+
+        Blocks only while ``max_in_flight`` calls of this client are outstanding.
+        """
         contiguous = np.ascontiguousarray(frame)
-        segment = shared_memory.SharedMemory(create=True, size=contiguous.nbytes)
+        self.in_flight.acquire()
+        slab = None
         try:
-            shared_array = np.ndarray(contiguous.shape, dtype=contiguous.dtype, buffer=segment.buf)
+            slab, reused = self.slabs.acquire(contiguous.nbytes)
+            shared_array = np.ndarray(contiguous.shape, dtype=contiguous.dtype, buffer=slab.segment.buf)
             shared_array[...] = contiguous
-            request = {
-                "request_id": uuid.uuid4().hex,
-                "shm_name": segment.name,
-                "shape": tuple(contiguous.shape),
-                "dtype": contiguous.dtype.str,
-                "config": _client_request_config(self.spec, config),
-            }
-            with self.lock:
-                if self.closed:
-                    raise SharedInferenceError("shared inference client is closed")
-                try:
-                    self.connection.send({
-                        "action": "infer",
-                        "model_key": self.model_key,
-                        "request": request,
-                        "timeout": self.timeout,
-                        "startup_timeout": self.startup_timeout,
-                    })
-                    response = self.connection.recv()
-                except (EOFError, BrokenPipeError, ConnectionResetError, OSError):
-                    try:
-                        self.connection.close()
-                    except Exception:
-                        pass
-                    self._connect_and_acquire()
-                    self.connection.send({
-                        "action": "infer",
-                        "model_key": self.model_key,
-                        "request": request,
-                        "timeout": self.timeout,
-                        "startup_timeout": self.startup_timeout,
-                    })
-                    response = self.connection.recv()
-            if response.get("overloaded"):
-                raise SharedInferenceOverloaded(response.get("error") or "model queue full")
-            if not response.get("ok"):
-                raise SharedInferenceError(
-                    _service_error_message(response, "shared inference failed")
+            del shared_array
+            call = self._call({
+                "action": "infer",
+                "request": {
+                    "request_id": uuid.uuid4().hex,
+                    "shm_name": slab.name,
+                    "slab_reused": reused,
+                    "shape": tuple(contiguous.shape),
+                    "dtype": contiguous.dtype.str,
+                    "config": _client_request_config(self.spec, config),
+                },
+                "timeout": self.timeout,
+                "startup_timeout": self.startup_timeout,
+            })
+        except BaseException:
+            if slab is not None:
+                self.slabs.discard(slab)
+            self.in_flight.release()
+            raise
+
+        result: Future = Future()
+
+        def complete(call_future: Future) -> None:
+            error = call_future.exception()
+            response = {} if error is not None else call_future.result()
+            if _slab_returned_by_worker(response):
+                self.slabs.release(slab)
+            else:
+                self.slabs.discard(slab)
+            self.in_flight.release()
+            if error is not None:
+                result.set_exception(error)
+            elif response.get("overloaded"):
+                result.set_exception(
+                    SharedInferenceOverloaded(response.get("error") or "model queue full")
                 )
-            return response
-        finally:
-            segment.close()
-            try:
-                segment.unlink()
-            except FileNotFoundError:
-                pass
+            elif not response.get("ok"):
+                result.set_exception(SharedInferenceError(
+                    _service_error_message(response, "shared inference failed")
+                ))
+            else:
+                result.set_result(response)
+
+        call.add_done_callback(complete)
+        return result
+
+    def infer(self, frame: np.ndarray, config: Dict[str, Any]) -> Dict[str, Any]:
+        return self.infer_async(frame, config).result()
+
+    def infer_many(self, frames, config: Dict[str, Any]) -> list:
+        """Keep up to ``max_in_flight`` frames queued and return responses in order.
+
+        Raises the first failure, after every submitted frame has completed.
+        """
+        futures = [self.infer_async(frame, config) for frame in frames]
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+        return [future.result() for future in futures]
 
     def close(self) -> None:
         with self.lock:
             if self.closed:
                 return
-            self.closed = True
-            if self.connection is not None:
+            connection = self.connection
+            release = None
+            if connection is not None:
                 try:
-                    self.connection.send({"action": "release", "model_key": self.model_key})
-                    self.connection.recv()
+                    release = Future()
+                    self._send_call(
+                        uuid.uuid4().hex, release, {"action": "release"}
+                    )
                 except Exception:
-                    pass
-                self.connection.close()
-                self.connection = None
+                    release = None
+            self.closed = True
+        if release is not None:
+            try:
+                release.result(timeout=5)
+            except Exception:
+                pass
+        if connection is not None:
+            # The reader thread owns the close once recv() sees EOF.
+            _shutdown_connection(connection)
+        self.slabs.close()
 
 
 def request_service_stats(socket_path: str = SHARED_INFERENCE_SOCKET_PATH) -> Dict[str, Any]:
@@ -19,7 +19,9 @@ from app.core.frame_utils import (
     frame_to_bgr,
     infer_frame_dimensions,
 )
+from app.core.packet_ringbuffer import PacketRingBuffer
 from app.core.ringbuffer import VideoRingBuffer
+from app.core.video_probe import elementary_stream_muxer
 
 # HTML5 <video> in Chrome/Safari/Firefox plays H.264 in MP4, not MPEG-4 Part 2
 # (mp4v). Prefer software x264, then common hardware H.264 encoders.
@@ -83,6 +85,41 @@ def build_ffmpeg_raw_encode_command(
     ]
 
 
+def build_ffmpeg_remux_command(
+    ffmpeg_path: str,
+    output_path: str,
+    codec: str,
+    fps: float,
+) -> List[str]:
+    """把 Annex-B 码流从 stdin 直接封装为 MP4（-c copy，不重新编码）。"""
+    return [
+        ffmpeg_path,
+        '-hide_banner',
+        '-loglevel', 'error',
+        '-y',
+        '-fflags', '+genpts',
+        '-f', elementary_stream_muxer(codec),
+        '-framerate', f'{fps:.3f}',
+        '-i', 'pipe:0',
+        '-an',
+        '-c:v', 'copy',
+        '-movflags', '+faststart',
+        '-tag:v', 'avc1' if codec == 'h264' else 'hvc1',
+        '-f', 'mp4',
+        output_path,
+    ]
+
+
+def estimate_packet_fps(timestamps: List[float], default_fps: float) -> float:
+    """按访问单元到达时间估算帧率；裸码流没有时间戳，封装时需要显式指定。"""
+    if len(timestamps) < 2:
+        return float(default_fps)
+    span = timestamps[-1] - timestamps[0]
+    if span <= 0:
+        return float(default_fps)
+    return min(120.0, max(1.0, (len(timestamps) - 1) / span))
+
+
 def probe_mp4_video_codec(path: str, timeout_seconds: float = 10.0) -> Optional[str]:
     ffprobe_path = shutil.which('ffprobe')
     if not ffprobe_path:
@@ -426,6 +463,10 @@ class VideoRecorder:
             alert_id: 预警ID
             recording_info: 录制任务信息
         """
+        if isinstance(self.buffer, PacketRingBuffer):
+            self._record_packet_window(alert_id, recording_info)
+            return
+
         try:
             trigger_time = recording_info['trigger_time']
             pre_seconds = recording_info['pre_seconds']
@@ -565,6 +606,82 @@ class VideoRecorder:
             except Exception:
                 pass
 
+    def _record_packet_window(self, alert_id: int, recording_info: dict):
+        """压缩域录制：等待告警后窗口结束，从关键帧开始截取码流并直接封装。"""
+        try:
+            trigger_time = recording_info['trigger_time']
+            post_seconds = recording_info['post_seconds']
+            output_path = recording_info['output_path']
+            start_time = trigger_time - recording_info['pre_seconds']
+            end_time = trigger_time + post_seconds
+
+            with self.lock:
+                self.recording_tasks[alert_id]['status'] = 'collecting'
+
+            real_end_time = time.time() + post_seconds
+            while True:
+                remaining = real_end_time - time.time()
+                if remaining <= 0:
+                    break
+                time.sleep(min(0.5, remaining))
+
+            if not self._disk_allows_recording():
+                raise RuntimeError(
+                    f"磁盘已达到 {self.max_disk_used_percent:g}% 停录像水位"
+                )
+
+            packets = self.buffer.get_packets_in_time_range(start_time, end_time)
+            if not packets:
+                logger.error(
+                    f"[录制 {alert_id}] 时间范围 [{start_time:.2f}, {end_time:.2f}] 内没有可独立解码的码流，"
+                    f"取消录制; Buffer状态: {self.buffer.get_stats()}"
+                )
+                with self.lock:
+                    self.recording_tasks[alert_id]['status'] = 'failed'
+                return
+
+            with self.lock:
+                self.recording_tasks[alert_id]['status'] = 'encoding'
+
+            if not self._remux_packets(packets, output_path):
+                raise RuntimeError("告警录像封装失败")
+            if self.buffer.codec != 'h264' and not ensure_browser_compatible_mp4(output_path):
+                raise RuntimeError("告警录像无法转换为浏览器可播放的 H.264")
+
+            logger.info(
+                f"[录制 {alert_id}] 视频录制完成(码流直封): {output_path}, "
+                f"共 {len(packets)} 帧, 起始关键帧 {packets[0][1]:.2f}"
+            )
+            with self.lock:
+                self.recording_tasks[alert_id]['status'] = 'completed'
+        except Exception as e:
+            logger.error(f"[录制 {alert_id}] 录制过程出错: {e}", exc_info=True)
+            with self.lock:
+                if alert_id in self.recording_tasks:
+                    self.recording_tasks[alert_id]['status'] = 'failed'
+
+    def _remux_packets(self, packets: List[Tuple[bytes, float, bool]], output_path: str) -> bool:
+        ffmpeg_path = shutil.which('ffmpeg')
+        if not ffmpeg_path:
+            logger.error(f"无法封装告警录像，未找到 ffmpeg: {output_path}")
+            return False
+
+        fps = estimate_packet_fps([timestamp for _, timestamp, _ in packets], self.fps)
+        command = build_ffmpeg_remux_command(ffmpeg_path, output_path, self.buffer.codec, fps)
+        result = subprocess.run(
+            command,
+            input=b''.join(payload for payload, _, _ in packets),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=120,
+            check=False,
+        )
+        if result.returncode != 0 or not os.path.isfile(output_path) or os.path.getsize(output_path) <= 0:
+            stderr = (result.stderr or b'').decode('utf-8', errors='replace').strip()
+            logger.error(f"FFmpeg 码流封装失败: {output_path}; 退出码 {result.returncode}; {stderr}")
+            return False
+        return True
+
     def _open_video_writer(self, first_frame: np.ndarray, output_path: str):
         """基于首帧创建视频写入器。优先独立 FFmpeg H.264，避免 OpenCV mp4v。"""
         pixel_format = self._get_frame_pixel_format(first_frame)
@@ -7,20 +7,151 @@
 2. window: 时间窗口检测（窗口内检测比例/连续次数达到阈值）
 """
 import time
+from array import array
 from collections import deque
 from typing import Dict, Tuple, Optional
 
 from app import logger
 
 
+class _WindowRecords:
+    """单个 (source_id, node_id) 的检测记录与增量窗口统计。
+
+    记录按帧序追加、从队头过期，时间戳与命中标记存放在按序号取模的环形数组里，
+    图片路径只为有路径的记录保存。命中总数随追加/过期增减；连续命中段保存在 runs 中，
+    max_runs 是按段长单调递减的队列，队头即窗口内最大连续命中数。
+    因此每帧追加和每次统计都是均摊 O(1)，与窗口大小和帧率无关。
+    过期是永久的：查询时间与帧时间戳一样只向前推进（告警节点按当前帧时间戳查询）。
+    """
+
+    INITIAL_CAPACITY = 256
+
+    def __init__(self, max_records: int):
+        self.max_records = max_records
+        self.capacity = min(self.INITIAL_CAPACITY, max_records)
+        self.timestamps = array('d', bytes(8 * self.capacity))
+        self.detected = bytearray(self.capacity)
+        self.image_paths: Dict[int, str] = {}
+        # 序号区间 [head, tail) 为当前保留的记录
+        self.head = 0
+        self.tail = 0
+        self.detection_count = 0
+        # 连续命中段 [起始序号, 结束序号]，按时间顺序排列
+        self.runs = deque()
+        self.max_runs = deque()
+
+    def __len__(self) -> int:
+        return self.tail - self.head
+
+    @property
+    def max_consecutive(self) -> int:
+        if not self.max_runs:
+            return 0
+        run = self.max_runs[0]
+        return run[1] - run[0] + 1
+
+    def append(self, timestamp: float, has_detection: bool, image_path: Optional[str] = None):
+        if len(self) == self.capacity:
+            if self.capacity < self.max_records:
+                self._grow()
+            else:
+                self._pop_head()
+
+        seq = self.tail
+        index = seq % self.capacity
+        self.timestamps[index] = timestamp
+        self.detected[index] = 1 if has_detection else 0
+        if image_path:
+            self.image_paths[seq] = image_path
+        self.tail += 1
+
+        if not has_detection:
+            return
+        self.detection_count += 1
+        if self.runs and self.runs[-1][1] == seq - 1:
+            run = self.runs[-1]
+            run[1] = seq
+        else:
+            run = [seq, seq]
+            self.runs.append(run)
+        # 只有最后一段会增长：移出队尾不长于它的段后重新入队
+        if self.max_runs and self.max_runs[-1] is run:
+            self.max_runs.pop()
+        length = run[1] - run[0] + 1
+        while self.max_runs and self.max_runs[-1][1] - self.max_runs[-1][0] + 1 <= length:
+            self.max_runs.pop()
+        self.max_runs.append(run)
+
+    def expire_before(self, window_start: float):
+        while self.head < self.tail and self.timestamps[self.head % self.capacity] < window_start:
+            self._pop_head()
+
+    def set_last_image_path(self, image_path: str):
+        if self.tail > self.head:
+            self.image_paths[self.tail - 1] = image_path
+
+    def records(self) -> list:
+        return [self._record(seq) for seq in range(self.head, self.tail)]
+
+    def detection_records(self) -> list:
+        return [self._record(seq) for run in self.runs for seq in range(run[0], run[1] + 1)]
+
+    def clear(self):
+        self.head = self.tail
+        self.detection_count = 0
+        self.image_paths.clear()
+        self.runs.clear()
+        self.max_runs.clear()
+
+    def _record(self, seq: int) -> tuple:
+        index = seq % self.capacity
+        return self.timestamps[index], bool(self.detected[index]), self.image_paths.get(seq)
+
+    def _pop_head(self):
+        seq = self.head
+        self.head += 1
+        self.image_paths.pop(seq, None)
+        if not self.detected[seq % self.capacity]:
+            return
+        self.detection_count -= 1
+        # 过期的命中记录必然是第一段的起点
+        run = self.runs[0]
+        run[0] += 1
+        if run[0] > run[1]:
+            self.runs.popleft()
+            if self.max_runs and self.max_runs[0] is run:
+                self.max_runs.popleft()
+        elif (
+            len(self.max_runs) > 1
+            and self.max_runs[0] is run
+            and run[1] - run[0] + 1 <= self.max_runs[1][1] - self.max_runs[1][0] + 1
+        ):
+            self.max_runs.popleft()
+
+    def _grow(self):
+        capacity = min(self.capacity * 2, self.max_records)
+        timestamps = array('d', bytes(8 * capacity))
+        detected = bytearray(capacity)
+        for seq in range(self.head, self.tail):
+            timestamps[seq % capacity] = self.timestamps[seq % self.capacity]
+            detected[seq % capacity] = self.detected[seq % self.capacity]
+        self.timestamps = timestamps
+        self.detected = detected
+        self.capacity = capacity
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.capacity * 9
+
+
 class WindowDetector:
     """纯内存时间窗口检测器"""
 
     SUPPRESSION_LOG_INTERVAL_SECONDS = 10.0
 
     def __init__(self):
-        # 检测记录缓冲区: {(source_id, node_id): deque([(timestamp, has_detection, image_path), ...])}
-        self.buffers: Dict[Tuple[int, str], deque] = {}
+        # 检测记录缓冲区: {(source_id, node_id): _WindowRecords}
+        self.buffers: Dict[Tuple[int, str], _WindowRecords] = {}
 
         # 触发条件配置: {(source_id, node_id): trigger_config_dict}
         self.configs: Dict[Tuple[int, str], dict] = {}
@@ -32,16 +163,9 @@ class WindowDetector:
         self.last_trigger_times: Dict[Tuple[int, str], float] = {}
         self.last_suppression_log_times: Dict[Tuple[int, str], float] = {}
 
-        # 统计缓存（避免重复计算）: {(source_id, node_id): (cache_time, stats)}
-        self.stats_cache: Dict[Tuple[int, str], Tuple[float, dict]] = {}
-        self.cache_ttl = 0.5  # 缓存有效期0.5秒
-
-        # 清理任务
-        self.cleanup_interval = 60  # 60秒清理一次
-        self.last_cleanup = time.time()
-
-        # 内存限制
-        self.max_records_per_buffer = 3000  # 每个缓冲区最多3000条记录
+        # 内存限制：每个缓冲区最多保留的记录数（约 30 fps × 600 秒窗口）。
+        # 记录按窗口过期，缓冲区按需扩容，未用满时不会占满这么多内存。
+        self.max_records_per_buffer = 18000
 
     def load_trigger_condition(self, source_id: int, node_id: str, trigger_config: dict):
         """
@@ -136,19 +260,15 @@ class WindowDetector:
         key = (source_id, node_id)
 
         # 初始化缓冲区
-        if key not in self.buffers:
-            self.buffers[key] = deque(maxlen=self.max_records_per_buffer)
-
-        # 添加记录（包含图片路径）
-        record = (timestamp, has_detection, image_path)
-        self.buffers[key].append(record)
-
-        # 清除该节点的缓存
-        if key in self.stats_cache:
-            del self.stats_cache[key]
+        records = self.buffers.get(key)
+        if records is None:
+            records = self.buffers[key] = _WindowRecords(self.max_records_per_buffer)
 
-        # 定期清理
-        self._periodic_cleanup()
+        # 添加记录（包含图片路径），滑出窗口的旧记录随之过期
+        records.append(timestamp, has_detection, image_path)
+        config = self.configs.get(key)
+        if config is not None:
+            records.expire_before(timestamp - config['window_size'])
 
     def check_condition(self, source_id: int, node_id: str, current_time: float) -> Tuple[bool, Optional[dict]]:
         """
@@ -263,92 +383,30 @@ class WindowDetector:
             logger.info(f"[WindowDetector] 记录告警触发 Source={source_id}, Node={node_id}，未配置抑制")
 
     def _get_window_stats(self, key: Tuple[int, str], current_time: float, config: dict) -> dict:
-        """获取窗口统计（带缓存）"""
-        
-        # 检查缓存
-        if key in self.stats_cache:
-            cache_time, cached_stats = self.stats_cache[key]
-            if current_time - cache_time < self.cache_ttl:
-                return cached_stats
-        
-        # 计算统计
-        stats = self._calculate_stats(key, current_time, config)
-        
-        # 更新缓存
-        self.stats_cache[key] = (current_time, stats)
-        
-        return stats
-    
-    def _calculate_stats(self, key: Tuple[int, str], current_time: float, config: dict) -> dict:
-        """计算窗口统计"""
-        if key not in self.buffers:
+        """获取窗口统计：过期窗口外的记录后直接读取增量维护的计数。"""
+        records = self.buffers.get(key)
+        if records is None:
             return self._empty_stats()
-        
+
         window_size = config['window_size']
         window_start = current_time - window_size
-        
-        records = self.buffers[key]
-        
-        # 过滤窗口内的记录
-        window_records = [
-            (ts, detected, img_path) for ts, detected, img_path in records
-            if ts >= window_start
-        ]
-        
-        if not window_records:
+        records.expire_before(window_start)
+
+        total_count = len(records)
+        if not total_count:
             return self._empty_stats()
-        
-        # 统计
-        total_count = len(window_records)
-        detection_count = sum(1 for _, detected, _ in window_records if detected)
-        detection_ratio = detection_count / total_count if total_count > 0 else 0
-        
-        # 计算最大连续检测数
-        max_consecutive = self._calc_max_consecutive(window_records)
-        
+
+        detection_count = records.detection_count
         return {
             'total_count': total_count,
             'detection_count': detection_count,
-            'detection_ratio': detection_ratio,
-            'max_consecutive': max_consecutive,
+            'detection_ratio': detection_count / total_count,
+            'max_consecutive': records.max_consecutive,
             'window_start': window_start,
             'window_end': current_time,
             'window_size': window_size
         }
-    
-    def _calc_max_consecutive(self, records: list) -> int:
-        """计算最大连续检测次数"""
-        max_count = 0
-        current_count = 0
-        
-        for _, detected, _ in records:
-            if detected:
-                current_count += 1
-                max_count = max(max_count, current_count)
-            else:
-                current_count = 0
-        
-        return max_count
-    
-    def _periodic_cleanup(self):
-        """定期清理过期数据"""
-        current_time = time.time()
-        if current_time - self.last_cleanup < self.cleanup_interval:
-            return
-        
-        # 清理过期的统计缓存
-        expired_keys = [
-            key for key, (cache_time, _) in self.stats_cache.items()
-            if current_time - cache_time > 60  # 缓存超过60秒清理
-        ]
-        for key in expired_keys:
-            del self.stats_cache[key]
-        
-        if expired_keys:
-            logger.debug(f"[WindowDetector] 清理了 {len(expired_keys)} 个过期统计缓存")
-        
-        self.last_cleanup = current_time
-    
+
     def get_stats(self, source_id: int, node_id: str, current_time: Optional[float] = None) -> dict:
         """
         获取当前窗口统计（用于监控面板）
@@ -384,8 +442,6 @@ class WindowDetector:
         if key in self.buffers:
             self.buffers[key].clear()
             logger.info(f"[WindowDetector] 清空缓冲区 Source={source_id}, Node={node_id}")
-        if key in self.stats_cache:
-            del self.stats_cache[key]
         if key in self.configs:
             del self.configs[key]
         if key in self.suppression_configs:
@@ -400,16 +456,15 @@ class WindowDetector:
         """获取内存使用情况"""
         buffer_count = len(self.buffers)
         total_records = sum(len(buf) for buf in self.buffers.values())
-        
-        # 估算内存使用（每条记录约9字节）
-        estimated_memory_bytes = total_records * 9
+
+        # 估算内存使用（按已分配容量，每条记录 8 字节时间戳 + 1 字节命中标记）
+        estimated_memory_bytes = sum(buf.memory_bytes for buf in self.buffers.values())
         estimated_memory_mb = estimated_memory_bytes / (1024 * 1024)
-        
+
         return {
             'buffer_count': buffer_count,
             'total_records': total_records,
             'estimated_memory_mb': round(estimated_memory_mb, 2),
-            'cache_count': len(self.stats_cache)
         }
     
     def get_window_records(self, source_id: int, node_id: str, current_time: float) -> list:
@@ -433,19 +488,9 @@ class WindowDetector:
         if key not in self.configs:
             return []
 
-        config = self.configs[key]
-        window_size = config['window_size']
-        window_start = current_time - window_size
-
         records = self.buffers[key]
-
-        # 过滤窗口内的记录
-        window_records = [
-            (ts, detected, img_path) for ts, detected, img_path in records
-            if ts >= window_start
-        ]
-
-        return window_records
+        records.expire_before(current_time - self.configs[key]['window_size'])
+        return records.records()
 
     def get_detection_records(self, source_id: int, node_id: str, current_time: float) -> list:
         """
@@ -459,15 +504,14 @@ class WindowDetector:
         Returns:
             检测到目标的记录列表 [(timestamp, has_detection, image_path), ...]
         """
-        window_records = self.get_window_records(source_id, node_id, current_time)
-
-        # 只返回检测到目标的记录
-        detection_records = [
-            (ts, detected, img_path) for ts, detected, img_path in window_records
-            if detected
-        ]
+        key = (source_id, node_id)
+        if key not in self.buffers or key not in self.configs:
+            return []
 
-        return detection_records
+        # 只遍历连续命中段，不扫描未命中的记录
+        records = self.buffers[key]
+        records.expire_before(current_time - self.configs[key]['window_size'])
+        return records.detection_records()
 
     def update_last_image_path(self, source_id: int, node_id: str, image_path: str):
         """
@@ -482,17 +526,11 @@ class WindowDetector:
         """
         key = (source_id, node_id)
 
-        if key not in self.buffers or len(self.buffers[key]) == 0:
+        if key not in self.buffers:
             return
 
         # 更新最后一条记录的图片路径
-        buffer = self.buffers[key]
-        timestamp, has_detection, _ = buffer[-1]
-        buffer[-1] = (timestamp, has_detection, image_path)
-
-        # 清除该节点的缓存
-        if key in self.stats_cache:
-            del self.stats_cache[key]
+        self.buffers[key].set_last_image_path(image_path)
 
     def _empty_stats(self) -> dict:
         """返回空统计"""
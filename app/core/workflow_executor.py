@@ -10,7 +10,6 @@ import os
 import re
 import time
 import numpy as np
-import requests
 import threading
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -19,8 +18,10 @@ from multiprocessing import resource_tracker
 from typing import Collection, Dict, List, Any, Optional
 
 from app import logger as main_logger
-from app import logging
+from app import get_frame_logger, logging
 logger = logging.getLogger("workflow_executor")
+# 逐帧 debug 明细走子 logger，默认不格式化；WORKFLOW_FRAME_LOGS_ENABLED 打开后写入 workflow_debug.log
+frame_logger = get_frame_logger("workflow_executor")
 from app.config import (
     ANALYSIS_BUFFER_SECONDS,
     ANALYSIS_TARGET_FPS,
@@ -40,10 +41,13 @@ from app.config import (
     DETECTION_SNAPSHOT_ENABLED,
     DETECTION_SNAPSHOT_INTERVAL,
     DETECTION_SNAPSHOT_SAVE_PATH,
+    EXTERNAL_API_MAX_IN_FLIGHT,
 )
 from app.core.compressed_ringbuffer import CompressedVideoRingBuffer
+from app.core.packet_ringbuffer import attach_packet_ringbuffer
 from app.core.cv2_compat import cv2, require_cv2
 from app.core.algorithm import BaseAlgorithm
+from app.core.frame_cache import frame_scope
 from app.core.frame_utils import (
     detect_frame_pixel_format,
     frame_to_bgr,
@@ -55,7 +59,7 @@ from app.core.frame_utils import (
 from app.core.ringbuffer import VideoRingBuffer
 from app.core.utils import save_frame
 from app.core.video_recorder import VideoRecorderManager
-from app.core.alert_delivery import enqueue_alert_delivery
+from app.core.alert_sink import AlertJob, persist_alert_jobs
 from app.core.recording_storage_config import get_recording_storage_config
 from app.core.storage_pressure import (
     StoragePressure,
@@ -66,10 +70,17 @@ from app.core.vl_validator import get_vl_service_config, validate_frame_with_vl
 from app.core.window_detector import WindowDetector
 from app.core.numeric_window_detector import NumericWindowDetector
 from app.plugins.script_algorithm import ScriptAlgorithm
+from app.core.workflow_plan import (
+    GATE_CONDITIONS,
+    WorkflowExecutionPlan,
+    compile_workflow_plan,
+    get_node_type_priority,
+)
 from app.core.workflow_types import create_node_data, NodeContext, SourceNodeData, AlgorithmNodeData, RoiDrawNodeData, FunctionNodeData, DetectionFilterNodeData, ConditionNodeData, TimeScheduleNodeData, OutputNodeData, AlertNodeData, ExternalApiNodeData, WebhookNodeData
 from app.core.detection_filter import filter_detections_by_size
 from app.core.time_schedule import evaluate_weekly_schedule
 from app.core.execution_log_collector import ExecutionLogCollector
+from app.core.external_api_client import get_external_api_client
 from app.core.webhook_notifier import (
     apply_public_media_urls,
     build_alert_webhook_event,
@@ -80,7 +91,7 @@ from app.core.webhook_notifier import (
 from app.core.public_media_config import build_public_media_url
 
 try:
-    from app.core.database_models import Workflow, VideoSource, Algorithm, Alert, ExternalApi, db
+    from app.core.database_models import Workflow, VideoSource, Algorithm, Alert, ExternalApi
 except ImportError as exc:  # pragma: no cover - optional in lightweight test envs
     _WORKFLOW_EXECUTOR_IMPORT_ERROR = exc
 
@@ -99,7 +110,7 @@ DETECTION_JSONL_LOG_LOCK = threading.Lock()
 DETECTION_SNAPSHOT_COORDINATOR_LOCK = threading.Lock()
 DETECTION_SNAPSHOT_SOURCE_STATES = {}
 
-_GATE_CONDITIONS = frozenset({'detected', 'not_detected', 'true', 'false', 'yes', 'no'})
+_GATE_CONDITIONS = GATE_CONDITIONS
 _GATE_SKIP_REASON_MESSAGES = {
     'upstream_not_executed': '已跳过：上游未执行',
     'upstream_empty': '已跳过：上游无目标',
@@ -108,7 +119,11 @@ _GATE_SKIP_REASON_MESSAGES = {
 
 
 class FrameExecutionContext(dict):
-    """按需从主帧派生 RGB/BGR 视图，避免实时链路无条件转换。"""
+    """按需从主帧派生 RGB/BGR 视图，避免实时链路无条件转换。
+
+    source host 驱动时 context 中带有 frame_derived（DerivedFrameImages），
+    派生图像优先从这里取，同一帧在多个工作流之间只转换一次。
+    """
 
     def get(self, key, default=None):
         if key in {'frame', 'frame_rgb'}:
@@ -156,6 +171,31 @@ class FrameExecutionContext(dict):
     def _get_native_frame(self):
         return super().get('frame_nv12')
 
+    def _get_derived_images(self):
+        return super().get('frame_derived')
+
+    def get_resized_frame(self, width: int, height: int, color: str = 'rgb'):
+        """返回缩放到 width x height 的 RGB/BGR 帧（只读共享或本工作流内缓存）。"""
+        color = 'bgr' if str(color).lower() == 'bgr' else 'rgb'
+        key = f'frame_{color}_{int(width)}x{int(height)}'
+        resized = super().get(key)
+        if resized is not None:
+            return resized
+
+        derived = self._get_derived_images()
+        if derived is not None:
+            resized = derived.resized(width, height, color=color)
+        else:
+            source = self._get_frame_bgr() if color == 'bgr' else self._get_frame_rgb()
+            if source is None:
+                return None
+            if (source.shape[1], source.shape[0]) == (int(width), int(height)):
+                return source
+            require_cv2()
+            resized = cv2.resize(source, (int(width), int(height)), interpolation=cv2.INTER_AREA)
+        super().__setitem__(key, resized)
+        return resized
+
     def _get_frame_pixel_format(self) -> str:
         frame = self._get_native_frame()
         declared = super().get('frame_pixel_format', VIDEO_FRAME_PIXEL_FORMAT)
@@ -212,6 +252,12 @@ class FrameExecutionContext(dict):
         if frame_rgb is not None:
             return frame_rgb
 
+        derived = self._get_derived_images()
+        if derived is not None:
+            frame_rgb = derived.rgb()
+            super().__setitem__('frame_rgb', frame_rgb)
+            return frame_rgb
+
         frame_native = self._get_native_frame()
         if frame_native is None:
             return default
@@ -232,6 +278,12 @@ class FrameExecutionContext(dict):
         if frame_bgr is not None:
             return frame_bgr
 
+        derived = self._get_derived_images()
+        if derived is not None:
+            frame_bgr = derived.bgr()
+            super().__setitem__('frame_bgr', frame_bgr)
+            return frame_bgr
+
         frame_native = self._get_native_frame()
         if frame_native is not None:
             width = self._get_frame_width()
@@ -266,13 +318,15 @@ class WorkflowExecutor:
 
     _GATE_CONDITIONS = _GATE_CONDITIONS
 
-    def __init__(self, workflow_id, test_mode=False, window_detector=None):
+    def __init__(self, workflow_id, test_mode=False, window_detector=None, alert_sink=None):
         """
         初始化工作流执行器
 
         Args:
             workflow_id: 工作流ID
             test_mode: 是否为测试模式（测试模式下不初始化视频源和buffer，不产生副作用）
+            window_detector: 共享的窗口检测器（可选）
+            alert_sink: source host 的告警异步落库队列（可选，为空时在当前线程同步落库）
         """
         self.workflow_id = workflow_id
         self.test_mode = test_mode
@@ -291,7 +345,7 @@ class WorkflowExecutor:
             try:
                 node = create_node_data(n)
                 self.nodes[n['id']] = node
-                logger.debug(f"[Workflow-{self.workflow_id}] 成功创建节点: {n['id']} (类型: {n.get('type')})")
+                logger.debug("[Workflow-%s] 成功创建节点: %s (类型: %s)", self.workflow_id, n['id'], n.get('type'))
             except Exception as e:
                 logger.error(f"[Workflow-{self.workflow_id}] 创建节点失败: {n['id']}, 错误: {e}")
 
@@ -309,9 +363,13 @@ class WorkflowExecutor:
         self.algorithm_roi_configs = {}
         self.external_api_configs = {}
         self.external_api_datamap = {}
+        # latest_result 模式：各节点最近一次完成的结果与正在进行的请求
+        self.external_api_latest = {}
+        self.external_api_pending = set()
         self.execution_graph = defaultdict(list)
         self.video_recorder = None
         self.window_detector = window_detector or WindowDetector()
+        self.alert_sink = alert_sink
         self.numeric_window_detector = NumericWindowDetector()
         self.recorder_key = f"workflow:{self.workflow_id}"
         self.running = True
@@ -356,6 +414,14 @@ class WorkflowExecutor:
         }
 
         self._build_execution_graph()
+        self._execution_plan = self._get_execution_plan()
+        # 下游 Webhook 节点需要本帧就拿到告警 ID，这些告警节点保持同步落库
+        self._alert_event_consumers = frozenset(
+            upstream_id
+            for node_id, node in self.nodes.items()
+            if isinstance(node, WebhookNodeData)
+            for upstream_id in self._execution_plan.upstream_of(node_id)
+        )
 
         # 只在非测试模式下初始化视频源和buffer
         if not test_mode:
@@ -375,6 +441,13 @@ class WorkflowExecutor:
         self._profile_run_once_count = 0
         self._profile_run_once_total_ms = 0.0
         self._profile_run_once_max_ms = 0.0
+        self._profile_inference_requests = 0
+        self._profile_inference_dedup_hits = 0
+        # 最近一次 run_once 的耗时，供 source host 的自适应调度使用
+        self.last_run_once_ms = None
+        # 自适应调度下发的节点步长：node_id -> 每 N 帧执行一次
+        self.node_strides = {}
+        self._node_stride_skips = {}
 
     def stop(self):
         self.running = False
@@ -382,8 +455,15 @@ class WorkflowExecutor:
     def begin_drain(self):
         """停止检测并尽早释放模型；录像线程仍可继续读取录制缓冲区。"""
         self.running = False
+        self._flush_alert_sink()
         self._cleanup_algorithms()
 
+    def _flush_alert_sink(self):
+        """等已提交的告警写完：图片绘制要用算法的 visualize，录像要用本执行器的录制器。"""
+        alert_sink = getattr(self, 'alert_sink', None)
+        if alert_sink is not None and not alert_sink.flush():
+            logger.warning(f"[Workflow-{self.workflow_id}] 等待告警异步落库超时，仍有告警未写入")
+
     def _cleanup_algorithms(self):
         for node_id, algorithm in list(getattr(self, 'algorithms', {}).items()):
             cleanup = getattr(algorithm, 'cleanup', None)
@@ -404,6 +484,8 @@ class WorkflowExecutor:
             self.external_api_configs.clear()
         if hasattr(self, 'external_api_datamap'):
             self.external_api_datamap.clear()
+        if hasattr(self, 'external_api_latest'):
+            self.external_api_latest.clear()
 
     def _cleanup_runtime_state(self):
         with self._state_lock:
@@ -451,6 +533,7 @@ class WorkflowExecutor:
         self.running = False
         self._cleaned_up = True
 
+        self._flush_alert_sink()
         self._cleanup_algorithms()
         self._cleanup_window_detector()
         self._cleanup_runtime_state()
@@ -684,6 +767,8 @@ class WorkflowExecutor:
                     'interval_seconds': interval_seconds,
                     'timeout_seconds': runtime_timeout,
                     'execution_mode': node_config.get('execution_mode') or 'sync',
+                    'max_in_flight': int(node_config.get('max_in_flight') or EXTERNAL_API_MAX_IN_FLIGHT),
+                    'cache_ttl_seconds': float(node_config.get('cache_ttl_seconds') or 0),
                     'include_image': node_config.get('include_image', True),
                     'include_upstream_results': node_config.get('include_upstream_results', True),
                     'payload_template': node_config.get('payload_template') if isinstance(node_config.get('payload_template'), dict) else {},
@@ -818,6 +903,21 @@ class WorkflowExecutor:
             if node.node_type == 'source':
                 self.source_node = node
                 break
+        # 图结构变化后执行计划失效，下次调度时重新编译
+        self._execution_plan = None
+
+    def _get_execution_plan(self) -> WorkflowExecutionPlan:
+        """返回加载时编译的执行计划；通过 __new__ 构造的执行器首次使用时编译。"""
+        plan = getattr(self, '_execution_plan', None)
+        if plan is None:
+            plan = compile_workflow_plan(
+                getattr(self, 'nodes', {}),
+                getattr(self, 'connections', []),
+                getattr(self, 'node_handlers', {}),
+                workflow_id=getattr(self, 'workflow_id', None),
+            )
+            self._execution_plan = plan
+        return plan
     
     def _init_resources(self):
         if not self.source_node:
@@ -885,26 +985,34 @@ class WorkflowExecutor:
             )
             recording_buffer_name = self.video_source.recording_buffer_name
             try:
-                self.recording_buffer = CompressedVideoRingBuffer(
-                    name=recording_buffer_name,
-                    create=False,
-                    width=self.video_source.source_decode_width,
-                    height=self.video_source.source_decode_height,
-                    pixel_format=VIDEO_FRAME_PIXEL_FORMAT,
-                    fps=self.recording_config.recording_fps,
-                    duration_seconds=recording_buffer_duration,
-                    max_frame_bytes=RECORDING_COMPRESSED_MAX_BYTES,
-                    jpeg_quality=RECORDING_JPEG_QUALITY,
-                )
+                self.recording_buffer = attach_packet_ringbuffer(recording_buffer_name)
+                if self.recording_buffer is not None:
+                    logger.info(
+                        f"已连接录制缓冲区: {recording_buffer_name} "
+                        f"(packet {self.recording_buffer.codec}, duration={recording_buffer_duration}s, "
+                        f"capacity={self.recording_buffer.capacity})"
+                    )
+                else:
+                    self.recording_buffer = CompressedVideoRingBuffer(
+                        name=recording_buffer_name,
+                        create=False,
+                        width=self.video_source.source_decode_width,
+                        height=self.video_source.source_decode_height,
+                        pixel_format=VIDEO_FRAME_PIXEL_FORMAT,
+                        fps=self.recording_config.recording_fps,
+                        duration_seconds=recording_buffer_duration,
+                        max_frame_bytes=RECORDING_COMPRESSED_MAX_BYTES,
+                        jpeg_quality=RECORDING_JPEG_QUALITY,
+                    )
+                    logger.info(
+                        f"已连接录制缓冲区: {recording_buffer_name} "
+                        f"(compressed jpeg, fps={self.recording_config.recording_fps}, "
+                        f"duration={recording_buffer_duration}s, "
+                        f"capacity={self.recording_buffer.capacity}, frame_shape={self.recording_buffer.frame_shape}, "
+                        f"pixel_format={self.recording_buffer.pixel_format})"
+                    )
                 shm_name = recording_buffer_name if os.name == 'nt' else f"/{recording_buffer_name}"
                 resource_tracker.unregister(shm_name, 'shared_memory')
-                logger.info(
-                    f"已连接录制缓冲区: {recording_buffer_name} "
-                    f"(compressed jpeg, fps={self.recording_config.recording_fps}, "
-                    f"duration={recording_buffer_duration}s, "
-                    f"capacity={self.recording_buffer.capacity}, frame_shape={self.recording_buffer.frame_shape}, "
-                    f"pixel_format={self.recording_buffer.pixel_format})"
-                )
             except FileNotFoundError:
                 logger.warning(
                     f"[Workflow-{self.workflow_id}] 录制缓冲区 /{recording_buffer_name} 不可用，本次仅启用分析链路"
@@ -945,101 +1053,29 @@ class WorkflowExecutor:
 
     def _calculate_node_indegrees(self):
         """计算每个节点的入度（前驱节点数量）"""
-        indegrees = {node_id: 0 for node_id in self.nodes.keys()}
-        for conn in self.connections:
-            to_id = conn['to']
-            if to_id in indegrees:
-                indegrees[to_id] += 1
-        return indegrees
-
-    def _calculate_node_indegrees_for_subset(self, node_subset):
-        """计算节点子集中每个节点的入度（只计算子集内的前驱节点）"""
-        indegrees = {node_id: 0 for node_id in node_subset}
-        for conn in self.connections:
-            from_id = conn['from']
-            to_id = conn['to']
-            # 只统计两端都在子集中的连接
-            if to_id in indegrees and from_id in node_subset:
-                indegrees[to_id] += 1
-        return indegrees
+        plan = self._get_execution_plan()
+        return {node_id: len(plan.upstream_of(node_id)) for node_id in self.nodes.keys()}
 
     def _get_node_dependencies(self, node_id):
         """获取节点的所有依赖节点（前驱节点）"""
-        dependencies = []
-        for conn in self.connections:
-            if conn['to'] == node_id:
-                from_id = conn['from']
-                if from_id in self.nodes:
-                    dependencies.append(from_id)
-        return dependencies
+        return [
+            from_id for from_id in self._get_execution_plan().upstream_of(node_id)
+            if from_id in self.nodes
+        ]
 
     def _build_topology_levels(self):
         """
-        构建拓扑层级
+        返回编译好的拓扑层级
         返回: [[level0_nodes], [level1_nodes], [level2_nodes], ...]
         例如: [[source], [algo1, algo2, algo3], [function]]
 
         注意：不包含 alert 和 output 节点，因为它们会由上游节点通过 _execute_branch 自动执行
         """
-        levels = []
-        # 排除会被上游分支自动执行的终端节点（alert, output, webhook）
-        remaining_nodes = {
-            node_id for node_id in self.nodes.keys()
-            if not isinstance(self.nodes[node_id], (OutputNodeData, AlertNodeData, WebhookNodeData))
-        }
-        level_indegrees = self._calculate_node_indegrees_for_subset(remaining_nodes)
-
-        while remaining_nodes:
-            # 找出当前入度为0的节点（可以执行的节点）
-            current_level = []
-            for node_id in list(remaining_nodes):
-                if level_indegrees.get(node_id, 0) == 0:
-                    current_level.append(node_id)
-
-            if not current_level:
-                # 如果没有入度为0的节点，说明存在循环依赖
-                logger.warning(f"[Workflow-{self.workflow_id}] 检测到循环依赖，剩余节点: {remaining_nodes}")
-                # 强制添加剩余节点到当前层级
-                current_level = list(remaining_nodes)
-
-            # 按节点类型排序（source -> algorithm/roi_draw -> function -> condition -> output/alert）
-            current_level.sort(key=lambda nid: self._get_node_type_priority(nid))
-
-            levels.append(current_level)
-            logger.debug(f"[Workflow-{self.workflow_id}] 拓扑层级 {len(levels)-1}: {[f'{nid}({self.nodes[nid].node_type})' for nid in current_level]}")
-
-            # 更新入度：移除当前层级的节点
-            for node_id in current_level:
-                remaining_nodes.remove(node_id)
-                # 更新后继节点的入度
-                for next_info in self.execution_graph.get(node_id, []):
-                    next_id = next_info['target']
-                    if next_id in level_indegrees:
-                        level_indegrees[next_id] -= 1
-
-        return levels
+        return [list(level) for level in self._get_execution_plan().levels]
 
     def _get_node_type_priority(self, node_id):
         """获取节点类型的优先级（用于排序）"""
-        node = self.nodes.get(node_id)
-        if not node:
-            return 999
-
-        priority_map = {
-            'source': 0,
-            'roi_draw': 1,
-            'roi': 1,  # 支持前后端两种类型名称
-            'algorithm': 2,
-            'external_api': 2,
-            'function': 3,
-            'detection_filter': 3,
-            'condition': 4,
-            'time_schedule': 4,
-            'output': 5,
-            'alert': 5,
-            'webhook': 6,
-        }
-        return priority_map.get(node.node_type, 999)
+        return get_node_type_priority(self.nodes.get(node_id))
 
     def _can_execute_level_parallel(self, level_nodes):
         """
@@ -1064,11 +1100,7 @@ class WorkflowExecutor:
             return True
 
         # 只从连线中获取上游节点（忽略 input_nodes 配置）
-        connected_upstream = []
-        for conn in self.connections:
-            if conn['to'] == node_id:
-                from_node_id = conn['from']
-                connected_upstream.append(from_node_id)
+        connected_upstream = self._get_execution_plan().upstream_of(node_id)
 
         if not connected_upstream:
             # 没有连线，静默返回 False
@@ -1088,8 +1120,7 @@ class WorkflowExecutor:
         if not isinstance(node, DetectionFilterNodeData):
             return True
         upstream_ids = [
-            conn['from'] for conn in self.connections
-            if conn.get('to') == node_id and conn.get('from')
+            from_id for from_id in self._get_execution_plan().upstream_of(node_id) if from_id
         ]
         if len(upstream_ids) != 1:
             return False
@@ -1099,27 +1130,27 @@ class WorkflowExecutor:
     def _get_node_interval(self, node_id):
         node = self.nodes.get(node_id)
         if not node:
-            logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 不存在，返回 interval=0")
+            frame_logger.debug("[Workflow-%s] 节点 %s 不存在，返回 interval=0", self.workflow_id, node_id)
             return 0
 
         if isinstance(node, AlgorithmNodeData):
-            logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 是算法节点，interval_seconds={node.interval_seconds}（类型: {type(node.interval_seconds)}）")
+            frame_logger.debug("[Workflow-%s] 节点 %s 是算法节点，interval_seconds=%s（类型: %s）", self.workflow_id, node_id, node.interval_seconds, type(node.interval_seconds))
             if node.interval_seconds is not None:
                 return node.interval_seconds
 
         if isinstance(node, ExternalApiNodeData):
-            logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 是外部 API 节点，interval_seconds={node.interval_seconds}（类型: {type(node.interval_seconds)}）")
+            frame_logger.debug("[Workflow-%s] 节点 %s 是外部 API 节点，interval_seconds=%s（类型: %s）", self.workflow_id, node_id, node.interval_seconds, type(node.interval_seconds))
             if node.interval_seconds is not None:
                 return node.interval_seconds
 
         if node_id in self.algorithms:
             interval_from_map = self.algorithm_datamap[node_id].get('interval_seconds', 1)
-            logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 从 algorithm_datamap 获取 interval={interval_from_map}")
+            frame_logger.debug("[Workflow-%s] 节点 %s 从 algorithm_datamap 获取 interval=%s", self.workflow_id, node_id, interval_from_map)
             return interval_from_map
 
         if node_id in self.external_api_configs:
             interval_from_map = self.external_api_configs[node_id].get('interval_seconds', 1)
-            logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 从 external_api_configs 获取 interval={interval_from_map}")
+            frame_logger.debug("[Workflow-%s] 节点 %s 从 external_api_configs 获取 interval=%s", self.workflow_id, node_id, interval_from_map)
             return interval_from_map
 
         # logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 不是算法节点且不在 algorithms 中，返回 interval=0")
@@ -1231,24 +1262,77 @@ class WorkflowExecutor:
         )
         return filtered_result
     
+    def set_node_strides(self, strides):
+        """设置重节点的帧步长；未列出的节点每帧都参与调度。"""
+        self.node_strides = {node_id: int(stride) for node_id, stride in (strides or {}).items() if int(stride) > 1}
+        self._node_stride_skips = {
+            node_id: skips
+            for node_id, skips in getattr(self, '_node_stride_skips', {}).items()
+            if node_id in self.node_strides
+        }
+
+    def get_stride_candidates(self):
+        """可以按帧步长降频的节点：算法节点与外部 API 节点。"""
+        return set(self.algorithms.keys()) | set(self.external_api_configs.keys())
+
+    def get_last_run_node_times(self):
+        """最近一次 run_once 中实际执行过的节点耗时（毫秒）。"""
+        with self._state_lock:
+            return {
+                node_id: result.get('execution_time', 0)
+                for node_id, result in self.execution_results.items()
+                if node_id not in self.skipped_nodes
+            }
+
+    def _consume_node_stride(self, node_id) -> bool:
+        stride = getattr(self, 'node_strides', None)
+        stride = stride.get(node_id, 1) if stride else 1
+        if stride <= 1:
+            return True
+        skips = self._node_stride_skips.get(node_id, stride - 1)
+        if skips + 1 >= stride:
+            self._node_stride_skips[node_id] = 0
+            return True
+        self._node_stride_skips[node_id] = skips + 1
+        frame_logger.debug("[Workflow-%s] 节点 %s 按步长 %s 跳过本帧", self.workflow_id, node_id, stride)
+        return False
+
     def _should_execute_node(self, node_id):
+        if not self._consume_node_stride(node_id):
+            return False
+
         current_time = time.time()
         interval = self._get_node_interval(node_id)
 
         if interval <= 0:
-            logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} interval={interval}<=0，总是执行")
+            frame_logger.debug("[Workflow-%s] 节点 %s interval=%s<=0，总是执行", self.workflow_id, node_id, interval)
             return True
 
         last_exec = self.node_last_exec_time.get(node_id, 0)
         time_since_last = current_time - last_exec
         if time_since_last >= interval:
-            logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 距离上次执行{time_since_last:.2f}秒>=interval({interval}秒)，执行")
+            frame_logger.debug("[Workflow-%s] 节点 %s 距离上次执行%.2f秒>=interval(%s秒)，执行", self.workflow_id, node_id, time_since_last, interval)
             self.node_last_exec_time[node_id] = current_time
             return True
 
-        logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 未到执行间隔 ({interval}秒)，跳过")
+        frame_logger.debug("[Workflow-%s] 节点 %s 未到执行间隔 (%s秒)，跳过", self.workflow_id, node_id, interval)
         return False
     
+    def _algorithm_accepts_frame_timestamp(self, node_id, algo) -> bool:
+        """algo.process 是否声明 frame_timestamp；按节点缓存，算法实例被替换时重新解析签名。"""
+        cache = getattr(self, '_process_signature_cache', None)
+        if cache is None:
+            cache = self._process_signature_cache = {}
+        cached = cache.get(node_id)
+        if cached is None or cached[0] is not algo:
+            try:
+                process_params = inspect.signature(algo.process).parameters
+            except (TypeError, ValueError):
+                process_params = {}
+            cached = (algo, 'frame_timestamp' in process_params)
+            cache[node_id] = cached
+        return cached[1]
+
     def _process_algorithm(
         self,
         node_id,
@@ -1257,7 +1341,9 @@ class WorkflowExecutor:
         roi_regions=None,
         upstream_results=None,
         frame=None,
+        derived_images=None,
     ):
+        """derived_images 为 host 共享帧时，算法内同一帧、同一模型的推理可在工作流之间复用。"""
         if frame_nv12 is None:
             frame_nv12 = frame
 
@@ -1270,30 +1356,29 @@ class WorkflowExecutor:
             effective_roi_regions = roi_regions if roi_regions is not None else self.algorithm_roi_configs.get(node_id, [])
 
             if roi_regions is not None:
-                logger.debug(f"[Workflow-{self.workflow_id}] 算法节点 {node_id} 使用context中的ROI配置，包含 {len(roi_regions)} 个区域")
-                # 打印详细的ROI配置
-                for idx, roi in enumerate(roi_regions):
+                frame_logger.debug("[Workflow-%s] 算法节点 %s 使用context中的ROI配置，包含 %s 个区域", self.workflow_id, node_id, len(roi_regions))
+                # 打印详细的ROI配置（仅 DEBUG 级别开启时逐区域遍历）
+                for idx, roi in enumerate(roi_regions if frame_logger.isEnabledFor(logging.DEBUG) else ()):
                     polygon = roi.get('polygon', [])
                     if polygon and len(polygon) > 0:
-                        logger.debug(f"[Workflow-{self.workflow_id}] 算法节点 {node_id} ROI区域{idx + 1}: 顶点数={len(polygon)}, 数据={polygon[:2]}...")
+                        frame_logger.debug("[Workflow-%s] 算法节点 %s ROI区域%s: 顶点数=%s, 数据=%s...", self.workflow_id, node_id, idx + 1, len(polygon), polygon[:2])
             elif effective_roi_regions:
-                logger.debug(f"[Workflow-{self.workflow_id}] 算法节点 {node_id} 使用算法自带的ROI配置，包含 {len(effective_roi_regions)} 个区域")
+                frame_logger.debug("[Workflow-%s] 算法节点 %s 使用算法自带的ROI配置，包含 %s 个区域", self.workflow_id, node_id, len(effective_roi_regions))
 
-            logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 调用 algo.process，upstream_results: {list(upstream_results.keys())} (共{len(upstream_results)}个上游)")
-            logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 传递给算法的ROI配置: {effective_roi_regions}")
+            frame_logger.debug("[Workflow-%s] 节点 %s 调用 algo.process，upstream_results: %s (共%s个上游)", self.workflow_id, node_id, list(upstream_results.keys()), len(upstream_results))
+            frame_logger.debug("[Workflow-%s] 节点 %s 传递给算法的ROI配置: %s", self.workflow_id, node_id, effective_roi_regions)
             process_kwargs = {'upstream_results': upstream_results}
-            try:
-                process_params = inspect.signature(algo.process).parameters
-            except (TypeError, ValueError):
-                process_params = {}
-            if 'frame_timestamp' in process_params:
+            if self._algorithm_accepts_frame_timestamp(node_id, algo):
                 process_kwargs['frame_timestamp'] = frame_timestamp
-            result = algo.process(frame_nv12, effective_roi_regions, **process_kwargs)
+            with frame_scope(derived_images) as scope:
+                result = algo.process(frame_nv12, effective_roi_regions, **process_kwargs)
+            if scope is not None:
+                self._record_inference_dedup(scope)
             result = self._apply_algorithm_confidence_filter(node_id, result)
             if isinstance(result, dict):
                 result = dict(result)
                 result['detections'] = BaseAlgorithm.normalize_detection_results(result.get('detections', []))
-            logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} algo.process 返回: {result}")
+            frame_logger.debug("[Workflow-%s] 节点 %s algo.process 返回: %s", self.workflow_id, node_id, result)
             if result is None:
                 raise RuntimeError(f"algo.process returned None for node {node_id}")
             has_detection = bool(result and result.get("detections"))
@@ -1414,13 +1499,14 @@ class WorkflowExecutor:
             bool: 条件是否满足
         """
         if context.get('_skip_condition_routing'):
-            logger.debug(
-                f"[Workflow-{self.workflow_id}] 条件节点本次无有效新样本，跳过分支路由"
+            frame_logger.debug(
+                "[Workflow-%s] 条件节点本次无有效新样本，跳过分支路由",
+                self.workflow_id,
             )
             return False
 
         if not condition:
-            logger.debug(f"[Workflow-{self.workflow_id}] 条件判断: 无条件，通过")
+            frame_logger.debug("[Workflow-%s] 条件判断: 无条件，通过", self.workflow_id)
             return True
 
         # 向后兼容：处理旧的字符串类型条件
@@ -1432,25 +1518,25 @@ class WorkflowExecutor:
                 )
                 return False
             has_detection = context.get('has_detection', False)
-            logger.debug(f"[Workflow-{self.workflow_id}] 条件判断(字符串): condition={condition}, has_detection={has_detection}")
+            frame_logger.debug("[Workflow-%s] 条件判断(字符串): condition=%s, has_detection=%s", self.workflow_id, condition, has_detection)
 
             # 条件节点的分支
             if condition == 'true' or condition == 'yes':
                 result = has_detection
-                logger.debug(f"[Workflow-{self.workflow_id}] 条件判断(条件节点true): has_detection={has_detection}, result={result}")
+                frame_logger.debug("[Workflow-%s] 条件判断(条件节点true): has_detection=%s, result=%s", self.workflow_id, has_detection, result)
                 return result
             if condition == 'false' or condition == 'no':
                 result = not has_detection
-                logger.debug(f"[Workflow-{self.workflow_id}] 条件判断(条件节点false): has_detection={has_detection}, result={result}")
+                frame_logger.debug("[Workflow-%s] 条件判断(条件节点false): has_detection=%s, result=%s", self.workflow_id, has_detection, result)
                 return result
             # 旧的条件格式（向后兼容）
             if condition == 'detected':
                 result = has_detection
-                logger.debug(f"[Workflow-{self.workflow_id}] 条件判断(旧格式detected): has_detection={has_detection}, result={result}")
+                frame_logger.debug("[Workflow-%s] 条件判断(旧格式detected): has_detection=%s, result=%s", self.workflow_id, has_detection, result)
                 return result
             if condition == 'not_detected':
                 result = not has_detection
-                logger.debug(f"[Workflow-{self.workflow_id}] 条件判断(旧格式not_detected): has_detection={has_detection}, result={result}")
+                frame_logger.debug("[Workflow-%s] 条件判断(旧格式not_detected): has_detection=%s, result=%s", self.workflow_id, has_detection, result)
                 return result
             # 未知条件，默认通过
             logger.warning(f"[Workflow-{self.workflow_id}] 条件判断: 未知条件 '{condition}'，默认通过")
@@ -1470,26 +1556,27 @@ class WorkflowExecutor:
                 target_count = node.target_count
                 comparison_type = node.comparison_type
 
-                logger.debug(
-                    f"[Workflow-{self.workflow_id}] 条件判断(节点): node_id={node_id}, "
-                    f"detection_count={detection_count}, target_count={target_count}, "
-                    f"comparison_type={comparison_type}"
+                frame_logger.debug(
+                    "[Workflow-%s] 条件判断(节点): node_id=%s, "
+                    "detection_count=%s, target_count=%s, "
+                    "comparison_type=%s",
+                    self.workflow_id, node_id, detection_count, target_count, comparison_type,
                 )
 
                 if comparison_type == "==":
                     # 精确匹配：数量必须等于阈值
                     passed = detection_count == target_count
-                    logger.debug(f"[Workflow-{self.workflow_id}] 条件判断结果: {detection_count} == {target_count} = {passed}")
+                    frame_logger.debug("[Workflow-%s] 条件判断结果: %s == %s = %s", self.workflow_id, detection_count, target_count, passed)
                     return passed
                 elif comparison_type == ">=":
                     # 大于等于：数量至少达到阈值
                     passed = detection_count >= target_count
-                    logger.debug(f"[Workflow-{self.workflow_id}] 条件判断结果: {detection_count} >= {target_count} = {passed}")
+                    frame_logger.debug("[Workflow-%s] 条件判断结果: %s >= %s = %s", self.workflow_id, detection_count, target_count, passed)
                     return passed
 
         # 默认：根据是否有检测结果判断
         passed = detection_count > 0
-        logger.debug(f"[Workflow-{self.workflow_id}] 条件判断(默认): detection_count={detection_count}, passed={passed}")
+        frame_logger.debug("[Workflow-%s] 条件判断(默认): detection_count=%s, passed=%s", self.workflow_id, detection_count, passed)
         return passed
     
     def _handle_source_node(self, node_id, context):
@@ -1509,10 +1596,7 @@ class WorkflowExecutor:
             list: ROI配置列表，如果上游没有ROI节点则返回None
         """
         # 获取当前节点的直接上游节点
-        connected_upstream = []
-        for conn in self.connections:
-            if conn['to'] == node_id:
-                connected_upstream.append(conn['from'])
+        connected_upstream = self._get_execution_plan().upstream_of(node_id)
 
         # 递归检查每个上游分支
         for upstream_id in connected_upstream:
@@ -1522,7 +1606,7 @@ class WorkflowExecutor:
 
             # 如果上游节点是ROI节点，直接返回其配置
             if isinstance(upstream_node, RoiDrawNodeData) and upstream_node.roi_regions:
-                logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 找到上游ROI节点 {upstream_id}，包含 {len(upstream_node.roi_regions)} 个区域")
+                frame_logger.debug("[Workflow-%s] 节点 %s 找到上游ROI节点 %s，包含 %s 个区域", self.workflow_id, node_id, upstream_id, len(upstream_node.roi_regions))
                 return upstream_node.roi_regions
 
             # 递归检查上游的上游（深度优先，找到第一个ROI就停止）
@@ -1602,37 +1686,32 @@ class WorkflowExecutor:
 
         return payload
 
-    def _submit_external_api_request(self, node_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _submit_external_api_request(
+        self,
+        node_id: str,
+        payload: Dict[str, Any],
+        block: bool = True,
+    ) -> Dict[str, Any]:
+        """经进程内共享的连接池客户端发送请求；block=False 时在途请求已满立即失败。"""
         api_meta = self.external_api_datamap.get(node_id, {})
         node_config = self.external_api_configs.get(node_id, {})
-        endpoint_url = api_meta.get('endpoint_url')
         method = (api_meta.get('method') or 'POST').upper()
         headers = dict(api_meta.get('headers') or {})
         timeout_seconds = int(node_config.get('timeout_seconds') or api_meta.get('timeout_seconds') or 30)
 
-        response = requests.request(
-            method=method,
-            url=endpoint_url,
-            headers=headers,
-            json=payload,
-            timeout=timeout_seconds,
+        client = get_external_api_client(
+            api_meta.get('id'),
+            api_meta.get('endpoint_url'),
+            node_config.get('max_in_flight') or EXTERNAL_API_MAX_IN_FLIGHT,
+        )
+        return client.request(
+            method,
+            headers,
+            payload,
+            timeout_seconds,
+            cache_ttl_seconds=float(node_config.get('cache_ttl_seconds') or 0),
+            block=block,
         )
-        response.raise_for_status()
-
-        content_type = (response.headers.get('Content-Type') or '').lower()
-        if 'json' in content_type:
-            body = response.json()
-        else:
-            try:
-                body = response.json()
-            except ValueError:
-                body = {'raw_text': response.text}
-
-        return {
-            'status_code': response.status_code,
-            'headers': dict(response.headers),
-            'body': body,
-        }
 
     def _normalize_external_api_result(self, node_id: str, response_payload: Dict[str, Any]) -> Dict[str, Any]:
         api_meta = self.external_api_datamap.get(node_id, {})
@@ -1694,6 +1773,53 @@ class WorkflowExecutor:
                 exc_info=True,
             )
 
+    def _handle_external_api_latest_submit(self, node_id: str, payload: Dict[str, Any]):
+        # 已在后台线程执行：endpoint 在途请求满时等待空位，而不是立即失败后让下一帧重新编码
+        try:
+            response_payload = self._submit_external_api_request(node_id, payload)
+            result = self._normalize_external_api_result(node_id, response_payload)
+            with self._state_lock:
+                self.external_api_latest[node_id] = (result, time.time())
+        except Exception as exc:
+            logger.warning(f"[Workflow-{self.workflow_id}] 外部 API 节点 {node_id} 后台请求失败: {exc}")
+        finally:
+            with self._state_lock:
+                self.external_api_pending.discard(node_id)
+
+    def _latest_external_api_result(self, node_id: str, node_config: Dict[str, Any], submitted: bool) -> Dict[str, Any]:
+        """latest_result 模式下返回最近一次完成的响应；尚无响应时返回空结果。"""
+        with self._state_lock:
+            latest = self.external_api_latest.get(node_id)
+        if latest is None:
+            return {
+                'node_id': node_id,
+                'has_detection': False,
+                'result': {
+                    'detections': [],
+                    'metadata': {
+                        'execution_mode': 'latest_result',
+                        'submitted': submitted,
+                        'result_available': False,
+                        'external_api_name': self.external_api_datamap.get(node_id, {}).get('name'),
+                    },
+                },
+                'label_color': node_config.get('label_color') or '#1677ff',
+                'upstream_node_id': node_id,
+            }
+        result, completed_at = latest
+        return {
+            **result,
+            'result': {
+                **result['result'],
+                'metadata': {
+                    **result['result']['metadata'],
+                    'submitted': submitted,
+                    'result_available': True,
+                    'result_age_seconds': round(max(0.0, time.time() - completed_at), 3),
+                },
+            },
+        }
+
     def _handle_external_api_node(self, node_id, context):
         frame_nv12 = context.get('frame_nv12')
         if frame_nv12 is None:
@@ -1714,11 +1840,29 @@ class WorkflowExecutor:
                 raise RuntimeError('外部 API 已禁用')
 
             node_config = self.external_api_configs.get(node_id, {})
-            frame_bgr = context.get('frame_bgr') if node_config.get('include_image', True) else None
-            payload = self._build_external_api_payload(node_id, frame_timestamp, frame_bgr, upstream_results)
             execution_mode = node_config.get('execution_mode') or 'sync'
 
-            if execution_mode == 'async_submit':
+            if execution_mode == 'latest_result':
+                # 同一节点同时只有一个请求在途；请求未返回时不编码新帧，直接复用上一次结果
+                submitted = False
+                async_submit_executor = getattr(self, '_async_submit_executor', None)
+                with self._state_lock:
+                    if async_submit_executor is not None and node_id not in self.external_api_pending:
+                        self.external_api_pending.add(node_id)
+                        submitted = True
+                if submitted:
+                    try:
+                        frame_bgr = context.get('frame_bgr') if node_config.get('include_image', True) else None
+                        payload = self._build_external_api_payload(node_id, frame_timestamp, frame_bgr, upstream_results)
+                        async_submit_executor.submit(self._handle_external_api_latest_submit, node_id, payload)
+                    except Exception:
+                        with self._state_lock:
+                            self.external_api_pending.discard(node_id)
+                        raise
+                result = self._latest_external_api_result(node_id, node_config, submitted)
+            elif execution_mode == 'async_submit':
+                frame_bgr = context.get('frame_bgr') if node_config.get('include_image', True) else None
+                payload = self._build_external_api_payload(node_id, frame_timestamp, frame_bgr, upstream_results)
                 if self._async_submit_executor is not None:
                     self._async_submit_executor.submit(self._handle_external_api_async_submit, node_id, payload)
 
@@ -1737,6 +1881,8 @@ class WorkflowExecutor:
                     'upstream_node_id': node_id,
                 }
             else:
+                frame_bgr = context.get('frame_bgr') if node_config.get('include_image', True) else None
+                payload = self._build_external_api_payload(node_id, frame_timestamp, frame_bgr, upstream_results)
                 response_payload = self._submit_external_api_request(node_id, payload)
                 result = self._normalize_external_api_result(node_id, response_payload)
 
@@ -1789,17 +1935,24 @@ class WorkflowExecutor:
         upstream_roi = self._find_upstream_roi(node_id)
         if upstream_roi is not None:
             roi_regions = upstream_roi
-            logger.debug(f"[Workflow-{self.workflow_id}] 算法节点 {node_id} 使用上游ROI配置，包含 {len(roi_regions)} 个区域")
+            frame_logger.debug("[Workflow-%s] 算法节点 %s 使用上游ROI配置，包含 %s 个区域", self.workflow_id, node_id, len(roi_regions))
         else:
             # 向后兼容：使用全局context中的ROI配置
             roi_regions = context.get('roi_regions')
             if roi_regions:
-                logger.debug(f"[Workflow-{self.workflow_id}] 算法节点 {node_id} 使用全局context中的ROI配置，包含 {len(roi_regions)} 个区域")
+                frame_logger.debug("[Workflow-%s] 算法节点 %s 使用全局context中的ROI配置，包含 %s 个区域", self.workflow_id, node_id, len(roi_regions))
 
         upstream_results = self._get_upstream_results(node_id)
 
         try:
-            result = self._process_algorithm(node_id, frame_nv12, frame_timestamp, roi_regions, upstream_results)
+            result = self._process_algorithm(
+                node_id,
+                frame_nv12,
+                frame_timestamp,
+                roi_regions,
+                upstream_results,
+                derived_images=context.get('frame_derived'),
+            )
             if result:
                 self._append_detection_result_jsonl(node_id, result, frame_timestamp)
 
@@ -1845,7 +1998,7 @@ class WorkflowExecutor:
                                 'algorithm_name': algorithm_name,
                             },
                         )
-                        logger.debug(f"[Workflow-{self.workflow_id}] 算法节点 {node_id} 已记录检测摘要，命中 {detection_count} 个目标")
+                        frame_logger.debug("[Workflow-%s] 算法节点 %s 已记录检测摘要，命中 %s 个目标", self.workflow_id, node_id, detection_count)
             return result
         except Exception as e:
             if log_collector:
@@ -1943,9 +2096,10 @@ class WorkflowExecutor:
                 }
             )
 
-        logger.debug(
-            f"[Workflow-{self.workflow_id}] 条件节点 {node_id}: "
-            f"{detection_count} {comparison_type} {target_count} = {condition_passed}"
+        frame_logger.debug(
+            "[Workflow-%s] 条件节点 %s: "
+            "%s %s %s = %s",
+            self.workflow_id, node_id, detection_count, comparison_type, target_count, condition_passed,
         )
 
         # 诊断写入 cache；第一次仍返回 context，避免 _execute_branch 覆盖上游检测框
@@ -1982,11 +2136,7 @@ class WorkflowExecutor:
         node_id = node.node_id
         source_node_id = node.source_node_id
         context.pop('_skip_condition_routing', None)
-        connected_sources = [
-            conn.get('from')
-            for conn in self.connections
-            if conn.get('to') == node_id
-        ]
+        connected_sources = self._get_execution_plan().upstream_of(node_id)
         if len(connected_sources) != 1 or not source_node_id or connected_sources[0] != source_node_id:
             error = '数量骤变条件必须且只能连接一个与配置一致的上游结果节点'
             context['has_detection'] = False
@@ -2085,8 +2235,9 @@ class WorkflowExecutor:
                 )
             log_collector.add_info(node_id, message, metadata=metadata)
 
-        logger.debug(
-            f"[Workflow-{self.workflow_id}] 数量骤变条件 {node_id}: {metadata}"
+        frame_logger.debug(
+            "[Workflow-%s] 数量骤变条件 %s: %s",
+            self.workflow_id, node_id, metadata,
         )
         return context
 
@@ -2128,19 +2279,19 @@ class WorkflowExecutor:
                 },
             )
 
-        logger.debug(
-            f"[Workflow-{self.workflow_id}] 时间节点 {node_id}: "
-            f"enabled={enabled}, current_time={outcome.get('current_time')}, "
-            f"matched_period={matched_period}"
+        frame_logger.debug(
+            "[Workflow-%s] 时间节点 %s: "
+            "enabled=%s, current_time=%s, "
+            "matched_period=%s",
+            self.workflow_id, node_id, enabled, outcome.get('current_time'), matched_period,
         )
         return context if enabled else None
 
     def _prepare_time_schedule_gates(self, context):
         """Evaluate schedule gates once and identify exclusively blocked descendants."""
         schedule_nodes = {
-            node_id: node
-            for node_id, node in self.nodes.items()
-            if isinstance(node, TimeScheduleNodeData)
+            node_id: self.nodes[node_id]
+            for node_id in self._get_execution_plan().time_schedule_node_ids
         }
         if not schedule_nodes:
             return
@@ -2178,10 +2329,7 @@ class WorkflowExecutor:
                     visited.add(next_id)
                     pending.append(next_id)
 
-        source_ids = [
-            node_id for node_id, node in self.nodes.items()
-            if isinstance(node, SourceNodeData)
-        ]
+        source_ids = self._get_execution_plan().source_node_ids
         active_reachable = set(source_ids)
         pending = list(source_ids)
         while pending:
@@ -2267,11 +2415,7 @@ class WorkflowExecutor:
         if not isinstance(node, WebhookNodeData):
             raise ValueError(f"节点 {node_id} 不是 Webhook 节点")
 
-        upstream_ids = [
-            conn.get('from') or conn.get('from_node_id')
-            for conn in self.connections
-            if (conn.get('to') or conn.get('to_node_id')) == node_id
-        ]
+        upstream_ids = self._get_execution_plan().upstream_of(node_id)
         if len(upstream_ids) != 1:
             raise ValueError("Webhook 节点必须且只能连接一个告警输出节点")
         upstream_id = upstream_ids[0]
@@ -2352,8 +2496,8 @@ class WorkflowExecutor:
         node_config = node_data_dict.get('config', {})
         function_name = node_config.get('function_name', 'area_ratio')
 
-        logger.debug(f"[Workflow-{self.workflow_id}] 函数节点 {node_id} 原始配置: {node_config}")
-        logger.debug(f"[Workflow-{self.workflow_id}] 函数节点 {node_id} 开始处理，函数类型: {function_name}")
+        frame_logger.debug("[Workflow-%s] 函数节点 %s 原始配置: %s", self.workflow_id, node_id, node_config)
+        frame_logger.debug("[Workflow-%s] 函数节点 %s 开始处理，函数类型: %s", self.workflow_id, node_id, function_name)
 
         # 获取上游结果
         upstream_results = self._get_upstream_results(node_id)
@@ -2363,7 +2507,7 @@ class WorkflowExecutor:
             logger.warning(f"[Workflow-{self.workflow_id}] 函数节点 {node_id} 没有上游结果")
             return None
 
-        logger.debug(f"[Workflow-{self.workflow_id}] 函数节点 {node_id} 上游节点: {list(upstream_results.keys())}")
+        frame_logger.debug("[Workflow-%s] 函数节点 %s 上游节点: %s", self.workflow_id, node_id, list(upstream_results.keys()))
 
         # 导入内置函数模块
         try:
@@ -2381,7 +2525,7 @@ class WorkflowExecutor:
             result_a = upstream_results.get(node_a_id, {})
             detections_a = result_a.get('detections', [])
 
-            logger.debug(f"[Workflow-{self.workflow_id}] 函数节点 {node_id} 从节点 {node_a_id} 获取 {len(detections_a)} 个检测结果")
+            frame_logger.debug("[Workflow-%s] 函数节点 %s 从节点 %s 获取 %s 个检测结果", self.workflow_id, node_id, node_a_id, len(detections_a))
 
             # 判断是单输入还是双输入函数
             single_input_functions = ['height_ratio_frame', 'width_ratio_frame', 'area_ratio_frame', 'size_absolute']
@@ -2402,7 +2546,7 @@ class WorkflowExecutor:
 
             if is_single_input:
                 # 单输入函数
-                logger.debug(f"[Workflow-{self.workflow_id}] 调用单输入函数 {function_name}")
+                frame_logger.debug("[Workflow-%s] 调用单输入函数 %s", self.workflow_id, function_name)
                 results = func(detections_a, [], function_config)
 
                 # 收集匹配的检测框
@@ -2421,7 +2565,7 @@ class WorkflowExecutor:
                 result_b = upstream_results.get(node_b_id, {})
                 detections_b = result_b.get('detections', [])
 
-                logger.debug(f"[Workflow-{self.workflow_id}] 调用双输入函数 {function_name}，节点A: {node_a_id}({len(detections_a)}个), 节点B: {node_b_id}({len(detections_b)}个)")
+                frame_logger.debug("[Workflow-%s] 调用双输入函数 %s，节点A: %s(%s个), 节点B: %s(%s个)", self.workflow_id, function_name, node_a_id, len(detections_a), node_b_id, len(detections_b))
 
                 results = func(detections_a, detections_b, function_config)
 
@@ -2431,7 +2575,7 @@ class WorkflowExecutor:
                     all_detections.append(r['object_a'])
                     all_detections.append(r['object_b'])
 
-            logger.debug(f"[Workflow-{self.workflow_id}] 函数节点 {node_id} 处理完成，匹配数: {len(results)}, 返回检测数: {len(all_detections)}")
+            frame_logger.debug("[Workflow-%s] 函数节点 %s 处理完成，匹配数: %s, 返回检测数: %s", self.workflow_id, node_id, len(results), len(all_detections))
 
             # 记录函数执行日志
             if log_collector:
@@ -2454,7 +2598,7 @@ class WorkflowExecutor:
                         'matched_count': len(results),
                     },
                 )
-                logger.debug(f"[Workflow-{self.workflow_id}] 函数节点 {node_id} 已记录日志: 函数 {function_name} 处理完成，匹配数: {len(results)}")
+                frame_logger.debug("[Workflow-%s] 函数节点 %s 已记录日志: 函数 %s 处理完成，匹配数: %s", self.workflow_id, node_id, function_name, len(results))
 
             # 返回标准格式的结果
             result = {
@@ -2595,14 +2739,12 @@ class WorkflowExecutor:
             cache_snapshot = dict(self.node_results_cache)
 
         # 优先从连线中获取上游节点（更可靠）
-        for conn in self.connections:
-            if conn['to'] == node_id:
-                from_node_id = conn['from']
-                if from_node_id in cache_snapshot:
-                    cached = cache_snapshot[from_node_id]
-                    # 只处理有 result 的缓存（source 节点没有 result）
-                    if 'result' in cached:
-                        upstream_results[from_node_id] = cached['result']
+        for from_node_id in self._get_execution_plan().upstream_of(node_id):
+            if from_node_id in cache_snapshot:
+                cached = cache_snapshot[from_node_id]
+                # 只处理有 result 的缓存（source 节点没有 result）
+                if 'result' in cached:
+                    upstream_results[from_node_id] = cached['result']
 
         # 如果连线中没有结果，回退到 input_nodes 配置（向后兼容）
         if not upstream_results:
@@ -2636,7 +2778,8 @@ class WorkflowExecutor:
         # ROI配置现在完全通过算法节点查找上游节点来获取
         # context['roi_regions'] = roi_regions
 
-        # 打印详细的ROI配置信息
+        # 打印详细的ROI配置信息（顶点字符串只在 DEBUG 级别开启时拼接）
+        debug_enabled = frame_logger.isEnabledFor(logging.DEBUG)
         for idx, roi in enumerate(roi_regions):
             polygon = roi.get('polygon', [])
             points = roi.get('points', [])
@@ -2645,53 +2788,48 @@ class WorkflowExecutor:
             vertex_data = polygon if polygon else points
 
             if vertex_data:
+                if not debug_enabled:
+                    continue
                 # 检查坐标格式
                 if isinstance(vertex_data[0], dict):
                     # 相对坐标格式 [{"x": 0.1, "y": 0.2}, ...]
                     vertex_str = ", ".join([f"({p.get('x', 0):.3f}, {p.get('y', 0):.3f})" for p in vertex_data])
-                    logger.debug(
-                        f"[Workflow-{self.workflow_id}] 热区绘制节点 {node_id} 区域{idx + 1}: "
-                        f"名称={roi.get('name', '未命名')}, "
-                        f"模式={roi.get('mode', 'N/A')}, "
-                        f"顶点数={len(vertex_data)}, "
-                        f"顶点坐标(相对): [{vertex_str}]"
+                    frame_logger.debug(
+                        "[Workflow-%s] 热区绘制节点 %s 区域%s: "
+                        "名称=%s, "
+                        "模式=%s, "
+                        "顶点数=%s, "
+                        "顶点坐标(相对): [%s]",
+                        self.workflow_id, node_id, idx + 1, roi.get('name', '未命名'),
+                        roi.get('mode', 'N/A'), len(vertex_data), vertex_str,
                     )
                 else:
                     # 绝对坐标格式 [[x1, y1], [x2, y2], ...]
                     vertex_str = ", ".join([f"({p[0]}, {p[1]})" for p in vertex_data])
-                    logger.debug(
-                        f"[Workflow-{self.workflow_id}] 热区绘制节点 {node_id} 区域{idx + 1}: "
-                        f"名称={roi.get('name', '未命名')}, "
-                        f"模式={roi.get('mode', 'N/A')}, "
-                        f"顶点数={len(vertex_data)}, "
-                        f"顶点坐标(绝对): [{vertex_str}]"
+                    frame_logger.debug(
+                        "[Workflow-%s] 热区绘制节点 %s 区域%s: "
+                        "名称=%s, "
+                        "模式=%s, "
+                        "顶点数=%s, "
+                        "顶点坐标(绝对): [%s]",
+                        self.workflow_id, node_id, idx + 1, roi.get('name', '未命名'),
+                        roi.get('mode', 'N/A'), len(vertex_data), vertex_str,
                     )
             else:
                 logger.warning(f"[Workflow-{self.workflow_id}] 热区绘制节点 {node_id} 区域{idx + 1}: 没有顶点数据")
 
-        logger.debug(f"[Workflow-{self.workflow_id}] 热区绘制节点 {node_id} 共配置了 {len(roi_regions)} 个ROI区域")
-        logger.debug(f"[Workflow-{self.workflow_id}] 热区绘制节点 {node_id} 完整ROI数据: {roi_regions}")
+        frame_logger.debug("[Workflow-%s] 热区绘制节点 %s 共配置了 %s 个ROI区域", self.workflow_id, node_id, len(roi_regions))
+        frame_logger.debug("[Workflow-%s] 热区绘制节点 %s 完整ROI数据: %s", self.workflow_id, node_id, roi_regions)
 
         return context
 
     def _has_gated_incoming(self, node_id) -> bool:
         """是否存在显式门控入边。只阻止拓扑层独立调度，分支层仍是 per-edge OR。"""
-        for conn in self.connections:
-            if (conn.get('to') or conn.get('to_node_id')) != node_id:
-                continue
-            if conn.get('condition') in self._GATE_CONDITIONS:
-                return True
-        return False
+        return self._get_execution_plan().has_gated_incoming(node_id)
 
     def _first_gated_incoming(self, node_id):
         """第一条门控入边的 (from_id, condition)。"""
-        for conn in self.connections:
-            if (conn.get('to') or conn.get('to_node_id')) != node_id:
-                continue
-            condition = conn.get('condition')
-            if condition in self._GATE_CONDITIONS:
-                return conn.get('from') or conn.get('from_node_id'), condition
-        return None, None
+        return self._get_execution_plan().first_gated_incoming(node_id)
 
     def _is_ocr_algorithm_node(self, node_id) -> bool:
         info = (getattr(self, 'algorithm_datamap', None) or {}).get(node_id) or {}
@@ -2874,15 +3012,17 @@ class WorkflowExecutor:
             return None
 
         if node_id in context.get('_time_schedule_blocked_nodes', set()):
-            logger.debug(
-                f"[Workflow-{self.workflow_id}] 节点 {node_id} 位于未启用的时间分支，跳过执行"
+            frame_logger.debug(
+                "[Workflow-%s] 节点 %s 位于未启用的时间分支，跳过执行",
+                self.workflow_id, node_id,
             )
             return None
 
         claimed, completion_event, cached = self._await_or_claim_node_execution(node_id, context)
         if not claimed:
-            logger.debug(
-                f"[Workflow-{self.workflow_id}] 节点 {node_id} 本帧已执行或已 skip，跳过重复调度"
+            frame_logger.debug(
+                "[Workflow-%s] 节点 %s 本帧已执行或已 skip，跳过重复调度",
+                self.workflow_id, node_id,
             )
             return cached
 
@@ -2897,7 +3037,7 @@ class WorkflowExecutor:
                 # 算法节点或函数节点因间隔被跳过时，清除旧缓存结果，避免下游节点使用过期数据
                 if (isinstance(node, (AlgorithmNodeData, ExternalApiNodeData, FunctionNodeData, DetectionFilterNodeData))
                     and node_id in self.node_results_cache):
-                    logger.debug(f"[Workflow-{self.workflow_id}] 节点 {node_id} 因间隔被跳过，清除旧缓存结果")
+                    frame_logger.debug("[Workflow-%s] 节点 %s 因间隔被跳过，清除旧缓存结果", self.workflow_id, node_id)
                     with self._state_lock:
                         if node_id in self.node_results_cache:
                             del self.node_results_cache[node_id]
@@ -2909,7 +3049,7 @@ class WorkflowExecutor:
             execution_error = None
 
             node_type = node.node_type
-            handler = self.node_handlers.get(node_type)
+            handler = self._get_execution_plan().handlers.get(node_id) or self.node_handlers.get(node_type)
 
             if not handler:
                 # 从 context 中获取 log_collector 并记录警告
@@ -3033,30 +3173,34 @@ class WorkflowExecutor:
 
             # 传递更新后的 context 进行条件判断
             if not self._evaluate_condition(condition, context):
-                logger.debug(f"[Workflow-{self.workflow_id}] {node_id} -> {next_id} 条件不满足: {condition}")
+                frame_logger.debug("[Workflow-%s] %s -> %s 条件不满足: %s", self.workflow_id, node_id, next_id, condition)
                 continue
 
-            logger.debug(f"[Workflow-{self.workflow_id}] {node_id} -> {next_id} 条件满足，继续执行")
+            frame_logger.debug("[Workflow-%s] %s -> %s 条件满足，继续执行", self.workflow_id, node_id, next_id)
             # 继续执行下游节点（分支隔离 context，避免污染）
             branch_context = context.copy()
             branch_context['_routing_from_node_id'] = node_id
             self._execute_branch(next_id, branch_context)
 
-    def _execute_level_nodes(self, level_nodes, context, executor=None):
+    def _execute_level_nodes(self, level_nodes, context, executor=None, level_parallel=None):
         """
         执行一个层级的所有节点
         - 如果可以并行且提供了executor，则并行执行
         - 否则串行执行
+        - level_parallel: 执行计划中预先计算的并行标记，未提供时现场判断
         """
         if not level_nodes:
             return
 
         # 检查是否可以并行执行
-        can_parallel = self._can_execute_level_parallel(level_nodes) and executor is not None
+        if level_parallel is None:
+            level_parallel = self._can_execute_level_parallel(level_nodes)
+        can_parallel = level_parallel and executor is not None
 
         if can_parallel:
             # 并行执行当前层级的节点
-            logger.debug(f"[Workflow-{self.workflow_id}] 并行执行层级节点: {[f'{nid}({self.nodes[nid].node_type})' for nid in level_nodes]}")
+            if frame_logger.isEnabledFor(logging.DEBUG):
+                frame_logger.debug("[Workflow-%s] 并行执行层级节点: %s", self.workflow_id, [f'{nid}({self.nodes[nid].node_type})' for nid in level_nodes])
             future_to_node = {
                 executor.submit(self._execute_level_node, nid, context.copy()): nid
                 for nid in level_nodes
@@ -3070,7 +3214,8 @@ class WorkflowExecutor:
                     logger.error(f"[Workflow-{self.workflow_id}] 节点 {node_id} 执行异常: {exc}", exc_info=True)
         else:
             # 串行执行当前层级的节点
-            logger.debug(f"[Workflow-{self.workflow_id}] 串行执行层级节点: {[f'{nid}({self.nodes[nid].node_type})' for nid in level_nodes]}")
+            if frame_logger.isEnabledFor(logging.DEBUG):
+                frame_logger.debug("[Workflow-%s] 串行执行层级节点: %s", self.workflow_id, [f'{nid}({self.nodes[nid].node_type})' for nid in level_nodes])
             for node_id in level_nodes:
                 self._execute_level_node(node_id, context.copy())
 
@@ -3086,8 +3231,9 @@ class WorkflowExecutor:
             return
 
         if node_id in context.get('_time_schedule_blocked_nodes', set()):
-            logger.debug(
-                f"[Workflow-{self.workflow_id}] 节点 {node_id} 位于未启用的时间分支，跳过独立调度"
+            frame_logger.debug(
+                "[Workflow-%s] 节点 %s 位于未启用的时间分支，跳过独立调度",
+                self.workflow_id, node_id,
             )
             return
 
@@ -3118,7 +3264,7 @@ class WorkflowExecutor:
             # 执行函数节点
             result = self._execute_single_node(node_id, context)
             if result is None:
-                logger.debug(f"[Workflow-{self.workflow_id}] 结果转换节点 {node_id} 返回None")
+                frame_logger.debug("[Workflow-%s] 结果转换节点 %s 返回None", self.workflow_id, node_id)
                 return
 
             # 函数节点执行完后，继续执行下游节点（通常是 alert）
@@ -3143,7 +3289,7 @@ class WorkflowExecutor:
                 next_id = next_info['target']
                 condition = next_info.get('condition')
                 if self._evaluate_condition(condition, context):
-                    logger.debug(f"[Workflow-{self.workflow_id}] 结果转换节点 {node_id} -> {next_id} 条件满足，继续执行")
+                    frame_logger.debug("[Workflow-%s] 结果转换节点 %s -> %s 条件满足，继续执行", self.workflow_id, node_id, next_id)
                     # 传递原始 context 而不是 result，确保 log_collector 能被传递到 Alert 节点
                     branch_context = context.copy()
                     branch_context['_routing_from_node_id'] = node_id
@@ -3160,11 +3306,12 @@ class WorkflowExecutor:
         按拓扑层级执行所有节点
         """
         self._prepare_time_schedule_gates(context)
-        levels = self._build_topology_levels()
-        logger.debug(f"[Workflow-{self.workflow_id}] 共有 {len(levels)} 个拓扑层级，开始按层级执行...")
+        plan = self._get_execution_plan()
+        levels = plan.levels
+        frame_logger.debug("[Workflow-%s] 共有 %s 个拓扑层级，开始按层级执行...", self.workflow_id, len(levels))
 
         for level_idx, level_nodes in enumerate(levels):
-            logger.debug(f"[Workflow-{self.workflow_id}] 执行层级 {level_idx + 1}/{len(levels)}")
+            frame_logger.debug("[Workflow-%s] 执行层级 %s/%s", self.workflow_id, level_idx + 1, len(levels))
 
             # 特殊处理第一层（source节点）
             if level_idx == 0:
@@ -3173,7 +3320,9 @@ class WorkflowExecutor:
                     self._execute_single_node(node_id, context)
             else:
                 # 其他层级按并行或串行执行
-                self._execute_level_nodes(level_nodes, context, executor)
+                self._execute_level_nodes(
+                    level_nodes, context, executor, level_parallel=plan.level_parallel[level_idx]
+                )
 
     def _cache_output_result(self, node_id: str, alert_triggered: bool, detection_count: int, trigger_reason: str,
                              result_image: Optional[str] = None, upstream_node_id: Optional[str] = None,
@@ -3242,6 +3391,7 @@ class WorkflowExecutor:
         if not node_id:
             return None
 
+        plan = self._get_execution_plan()
         visited = set()
         stack = [node_id]
 
@@ -3254,11 +3404,9 @@ class WorkflowExecutor:
             if current_id in self.algorithms:
                 return current_id
 
-            for conn in self.connections:
-                if conn['to'] == current_id:
-                    upstream_id = conn['from']
-                    if upstream_id not in visited:
-                        stack.append(upstream_id)
+            for upstream_id in plan.upstream_of(current_id):
+                if upstream_id not in visited:
+                    stack.append(upstream_id)
 
         return None
 
@@ -3302,6 +3450,36 @@ class WorkflowExecutor:
             except Exception:
                 return False
 
+    def _get_alert_sink(self, node_id: str):
+        if self.test_mode or node_id in self._alert_event_consumers:
+            return None
+        return self.alert_sink
+
+    def _alert_frame_writer(self, alert_sink, frame: np.ndarray, detections: Optional[List[dict]], save_path: str,
+                            ori_save_path: str, label_color: str, roi_mask=None, roi_regions=None,
+                            upstream_node_id: Optional[str] = None):
+        """返回写入告警可视化图片与原始图片（.ori.jpg）的动作。
+
+        交给告警 sink 在其他线程执行时复制帧：共享帧和派生图像在 runner 处理完本帧后会被复用。
+        """
+        if alert_sink is not None:
+            frame = frame.copy() if frame is not None else None
+            detections = list(detections or [])
+
+        def write():
+            self._save_visualized_frame(
+                frame_rgb=frame,
+                detections=detections,
+                save_path=save_path,
+                label_color=label_color,
+                roi_mask=roi_mask,
+                roi_regions=roi_regions,
+                upstream_node_id=upstream_node_id
+            )
+            save_frame(frame, ori_save_path)
+
+        return write
+
     def _get_storage_pressure(self) -> StoragePressure:
         """短周期缓存磁盘检查，兼顾落盘保护与实时告警吞吐。"""
         now = time.monotonic()
@@ -3365,22 +3543,7 @@ class WorkflowExecutor:
 
     def _get_alert_log_scope(self, alert_node_id: str) -> set:
         """返回当前告警节点及其所有上游祖先，用于隔离兄弟分支日志。"""
-        reverse_graph = defaultdict(set)
-        for connection in self.connections:
-            source_id = connection.get('from') or connection.get('from_node_id')
-            target_id = connection.get('to') or connection.get('to_node_id')
-            if source_id and target_id:
-                reverse_graph[target_id].add(source_id)
-
-        scope = {alert_node_id}
-        pending = [alert_node_id]
-        while pending:
-            current_id = pending.pop()
-            for upstream_id in reverse_graph.get(current_id, ()):
-                if upstream_id not in scope:
-                    scope.add(upstream_id)
-                    pending.append(upstream_id)
-        return scope
+        return set(self._get_execution_plan().ancestors_of(alert_node_id))
 
     @staticmethod
     def _compose_alert_message(
@@ -3462,11 +3625,7 @@ class WorkflowExecutor:
         # 如果 context 中没有上游结果，从 node_results_cache 中获取
         if 'result' not in context or 'has_detection' not in context:
             # 查找 Alert 节点的上游节点
-            upstream_node_id = None
-            for conn in self.connections:
-                if conn['to'] == node_id:
-                    upstream_node_id = conn['from']
-                    break
+            upstream_node_id = self._get_execution_plan().first_upstream(node_id)
 
             cached_data = None
             if upstream_node_id:
@@ -3524,8 +3683,10 @@ class WorkflowExecutor:
                 metadata={'recovered_at_alert_node': True},
             )
 
-        logger.debug(
-            f"[Workflow-{self.workflow_id}] Alert 节点 {node_id} 收到结果: has_detection={has_detection}, 检测数={detection_count}")
+        frame_logger.debug(
+            "[Workflow-%s] Alert 节点 %s 收到结果: has_detection=%s, 检测数=%s",
+            self.workflow_id, node_id, has_detection, detection_count,
+        )
 
         # 加载触发条件配置（窗口检测）- 必须在记录之前加载
         trigger_condition = alert_node.trigger_condition
@@ -3537,7 +3698,7 @@ class WorkflowExecutor:
             )
         else:
             # 未配置触发条件，使用默认配置（不进行窗口检测，直接通过）
-            logger.debug(f"[Workflow-{self.workflow_id}] 告警节点 {node_id} 未配置触发条件，所有检测都将触发")
+            frame_logger.debug("[Workflow-%s] 告警节点 %s 未配置触发条件，所有检测都将触发", self.workflow_id, node_id)
             self.window_detector.load_trigger_condition(
                 source_id=self.video_source.id,
                 node_id=node_id,
@@ -3554,7 +3715,7 @@ class WorkflowExecutor:
             )
         else:
             # 未配置抑制，不启用抑制
-            logger.debug(f"[Workflow-{self.workflow_id}] 告警节点 {node_id} 未配置抑制，告警不会被抑制")
+            frame_logger.debug("[Workflow-%s] 告警节点 %s 未配置抑制，告警不会被抑制", self.workflow_id, node_id)
             self.window_detector.load_suppression(
                 source_id=self.video_source.id,
                 node_id=node_id,
@@ -3562,6 +3723,9 @@ class WorkflowExecutor:
             )
 
         trigger_time = frame_timestamp
+        # 图片写盘与告警入库交给 host 的告警 sink；同一节点的 job 固定由同一个 worker 顺序处理
+        alert_sink = self._get_alert_sink(node_id)
+        alert_sink_key = (self.video_source.id, self.workflow_id, node_id)
 
         # 检查是否启用了窗口检测
         window_detection_enabled = trigger_condition and trigger_condition.get('enable', False)
@@ -3588,22 +3752,25 @@ class WorkflowExecutor:
                     # 回退到算法节点自身的ROI配置
                     effective_roi_regions = self.algorithm_roi_configs.get(upstream_node_id, [])
 
-            self._save_visualized_frame(
-                frame_rgb=frame,
+            # 同时保存原始图片（.ori.jpg）
+            filepath_ori = f"{filepath}.ori.jpg"
+            write_images = self._alert_frame_writer(
+                alert_sink,
+                frame=frame,
                 detections=result.get("detections"),
                 save_path=filepath_absolute,
+                ori_save_path=os.path.join(FRAME_SAVE_PATH, filepath_ori),
                 label_color=label_color,
                 roi_mask=roi_mask,
                 roi_regions=effective_roi_regions,
-                upstream_node_id=upstream_node_id
+                upstream_node_id=upstream_node_id,
             )
+            if alert_sink is None:
+                write_images()
+            else:
+                alert_sink.submit(AlertJob(alert_sink_key, media=(write_images,), log_prefix=f"[Workflow-{self.workflow_id}]"))
 
-            # 同时保存原始图片（.ori.jpg）
-            filepath_ori = f"{filepath}.ori.jpg"
-            filepath_ori_absolute = os.path.join(FRAME_SAVE_PATH, filepath_ori)
-            save_frame(frame, filepath_ori_absolute)
-
-            logger.debug(f"[Workflow-{self.workflow_id}] 保存窗口检测图片: {filepath}, 原始图片: {filepath_ori}")
+            frame_logger.debug("[Workflow-%s] 保存窗口检测图片: %s, 原始图片: %s", self.workflow_id, filepath, filepath_ori)
 
             # 更新窗口检测器中的图片路径
             self.window_detector.update_last_image_path(
@@ -3621,7 +3788,7 @@ class WorkflowExecutor:
                 detection_count=detection_count,
                 trigger_reason='上游条件未通过（has_detection=False）'
             )
-            logger.debug(f"[Workflow-{self.workflow_id}] Alert 节点 {node_id} 未检测到目标，跳过告警处理")
+            frame_logger.debug("[Workflow-%s] Alert 节点 %s 未检测到目标，跳过告警处理", self.workflow_id, node_id)
             return
 
         # 从 Alert 节点配置获取告警信息
@@ -3633,17 +3800,17 @@ class WorkflowExecutor:
             # 获取消息格式类型（默认 'detailed'）
             message_format = alert_node.message_format or 'detailed'
 
-            logger.debug(f"[Workflow-{self.workflow_id}] Alert节点 {node_id} 开始构建告警消息，格式: {message_format}")
-            logger.debug(f"[Workflow-{self.workflow_id}] 日志收集器 ID: {id(log_collector)}")
-            logger.debug(f"[Workflow-{self.workflow_id}] 日志收集器包含 {len(log_collector.logs)} 条日志")
+            frame_logger.debug("[Workflow-%s] Alert节点 %s 开始构建告警消息，格式: %s", self.workflow_id, node_id, message_format)
+            frame_logger.debug("[Workflow-%s] 日志收集器 ID: %s", self.workflow_id, id(log_collector))
+            frame_logger.debug("[Workflow-%s] 日志收集器包含 %s 条日志", self.workflow_id, len(log_collector.logs))
 
             # 打印所有日志
-            for idx, log in enumerate(log_collector.logs):
-                logger.debug(f"[Workflow-{self.workflow_id}] 日志 {idx + 1}: [{log['node_id']}] {log['content']}")
+            for idx, log in enumerate(log_collector.logs if frame_logger.isEnabledFor(logging.DEBUG) else ()):
+                frame_logger.debug("[Workflow-%s] 日志 %s: [%s] %s", self.workflow_id, idx + 1, log['node_id'], log['content'])
 
             alert_message = self._compose_alert_message(alert_node, log_collector, alert_log_scope)
 
-            logger.debug(f"[Workflow-{self.workflow_id}] 最终告警消息: {alert_message}")
+            frame_logger.debug("[Workflow-%s] 最终告警消息: %s", self.workflow_id, alert_message)
         else:
             # 如果没有日志收集器，使用原始消息
             alert_message = alert_node.alert_message or ""
@@ -3664,11 +3831,13 @@ class WorkflowExecutor:
                 trigger_reason='不满足窗口触发条件'
             )
             if trigger_stats:
-                logger.debug(
-                    f"[Workflow-{self.workflow_id}] 输出节点 {node_id} 不满足触发条件，跳过告警 "
-                    f"(检测: {trigger_stats['detection_count']}/{trigger_stats['total_count']} 帧, "
-                    f"比例: {trigger_stats['detection_ratio']:.2%}, "
-                    f"连续: {trigger_stats['max_consecutive']} 次)"
+                frame_logger.debug(
+                    "[Workflow-%s] 输出节点 %s 不满足触发条件，跳过告警 "
+                    "(检测: %s/%s 帧, "
+                    "比例: %.2f%%, "
+                    "连续: %s 次)",
+                    self.workflow_id, node_id, trigger_stats['detection_count'], trigger_stats['total_count'],
+                    trigger_stats['detection_ratio'] * 100, trigger_stats['max_consecutive'],
                 )
             return
 
@@ -3711,9 +3880,10 @@ class WorkflowExecutor:
             )
             # 在抑制期内，跳过告警
             if suppression_stats:
-                logger.debug(
-                    f"[Workflow-{self.workflow_id}] 输出节点 {node_id} 在抑制期内，跳过告警 "
-                    f"(剩余冷却时间: {suppression_stats['cooldown_remaining']:.2f}秒)"
+                frame_logger.debug(
+                    "[Workflow-%s] 输出节点 %s 在抑制期内，跳过告警 "
+                    "(剩余冷却时间: %.2f秒)",
+                    self.workflow_id, node_id, suppression_stats['cooldown_remaining'],
                 )
             return
 
@@ -3818,11 +3988,11 @@ class WorkflowExecutor:
                 node_id=node_id,
                 current_time=trigger_time
             )
-            logger.debug(f"[Workflow-{self.workflow_id}] 窗口检测已启用，窗口内检测到 {len(detection_records)} 次目标")
+            frame_logger.debug("[Workflow-%s] 窗口检测已启用，窗口内检测到 %s 次目标", self.workflow_id, len(detection_records))
         else:
             # 未启用窗口检测，不获取历史记录，只保存当前触发帧
             detection_records = []
-            logger.debug(f"[Workflow-{self.workflow_id}] 窗口检测未启用，将保存当前触发帧")
+            frame_logger.debug("[Workflow-%s] 窗口检测未启用，将保存当前触发帧", self.workflow_id)
 
         # 处理检测图片
         detection_images = []
@@ -3837,6 +4007,7 @@ class WorkflowExecutor:
                 })
 
         # 如果没有检测图片，保存当前帧
+        media_writes = []
         if not detection_images and media_allowed:
             filepath = f"{self.video_source.source_code}/{alert_type}/frame_{time.strftime('%Y%m%d_%H%M%S')}_{int(time.time() * 1000) % 10000}_wf{self.workflow_id}.jpg"
             filepath_absolute = os.path.join(FRAME_SAVE_PATH, filepath)
@@ -3858,19 +4029,18 @@ class WorkflowExecutor:
                     if effective_roi_regions:
                         logger.info(f"[Workflow-{self.workflow_id}] Alert可视化：使用算法节点配置，包含 {len(effective_roi_regions)} 个区域")
 
-            self._save_visualized_frame(
-                frame_rgb=frame,
+            filepath_ori = f"{filepath}.ori.jpg"
+            media_writes.append(self._alert_frame_writer(
+                alert_sink,
+                frame=frame,
                 detections=result.get("detections"),
                 save_path=filepath_absolute,
+                ori_save_path=os.path.join(FRAME_SAVE_PATH, filepath_ori),
                 label_color=label_color,
                 roi_mask=roi_mask,
                 roi_regions=effective_roi_regions,
-                upstream_node_id=upstream_node_id
-            )
-
-            filepath_ori = f"{filepath}.ori.jpg"
-            filepath_ori_absolute = os.path.join(FRAME_SAVE_PATH, filepath_ori)
-            save_frame(frame, filepath_ori_absolute)
+                upstream_node_id=upstream_node_id,
+            ))
 
             detection_images.append({
                 'image_path': filepath,
@@ -3894,47 +4064,56 @@ class WorkflowExecutor:
 
         # 创建告警记录
         logger.info(f"[Workflow-{self.workflow_id}] 准备创建 Alert，alert_message: {alert_message[:200] if alert_message else 'None'}...")
-        with db.atomic():
-            alert = Alert.create(
-                video_source=self.video_source,
-                workflow=self.workflow,
-                alert_time=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(trigger_time)),
-                alert_type=alert_type,
-                alert_level=alert_level,
-                alert_message=alert_message,
-                alert_image=main_image,
-                alert_image_ori=main_image_ori,
-                alert_video=None,
-                detection_count=(detection_count if not media_allowed else len(detection_images)),
-                window_stats=json.dumps(trigger_stats) if trigger_stats else None,
-                detection_images=json.dumps(detection_images) if detection_images else None,
-                created_by=getattr(self.video_source, 'created_by', 'admin'),
+        recording = None
+        if self.video_recorder and storage_pressure is not None and storage_pressure.allow_recording:
+            recording = {
+                'source_id': self.video_source.id,
+                'trigger_time': trigger_time,
+                'pre_seconds': self.recording_config.pre_alert_seconds,
+                'post_seconds': self.recording_config.post_alert_seconds,
+            }
+        elif self.video_recorder and storage_pressure is not None:
+            logger.warning(
+                f"[Workflow-{self.workflow_id}] 磁盘使用率 {storage_pressure.used_percent:.1f}% "
+                "已达到停录像水位，本次告警不录像"
             )
+        job = AlertJob(
+            alert_sink_key,
+            media=media_writes,
+            alert_fields={
+                'video_source': self.video_source,
+                'workflow': self.workflow,
+                'alert_time': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(trigger_time)),
+                'alert_type': alert_type,
+                'alert_level': alert_level,
+                'alert_message': alert_message,
+                'alert_image': main_image,
+                'alert_image_ori': main_image_ori,
+                'alert_video': None,
+                'detection_count': (detection_count if not media_allowed else len(detection_images)),
+                'window_stats': json.dumps(trigger_stats) if trigger_stats else None,
+                'detection_images': json.dumps(detection_images) if detection_images else None,
+                'created_by': getattr(self.video_source, 'created_by', 'admin'),
+            },
+            recorder=self.video_recorder,
+            recording=recording,
+            publish=getattr(alert_node, 'publish_to_mq', True),
+            log_prefix=f"[Workflow-{self.workflow_id}]",
+        )
 
-            # 先取得并保存录像路径，再创建 outbox。事务提交前 delivery worker
-            # 看不到任务，因此 URL 模式不会发布缺少 alert_video_url 的半成品消息。
-            if self.video_recorder and storage_pressure is not None and storage_pressure.allow_recording:
-                try:
-                    video_path = self.video_recorder.start_recording(
-                        source_id=self.video_source.id,
-                        alert_id=alert.id,
-                        trigger_time=trigger_time,
-                        pre_seconds=self.recording_config.pre_alert_seconds,
-                        post_seconds=self.recording_config.post_alert_seconds
-                    )
-                    alert.alert_video = video_path
-                    alert.save(only=[Alert.alert_video])
-                    logger.info(f"[Workflow-{self.workflow_id}] 已启动视频录制任务: {video_path}")
-                except Exception as rec_err:
-                    logger.error(f"[Workflow-{self.workflow_id}] 启动视频录制失败: {rec_err}", exc_info=True)
-            elif self.video_recorder and storage_pressure is not None:
-                logger.warning(
-                    f"[Workflow-{self.workflow_id}] 磁盘使用率 {storage_pressure.used_percent:.1f}% "
-                    "已达到停录像水位，本次告警不录像"
-                )
+        if alert_sink is not None:
+            alert_sink.submit(job)
+            self._cache_output_result(
+                node_id=node_id,
+                alert_triggered=True,
+                detection_count=detection_count,
+                trigger_reason='满足触发条件，告警已提交异步落库'
+            )
+            logger.info(f"[Workflow-{self.workflow_id}] 输出节点 {node_id} 提交告警，类型: {alert_type}, 级别: {alert_level}, 检测序列包含 {len(detection_images)} 张图片")
+            return
 
-            if getattr(alert_node, 'publish_to_mq', True):
-                enqueue_alert_delivery(alert)
+        persist_alert_jobs([job])
+        alert = job.alert
         self._cache_output_result(
             node_id=node_id,
             alert_triggered=True,
@@ -4031,8 +4210,18 @@ class WorkflowExecutor:
         logger.info(f"[Workflow-{self.workflow_id}] 测试完成，共执行 {len(final_result['nodes'])} 个节点")
         return final_result
 
-    def run_once(self, frame_nv12: np.ndarray, frame_timestamp: float, executor=None, source_code: str = None):
-        """执行单帧工作流，用于 source host 统一驱动多个工作流。"""
+    def run_once(
+        self,
+        frame_nv12: np.ndarray,
+        frame_timestamp: float,
+        executor=None,
+        source_code: str = None,
+        derived_images=None,
+    ):
+        """执行单帧工作流，用于 source host 统一驱动多个工作流。
+
+        derived_images 为 host 级共享的 DerivedFrameImages，RGB/BGR 等派生图像从中获取。
+        """
         if not self.running:
             return
 
@@ -4055,6 +4244,8 @@ class WorkflowExecutor:
             'log_collector': log_collector,
             'roi_regions': [],
         })
+        if derived_images is not None:
+            context['frame_derived'] = derived_images
 
         with self._state_lock:
             self.execution_results.clear()
@@ -4072,7 +4263,7 @@ class WorkflowExecutor:
             try:
                 self._maybe_save_detection_snapshot(context, source_code)
             except Exception as exc:  # noqa: BLE001
-                logger.debug(f"[Workflow-{self.workflow_id}] 写入检测帧快照失败（忽略）: {exc}")
+                frame_logger.debug("[Workflow-%s] 写入检测帧快照失败（忽略）: %s", self.workflow_id, exc)
 
     def _maybe_save_detection_snapshot(self, context, source_code: str):
         """周期性写入「最新检测帧」快照（带检测框 + ROI）到 detection_snapshots/{source_code}.jpg。
@@ -4187,7 +4378,16 @@ class WorkflowExecutor:
                 if os.path.exists(temp_path):
                     os.remove(temp_path)
 
+    def _record_inference_dedup(self, scope):
+        if not RESOURCE_PROFILING_ENABLED or not scope.inference_requests:
+            return
+        # 同一层的算法节点可能并行执行
+        with self._state_lock:
+            self._profile_inference_requests += scope.inference_requests
+            self._profile_inference_dedup_hits += scope.inference_dedup_hits
+
     def _record_run_once_profile(self, elapsed_ms: float):
+        self.last_run_once_ms = elapsed_ms
         if not RESOURCE_PROFILING_ENABLED:
             return
 
@@ -4204,10 +4404,17 @@ class WorkflowExecutor:
             if self._profile_run_once_count
             else 0.0
         )
+        with self._state_lock:
+            inference_requests = self._profile_inference_requests
+            dedup_hits = self._profile_inference_dedup_hits
+            self._profile_inference_requests = 0
+            self._profile_inference_dedup_hits = 0
+        dedup_hit_rate = dedup_hits / inference_requests if inference_requests else 0.0
         logger.info(
             f"[Workflow-{self.workflow_id}] run_once profile: "
             f"count={self._profile_run_once_count}, avg_ms={avg_ms:.2f}, "
-            f"max_ms={self._profile_run_once_max_ms:.2f}"
+            f"max_ms={self._profile_run_once_max_ms:.2f}, "
+            f"inference_requests={inference_requests}, dedup_hit_rate={dedup_hit_rate:.2f}"
         )
         self._profile_next_log_at = now + RESOURCE_PROFILE_LOG_INTERVAL_SECONDS
         self._profile_run_once_count = 0
@@ -4233,23 +4440,15 @@ class WorkflowExecutor:
         try:
             while self.running:
                 try:
-                    # 从 buffer 读取最新帧
-                    # peek_with_timestamp(-1) 获取最新的帧和时间戳（不消费帧，支持多 workflow 共享）
-                    peek_result = self.buffer.peek_with_timestamp(-1)
+                    # 阻塞等待比上一帧更新的帧（不消费帧，支持多 workflow 共享）；
+                    # 写端写入时会唤醒，超时只用于定期检查 running 标志
+                    peek_result = self.buffer.wait_for_newer(self.last_frame_timestamp, 0.5)
 
                     if peek_result is None:
-                        # 缓冲区为空，短暂休眠后继续
-                        time.sleep(0.01)
                         continue
 
                     frame_nv12, frame_timestamp = peek_result
 
-                    # 检查是否为新的帧（避免重复处理同一帧）
-                    if self.last_frame_timestamp is not None and frame_timestamp == self.last_frame_timestamp:
-                        # 帧未更新，短暂休眠后继续
-                        time.sleep(0.001)  # 短暂休眠避免 CPU 占用过高
-                        continue
-
                     # 更新最后处理的帧时间戳
                     self.last_frame_timestamp = frame_timestamp
 
@@ -4297,6 +4496,7 @@ class WorkflowExecutor:
             executed_nodes_snapshot = set(self.executed_nodes)
             node_results_snapshot = dict(self.node_results_cache)
 
+        plan = self._get_execution_plan()
         # 遍历所有 Alert 节点
         for node_id, node in self.nodes.items():
             if not isinstance(node, AlertNodeData):
@@ -4317,20 +4517,17 @@ class WorkflowExecutor:
 
             # 只使用当前帧真正执行的上游节点结果（不包括缓存的旧结果）
             # 这样窗口检测器统计的才是真正的算法执行次数
-            for conn in self.connections:
-                if conn['to'] == node_id:
-                    upstream_node_id = conn['from']
-                    # 关键：检查上游节点是否在当前帧被执行过
-                    # 只有在 executed_nodes 中，才说明是当前帧产生的检测结果
-                    if upstream_node_id in executed_nodes_snapshot and upstream_node_id in node_results_snapshot:
-                        upstream_result = node_results_snapshot[upstream_node_id]
-                        # 检查是否有检测
-                        if 'result' in upstream_result:
-                            detections = upstream_result['result'].get('detections', [])
-                            if detections:
-                                has_detection = True
-                                result = upstream_result['result']
-                    break
+            upstream_node_id = plan.first_upstream(node_id)
+            # 关键：检查上游节点是否在当前帧被执行过
+            # 只有在 executed_nodes 中，才说明是当前帧产生的检测结果
+            if upstream_node_id in executed_nodes_snapshot and upstream_node_id in node_results_snapshot:
+                upstream_result = node_results_snapshot[upstream_node_id]
+                # 检查是否有检测
+                if 'result' in upstream_result:
+                    detections = upstream_result['result'].get('detections', [])
+                    if detections:
+                        has_detection = True
+                        result = upstream_result['result']
 
             # 只在启用窗口检测时才记录
             # 不保存图片（图片在 Alert 节点触发时保存）
@@ -4695,14 +4892,12 @@ class WorkflowExecutor:
             detection_count = cached_output_result.get('detection_count')
             if detection_count is None:
                 detection_count = 0
-                for conn in self.connections:
-                    if conn['to'] == node_id:
-                        upstream_id = conn['from']
-                        with self._state_lock:
-                            cached = self.node_results_cache.get(upstream_id)
-                        if cached:
-                            detection_count = len(cached.get('result', {}).get('detections', []))
-                            break
+                upstream_id = self._get_execution_plan().first_upstream(node_id)
+                if upstream_id:
+                    with self._state_lock:
+                        cached = self.node_results_cache.get(upstream_id)
+                    if cached:
+                        detection_count = len(cached.get('result', {}).get('detections', []))
 
             has_detection = cached_output_result.get('alert_triggered')
             if has_detection is None:
@@ -4772,11 +4967,7 @@ class WorkflowExecutor:
 
         # 如果 context 中没有上游结果，从 node_results_cache 中获取
         if 'result' not in context or 'has_detection' not in context:
-            upstream_node_id = None
-            for conn in self.connections:
-                if conn['to'] == node_id:
-                    upstream_node_id = conn['from']
-                    break
+            upstream_node_id = self._get_execution_plan().first_upstream(node_id)
 
             cached_data = None
             if upstream_node_id:
@@ -0,0 +1,196 @@
+"""
+工作流执行计划 - 加载时把节点连线编译成不可变的调度结构
+
+WorkflowExecutor 每帧只遍历预先计算好的拓扑层级和邻接表，不再重复执行
+Kahn 拓扑排序，也不再线性扫描 connections 查找上下游节点。
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from app import logging
+from app.core.workflow_types import (
+    AlertNodeData,
+    DetectionFilterNodeData,
+    FunctionNodeData,
+    OutputNodeData,
+    SourceNodeData,
+    TimeScheduleNodeData,
+    WebhookNodeData,
+)
+
+logger = logging.getLogger("workflow_executor")
+
+GATE_CONDITIONS = frozenset({'detected', 'not_detected', 'true', 'false', 'yes', 'no'})
+
+# 同层节点的执行顺序（source -> roi -> algorithm -> function -> condition -> output/alert）
+NODE_TYPE_PRIORITY = MappingProxyType({
+    'source': 0,
+    'roi_draw': 1,
+    'roi': 1,  # 支持前后端两种类型名称
+    'algorithm': 2,
+    'external_api': 2,
+    'function': 3,
+    'detection_filter': 3,
+    'condition': 4,
+    'time_schedule': 4,
+    'output': 5,
+    'alert': 5,
+    'webhook': 6,
+})
+
+# 由上游分支自动执行的终端节点，不进入拓扑层级
+_BRANCH_TERMINAL_NODE_CLASSES = (OutputNodeData, AlertNodeData, WebhookNodeData)
+# 结果转换节点需要等待全部上游，所在层级不能并行
+_SERIAL_LEVEL_NODE_CLASSES = (FunctionNodeData, DetectionFilterNodeData)
+
+
+def connection_endpoints(conn: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """兼容 from/to 与 from_node_id/to_node_id 两种连线格式。"""
+    return (
+        conn.get('from') or conn.get('from_node_id'),
+        conn.get('to') or conn.get('to_node_id'),
+    )
+
+
+def get_node_type_priority(node) -> int:
+    if not node:
+        return 999
+    return NODE_TYPE_PRIORITY.get(node.node_type, 999)
+
+
+@dataclass(frozen=True)
+class WorkflowExecutionPlan:
+    """一个工作流图的不可变调度计划。
+
+    predecessors 保留连线顺序和重复边，与逐条扫描 connections 的结果一致；
+    successors 与 execution_graph 相同，保存 (target, condition)。
+    """
+
+    levels: Tuple[Tuple[str, ...], ...]
+    level_parallel: Tuple[bool, ...]
+    predecessors: Mapping[str, Tuple[Optional[str], ...]]
+    successors: Mapping[str, Tuple[Tuple[str, Optional[str]], ...]]
+    gated_incoming: Mapping[str, Tuple[Optional[str], str]]
+    ancestors: Mapping[str, FrozenSet[str]]
+    handlers: Mapping[str, Callable]
+    source_node_ids: Tuple[str, ...]
+    time_schedule_node_ids: Tuple[str, ...]
+
+    def upstream_of(self, node_id: str) -> Tuple[Optional[str], ...]:
+        return self.predecessors.get(node_id, ())
+
+    def first_upstream(self, node_id: str) -> Optional[str]:
+        upstream = self.predecessors.get(node_id)
+        return upstream[0] if upstream else None
+
+    def has_gated_incoming(self, node_id: str) -> bool:
+        return node_id in self.gated_incoming
+
+    def first_gated_incoming(self, node_id: str) -> Tuple[Optional[str], Optional[str]]:
+        return self.gated_incoming.get(node_id, (None, None))
+
+    def ancestors_of(self, node_id: str) -> FrozenSet[str]:
+        """返回节点自身及其全部上游祖先。"""
+        return self.ancestors.get(node_id) or frozenset({node_id})
+
+
+def _build_topology_levels(nodes, successors, predecessors, workflow_id) -> List[List[str]]:
+    remaining_nodes = {
+        node_id for node_id, node in nodes.items()
+        if not isinstance(node, _BRANCH_TERMINAL_NODE_CLASSES)
+    }
+    # 只统计两端都在子集中的连接
+    indegrees = {node_id: 0 for node_id in remaining_nodes}
+    for node_id in remaining_nodes:
+        for from_id in predecessors.get(node_id, ()):
+            if from_id in remaining_nodes:
+                indegrees[node_id] += 1
+
+    levels = []
+    while remaining_nodes:
+        current_level = [node_id for node_id in remaining_nodes if indegrees[node_id] == 0]
+        if not current_level:
+            # 没有入度为0的节点，说明存在循环依赖：强制添加剩余节点到当前层级
+            logger.warning(f"[Workflow-{workflow_id}] 检测到循环依赖，剩余节点: {remaining_nodes}")
+            current_level = list(remaining_nodes)
+
+        current_level.sort(key=lambda nid: get_node_type_priority(nodes.get(nid)))
+        levels.append(current_level)
+
+        for node_id in current_level:
+            remaining_nodes.remove(node_id)
+            for next_id, _condition in successors.get(node_id, ()):
+                if next_id in indegrees:
+                    indegrees[next_id] -= 1
+    return levels
+
+
+def _collect_ancestors(node_ids: Iterable[str], predecessors) -> Dict[str, FrozenSet[str]]:
+    ancestors = {}
+    for node_id in node_ids:
+        scope = {node_id}
+        pending = [node_id]
+        while pending:
+            current_id = pending.pop()
+            for upstream_id in predecessors.get(current_id, ()):
+                if upstream_id and upstream_id not in scope:
+                    scope.add(upstream_id)
+                    pending.append(upstream_id)
+        ancestors[node_id] = frozenset(scope)
+    return ancestors
+
+
+def compile_workflow_plan(
+    nodes: Dict[str, Any],
+    connections: List[Dict[str, Any]],
+    node_handlers: Optional[Dict[str, Callable]] = None,
+    workflow_id=None,
+) -> WorkflowExecutionPlan:
+    """把节点与连线编译成 WorkflowExecutionPlan。"""
+    predecessors: Dict[str, List[Optional[str]]] = {}
+    successors: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+    gated_incoming: Dict[str, Tuple[Optional[str], str]] = {}
+    for conn in connections or ():
+        from_id, to_id = connection_endpoints(conn)
+        condition = conn.get('condition')
+        predecessors.setdefault(to_id, []).append(from_id)
+        if from_id is not None:
+            successors.setdefault(from_id, []).append((to_id, condition))
+        if condition in GATE_CONDITIONS and to_id not in gated_incoming:
+            gated_incoming[to_id] = (from_id, condition)
+
+    frozen_predecessors = {node_id: tuple(items) for node_id, items in predecessors.items()}
+    frozen_successors = {node_id: tuple(items) for node_id, items in successors.items()}
+
+    levels = _build_topology_levels(nodes, frozen_successors, frozen_predecessors, workflow_id)
+    level_parallel = tuple(
+        not any(isinstance(nodes.get(node_id), _SERIAL_LEVEL_NODE_CLASSES) for node_id in level)
+        for level in levels
+    )
+
+    # 祖先集合同时覆盖只出现在连线中的节点，与逐条扫描连线的语义保持一致
+    ancestor_keys = set(nodes.keys())
+    ancestor_keys.update(node_id for node_id in frozen_predecessors if node_id)
+
+    handlers = {}
+    for node_id, node in nodes.items():
+        handler = (node_handlers or {}).get(node.node_type)
+        if handler is not None:
+            handlers[node_id] = handler
+
+    return WorkflowExecutionPlan(
+        levels=tuple(tuple(level) for level in levels),
+        level_parallel=level_parallel,
+        predecessors=MappingProxyType(frozen_predecessors),
+        successors=MappingProxyType(frozen_successors),
+        gated_incoming=MappingProxyType(gated_incoming),
+        ancestors=MappingProxyType(_collect_ancestors(ancestor_keys, frozen_predecessors)),
+        handlers=MappingProxyType(handlers),
+        source_node_ids=tuple(
+            node_id for node_id, node in nodes.items() if isinstance(node, SourceNodeData)
+        ),
+        time_schedule_node_ids=tuple(
+            node_id for node_id, node in nodes.items() if isinstance(node, TimeScheduleNodeData)
+        ),
+    )
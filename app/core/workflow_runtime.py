@@ -1,5 +1,5 @@
 from copy import deepcopy
-from typing import Iterable, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 SOURCE_NODE_TYPES = {'source', 'videosource', 'video_source'}
@@ -273,3 +273,29 @@ def build_workflow_signature(workflows: Iterable) -> Tuple[Tuple[int, int], ...]
         signature.append((int(workflow_id), int(config_version)))
 
     return tuple(sorted(signature))
+
+
+def diff_workflow_signatures(old_signature: Iterable, new_signature: Iterable) -> List[Dict[str, int]]:
+    """比较两个签名，得到让运行中的 source host 就地更新所需的控制命令。
+
+    先 remove（尽早释放模型），再 replace（配置版本变化），最后 add。
+    """
+    old_versions = dict(old_signature or ())
+    new_versions = dict(new_signature or ())
+    commands = []
+    for workflow_id in sorted(set(old_versions) - set(new_versions)):
+        commands.append({'command': 'remove', 'workflow_id': workflow_id})
+    for workflow_id in sorted(set(old_versions) & set(new_versions)):
+        if old_versions[workflow_id] != new_versions[workflow_id]:
+            commands.append({
+                'command': 'replace',
+                'workflow_id': workflow_id,
+                'config_version': new_versions[workflow_id],
+            })
+    for workflow_id in sorted(set(new_versions) - set(old_versions)):
+        commands.append({
+            'command': 'add',
+            'workflow_id': workflow_id,
+            'config_version': new_versions[workflow_id],
+        })
+    return commands
@@ -44,6 +44,7 @@ from app.core.decoder import DecoderFactory
 from app.core.decoder.async_dec import SOFTWARE_DECODE_FALLBACK_EXIT_CODE
 from app.core.decoder.base import DecoderStatus
 from app.core.hw_decode_budget import NVDEC_DECODER_TYPES, RKMPP_DECODER_TYPES
+from app.core.packet_ringbuffer import PacketRecordingSink, attach_packet_ringbuffer, packet_recording_enabled
 from app.core.ringbuffer import VideoRingBuffer
 from app.core.streamer import StreamerFactory  # 使用工厂模式
 from app.core.utils import save_frame
@@ -87,6 +88,9 @@ class DecoderWorker:
 
         self.analysis_buffer = None
         self.recording_buffer = None
+        # packet 录制模式：直接缓存拉流码流，不经过解码和 JPEG 编码
+        self.packet_recording_buffer = None
+        self.packet_recording_sink = None
         self.streamer = None
         self.decoder = None
         self.running = False
@@ -136,7 +140,7 @@ class DecoderWorker:
             analysis_fps = self.analysis_target_fps
 
         required_fps = analysis_fps
-        if self.recording_buffer_name:
+        if self.recording_buffer_name and not self._uses_packet_recording():
             required_fps = max(required_fps, self.recording_target_fps)
         return min(source_fps, required_fps)
 
@@ -190,7 +194,19 @@ class DecoderWorker:
             shm_name = self.analysis_buffer_name if os.name == 'nt' else f"/{self.analysis_buffer_name}"
             resource_tracker.unregister(shm_name, 'shared_memory')
 
-            if self.recording_buffer_name:
+            if self.recording_buffer_name and self._uses_packet_recording():
+                self.packet_recording_buffer = attach_packet_ringbuffer(self.recording_buffer_name)
+                if self.packet_recording_buffer is not None:
+                    logger.info(
+                        f"已连接录制缓冲区: {self.recording_buffer_name} "
+                        f"(packet {self.packet_recording_buffer.codec}, "
+                        f"capacity={self.packet_recording_buffer.capacity}, "
+                        f"data={self.packet_recording_buffer.data_capacity / 1024 / 1024:.0f}MB)"
+                    )
+                    shm_name = self.recording_buffer_name if os.name == 'nt' else f"/{self.recording_buffer_name}"
+                    resource_tracker.unregister(shm_name, 'shared_memory')
+
+            if self.recording_buffer_name and self.packet_recording_buffer is None:
                 self.recording_buffer = CompressedVideoRingBuffer(
                     name=self.recording_buffer_name,
                     create=False,
@@ -234,6 +250,8 @@ class DecoderWorker:
 
             if self.recording_buffer:
                 logger.info(f"录制采样模式: 按目标帧率 ({self.recording_target_fps} fps)")
+            elif self.packet_recording_buffer is not None:
+                logger.info("录制采样模式: 压缩域码流（全部访问单元，无需解码）")
 
         except Exception as e:
             logger.error(f"初始化失败: {e}", exc_info=True)
@@ -255,6 +273,11 @@ class DecoderWorker:
             return 'http-flv'
         return 'file'
 
+    def _uses_packet_recording(self) -> bool:
+        return bool(self.recording_buffer_name) and packet_recording_enabled(
+            self.decoder_config.get('input_format', 'h264')
+        )
+
     def _direct_rtsp_eligible(self) -> bool:
         decoder_type = str(
             self.decoder_config.get('type', VIDEO_DECODER_TYPE)
@@ -267,6 +290,8 @@ class DecoderWorker:
         }
         return (
             self.direct_rtsp_enabled
+            # 单阶段链路没有 streamer，拿不到压缩码流
+            and getattr(self, 'packet_recording_buffer', None) is None
             and self._resolved_stream_type() == 'rtsp'
             and decoder_type in ffmpeg_direct_types
             and not bool(
@@ -369,6 +394,9 @@ class DecoderWorker:
         self.direct_rtsp_active = direct_rtsp
         if self.streamer is not None:
             self.streamer.add_packet_handler(self.decoder.send_packet)
+            if self.packet_recording_buffer is not None:
+                self.packet_recording_sink = PacketRecordingSink(self.packet_recording_buffer)
+                self.streamer.add_packet_handler(self.packet_recording_sink.send_packet)
         mode = '单阶段 RTSP' if direct_rtsp else '两阶段'
         logger.info(
             f"已创建解码路径: {decoder_type} ({width}x{height}, {mode})"
@@ -637,16 +665,19 @@ class DecoderWorker:
                                 recording_written_count += 1
                             except Exception as recording_error:
                                 logger.warning(
-                                    f"录制缓冲区写入失败，已跳过当前帧: {recording_error}"
+                                    "录制缓冲区写入失败，已跳过当前帧: %s",
+                                    recording_error,
                                 )
 
                         if frame_count % 100 == 0 and wrote_analysis:
                             logger.info(
-                                f"已解码 {frame_count} 帧, "
-                                f"分析写入 {analysis_written_count} 帧, "
-                                f"分析跳过 {analysis_skipped_count} 帧, "
-                                f"录制写入 {recording_written_count} 帧, "
-                                f"最新帧龄 {latest_frame_age_ms:.1f} ms"
+                                "已解码 %s 帧, "
+                                "分析写入 %s 帧, "
+                                "分析跳过 %s 帧, "
+                                "录制写入 %s 帧, "
+                                "最新帧龄 %.1f ms",
+                                frame_count, analysis_written_count, analysis_skipped_count,
+                                recording_written_count, latest_frame_age_ms,
                             )
                             self.snapshot(frame)
 
@@ -664,10 +695,12 @@ class DecoderWorker:
                             if time_since_start > self.fps_check_grace_period:
                                 if self.expected_fps > 0 and recent_fps < self.expected_fps * LOW_FPS_RATIO:
                                     logger.warning(
-                                        f"帧率异常: 期望 {self.expected_fps:.2f} fps, "
-                                        f"最近10秒 {recent_fps:.2f} fps "
-                                        f"({recent_fps/self.expected_fps*100:.1f}%), "
-                                        f"整体平均 {overall_fps:.2f} fps"
+                                        "帧率异常: 期望 %.2f fps, "
+                                        "最近10秒 %.2f fps "
+                                        "(%.1f%%), "
+                                        "整体平均 %.2f fps",
+                                        self.expected_fps, recent_fps,
+                                        recent_fps/self.expected_fps*100, overall_fps,
                                     )
 
                             last_fps_check_time = current_time
@@ -675,13 +708,16 @@ class DecoderWorker:
 
                             # 输出当前状态（同时显示两种帧率）
                             logger.info(
-                                f"解码状态: 已解码 {frame_count} 帧, "
-                                f"分析写入 {analysis_written_count} 帧, "
-                                f"录制写入 {recording_written_count} 帧, "
-                                f"队列淘汰 {self.decoder.frames_dropped} 帧, "
-                                f"最新帧龄 {latest_frame_age_ms:.1f} ms, "
-                                f"最近10秒 {recent_fps:.2f} fps, "
-                                f"整体平均 {overall_fps:.2f} fps"
+                                "解码状态: 已解码 %s 帧, "
+                                "分析写入 %s 帧, "
+                                "录制写入 %s 帧, "
+                                "队列淘汰 %s 帧, "
+                                "最新帧龄 %.1f ms, "
+                                "最近10秒 %.2f fps, "
+                                "整体平均 %.2f fps",
+                                frame_count, analysis_written_count, recording_written_count,
+                                self.decoder.frames_dropped, latest_frame_age_ms, recent_fps,
+                                overall_fps,
                             )
 
                         if RESOURCE_PROFILING_ENABLED and time.monotonic() >= profile_next_log_at:
@@ -691,12 +727,15 @@ class DecoderWorker:
 
                             logger.info(
                                 "Decoder profile: "
-                                f"get_frame_count={profile_counts['get_frame']}, "
-                                f"avg_get_frame_ms={_avg_ms('get_frame'):.2f}, "
-                                f"analysis_writes={profile_counts['analysis_write']}, "
-                                f"avg_analysis_write_ms={_avg_ms('analysis_write'):.2f}, "
-                                f"recording_writes={profile_counts['recording_write']}, "
-                                f"avg_recording_write_ms={_avg_ms('recording_write'):.2f}"
+                                "get_frame_count=%s, "
+                                "avg_get_frame_ms=%.2f, "
+                                "analysis_writes=%s, "
+                                "avg_analysis_write_ms=%.2f, "
+                                "recording_writes=%s, "
+                                "avg_recording_write_ms=%.2f",
+                                profile_counts['get_frame'], _avg_ms('get_frame'),
+                                profile_counts['analysis_write'], _avg_ms('analysis_write'),
+                                profile_counts['recording_write'], _avg_ms('recording_write'),
                             )
                             profile_next_log_at = time.monotonic() + RESOURCE_PROFILE_LOG_INTERVAL_SECONDS
                             for key in profile_counts:
@@ -836,6 +875,15 @@ class DecoderWorker:
             except Exception as e:
                 logger.error(f"关闭录制缓冲区失败: {e}")
 
+        if self.packet_recording_buffer is not None:
+            try:
+                self.packet_recording_buffer.close()
+                logger.info("已断开压缩域录制缓冲区连接")
+            except Exception as e:
+                logger.error(f"关闭压缩域录制缓冲区失败: {e}")
+            self.packet_recording_buffer = None
+            self.packet_recording_sink = None
+
         logger.info("资源清理完成")
 
     def signal_handler(self, signum, frame):
@@ -10,7 +10,12 @@ import numpy as np
 from app import logger
 from app.config import VIDEO_FRAME_PIXEL_FORMAT
 from app.core.algorithm import BaseAlgorithm
-from app.core.frame_utils import detect_frame_pixel_format, frame_to_rgb, infer_frame_dimensions
+from app.core.frame_utils import (
+    crop_frame_to_rgb,
+    detect_frame_pixel_format,
+    frame_to_rgb,
+    infer_frame_dimensions,
+)
 from app.core.model_resolver import get_model_resolver
 from app.core.ocr_backend import (
     PaddleOCRBackend,
@@ -23,7 +28,6 @@ from app.core.ocr_backend import (
 )
 from app.core.ocr_runtime import OCR_BACKEND_RKNN
 from app.user_scripts.common.roi import (
-    crop_frame,
     expand_and_clip_box,
     filter_items_by_regions,
     remap_detections_to_full_frame,
@@ -168,12 +172,16 @@ class OCRAlgorithm(BaseAlgorithm):
             },
         }
 
-    def _convert_frame_rgb(self, frame: np.ndarray) -> np.ndarray:
+    def _frame_format(self, frame: np.ndarray) -> Tuple[str, int, int]:
         pixel_format = detect_frame_pixel_format(
             frame,
             pixel_format=self.config.get("pixel_format", VIDEO_FRAME_PIXEL_FORMAT),
         )
         frame_width, frame_height = infer_frame_dimensions(frame, pixel_format=pixel_format)
+        return pixel_format, frame_width, frame_height
+
+    def _convert_frame_rgb(self, frame: np.ndarray) -> np.ndarray:
+        pixel_format, frame_width, frame_height = self._frame_format(frame)
         return frame_to_rgb(
             frame,
             pixel_format=pixel_format,
@@ -325,16 +333,24 @@ class OCRAlgorithm(BaseAlgorithm):
             pruned_count = len(candidates) - max_candidates
             candidates = candidates[:max_candidates]
 
-        frame_rgb = self._convert_frame_rgb(frame)
+        # 只转换各裁剪区域，不做整帧 RGB 转换
+        pixel_format, frame_width, frame_height = self._frame_format(frame)
+        frame_shape = (frame_height, frame_width, 3)
         crops = []
         for candidate in candidates:
-            crop_box = expand_and_clip_box(candidate["box"], frame_rgb.shape, expand_ratio)
+            crop_box = expand_and_clip_box(candidate["box"], frame_shape, expand_ratio)
             if crop_box is None:
                 continue
             x1, y1, x2, y2 = crop_box
             if (x2 - x1) < min_crop_side or (y2 - y1) < min_crop_side:
                 continue
-            cropped = crop_frame(frame_rgb, crop_box)
+            cropped = crop_frame_to_rgb(
+                frame,
+                crop_box,
+                pixel_format,
+                width=frame_width,
+                height=frame_height,
+            )
             if cropped.size == 0:
                 continue
             crops.append({
@@ -354,16 +370,16 @@ class OCRAlgorithm(BaseAlgorithm):
         last_success_metadata: Dict[str, Any] = {}
         score_threshold = float(self.ocr_config.get("recognition_score_threshold") or 0)
 
-        for index, crop in enumerate(crops):
+        batched = callable(getattr(self.backend, "infer_crops", None))
+        outcomes = self._infer_crops([crop["crop_rgb"] for crop in crops])
+        for index, (crop, outcome) in enumerate(zip(crops, outcomes)):
             crop_boxes.append(list(crop["crop_box"]))
-            try:
-                crop_detections, _details, infer_metadata = self.backend.infer(crop["crop_rgb"])
-            except Exception as exc:
+            if isinstance(outcome, Exception):
                 failed += 1
                 if first_error is None:
-                    first_error = str(exc)
-                logger.warning("[OCR] 裁剪推理失败: crop=%s error=%s", index, exc, exc_info=True)
+                    first_error = str(outcome)
                 continue
+            crop_detections, _details, infer_metadata = outcome
             infer_metadata = infer_metadata or {}
             if infer_metadata.get("overloaded"):
                 failed += 1
@@ -401,6 +417,7 @@ class OCRAlgorithm(BaseAlgorithm):
             "successful_inferences": successful,
             "failed_inferences": failed,
             "crop_boxes": crop_boxes,
+            "batched_inference": batched,
             "expand_ratio": expand_ratio,
             "execution_state": execution_state,
             "skipped": False,
@@ -425,6 +442,34 @@ class OCRAlgorithm(BaseAlgorithm):
             "metadata": metadata,
         }
 
+    def _infer_crops(self, crop_images: List[np.ndarray]) -> list:
+        """全部裁剪图一次批量推理；返回与输入对齐的结果，失败项为异常对象。
+
+        后端没有 infer_crops 时逐张推理，单张失败不影响其余裁剪图。
+        """
+        if callable(getattr(self.backend, "infer_crops", None)):
+            try:
+                results = list(self.backend.infer_crops(crop_images))
+                if len(results) != len(crop_images):
+                    raise RuntimeError(
+                        f"OCR 批量推理返回 {len(results)} 个结果，与裁剪图数量 {len(crop_images)} 不符"
+                    )
+                return results
+            except Exception as exc:
+                logger.warning(
+                    "[OCR] 批量裁剪推理失败: count=%s error=%s", len(crop_images), exc, exc_info=True
+                )
+                return [exc] * len(crop_images)
+
+        outcomes = []
+        for index, crop_image in enumerate(crop_images):
+            try:
+                outcomes.append(self.backend.infer(crop_image))
+            except Exception as exc:
+                logger.warning("[OCR] 裁剪推理失败: crop=%s error=%s", index, exc, exc_info=True)
+                outcomes.append(exc)
+        return outcomes
+
     def process(self, frame: np.ndarray, roi_regions: list = None, upstream_results: dict = None) -> dict:
         started_at = time.perf_counter()
         try:
@@ -1,13 +1,12 @@
 """
 脚本算法插件 - 执行用户自定义Python脚本
 """
-import inspect
 import traceback
 import time
 import uuid
 import numpy as np
 
-from app import logger
+from app import get_frame_logger, logger
 from app.config import VIDEO_FRAME_PIXEL_FORMAT, WORKFLOW_FRAME_LOGS_ENABLED
 from app.core.algorithm import BaseAlgorithm
 from app.core.cv2_compat import cv2, require_cv2
@@ -17,11 +16,13 @@ from app.core.frame_utils import (
     infer_frame_dimensions,
     rgb_to_frame_format,
 )
-from app.core.script_loader import get_script_loader, ScriptLoadError
+from app.core.script_loader import get_script_loader, ScriptCallLayout, ScriptLoadError
 from app.core.resource_limiter import get_script_executor
 from app.core.hook_manager import get_hook_manager
 from app.core.model_resolver import get_model_resolver
 
+frame_logger = get_frame_logger(logger.name)
+
 
 class ScriptAlgorithm(BaseAlgorithm):
     """
@@ -109,7 +110,7 @@ class ScriptAlgorithm(BaseAlgorithm):
 
         # 如果没有 script_path，跳过加载（插件管理器扫描时可能没有完整配置）
         if not self.script_path:
-            logger.debug(f"[{self.name}] 未指定 script_path，跳过脚本加载")
+            logger.debug("[%s] 未指定 script_path，跳过脚本加载", self.name)
             return
 
         logger.info(
@@ -181,6 +182,12 @@ class ScriptAlgorithm(BaseAlgorithm):
             raise ScriptLoadError(f"脚本缺少必需的函数: {self.entry_function}")
 
         self.process_func = getattr(self.script_module, self.entry_function)
+        # 入口函数签名只在加载时解析一次，逐帧直接按布局组装参数
+        self._process_call_layout = loader.get_call_layout(
+            self.script_path,
+            self.entry_function,
+            isolate_key=self.script_loader_key,
+        )
 
         # 获取执行器
         self.executor = get_script_executor(timeout=self.timeout, memory_limit_mb=self.memory_limit)
@@ -191,6 +198,14 @@ class ScriptAlgorithm(BaseAlgorithm):
         # 算法ID（从config获取，用于Hook）
         self.algorithm_id = self.config.get('id')
 
+    def _get_process_call_layout(self) -> ScriptCallLayout:
+        """返回 process_func 的调用布局；process_func 被替换（如脚本重载）时重新解析。"""
+        layout = getattr(self, '_process_call_layout', None)
+        if layout is None or layout.func is not self.process_func:
+            layout = ScriptCallLayout.for_callable(self.process_func)
+            self._process_call_layout = layout
+        return layout
+
     def process(self, frame: np.ndarray, roi_regions: list = None, upstream_results: dict = None, frame_timestamp=None) -> dict:
         """
         处理帧（执行脚本）
@@ -240,8 +255,10 @@ class ScriptAlgorithm(BaseAlgorithm):
 
         # 2. 执行脚本
         try:
-            sig = inspect.signature(self.process_func)
-            if 'frame_rgb' in sig.parameters or 'frame_bgr' in sig.parameters:
+            call_layout = self._get_process_call_layout()
+            wants_frame_rgb = call_layout.accepts('frame_rgb')
+            wants_frame_bgr = call_layout.accepts('frame_bgr')
+            if wants_frame_rgb or wants_frame_bgr:
                 if frame_rgb is None:
                     frame_rgb = frame_to_rgb(
                         frame_for_script,
@@ -261,17 +278,14 @@ class ScriptAlgorithm(BaseAlgorithm):
                 'pixel_format': input_pixel_format,
                 'frame_timestamp': frame_timestamp,
             }
-            if 'frame_rgb' in sig.parameters:
+            if wants_frame_rgb:
                 all_args['frame_rgb'] = frame_rgb
-            if 'frame_bgr' in sig.parameters and frame_rgb is not None:
+            if wants_frame_bgr and frame_rgb is not None:
                 require_cv2()
                 all_args['frame_bgr'] = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
-            script_args = {}
-            for param_name in sig.parameters:
-                if param_name in all_args:
-                    script_args[param_name] = all_args[param_name]
+            script_args = call_layout.build_kwargs(all_args)
 
-            logger.debug(f"[{self.name}] 调用脚本函数参数: {list(script_args.keys())}")
+            frame_logger.debug("[%s] 调用脚本函数参数: %s", self.name, script_args.keys())
 
             # 执行（带资源限制）
             result, exec_time_ms, success, error = self.executor.execute(
@@ -288,7 +302,7 @@ class ScriptAlgorithm(BaseAlgorithm):
                 )
                 return {'detections': []}
 
-            logger.debug(f"[{self.name}] 脚本执行成功，耗时 {exec_time_ms:.2f}ms")
+            frame_logger.debug("[%s] 脚本执行成功，耗时 %.2fms", self.name, exec_time_ms)
 
             # 3. 验证返回结果格式
             if not isinstance(result, dict):
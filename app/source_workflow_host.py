@@ -3,9 +3,14 @@
 
 一个 source 只启动一个 host，host 读取一次最新帧并在进程内依次驱动该 source
 下所有激活工作流，避免为每个工作流重复起进程和重复读取 ring buffer。
+工作流增删或配置变更时，orchestrator 经 stdin 下发 add/remove/replace 命令，
+host 就地替换对应的 runner，其余工作流的模型和窗口/跟踪状态不受影响。
 """
 import argparse
+import json
+import math
 import os
+import queue
 import signal
 import sys
 import threading
@@ -17,16 +22,29 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import logger
 from app.config import (
+    ALERT_SINK_BATCH_SIZE,
+    ALERT_SINK_QUEUE_SIZE,
+    ALERT_SINK_WORKERS,
     ANALYSIS_BUFFER_SECONDS,
     ANALYSIS_TARGET_FPS,
+    RESOURCE_PROFILE_LOG_INTERVAL_SECONDS,
+    RESOURCE_PROFILING_ENABLED,
+    SOURCE_HOST_ADAPTIVE_SCHEDULING,
+    SOURCE_HOST_SHARED_FRAME_CACHE,
+    SOURCE_HOST_STATUS_INTERVAL_SECONDS,
     SOURCE_HOST_WORKFLOW_NODE_WORKERS,
     VIDEO_FRAME_PIXEL_FORMAT,
     WORKFLOW_ZERO_COPY_FRAMES,
     SOURCE_ROTATION_STARTUP_TIMEOUT_SECONDS,
     DETECTION_SNAPSHOT_SAVE_PATH,
 )
+from app.core.alert_sink import AlertSink
 from app.core.database_models import VideoSource, Workflow
+from app.core.external_api_client import close_external_api_clients, get_external_api_stats
+from app.core.frame_cache import DerivedFrameImages, SharedFrameCache
+from app.core.frame_utils import normalize_pixel_format
 from app.core.ringbuffer import VideoRingBuffer
+from app.core.roi_mask_cache import get_roi_mask_cache_stats
 from app.core.workflow_executor import WorkflowExecutor
 from app.core.workflow_runtime import extract_source_id_from_workflow_data
 
@@ -36,7 +54,142 @@ WORKFLOW_MAX_CONSECUTIVE_ERRORS = 10
 BUFFER_CONNECT_MAX_RETRIES = 10
 BUFFER_CONNECT_RETRY_INTERVAL_SECONDS = 1.0
 RUNNER_CLEANUP_WAIT_TIMEOUT_SECONDS = 5.0
-FRAME_POLL_INTERVAL_SECONDS = 0.01
+# 等待新帧的最长阻塞时间；写端每写一帧都会唤醒，超时只用于周期性检查重试和退出
+FRAME_WAIT_TIMEOUT_SECONDS = 0.5
+# 自适应调度：耗时 EWMA 系数、每帧预算余量、重节点判定占比、步长上限与重新规划周期
+ADAPTIVE_EWMA_ALPHA = 0.2
+ADAPTIVE_BUDGET_HEADROOM = 0.9
+ADAPTIVE_HEAVY_NODE_SHARE = 0.25
+ADAPTIVE_MAX_STRIDE = 30
+ADAPTIVE_REPLAN_INTERVAL_SECONDS = 1.0
+# host -> orchestrator 的状态行前缀，后接 "<source_id>:<json>"
+SOURCE_HOST_STATUS_PREFIX = "SOURCE_HOST_STATUS:"
+# orchestrator 经 stdin 下发的 add/remove/replace 命令处理完成后回复的确认行前缀
+SOURCE_HOST_ACK_PREFIX = "SOURCE_HOST_ACK:"
+CONTROL_COMMANDS = ('add', 'remove', 'replace')
+
+
+class AdaptiveFrameScheduler:
+    """按实测耗时为单个工作流决定帧步长和重节点步长，并统计实际帧率、丢帧和延迟。
+
+    source 的分析帧率为 input_fps，每帧预算为 1000/input_fps ms（留 10% 余量）。
+    平均每帧耗时在预算内时逐帧执行；超出时先让重节点（摊销耗时占每帧耗时
+    25% 以上的算法/外部 API 节点）每 N 帧执行一次，其余节点仍逐帧执行；
+    轻节点本身就超出预算时再降低整个工作流的帧率，每 M 帧才提交一帧。
+    enabled 为 False 时只统计，不调整步长。
+    """
+
+    def __init__(self, input_fps: float, stride_candidates=(), enabled: bool = True):
+        self.input_fps = max(1.0, float(input_fps))
+        self.enabled = enabled
+        self.stride_candidates = set(stride_candidates)
+        self.frame_stride = 1
+        self.node_strides = {}
+        self._lock = threading.Lock()
+        self._frames_since_submit = 0
+        self._run_once_ms = None
+        # node_id -> 每次 run_once 摊销的耗时（未执行记 0），反映当前步长下的实际负载
+        self._node_costs = {}
+        self._lag_ms = 0.0
+        self._next_replan_at = time.monotonic() + ADAPTIVE_REPLAN_INTERVAL_SECONDS
+        self._window_started_at = time.monotonic()
+        self._window_runs = 0
+        self.submitted_frames = 0
+        self.skipped_frames = 0
+        self.completed_runs = 0
+
+    @property
+    def frame_budget_ms(self) -> float:
+        return 1000.0 / self.input_fps * ADAPTIVE_BUDGET_HEADROOM
+
+    def should_submit(self) -> bool:
+        """host 每收到一帧调用一次；按帧步长决定这一帧是否交给该工作流。"""
+        with self._lock:
+            if self.frame_stride > 1 and self._frames_since_submit + 1 < self.frame_stride:
+                self._frames_since_submit += 1
+                self.skipped_frames += 1
+                return False
+            self._frames_since_submit = 0
+            self.submitted_frames += 1
+            return True
+
+    def record_run(self, run_once_ms, node_times, frame_timestamp: float) -> bool:
+        """记录一次 run_once；重新规划后步长有变化时返回 True。"""
+        with self._lock:
+            self.completed_runs += 1
+            self._window_runs += 1
+            if frame_timestamp:
+                self._lag_ms = max(0.0, (time.time() - float(frame_timestamp)) * 1000.0)
+            if run_once_ms is None:
+                return False
+            self._run_once_ms = _ewma(self._run_once_ms, float(run_once_ms))
+            for node_id in self.stride_candidates:
+                cost = float(node_times.get(node_id, 0) or 0)
+                self._node_costs[node_id] = _ewma(self._node_costs.get(node_id), cost)
+
+            now = time.monotonic()
+            if not self.enabled or now < self._next_replan_at:
+                return False
+            self._next_replan_at = now + ADAPTIVE_REPLAN_INTERVAL_SECONDS
+            previous = (self.frame_stride, self.node_strides)
+            self.frame_stride, self.node_strides = self._plan()
+            return (self.frame_stride, self.node_strides) != previous
+
+    def _plan(self):
+        budget = self.frame_budget_ms
+        # 当前步长下测得的是摊销耗时，乘回步长得到逐帧执行时的估计
+        full_costs = {
+            node_id: cost * self.node_strides.get(node_id, 1)
+            for node_id, cost in self._node_costs.items()
+        }
+        total = self._run_once_ms + sum(
+            full_costs[node_id] - cost for node_id, cost in self._node_costs.items()
+        )
+        if total <= budget:
+            return 1, {}
+
+        heavy = {
+            node_id: cost
+            for node_id, cost in full_costs.items()
+            if cost > 0 and cost >= ADAPTIVE_HEAVY_NODE_SHARE * total
+        }
+        heavy_cost = sum(heavy.values())
+        cheap_cost = max(0.0, total - heavy_cost)
+        node_stride = 1
+        if heavy and cheap_cost < budget:
+            node_stride = min(ADAPTIVE_MAX_STRIDE, math.ceil(heavy_cost / (budget - cheap_cost)))
+        per_frame = cheap_cost + heavy_cost / node_stride
+        frame_stride = min(ADAPTIVE_MAX_STRIDE, max(1, math.ceil(per_frame / budget)))
+        node_strides = {node_id: node_stride for node_id in heavy} if node_stride > 1 else {}
+        return frame_stride, node_strides
+
+    def snapshot(self, dropped_frames: int = 0) -> dict:
+        """当前调度状态；achieved_fps 按上一次 snapshot 以来完成的帧数计算。"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._window_started_at
+            achieved_fps = self._window_runs / elapsed if elapsed > 0 else 0.0
+            self._window_started_at = now
+            self._window_runs = 0
+            return {
+                'input_fps': round(self.input_fps, 2),
+                'target_fps': round(self.input_fps / self.frame_stride, 2),
+                'achieved_fps': round(achieved_fps, 2),
+                'frame_stride': self.frame_stride,
+                'node_strides': dict(self.node_strides),
+                'run_once_ms': round(self._run_once_ms or 0.0, 2),
+                'lag_ms': round(self._lag_ms, 1),
+                'completed_runs': self.completed_runs,
+                'submitted_frames': self.submitted_frames,
+                'skipped_frames': self.skipped_frames,
+                'dropped_frames': dropped_frames,
+            }
+
+
+def _ewma(previous, value: float) -> float:
+    if previous is None:
+        return value
+    return previous + ADAPTIVE_EWMA_ALPHA * (value - previous)
 
 
 class WorkflowRunner:
@@ -47,6 +200,7 @@ class WorkflowRunner:
         node_executor=None,
         max_consecutive_errors: int = WORKFLOW_MAX_CONSECUTIVE_ERRORS,
         source_code: str = None,
+        scheduler: AdaptiveFrameScheduler = None,
     ):
         self.workflow = workflow
         self.workflow_id = workflow.id
@@ -54,9 +208,13 @@ class WorkflowRunner:
         self.node_executor = node_executor
         self.max_consecutive_errors = max_consecutive_errors
         self.source_code = source_code
+        self.scheduler = scheduler
+        # 未执行就被新帧替换的帧数
+        self.dropped_frames = 0
         self._condition = threading.Condition()
         self._pending_frame = None
         self._pending_timestamp = None
+        self._pending_derived = None
         self._failure = None
         self._running = True
         self._consecutive_errors = 0
@@ -69,13 +227,21 @@ class WorkflowRunner:
     def start(self):
         self._thread.start()
 
-    def submit_frame(self, frame_nv12, frame_timestamp: float):
+    def submit_frame(self, frame_nv12, frame_timestamp: float, derived_images=None) -> bool:
+        """提交最新帧；未执行就被替换的旧帧会释放其共享派生图像引用。"""
         with self._condition:
             if not self._running:
-                return
+                return False
+            replaced = self._pending_derived
+            if self._pending_frame is not None:
+                self.dropped_frames += 1
             self._pending_frame = frame_nv12
             self._pending_timestamp = frame_timestamp
+            self._pending_derived = derived_images
             self._condition.notify()
+        if replaced is not None:
+            replaced.release()
+        return True
 
     def pop_failure(self):
         with self._condition:
@@ -88,7 +254,11 @@ class WorkflowRunner:
             self._running = False
             self._pending_frame = None
             self._pending_timestamp = None
+            pending_derived = self._pending_derived
+            self._pending_derived = None
             self._condition.notify_all()
+        if pending_derived is not None:
+            pending_derived.release()
         self.executor.stop()
 
     def join(self, timeout=None):
@@ -123,8 +293,10 @@ class WorkflowRunner:
 
                 frame_nv12 = self._pending_frame
                 frame_timestamp = self._pending_timestamp
+                derived_images = self._pending_derived
                 self._pending_frame = None
                 self._pending_timestamp = None
+                self._pending_derived = None
 
             try:
                 self.executor.run_once(
@@ -132,8 +304,10 @@ class WorkflowRunner:
                     frame_timestamp,
                     executor=self.node_executor,
                     source_code=self.source_code,
+                    derived_images=derived_images,
                 )
                 self._consecutive_errors = 0
+                self._record_schedule(frame_timestamp)
             except Exception as exc:
                 self._consecutive_errors += 1
                 logger.warning(
@@ -149,6 +323,33 @@ class WorkflowRunner:
                     self._running = False
                 self.executor.stop()
                 return
+            finally:
+                if derived_images is not None:
+                    derived_images.release()
+
+    def _record_schedule(self, frame_timestamp: float):
+        if self.scheduler is None:
+            return
+        changed = self.scheduler.record_run(
+            self.executor.last_run_once_ms,
+            self.executor.get_last_run_node_times(),
+            frame_timestamp,
+        )
+        if changed:
+            # 在 runner 线程内下发，与 run_once 不会并发
+            self.executor.set_node_strides(self.scheduler.node_strides)
+            logger.info(
+                f"[SourceHost:{self.workflow_id}] 自适应调度: frame_stride={self.scheduler.frame_stride}, "
+                f"node_strides={self.scheduler.node_strides}, "
+                f"run_once_ms={self.executor.last_run_once_ms:.1f}, "
+                f"budget_ms={self.scheduler.frame_budget_ms:.1f}"
+            )
+
+    def get_status(self) -> dict:
+        status = {'workflow_id': self.workflow_id, 'dropped_frames': self.dropped_frames}
+        if self.scheduler is not None:
+            status.update(self.scheduler.snapshot(dropped_frames=self.dropped_frames))
+        return status
 
 
 class SourceWorkflowHost:
@@ -162,12 +363,34 @@ class SourceWorkflowHost:
         self.failed_workflows = {}
         self.ready_announced = False
         self.last_frame_timestamp = None
+        self.frame_pixel_format = normalize_pixel_format(VIDEO_FRAME_PIXEL_FORMAT)
+        self.frame_cache = SharedFrameCache() if SOURCE_HOST_SHARED_FRAME_CACHE else None
+        # orchestrator 下发的工作流热更新命令；reload 线程串行加载，避免同时加载多份模型
+        self.control_commands = queue.Queue()
+        self._deferred_commands = []
+        self._reloads = {}
+        self.reload_executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=f"source-{self.source_id}-reload",
+        )
+        self._profile_next_log_at = time.monotonic() + RESOURCE_PROFILE_LOG_INTERVAL_SECONDS
+        self._status_next_publish_at = time.monotonic() + SOURCE_HOST_STATUS_INTERVAL_SECONDS
+        self.analysis_fps = self._analysis_fps()
         self.node_executor = None
         if SOURCE_HOST_WORKFLOW_NODE_WORKERS > 0:
             self.node_executor = ThreadPoolExecutor(
                 max_workers=SOURCE_HOST_WORKFLOW_NODE_WORKERS,
                 thread_name_prefix=f"source-{self.source_id}-node",
             )
+        # 告警图片写盘与入库在 host 内异步批量执行，各工作流共享
+        self.alert_sink = None
+        if ALERT_SINK_WORKERS > 0:
+            self.alert_sink = AlertSink(
+                workers=ALERT_SINK_WORKERS,
+                queue_size=ALERT_SINK_QUEUE_SIZE,
+                batch_size=ALERT_SINK_BATCH_SIZE,
+                name=f"source-{self.source_id}-alert",
+            )
 
     def _load_workflows(self):
         workflows = []
@@ -193,19 +416,26 @@ class SourceWorkflowHost:
             f"{delay_seconds}s 后重试，原因: {error}"
         )
 
-    def _activate_workflow(self, workflow):
+    def _activate_workflow(self, workflow, executor=None):
+        """为工作流启动 runner；executor 为热更新线程预先构建好的执行器时直接使用。"""
         workflow_id = workflow.id
-        try:
-            executor = WorkflowExecutor(workflow_id)
-        except Exception as exc:
-            self._schedule_workflow_retry(workflow, exc)
-            return False
+        if executor is None:
+            try:
+                executor = WorkflowExecutor(workflow_id, alert_sink=self.alert_sink)
+            except Exception as exc:
+                self._schedule_workflow_retry(workflow, exc)
+                return False
 
         runner = WorkflowRunner(
             workflow,
             executor,
             node_executor=self.node_executor,
             source_code=self.source.source_code,
+            scheduler=AdaptiveFrameScheduler(
+                self.analysis_fps,
+                stride_candidates=executor.get_stride_candidates(),
+                enabled=SOURCE_HOST_ADAPTIVE_SCHEDULING,
+            ),
         )
         runner.start()
         self.runners[workflow_id] = runner
@@ -229,8 +459,11 @@ class SourceWorkflowHost:
             )
             self._activate_workflow(workflow)
 
+    def _analysis_fps(self) -> int:
+        return max(1, min(int(self.source.source_fps), int(ANALYSIS_TARGET_FPS)))
+
     def _setup_buffer(self):
-        analysis_fps = max(1, min(int(self.source.source_fps), int(ANALYSIS_TARGET_FPS)))
+        analysis_fps = self._analysis_fps()
         last_error = None
         for attempt in range(1, BUFFER_CONNECT_MAX_RETRIES + 1):
             try:
@@ -262,6 +495,8 @@ class SourceWorkflowHost:
 
         if self.buffer is None and last_error is not None:
             raise last_error
+        # 一个 source 只有一个 host 钉住槽位，上一个 host 异常退出遗留的钉住在这里回收
+        self.buffer.clear_pins()
 
         shm_name = self.source.analysis_buffer_name if os.name == 'nt' else f"/{self.source.analysis_buffer_name}"
         resource_tracker.unregister(shm_name, 'shared_memory')
@@ -301,7 +536,176 @@ class SourceWorkflowHost:
             if workflow is not None:
                 self._schedule_workflow_retry(workflow, failure)
 
+    def _start_control_reader(self, stream=None):
+        """在后台线程读取 orchestrator 写入 stdin 的 JSON 命令，交给主循环处理。"""
+        stream = stream if stream is not None else sys.stdin
+        if stream is None:
+            return None
+        reader = threading.Thread(
+            target=self._read_control_commands,
+            args=(stream,),
+            name=f"source-{self.source_id}-control",
+            daemon=True,
+        )
+        reader.start()
+        return reader
+
+    def _read_control_commands(self, stream):
+        try:
+            for line in iter(stream.readline, ''):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    command = json.loads(line)
+                except ValueError:
+                    logger.warning(f"[SourceHost:{self.source_id}] 忽略无法解析的控制命令: {line}")
+                    continue
+                if isinstance(command, dict):
+                    self.control_commands.put(command)
+        except (OSError, ValueError) as exc:
+            logger.warning(f"[SourceHost:{self.source_id}] 控制通道已关闭: {exc}")
+
+    def _apply_control_commands(self):
+        """收尾已完成的热更新，并处理新到达的控制命令。
+
+        同一工作流同一时间只有一个热更新在进行，期间到达的命令顺延到它完成之后。
+        """
+        self._finish_reloads()
+        pending, self._deferred_commands = self._deferred_commands, []
+        while True:
+            try:
+                pending.append(self.control_commands.get_nowait())
+            except queue.Empty:
+                break
+        for command in pending:
+            try:
+                workflow_id = int(command.get('workflow_id'))
+            except (TypeError, ValueError):
+                self._ack(command, False, error='invalid workflow_id')
+                continue
+            if workflow_id in self._reloads:
+                self._deferred_commands.append(command)
+                continue
+            self._handle_control_command(command, workflow_id)
+
+    def _handle_control_command(self, command: dict, workflow_id: int):
+        action = command.get('command')
+        if action not in CONTROL_COMMANDS:
+            self._ack(command, False, error=f'unknown command {action!r}')
+            return
+
+        if action == 'remove':
+            runner = self.runners.pop(workflow_id, None)
+            self.workflows.pop(workflow_id, None)
+            self.failed_workflows.pop(workflow_id, None)
+            if runner is None:
+                self._ack(command, True, status='not_loaded')
+                return
+            # 先停止接收新帧，模型与录像在 reload 线程里释放，不阻塞其他工作流
+            runner.stop()
+            self._submit_reload(command, workflow_id, runner, None)
+            return
+
+        try:
+            workflow = Workflow.get_by_id(workflow_id)
+        except Workflow.DoesNotExist:
+            self._ack(command, False, error='workflow not found')
+            return
+        if (
+            not workflow.is_active
+            or workflow.is_template
+            or extract_source_id_from_workflow_data(workflow.data_dict) != self.source_id
+        ):
+            self._ack(command, False, error='workflow is not active on this source')
+            return
+
+        loaded_workflow = None
+        if workflow_id in self.runners:
+            loaded_workflow = self.runners[workflow_id].workflow
+        elif workflow_id in self.failed_workflows:
+            loaded_workflow = self.failed_workflows[workflow_id]['workflow']
+        if loaded_workflow is not None and loaded_workflow.config_version == workflow.config_version:
+            status = 'unchanged' if workflow_id in self.runners else 'retry_scheduled'
+            self._ack(command, True, status=status)
+            return
+
+        runner = self.runners.pop(workflow_id, None)
+        self.failed_workflows.pop(workflow_id, None)
+        self.workflows[workflow_id] = workflow
+        if runner is not None:
+            runner.stop()
+        self._submit_reload(command, workflow_id, runner, workflow)
+
+    def _submit_reload(self, command: dict, workflow_id: int, old_runner, workflow):
+        logger.info(
+            f"[SourceHost:{self.source_id}] 热更新工作流 {workflow_id}: {command.get('command')}"
+        )
+        future = self.reload_executor.submit(self._reload_workflow, old_runner, workflow)
+        self._reloads[workflow_id] = (command, future, old_runner)
+
+    def _reload_workflow(self, old_runner, workflow):
+        """在 reload 线程中释放旧 runner 并构建新的执行器。
+
+        旧执行器必须先清理：录制器按 workflow id 在进程内共享，新旧执行器同时存在
+        会让旧执行器的清理关掉新执行器的录制器。
+        """
+        if old_runner is not None:
+            old_runner.join(timeout=RUNNER_CLEANUP_WAIT_TIMEOUT_SECONDS)
+            if not old_runner.is_alive():
+                old_runner.executor.begin_drain()
+            old_runner.cleanup(stop_first=False)
+        if workflow is None:
+            return None, None
+        try:
+            return WorkflowExecutor(workflow.id, alert_sink=self.alert_sink), None
+        except Exception as exc:
+            return None, exc
+
+    def _finish_reloads(self):
+        for workflow_id, (command, future, _) in list(self._reloads.items()):
+            if not future.done():
+                continue
+            del self._reloads[workflow_id]
+            try:
+                executor, error = future.result()
+            except Exception as exc:
+                executor, error = None, exc
+            workflow = self.workflows.get(workflow_id)
+            if command.get('command') == 'remove' or workflow is None:
+                if executor is not None:
+                    executor.cleanup()
+                if error is not None:
+                    self._ack(command, False, error=str(error))
+                else:
+                    self._ack(command, True, status='removed')
+                logger.info(f"[SourceHost:{self.source_id}] 工作流 {workflow_id} 已卸载")
+                continue
+            if executor is None:
+                self._schedule_workflow_retry(workflow, error)
+                self._ack(command, True, status='retry_scheduled', error=str(error))
+                continue
+            self._activate_workflow(workflow, executor=executor)
+            self._ack(command, True, status='loaded')
+
+    def _ack(self, command: dict, ok: bool, status: str = None, error: str = None):
+        ack = {
+            'command': command.get('command'),
+            'workflow_id': command.get('workflow_id'),
+            'config_version': command.get('config_version'),
+            'ok': ok,
+        }
+        if status is not None:
+            ack['status'] = status
+        if error is not None:
+            ack['error'] = error
+        print(
+            f"{SOURCE_HOST_ACK_PREFIX}{self.source_id}:{json.dumps(ack, ensure_ascii=False)}",
+            flush=True,
+        )
+
     def setup(self):
+        self._start_control_reader()
         self._setup_buffer()
         self._wait_for_first_frame()
         self._setup_executors()
@@ -316,10 +720,12 @@ class SourceWorkflowHost:
 
     def _wait_for_first_frame(self):
         deadline = time.monotonic() + SOURCE_ROTATION_STARTUP_TIMEOUT_SECONDS
-        while self.running and time.monotonic() < deadline:
-            if self.buffer.peek_with_timestamp(-1) is not None:
+        while self.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.buffer.wait_for_newer(None, min(remaining, FRAME_WAIT_TIMEOUT_SECONDS)) is not None:
                 return
-            time.sleep(0.05)
         if not self.running:
             raise RuntimeError("source host 在检测就绪前收到停止信号")
         raise TimeoutError(
@@ -337,33 +743,43 @@ class SourceWorkflowHost:
 
         while self.running:
             try:
+                self._apply_control_commands()
                 self._retry_failed_workflows()
                 self._collect_runner_failures()
                 self._announce_ready_if_runnable()
 
                 if not self.runners:
-                    if self.failed_workflows:
+                    if self.failed_workflows or self._reloads or self._deferred_commands:
                         time.sleep(1.0)
                         continue
                     logger.warning(f"[SourceHost:{self.source_id}] 无可运行工作流，宿主进程退出")
                     break
 
-                peek_result = self.buffer.peek_if_newer_with_timestamp(
-                    self.last_frame_timestamp,
-                    -1,
-                    copy=not WORKFLOW_ZERO_COPY_FRAMES,
-                )
-                if peek_result is None:
-                    time.sleep(FRAME_POLL_INTERVAL_SECONDS)
-                    continue
-
-                frame_nv12, frame_timestamp = peek_result
-                self.last_frame_timestamp = frame_timestamp
+                if WORKFLOW_ZERO_COPY_FRAMES:
+                    pinned = self.buffer.wait_and_pin_newer(
+                        self.last_frame_timestamp,
+                        FRAME_WAIT_TIMEOUT_SECONDS,
+                    )
+                    if pinned is None:
+                        continue
+                    self.last_frame_timestamp = pinned.timestamp
+                    try:
+                        self._dispatch_frame(pinned.frame, pinned.timestamp, pinned=pinned)
+                    finally:
+                        pinned.release()
+                else:
+                    peek_result = self.buffer.wait_for_newer(
+                        self.last_frame_timestamp,
+                        FRAME_WAIT_TIMEOUT_SECONDS,
+                    )
+                    if peek_result is None:
+                        continue
 
-                for workflow_id, runner in list(self.runners.items()):
-                    if not self.running:
-                        break
-                    runner.submit_frame(frame_nv12, frame_timestamp)
+                    frame_nv12, frame_timestamp = peek_result
+                    self.last_frame_timestamp = frame_timestamp
+                    self._dispatch_frame(frame_nv12, frame_timestamp)
+                self._log_frame_cache_profile()
+                self._publish_status()
 
             except KeyboardInterrupt:
                 logger.info(f"[SourceHost:{self.source_id}] 收到中断信号，准备退出")
@@ -376,7 +792,113 @@ class SourceWorkflowHost:
                 self.running = False
                 break
 
+    def _dispatch_frame(self, frame_nv12, frame_timestamp: float, pinned=None):
+        """把帧交给全部 runner。
+
+        pinned 为钉住的 ring buffer 槽位时，所有 runner 共享同一个零拷贝视图；
+        派生图像条目额外持有一个钉住引用，最后一个 runner 释放帧时解除钉住。
+        """
+        runners = [
+            runner for runner in self.runners.values()
+            if runner.scheduler is None or runner.scheduler.should_submit()
+        ]
+        derived_images = None
+        on_release = None
+        if pinned is not None and runners:
+            on_release = pinned.retain().release
+        if self.frame_cache is not None and runners:
+            # 每个 runner 持有一个引用，执行完或帧被替换时释放
+            derived_images = self.frame_cache.publish(
+                frame_nv12,
+                frame_timestamp,
+                self.frame_pixel_format,
+                refs=len(runners),
+                on_release=on_release,
+            )
+        elif on_release is not None:
+            # 不共享派生图像时仍需要按 runner 计数，才能知道何时解除钉住
+            derived_images = DerivedFrameImages(
+                frame_nv12,
+                frame_timestamp,
+                self.frame_pixel_format,
+                refs=len(runners),
+                on_release=on_release,
+            )
+        for runner in runners:
+            accepted = self.running and runner.submit_frame(
+                frame_nv12,
+                frame_timestamp,
+                derived_images=derived_images,
+            )
+            if not accepted and derived_images is not None:
+                derived_images.release()
+
+    def _publish_status(self):
+        """周期性向 orchestrator 报告各工作流的调度状态（stdout 状态行）。"""
+        now = time.monotonic()
+        if now < self._status_next_publish_at:
+            return
+        self._status_next_publish_at = now + SOURCE_HOST_STATUS_INTERVAL_SECONDS
+        status = {
+            'source_id': self.source_id,
+            'analysis_fps': self.analysis_fps,
+            'workflows': [runner.get_status() for runner in self.runners.values()],
+            'external_apis': get_external_api_stats(),
+        }
+        alert_sink = getattr(self, 'alert_sink', None)
+        if alert_sink is not None:
+            status['alert_sink'] = alert_sink.get_stats()
+        print(
+            f"{SOURCE_HOST_STATUS_PREFIX}{self.source_id}:{json.dumps(status, ensure_ascii=False)}",
+            flush=True,
+        )
+
+    def _log_frame_cache_profile(self):
+        if not RESOURCE_PROFILING_ENABLED or self.frame_cache is None:
+            return
+        now = time.monotonic()
+        if now < self._profile_next_log_at:
+            return
+        self._profile_next_log_at = now + RESOURCE_PROFILE_LOG_INTERVAL_SECONDS
+        stats = self.frame_cache.get_stats(reset=True)
+        logger.info(
+            f"[SourceHost:{self.source_id}] frame cache profile: "
+            f"frames={stats['frames_published']}, conversions={stats['conversions']}, "
+            f"hits={stats['hits']}, hit_rate={stats['hit_rate']:.2f}, "
+            f"live_frames={stats['live_frames']}, "
+            f"inference_requests={stats['inference_requests']}, "
+            f"inference_dedup_rate={stats['inference_dedup_rate']:.2f}"
+        )
+        roi_stats = get_roi_mask_cache_stats(reset=True)
+        logger.info(
+            f"[SourceHost:{self.source_id}] roi mask cache profile: "
+            f"hits={roi_stats['hits']}, misses={roi_stats['misses']}, "
+            f"hit_rate={roi_stats['hit_rate']:.2f}, entries={roi_stats['entries']}, "
+            f"evictions={roi_stats['evictions']}, memory_mb={roi_stats['bytes'] / 1024 / 1024:.1f}"
+        )
+
     def cleanup(self):
+        # 等进行中的热更新结束，已构建但尚未启动的执行器直接清理。
+        reload_executor = getattr(self, 'reload_executor', None)
+        if reload_executor is not None:
+            reload_executor.shutdown(wait=True, cancel_futures=True)
+            for _, future, old_runner in getattr(self, '_reloads', {}).values():
+                try:
+                    if future.cancelled():
+                        if old_runner is not None:
+                            old_runner.cleanup(stop_first=True)
+                        continue
+                    executor, _ = future.result()
+                    if executor is not None:
+                        executor.cleanup()
+                except Exception as exc:
+                    logger.error(
+                        f"[SourceHost:{self.source_id}] 清理热更新中的工作流失败: {exc}",
+                        exc_info=True,
+                    )
+            self._reloads.clear()
+            self.reload_executor = None
+
         # 先同时停止全部 runner，避免清理第一个工作流时其他工作流继续产生告警。
         for runner in self.runners.values():
             runner.stop()
@@ -399,6 +921,11 @@ class SourceWorkflowHost:
         self.failed_workflows.clear()
         self.workflows.clear()
 
+        alert_sink = getattr(self, 'alert_sink', None)
+        if alert_sink is not None:
+            alert_sink.close()
+            self.alert_sink = None
+
         if self.buffer is not None:
             try:
                 self.buffer.close()
@@ -419,6 +946,8 @@ class SourceWorkflowHost:
                 )
             self.node_executor = None
 
+        close_external_api_clients()
+
         # 源 host 停止后删除「最新检测帧」快照，让前端干净地回退到原始快照。
         try:
             code = self.source.source_code
@@ -13,6 +13,7 @@ from app.user_scripts.common.tracker import (
     ParsedDetection,
     Track,
     associate_class_aware,
+    boxes_to_array,
     confirmed_tracks,
     find_track,
     mark_matched,
@@ -109,6 +110,53 @@ class KalmanFilterXYAH:
         projected_cov = self._update_mat @ covariance @ self._update_mat.T + innovation_cov
         return projected_mean, projected_cov
 
+    def multi_predict(self, mean: np.ndarray, covariance: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched predict over stacked states: mean (N, 8), covariance (N, 8, 8)."""
+        height = mean[:, 3]
+        pos = self._std_weight_position * height
+        vel = self._std_weight_velocity * height
+        std = np.stack(
+            [pos, pos, np.full_like(height, 1e-2), pos, vel, vel, np.full_like(height, 1e-5), vel],
+            axis=1,
+        )
+        motion_cov = np.zeros_like(covariance)
+        diag = np.arange(8)
+        motion_cov[:, diag, diag] = np.square(std)
+        motion_mat = self._motion_mat(1.0)
+        mean = mean @ motion_mat.T
+        covariance = motion_mat @ covariance @ motion_mat.T + motion_cov
+        return mean, covariance
+
+    def multi_project(self, mean: np.ndarray, covariance: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        height = mean[:, 3]
+        pos = self._std_weight_position * height
+        std = np.stack([pos, pos, np.full_like(height, 1e-1), pos], axis=1)
+        update_mat = self._update_mat
+        projected_mean = mean @ update_mat.T
+        projected_cov = update_mat @ covariance @ update_mat.T
+        diag = np.arange(4)
+        projected_cov[:, diag, diag] += np.square(std)
+        return projected_mean, projected_cov
+
+    def multi_update(
+        self,
+        mean: np.ndarray,
+        covariance: np.ndarray,
+        measurement: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched update; measurement is (N, 4) in xyah."""
+        projected_mean, projected_cov = self.multi_project(mean, covariance)
+        cov_ht = covariance @ self._update_mat.T
+        kalman_gain = np.swapaxes(
+            np.linalg.solve(np.swapaxes(projected_cov, 1, 2), np.swapaxes(cov_ht, 1, 2)),
+            1,
+            2,
+        )
+        innovation = measurement - projected_mean
+        mean = mean + np.einsum("nij,nj->ni", kalman_gain, innovation)
+        covariance = covariance - kalman_gain @ projected_cov @ np.swapaxes(kalman_gain, 1, 2)
+        return mean, covariance
+
 
 def xyxy_to_xyah(box: Sequence[float]) -> np.ndarray:
     x1, y1, x2, y2 = [float(v) for v in box[:4]]
@@ -124,6 +172,130 @@ def xyah_to_xyxy(xyah: Sequence[float]) -> List[float]:
     return [cx - width / 2.0, cy - height / 2.0, cx + width / 2.0, cy + height / 2.0]
 
 
+def xyxy_to_xyah_batch(boxes: np.ndarray) -> np.ndarray:
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    width = np.maximum(1e-6, boxes[:, 2] - boxes[:, 0])
+    height = np.maximum(1e-6, boxes[:, 3] - boxes[:, 1])
+    return np.stack(
+        [boxes[:, 0] + width / 2.0, boxes[:, 1] + height / 2.0, width / height, height],
+        axis=1,
+    )
+
+
+def xyah_to_xyxy_batch(xyah: np.ndarray) -> np.ndarray:
+    xyah = np.asarray(xyah, dtype=np.float64).reshape(-1, 4)
+    height = np.maximum(1e-6, xyah[:, 3])
+    width = np.maximum(1e-6, xyah[:, 2] * height)
+    half_w = width / 2.0
+    half_h = height / 2.0
+    return np.stack(
+        [xyah[:, 0] - half_w, xyah[:, 1] - half_h, xyah[:, 0] + half_w, xyah[:, 1] + half_h],
+        axis=1,
+    )
+
+
+class KalmanTrackStore:
+    """Struct-of-arrays Kalman state: one row per track in stacked mean/covariance arrays.
+
+    Rows stay packed in [0, len); retain() compacts after pruning so predict runs as one batch.
+    """
+
+    def __init__(self, kf: KalmanFilterXYAH, capacity: int = 32) -> None:
+        self._kf = kf
+        self._means = np.zeros((capacity, 8), dtype=np.float64)
+        self._covs = np.zeros((capacity, 8, 8), dtype=np.float64)
+        self._rows: Dict[int, int] = {}
+        self._track_ids: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._track_ids)
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self._rows
+
+    def clear(self) -> None:
+        self._rows = {}
+        self._track_ids = []
+
+    def get(self, track_id: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        row = self._rows.get(track_id)
+        if row is None:
+            return None
+        return self._means[row].copy(), self._covs[row].copy()
+
+    def _grow(self, size: int) -> None:
+        capacity = len(self._means)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        means = np.zeros((capacity, 8), dtype=np.float64)
+        covs = np.zeros((capacity, 8, 8), dtype=np.float64)
+        count = len(self._track_ids)
+        means[:count] = self._means[:count]
+        covs[:count] = self._covs[:count]
+        self._means = means
+        self._covs = covs
+
+    def initiate(self, track_id: int, measurement: np.ndarray) -> None:
+        mean, cov = self._kf.initiate(measurement)
+        row = self._rows.get(track_id)
+        if row is None:
+            row = len(self._track_ids)
+            self._grow(row + 1)
+            self._rows[track_id] = row
+            self._track_ids.append(track_id)
+        self._means[row] = mean
+        self._covs[row] = cov
+
+    def predict_all(self) -> None:
+        count = len(self._track_ids)
+        if count:
+            self._means[:count], self._covs[:count] = self._kf.multi_predict(
+                self._means[:count], self._covs[:count]
+            )
+
+    def update(self, track_ids: Sequence[int], measurements: np.ndarray) -> None:
+        """Batched update for distinct track ids; ids without state are initiated instead."""
+        rows = []
+        known = []
+        for idx, track_id in enumerate(track_ids):
+            row = self._rows.get(track_id)
+            if row is None:
+                self.initiate(track_id, measurements[idx])
+            else:
+                rows.append(row)
+                known.append(idx)
+        if not rows:
+            return
+        rows = np.asarray(rows, dtype=np.intp)
+        self._means[rows], self._covs[rows] = self._kf.multi_update(
+            self._means[rows], self._covs[rows], measurements[known]
+        )
+
+    def boxes(self, tracks: Sequence[Track]) -> np.ndarray:
+        """Predicted xyxy boxes for tracks; tracks without state keep their last box."""
+        boxes = boxes_to_array([track.box for track in tracks])
+        rows = [self._rows.get(track.track_id) for track in tracks]
+        idx = [i for i, row in enumerate(rows) if row is not None]
+        if idx:
+            boxes[idx] = xyah_to_xyxy_batch(self._means[[rows[i] for i in idx], :4])
+        return boxes
+
+    def retain(self, track_ids: Iterable[int]) -> None:
+        alive = set(track_ids)
+        keep = [track_id for track_id in self._track_ids if track_id in alive]
+        if len(keep) == len(self._track_ids):
+            return
+        rows = np.asarray([self._rows[track_id] for track_id in keep], dtype=np.intp)
+        count = len(keep)
+        if count:
+            self._means[:count] = self._means[rows]
+            self._covs[:count] = self._covs[rows]
+        self._track_ids = keep
+        self._rows = {track_id: row for row, track_id in enumerate(keep)}
+
+
 class ByteTracker(BaseTracker):
     backend = BACKEND_BYTETRACK
 
@@ -155,13 +327,13 @@ class ByteTracker(BaseTracker):
         self.tracks: List[Track] = []
         self._ids = IdAllocator()
         self._kf = KalmanFilterXYAH()
-        self._kf_state: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._kf_store = KalmanTrackStore(self._kf)
         self._frame_index = 0
 
     def reset(self) -> None:
         self.tracks = []
         self._ids.reset()
-        self._kf_state = {}
+        self._kf_store.clear()
         self._frame_index = 0
 
     def update(
@@ -172,7 +344,7 @@ class ByteTracker(BaseTracker):
         self._frame_index += 1
         ts = resolve_timestamp(timestamp, self._frame_index)
         # BYTE Kalman Q/R is calibrated per frame, not per wall-clock second.
-        self._predict_all(1.0)
+        self._kf_store.predict_all()
         parsed = parse_detections(detections, self.label_filter)
         owned, fresh = split_passthrough(parsed)
         matched_ids = set()
@@ -215,28 +387,9 @@ class ByteTracker(BaseTracker):
                 self._start_track(det, ts)
 
         self.tracks = prune_tracks(self.tracks, self.max_misses, self.max_tracks)
-        alive_ids = {track.track_id for track in self.tracks}
-        self._kf_state = {
-            track_id: state for track_id, state in self._kf_state.items() if track_id in alive_ids
-        }
+        self._kf_store.retain(track.track_id for track in self.tracks)
         return confirmed_tracks(self.tracks, self.min_hits)
 
-    def _predict_all(self, dt: float) -> None:
-        for track in self.tracks:
-            state = self._kf_state.get(track.track_id)
-            if state is None:
-                mean, cov = self._kf.initiate(xyxy_to_xyah(track.box))
-            else:
-                mean, cov = state
-            mean, cov = self._kf.predict(mean, cov, dt)
-            self._kf_state[track.track_id] = (mean, cov)
-
-    def _predicted_box(self, track: Track) -> List[float]:
-        state = self._kf_state.get(track.track_id)
-        if state is None:
-            return list(track.box)
-        return xyah_to_xyxy(state[0])
-
     def _associate(
         self,
         tracks: List[Track],
@@ -251,25 +404,24 @@ class ByteTracker(BaseTracker):
             tracks,
             detections,
             iou_threshold,
-            box_fn=self._predicted_box,
+            track_boxes=self._kf_store.boxes(tracks),
         )
-        for track_idx, det_idx in matches:
-            track = tracks[track_idx]
-            self._commit_match(track, detections[det_idx], timestamp)
-            matched_ids.add(id(track))
+        if matches:
+            for track_idx, det_idx in matches:
+                track = tracks[track_idx]
+                mark_matched(track, detections[det_idx], timestamp, self.history_size)
+                matched_ids.add(id(track))
+            self._kf_store.update(
+                [tracks[track_idx].track_id for track_idx, _ in matches],
+                xyxy_to_xyah_batch(boxes_to_array([detections[det_idx].box for _, det_idx in matches])),
+            )
         leftover_dets = [detections[idx] for idx in unmatched_det_idx]
         leftover_tracks = [tracks[idx] for idx in unmatched_track_idx]
         return leftover_dets, leftover_tracks
 
     def _commit_match(self, track: Track, det: ParsedDetection, timestamp: float) -> None:
         mark_matched(track, det, timestamp, self.history_size)
-        measurement = xyxy_to_xyah(det.box)
-        state = self._kf_state.get(track.track_id)
-        if state is None:
-            mean, cov = self._kf.initiate(measurement)
-        else:
-            mean, cov = self._kf.update(state[0], state[1], measurement)
-        self._kf_state[track.track_id] = (mean, cov)
+        self._kf_store.update([track.track_id], xyxy_to_xyah(det.box)[None, :])
 
     def _start_track(
         self,
@@ -280,5 +432,5 @@ class ByteTracker(BaseTracker):
         live_ids = {item.track_id for item in self.tracks}
         track = new_track(self._ids.allocate(preferred_id, live_ids), det, timestamp, self.history_size)
         self.tracks.append(track)
-        self._kf_state[track.track_id] = self._kf.initiate(xyxy_to_xyah(det.box))
+        self._kf_store.initiate(track.track_id, xyxy_to_xyah(det.box))
         return track
@@ -14,6 +14,7 @@ import cv2
 import numpy as np
 
 from app.core.algorithm import BaseAlgorithm
+from app.core.roi_mask_cache import RoiMask
 
 
 ROI_MODE_PRE_MASK = "pre_mask"
@@ -255,7 +256,8 @@ def remap_detections_to_full_frame(
     return remapped
 
 
-def _mask_keep(box: Sequence[float], mask: np.ndarray, metric: str, threshold: float) -> bool:
+def _mask_keep(box: Sequence[float], roi_mask: RoiMask, metric: str, threshold: float) -> bool:
+    mask = roi_mask.mask
     height, width = mask.shape[:2]
     normalized_box = BaseAlgorithm._normalize_box_for_canvas(box, width, height)
     if normalized_box is None:
@@ -277,7 +279,8 @@ def _mask_keep(box: Sequence[float], mask: np.ndarray, metric: str, threshold: f
         area = float((x2_inclusive - x1) * (y2_inclusive - y1))
         if area <= 0:
             return False
-        roi_pixels = float(np.count_nonzero(mask[y1:y2_inclusive, x1:x2_inclusive]))
+        # 积分图随掩码缓存，每个框 O(1)
+        roi_pixels = float(roi_mask.count_nonzero(x1, y1, x2_inclusive, y2_inclusive))
         return roi_pixels / area >= float(threshold)
 
     point_x = int(round((x1 + x2) / 2.0))
@@ -311,12 +314,12 @@ def filter_items_by_regions(
             continue
         anchored_masks.append((
             anchor,
-            BaseAlgorithm.create_roi_mask(tuple(frame_shape), [region]),
+            BaseAlgorithm.get_roi_mask(tuple(frame_shape), [region]),
         ))
 
     fallback_mask = None
     if fallback_regions:
-        fallback_mask = BaseAlgorithm.create_roi_mask(tuple(frame_shape), fallback_regions)
+        fallback_mask = BaseAlgorithm.get_roi_mask(tuple(frame_shape), fallback_regions)
 
     filtered = []
     for item in items:
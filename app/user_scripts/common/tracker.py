@@ -146,46 +146,62 @@ def box_iou(box_a: Sequence[float], box_b: Sequence[float]) -> float:
     return inter / union if union > 0 else 0.0
 
 
+def boxes_to_array(boxes: Sequence[Sequence[float]]) -> np.ndarray:
+    if isinstance(boxes, np.ndarray):
+        return boxes[:, :4].astype(np.float64, copy=False).reshape(-1, 4)
+    return np.asarray([box[:4] for box in boxes], dtype=np.float64).reshape(-1, 4)
+
+
 def pairwise_iou(track_boxes: Sequence[Sequence[float]], det_boxes: Sequence[Sequence[float]]) -> np.ndarray:
-    iou = np.zeros((len(track_boxes), len(det_boxes)), dtype=np.float64)
-    for i, track_box in enumerate(track_boxes):
-        for j, det_box in enumerate(det_boxes):
-            iou[i, j] = box_iou(track_box, det_box)
+    """N x M IoU between two box lists, broadcast on arrays; same semantics as box_iou."""
+    tracks = boxes_to_array(track_boxes)
+    dets = boxes_to_array(det_boxes)
+    iou = np.zeros((len(tracks), len(dets)), dtype=np.float64)
+    if not len(tracks) or not len(dets):
+        return iou
+    inter_w = np.clip(
+        np.minimum(tracks[:, None, 2], dets[None, :, 2]) - np.maximum(tracks[:, None, 0], dets[None, :, 0]),
+        0.0,
+        None,
+    )
+    inter_h = np.clip(
+        np.minimum(tracks[:, None, 3], dets[None, :, 3]) - np.maximum(tracks[:, None, 1], dets[None, :, 1]),
+        0.0,
+        None,
+    )
+    inter = inter_w * inter_h
+    area_tracks = np.clip(tracks[:, 2] - tracks[:, 0], 0.0, None) * np.clip(tracks[:, 3] - tracks[:, 1], 0.0, None)
+    area_dets = np.clip(dets[:, 2] - dets[:, 0], 0.0, None) * np.clip(dets[:, 3] - dets[:, 1], 0.0, None)
+    union = area_tracks[:, None] + area_dets[None, :] - inter
+    np.divide(inter, union, out=iou, where=(inter > 0) & (union > 0))
     return iou
 
 
-def associate_by_iou(
-    track_boxes: Sequence[Sequence[float]],
-    det_boxes: Sequence[Sequence[float]],
-    iou_threshold: float,
-):
-    n_tracks = len(track_boxes)
-    n_dets = len(det_boxes)
+def assign_by_iou(iou: np.ndarray, iou_threshold: float):
+    """Match rows to columns of a precomputed IoU matrix (Hungarian, greedy without scipy)."""
+    n_tracks, n_dets = iou.shape
     if n_tracks == 0 or n_dets == 0:
         return [], list(range(n_tracks)), list(range(n_dets))
 
-    iou = pairwise_iou(track_boxes, det_boxes)
+    threshold = float(iou_threshold)
     matches: List[Tuple[int, int]] = []
     unmatched_tracks = set(range(n_tracks))
     unmatched_dets = set(range(n_dets))
 
     if _linear_sum_assignment is not None:
         cost = 1.0 - iou
-        cost[iou < float(iou_threshold)] = 1e5
+        cost[iou < threshold] = 1e5
         rows, cols = _linear_sum_assignment(cost)
         for row, col in zip(rows.tolist(), cols.tolist()):
-            if iou[row, col] >= float(iou_threshold):
+            if iou[row, col] >= threshold:
                 matches.append((int(row), int(col)))
                 unmatched_tracks.discard(int(row))
                 unmatched_dets.discard(int(col))
     else:
-        pairs = []
-        for i in range(n_tracks):
-            for j in range(n_dets):
-                if iou[i, j] >= float(iou_threshold):
-                    pairs.append((float(iou[i, j]), i, j))
-        pairs.sort(reverse=True)
-        for _, i, j in pairs:
+        rows, cols = np.nonzero(iou >= threshold)
+        # 按 (iou, 行, 列) 降序贪心匹配
+        order = np.lexsort((-cols, -rows, -iou[rows, cols]))
+        for i, j in zip(rows[order].tolist(), cols[order].tolist()):
             if i in unmatched_tracks and j in unmatched_dets:
                 matches.append((i, j))
                 unmatched_tracks.discard(i)
@@ -194,6 +210,14 @@ def associate_by_iou(
     return matches, sorted(unmatched_tracks), sorted(unmatched_dets)
 
 
+def associate_by_iou(
+    track_boxes: Sequence[Sequence[float]],
+    det_boxes: Sequence[Sequence[float]],
+    iou_threshold: float,
+):
+    return assign_by_iou(pairwise_iou(track_boxes, det_boxes), iou_threshold)
+
+
 def detection_label(det: Dict[str, Any]) -> str:
     label = det.get("label") or det.get("label_name") or det.get("class_name")
     if label is None and det.get("class") is not None:
@@ -354,25 +378,36 @@ def associate_class_aware(
     detections: Sequence[ParsedDetection],
     iou_threshold: float,
     box_fn=None,
+    track_boxes: Optional[Sequence[Sequence[float]]] = None,
 ):
-    if box_fn is None:
-        box_fn = lambda track: track.box
+    """Associate tracks and detections of the same label.
+
+    The IoU matrix is computed once for all pairs and sliced per label.
+    track_boxes (one row per track, e.g. Kalman-predicted boxes) takes precedence over box_fn.
+    """
+    if not tracks or not detections:
+        return [], list(range(len(tracks))), list(range(len(detections)))
+    if track_boxes is None:
+        if box_fn is None:
+            box_fn = lambda track: track.box
+        track_boxes = [box_fn(track) for track in tracks]
+
+    iou = pairwise_iou(track_boxes, [det.box for det in detections])
+    track_groups: Dict[str, List[int]] = {}
+    for idx, track in enumerate(tracks):
+        track_groups.setdefault(track.label, []).append(idx)
+    det_groups: Dict[str, List[int]] = {}
+    for idx, det in enumerate(detections):
+        det_groups.setdefault(det.label, []).append(idx)
 
     matches: List[Tuple[int, int]] = []
     unmatched_tracks = set(range(len(tracks)))
     unmatched_dets = set(range(len(detections)))
-    labels = {track.label for track in tracks} | {det.label for det in detections}
-
-    for label in labels:
-        track_indices = [idx for idx, track in enumerate(tracks) if track.label == label]
-        det_indices = [idx for idx, det in enumerate(detections) if det.label == label]
-        if not track_indices or not det_indices:
+    for label, track_indices in track_groups.items():
+        det_indices = det_groups.get(label)
+        if not det_indices:
             continue
-        local_matches, _, _ = associate_by_iou(
-            [box_fn(tracks[idx]) for idx in track_indices],
-            [detections[idx].box for idx in det_indices],
-            iou_threshold,
-        )
+        local_matches, _, _ = assign_by_iou(iou[np.ix_(track_indices, det_indices)], iou_threshold)
         for local_t, local_d in local_matches:
             track_idx = track_indices[local_t]
             det_idx = det_indices[local_d]
@@ -13,7 +13,7 @@ import os
 import threading
 import time
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -25,6 +25,12 @@ except ImportError:  # pragma: no cover - standalone adapter tests/templates
     SHARED_INFERENCE_ENABLED = False
     SHARED_RKNN_ENABLED = False
 
+try:
+    from app.core.frame_cache import current_frame_scope
+except ImportError:  # pragma: no cover - standalone adapter tests/templates
+    def current_frame_scope():
+        return None
+
 _SHARED_INFERENCE_CLIENT_MODE = (
     SHARED_INFERENCE_ENABLED
     and os.getenv("SHARED_INFERENCE_WORKER", "false").lower()
@@ -273,6 +279,15 @@ def normalize_backend_config(config: Dict[str, Any]) -> Dict[str, Any]:
         raise ValueError(f"onnx_input_dtype 仅支持 auto、float32 或 uint8，当前值: {dtype}")
     normalized["onnx_input_dtype"] = dtype
     normalized["onnx_normalize"] = _parse_bool(normalized.get("onnx_normalize"), True)
+
+    raw_batch_size = normalized.get("rknn_batch_size", 1)
+    try:
+        rknn_batch_size = int(raw_batch_size if raw_batch_size not in (None, "") else 1)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"rknn_batch_size 必须是正整数，当前值: {raw_batch_size!r}") from exc
+    if rknn_batch_size <= 0:
+        raise ValueError(f"rknn_batch_size 必须是正整数，当前值: {rknn_batch_size}")
+    normalized["rknn_batch_size"] = rknn_batch_size
     return normalized
 
 
@@ -304,18 +319,172 @@ def _resolve_rknn_core_mask(config: Dict[str, Any]):
     return mapping.get((config.get("rknn_core_mask") or "auto").lower())
 
 
-def _letterbox(frame: np.ndarray, target_w: int, target_h: int) -> Tuple[np.ndarray, float, int, int]:
-    src_h, src_w = frame.shape[:2]
-    scale = min(target_w / src_w, target_h / src_h)
-    resized_w = int(round(src_w * scale))
-    resized_h = int(round(src_h * scale))
-    resized = cv2.resize(frame, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+class NV12Frame(NamedTuple):
+    """未经颜色转换的 NV12 帧：data 为 (height * 3 / 2, width) 的 uint8 数组。
+
+    shape 与转换后的 RGB 帧一致，后处理可以直接用它还原坐标。
+    """
+
+    data: np.ndarray
+    width: int
+    height: int
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return (int(self.height), int(self.width), 3)
+
+
+def _even(value: int) -> int:
+    return value + (value & 1)
+
+
+class InputPreprocessor:
+    """把 RGB 或 NV12 帧直接写成模型输入张量（缩放 + 颜色转换 + 补边 + 归一化 + 布局）。
+
+    每个实例对应一个输入尺寸/格式，中间结果都写进预分配的缓冲区：缩放结果直接落在
+    画布的有效区域，补边每次只清零边带；NV12 输入先分别缩放 Y/UV 平面，再在目标
+    分辨率上做一次颜色转换，不再生成全分辨率 RGB 帧。out 为 None 时返回内部缓冲区，
+    只在下一次调用前有效；多帧 batch 应传入 batch 中的槽位。
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        *,
+        color: str = "rgb",
+        layout: str = "nhwc",
+        dtype: Any = np.uint8,
+        normalize: bool = False,
+        keep_ratio: bool = True,
+    ):
+        self.width = int(width)
+        self.height = int(height)
+        self.color = "bgr" if str(color).lower() == "bgr" else "rgb"
+        self.layout = "nchw" if str(layout).lower() == "nchw" else "nhwc"
+        self.dtype = np.dtype(dtype)
+        self.normalize = bool(normalize)
+        self.keep_ratio = bool(keep_ratio)
+        if self.layout == "nchw":
+            self.tensor_shape = (3, self.height, self.width)
+        else:
+            self.tensor_shape = (self.height, self.width, 3)
+        # uint8 + NHWC 时画布本身就是输入张量，无需再做一次拷贝
+        self._canvas_is_tensor = self.dtype == np.uint8 and self.layout == "nhwc" and not self.normalize
+        self._canvas = None
+        self._tensor = None
+        self._nv12_buffer = None
+        self._nv12_rgb_buffer = None
+
+    def new_batch(self, batch_size: int) -> np.ndarray:
+        return np.zeros((int(batch_size), *self.tensor_shape), dtype=self.dtype)
+
+    def geometry(self, source_w: int, source_h: int) -> Tuple[float, int, int, int, int]:
+        """返回 (scale, resized_w, resized_h, pad_x, pad_y)。"""
+        if not self.keep_ratio:
+            return min(self.width / source_w, self.height / source_h), self.width, self.height, 0, 0
+        scale = min(self.width / source_w, self.height / source_h)
+        resized_w = int(round(source_w * scale))
+        resized_h = int(round(source_h * scale))
+        return scale, resized_w, resized_h, (self.width - resized_w) // 2, (self.height - resized_h) // 2
+
+    def prepare(self, frame, out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, int, int]:
+        """frame 为 RGB ndarray 或 NV12Frame；返回 (输入张量, scale, pad_x, pad_y)。"""
+        source_h, source_w = frame.shape[:2]
+        scale, resized_w, resized_h, pad_x, pad_y = self.geometry(source_w, source_h)
+
+        if self._canvas_is_tensor and out is not None:
+            canvas = out
+        else:
+            if self._canvas is None:
+                self._canvas = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            canvas = self._canvas
+        self._clear_padding(canvas, resized_w, resized_h, pad_x, pad_y)
+        region = canvas[pad_y:pad_y + resized_h, pad_x:pad_x + resized_w]
+        if isinstance(frame, NV12Frame):
+            self._resize_nv12(frame, region, resized_w, resized_h)
+        else:
+            _write_into(region, cv2.resize(frame, (resized_w, resized_h), dst=region, interpolation=cv2.INTER_LINEAR))
+            if self.color == "bgr":
+                _write_into(region, cv2.cvtColor(region, cv2.COLOR_RGB2BGR, dst=region))
+
+        if self._canvas_is_tensor:
+            return canvas, scale, pad_x, pad_y
+
+        if out is None:
+            if self._tensor is None:
+                self._tensor = np.empty(self.tensor_shape, dtype=self.dtype)
+            out = self._tensor
+        source = canvas.transpose(2, 0, 1) if self.layout == "nchw" else canvas
+        if self.normalize:
+            # 与 astype(float32) / 255.0 逐位一致
+            np.divide(source, 255.0, out=out, dtype=self.dtype)
+        else:
+            np.copyto(out, source, casting="unsafe")
+        return out, scale, pad_x, pad_y
+
+    @staticmethod
+    def _clear_padding(canvas: np.ndarray, resized_w: int, resized_h: int, pad_x: int, pad_y: int):
+        canvas[:pad_y] = 0
+        canvas[pad_y + resized_h:] = 0
+        canvas[pad_y:pad_y + resized_h, :pad_x] = 0
+        canvas[pad_y:pad_y + resized_h, pad_x + resized_w:] = 0
+
+    def _resize_nv12(self, frame: NV12Frame, region: np.ndarray, resized_w: int, resized_h: int):
+        width, height = int(frame.width), int(frame.height)
+        data = frame.data
+        # NV12 的宽高必须为偶数；奇数尺寸时亮度平面多补一行/一列，转换后再裁掉
+        target_w, target_h = _even(resized_w), _even(resized_h)
+        if self._nv12_buffer is None or self._nv12_buffer.shape != (target_h * 3 // 2, target_w):
+            self._nv12_buffer = np.empty((target_h * 3 // 2, target_w), dtype=np.uint8)
+        small = self._nv12_buffer
+        luma = small[:resized_h, :resized_w]
+        chroma = small[target_h:].reshape(target_h // 2, target_w // 2, 2)
+        _write_into(luma, cv2.resize(data[:height], (resized_w, resized_h), dst=luma, interpolation=cv2.INTER_LINEAR))
+        if target_w != resized_w:
+            small[:resized_h, resized_w] = small[:resized_h, resized_w - 1]
+        if target_h != resized_h:
+            small[resized_h] = small[resized_h - 1]
+        source_chroma = data[height:height * 3 // 2].reshape(height // 2, width // 2, 2)
+        _write_into(
+            chroma,
+            cv2.resize(source_chroma, (target_w // 2, target_h // 2), dst=chroma, interpolation=cv2.INTER_LINEAR),
+        )
+
+        code = cv2.COLOR_YUV2BGR_NV12 if self.color == "bgr" else cv2.COLOR_YUV2RGB_NV12
+        if (target_w, target_h) == (resized_w, resized_h):
+            _write_into(region, cv2.cvtColor(small, code, dst=region))
+            return
+        if self._nv12_rgb_buffer is None or self._nv12_rgb_buffer.shape[:2] != (target_h, target_w):
+            self._nv12_rgb_buffer = np.empty((target_h, target_w, 3), dtype=np.uint8)
+        converted = self._nv12_rgb_buffer
+        _write_into(converted, cv2.cvtColor(small, code, dst=converted))
+        region[...] = converted[:resized_h, :resized_w]
+
+
+def _write_into(target: np.ndarray, result: np.ndarray):
+    """OpenCV 无法复用 dst（类型或步长不匹配）时会另行分配，此时把结果拷回目标缓冲区。"""
+    if result is not target:
+        np.copyto(target, result.reshape(target.shape))
+
 
-    canvas = np.zeros((target_h, target_w, 3), dtype=np.uint8)
-    pad_x = (target_w - resized_w) // 2
-    pad_y = (target_h - resized_h) // 2
-    canvas[pad_y:pad_y + resized_h, pad_x:pad_x + resized_w] = resized
-    return canvas, scale, pad_x, pad_y
+class _BatchOutputMismatch(ValueError):
+    """模型输出没有与输入对应的 batch 维。"""
+
+
+def _slice_batch_outputs(outputs: List[Any], index: int, batch_size: int) -> List[np.ndarray]:
+    """取出 batch 中第 index 张图的输出，保留长度为 1 的 batch 维，后处理与单帧推理一致。"""
+    if batch_size == 1:
+        return list(outputs or [])
+    sliced = []
+    for output in outputs or []:
+        arr = np.asarray(output)
+        if arr.ndim == 0 or arr.shape[0] != batch_size:
+            raise _BatchOutputMismatch(
+                f"模型输出 shape {list(arr.shape)} 的首维与 batch 大小 {batch_size} 不一致"
+            )
+        sliced.append(arr[index:index + 1])
+    return sliced
 
 
 def _clip_box(x1: float, y1: float, x2: float, y2: float, width: int, height: int):
@@ -544,17 +713,33 @@ def _normalize_score_array(values: np.ndarray) -> np.ndarray:
     return scores
 
 
-def _collect_row_items_from_dense_outputs(outputs: List[Any]) -> List[Dict[str, Any]]:
-    row_items = []
+class _RowBlock(NamedTuple):
+    """同一输出（或同一 DFL 分支组）的候选行矩阵，行号即该矩阵内的下标。"""
+    rows: np.ndarray
+    output_index: int
+    branch_index: int = -1
+
+
+def _collect_row_blocks_from_dense_outputs(outputs: List[Any]) -> List[_RowBlock]:
+    blocks = []
     for output_idx, output in enumerate(outputs or []):
         rows = _flatten_output(output)
         if rows.size == 0:
             continue
-        for row_idx, row in enumerate(rows):
+        blocks.append(_RowBlock(np.asarray(rows, dtype=np.float32), output_idx))
+    return blocks
+
+
+def _row_items_from_blocks(blocks: List[_RowBlock]) -> List[Dict[str, Any]]:
+    """展开成逐行字典，供 _build_detections_from_rows 参考实现使用。"""
+    row_items = []
+    for block in blocks:
+        for row_idx, row in enumerate(block.rows):
             row_items.append({
                 "row": np.asarray(row, dtype=np.float32).reshape(-1),
-                "output_index": output_idx,
+                "output_index": block.output_index,
                 "row_index": row_idx,
+                "branch_index": block.branch_index,
             })
     return row_items
 
@@ -621,6 +806,7 @@ def _build_detections_from_rows(
     bbox_format: str = "auto",
     score_mode: str = "auto"
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """逐行解码的参考实现；线上走 _build_detections_from_blocks，两者输出一致。"""
     confidence_threshold = float(config.get("confidence", 0.6))
     class_filter = set(config.get("class_filter", []) or [])
     frame_h, frame_w = frame_shape[:2]
@@ -712,6 +898,239 @@ def _build_detections_from_rows(
     return detections, details
 
 
+def _normalize_score_columns(values: np.ndarray) -> np.ndarray:
+    """逐元素版 _normalize_score_value：只对超出 [0, 1] 的分数做 sigmoid。"""
+    scores = np.asarray(values, dtype=np.float32)
+    out_of_range = (scores < 0.0) | (scores > 1.0)
+    if np.any(out_of_range):
+        scores = np.where(out_of_range, _sigmoid(scores), scores)
+    return scores
+
+
+def _normalize_score_rows(values: np.ndarray) -> np.ndarray:
+    """逐行版 _normalize_score_array：某行任一分数超出 [0, 1] 时整行做 sigmoid。"""
+    scores = np.asarray(values, dtype=np.float32)
+    if scores.size == 0:
+        return scores
+    out_of_range = np.any((scores < 0.0) | (scores > 1.0), axis=1)
+    if np.any(out_of_range):
+        scores = scores.copy()
+        scores[out_of_range] = _sigmoid(scores[out_of_range])
+    return scores
+
+
+def _best_class_scores(class_scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    classes = np.argmax(class_scores, axis=1)
+    best = class_scores[np.arange(class_scores.shape[0]), classes]
+    return best.astype(np.float64), classes.astype(np.int64)
+
+
+def _extract_confidences_and_classes(
+    rows: np.ndarray,
+    class_count: int,
+    score_mode: str
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """_extract_confidence_and_class 的矩阵版，返回 (float64 置信度, int64 类别)。"""
+    row_count, attr_count = rows.shape
+    if attr_count < 5:
+        return None
+
+    if score_mode == "flat":
+        if attr_count < 6:
+            return None
+        return (
+            _normalize_score_columns(rows[:, 4]).astype(np.float64),
+            np.rint(rows[:, 5]).astype(np.int64),
+        )
+
+    if score_mode == "class_only":
+        return _best_class_scores(_normalize_score_rows(rows[:, 4:]))
+
+    if score_mode == "objectness_class":
+        objectness = _normalize_score_columns(rows[:, 4]).astype(np.float64)
+        if attr_count == 5:
+            return objectness, np.zeros(row_count, dtype=np.int64)
+        class_conf, classes = _best_class_scores(_normalize_score_rows(rows[:, 5:]))
+        return objectness * class_conf, classes
+
+    if attr_count == 5:
+        return _extract_confidences_and_classes(rows, class_count, "objectness_class")
+    if attr_count == 6:
+        return _extract_confidences_and_classes(rows, class_count, "flat")
+
+    if class_count > 0:
+        if attr_count == 4 + class_count:
+            return _extract_confidences_and_classes(rows, class_count, "class_only")
+        if attr_count == 5 + class_count:
+            return _extract_confidences_and_classes(rows, class_count, "objectness_class")
+
+    confidences, classes = _extract_confidences_and_classes(rows, class_count, "objectness_class")
+    # 第 6 列接近整数且第 5 列不超过 1 的行按 [box, conf, cls, ...] 解释
+    flat_rows = (np.abs(rows[:, 5] - np.round(rows[:, 5])) < 1e-3) & (rows[:, 4] <= 1.0)
+    if np.any(flat_rows):
+        confidences = np.where(flat_rows, rows[:, 4].astype(np.float64), confidences)
+        classes = np.where(flat_rows, np.rint(rows[:, 5]).astype(np.int64), classes)
+    return confidences, classes
+
+
+def _decode_boxes(
+    raw_boxes: np.ndarray,
+    input_w: int,
+    input_h: int,
+    scale: float,
+    pad_x: int,
+    pad_y: int,
+    frame_w: int,
+    frame_h: int,
+    bbox_format: str = "auto"
+) -> np.ndarray:
+    """_decode_box 的矩阵版，返回原图坐标系下的 float64 xyxy 框。"""
+    boxes = np.array(raw_boxes[:, :4], dtype=np.float32)
+    normalized = np.max(np.abs(boxes), axis=1) <= 1.5
+    if np.any(normalized):
+        boxes[normalized] *= np.asarray([input_w, input_h, input_w, input_h], dtype=np.float32)
+    boxes = boxes.astype(np.float64)
+
+    if bbox_format == "xyxy":
+        use_xyxy = np.ones(boxes.shape[0], dtype=bool)
+    elif bbox_format == "auto":
+        use_xyxy = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+    else:
+        use_xyxy = np.zeros(boxes.shape[0], dtype=bool)
+
+    if not np.all(use_xyxy):
+        half_w = boxes[:, 2] / 2.0
+        half_h = boxes[:, 3] / 2.0
+        converted = np.stack([
+            boxes[:, 0] - half_w,
+            boxes[:, 1] - half_h,
+            boxes[:, 0] + half_w,
+            boxes[:, 1] + half_h,
+        ], axis=1)
+        boxes = np.where(use_xyxy[:, None], boxes, converted)
+
+    scale = float(scale)
+    boxes[:, 0::2] = (boxes[:, 0::2] - pad_x) / scale
+    boxes[:, 1::2] = (boxes[:, 1::2] - pad_y) / scale
+    boxes[:, 0::2] = np.maximum(0.0, np.minimum(boxes[:, 0::2], float(frame_w - 1)))
+    boxes[:, 1::2] = np.maximum(0.0, np.minimum(boxes[:, 1::2], float(frame_h - 1)))
+    return boxes
+
+
+def _build_detections_from_blocks(
+    blocks: List[_RowBlock],
+    classes: Dict[int, str],
+    config: Dict[str, Any],
+    frame_shape: Tuple[int, int, int],
+    input_width: int,
+    input_height: int,
+    scale: float,
+    pad_x: int,
+    pad_y: int,
+    class_count: int,
+    bbox_format: str = "auto",
+    score_mode: str = "auto"
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """按输出矩阵整体解码：阈值掩码 -> argmax -> 框变换 -> NMS，只为保留的框构造字典。"""
+    confidence_threshold = float(config.get("confidence", 0.6))
+    class_filter = set(config.get("class_filter", []) or [])
+    frame_h, frame_w = frame_shape[:2]
+
+    candidate_boxes = []
+    candidate_scores = []
+    candidate_classes = []
+    candidate_sources = []
+    for block in blocks:
+        rows = block.rows
+        if rows.ndim != 2 or rows.shape[0] == 0:
+            continue
+        score_result = _extract_confidences_and_classes(rows, class_count, score_mode)
+        if score_result is None:
+            continue
+        confidences, row_classes = score_result
+
+        row_indices = np.flatnonzero(confidences >= confidence_threshold)
+        if class_filter and row_indices.size:
+            allowed = np.fromiter(
+                (cls in class_filter for cls in row_classes[row_indices].tolist()),
+                dtype=bool,
+                count=row_indices.size,
+            )
+            row_indices = row_indices[allowed]
+        if row_indices.size == 0:
+            continue
+
+        candidate_boxes.append(_decode_boxes(
+            rows[row_indices],
+            input_width,
+            input_height,
+            scale,
+            pad_x,
+            pad_y,
+            frame_w,
+            frame_h,
+            bbox_format=bbox_format,
+        ))
+        candidate_scores.append(confidences[row_indices])
+        candidate_classes.append(row_classes[row_indices])
+        candidate_sources.append(np.stack([
+            np.full(row_indices.size, block.output_index, dtype=np.int64),
+            row_indices.astype(np.int64),
+            np.full(row_indices.size, block.branch_index, dtype=np.int64),
+        ], axis=1))
+
+    if not candidate_boxes:
+        return [], []
+
+    boxes = np.concatenate(candidate_boxes)
+    scores = np.concatenate(candidate_scores)
+    nms_boxes = np.stack([
+        boxes[:, 0],
+        boxes[:, 1],
+        np.maximum(1.0, boxes[:, 2] - boxes[:, 0]),
+        np.maximum(1.0, boxes[:, 3] - boxes[:, 1]),
+    ], axis=1)
+    indices = cv2.dnn.NMSBoxes(
+        bboxes=nms_boxes,
+        scores=scores,
+        score_threshold=confidence_threshold,
+        nms_threshold=float(config.get("nms_iou", 0.45)),
+    )
+    if len(indices) == 0:
+        return [], []
+    indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+
+    kept_boxes = boxes[indices].tolist()
+    kept_scores = scores[indices].tolist()
+    kept_classes = np.concatenate(candidate_classes)[indices].tolist()
+    kept_sources = np.concatenate(candidate_sources)[indices].tolist()
+
+    detections = []
+    details = []
+    for box, conf, cls, (output_index, row_index, branch_index) in zip(
+        kept_boxes, kept_scores, kept_classes, kept_sources
+    ):
+        label = classes.get(cls, f"class_{cls}")
+        detections.append({
+            "box": box,
+            "label": label,
+            "label_name": config.get("label_name", label),
+            "class": cls,
+            "confidence": conf,
+        })
+        details.append({
+            "box": list(box),
+            "confidence": conf,
+            "class": cls,
+            "class_name": label,
+            "output_index": output_index,
+            "row_index": row_index,
+            "branch_index": branch_index,
+        })
+
+    return detections, details
+
+
 class YoloOutputAdapter:
     """根据模型输出 signature 选择合适的后处理路径。"""
 
@@ -781,32 +1200,18 @@ class YoloOutputAdapter:
         if warning:
             metadata["postprocess_warning"] = warning
 
-        row_items: List[Dict[str, Any]] = []
-        bbox_format = self.bbox_format
-        score_mode = self.score_mode
-
-        if resolved_profile == "dense":
-            row_items = _collect_row_items_from_dense_outputs(outputs)
-        elif resolved_profile == "head_decoded":
-            row_items = self._collect_decoded_head_rows(outputs)
-        elif resolved_profile == "head_anchor_based":
-            row_items = self._collect_anchor_based_rows(outputs)
-            bbox_format = "xywh"
-            score_mode = "objectness_class"
-        elif resolved_profile == "head_dfl":
-            row_items = self._collect_dfl_head_rows(outputs)
-            bbox_format = "xyxy"
-            score_mode = "class_only"
-        else:
+        bbox_format, score_mode = self._resolve_decode_modes(resolved_profile)
+        blocks = self._collect_row_blocks(outputs, resolved_profile)
+        if blocks is None:
             return [], [], metadata
 
-        if not row_items and warning is None:
+        if not blocks and warning is None:
             metadata["postprocess_warning"] = (
                 "模型输出未能匹配当前后处理适配配置，请根据 output shape 调整 profile/layout/anchors/strides。"
             )
 
-        detections, details = _build_detections_from_rows(
-            row_items=row_items,
+        detections, details = _build_detections_from_blocks(
+            blocks=blocks,
             classes=self.classes,
             config=self.config,
             frame_shape=frame_shape,
@@ -821,6 +1226,26 @@ class YoloOutputAdapter:
         )
         return detections, details, metadata
 
+    def _resolve_decode_modes(self, profile: str) -> Tuple[str, str]:
+        """返回该后处理 profile 使用的 (bbox_format, score_mode)。"""
+        if profile == "head_anchor_based":
+            return "xywh", "objectness_class"
+        if profile == "head_dfl":
+            return "xyxy", "class_only"
+        return self.bbox_format, self.score_mode
+
+    def _collect_row_blocks(self, outputs: List[Any], profile: str) -> Optional[List[_RowBlock]]:
+        """按 profile 把模型输出整理成候选行矩阵；不支持的 profile 返回 None。"""
+        if profile == "dense":
+            return _collect_row_blocks_from_dense_outputs(outputs)
+        if profile == "head_decoded":
+            return self._collect_decoded_head_blocks(outputs)
+        if profile == "head_anchor_based":
+            return self._collect_anchor_based_blocks(outputs)
+        if profile == "head_dfl":
+            return self._collect_dfl_head_blocks(outputs)
+        return None
+
     def _resolve_profile(self, outputs: List[Any]) -> Tuple[str, Optional[str]]:
         if self.profile in ("dense", "head_decoded", "head_anchor_based", "head_dfl"):
             return self.profile, None
@@ -845,23 +1270,17 @@ class YoloOutputAdapter:
 
         return "dense", None
 
-    def _collect_decoded_head_rows(self, outputs: List[Any]) -> List[Dict[str, Any]]:
-        row_items = []
+    def _collect_decoded_head_blocks(self, outputs: List[Any]) -> List[_RowBlock]:
+        blocks = []
         for output_idx, output in enumerate(outputs or []):
             rows = self._normalize_decoded_head(output, output_idx)
             if rows is None or rows.size == 0:
                 continue
-            for row_idx, row in enumerate(rows):
-                row_items.append({
-                    "row": np.asarray(row, dtype=np.float32).reshape(-1),
-                    "output_index": output_idx,
-                    "row_index": row_idx,
-                    "branch_index": output_idx,
-                })
-        return row_items
+            blocks.append(_RowBlock(np.asarray(rows, dtype=np.float32), output_idx, output_idx))
+        return blocks
 
-    def _collect_anchor_based_rows(self, outputs: List[Any]) -> List[Dict[str, Any]]:
-        row_items = []
+    def _collect_anchor_based_blocks(self, outputs: List[Any]) -> List[_RowBlock]:
+        blocks = []
         for output_idx, output in enumerate(outputs or []):
             normalized = self._normalize_anchor_head(output, output_idx)
             if normalized is None:
@@ -889,24 +1308,17 @@ class YoloOutputAdapter:
             decoded[..., 3] = (preds[..., 3] * 2.0) ** 2 * anchors[..., 1]
             decoded[..., 4:] = preds[..., 4:]
 
-            rows = decoded.reshape(-1, attr_count)
-            for row_idx, row in enumerate(rows):
-                row_items.append({
-                    "row": np.asarray(row, dtype=np.float32).reshape(-1),
-                    "output_index": output_idx,
-                    "row_index": row_idx,
-                    "branch_index": output_idx,
-                })
+            blocks.append(_RowBlock(decoded.reshape(-1, attr_count), output_idx, output_idx))
 
-        if not row_items:
+        if not blocks:
             warning = (
                 "anchor-based 后处理未能匹配输出 shape，请检查 model_postprocess 中的 anchors/strides/layout。"
             )
             self._warn_once(warning)
-        return row_items
+        return blocks
 
-    def _collect_dfl_head_rows(self, outputs: List[Any]) -> List[Dict[str, Any]]:
-        row_items = []
+    def _collect_dfl_head_blocks(self, outputs: List[Any]) -> List[_RowBlock]:
+        blocks = []
         for group in self._group_spatial_outputs(outputs):
             box_item = self._select_dfl_box_item(group)
             cls_item = self._select_dfl_class_item(group, box_item)
@@ -959,21 +1371,19 @@ class YoloOutputAdapter:
             boxes[..., 2] = center_x + distances[..., 2]
             boxes[..., 3] = center_y + distances[..., 3]
 
-            for row_idx, (box, cls_score) in enumerate(zip(boxes.reshape(-1, 4), cls_scores.reshape(-1, cls_scores.shape[-1]))):
-                row = np.concatenate([box, cls_score], axis=0)
-                row_items.append({
-                    "row": row.astype(np.float32, copy=False),
-                    "output_index": int(box_item["output_index"]),
-                    "row_index": int(row_idx),
-                    "branch_index": int(box_item["output_index"]),
-                })
+            rows = np.concatenate(
+                [boxes.reshape(-1, 4), cls_scores.reshape(-1, cls_scores.shape[-1])],
+                axis=1,
+            ).astype(np.float32, copy=False)
+            output_index = int(box_item["output_index"])
+            blocks.append(_RowBlock(rows, output_index, output_index))
 
-        if not row_items:
+        if not blocks:
             warning = (
                 "DFL/head-split 后处理未能匹配输出 shape，请检查 model_postprocess 中的 reg_max/strides/layout。"
             )
             self._warn_once(warning)
-        return row_items
+        return blocks
 
     def _normalize_decoded_head(
         self,
@@ -1303,6 +1713,176 @@ class BaseYoloBackend:
         self.model = None
 
 
+class LetterboxBatchBackend(BaseYoloBackend):
+    """letterbox 预处理 + 原生运行时推理的后端；同一次运行时调用可以处理多张图。
+
+    子类提供 _create_preprocessor（模型输入格式对应的 InputPreprocessor）、_run_batch 与
+    _inference_metadata。batch_capacity 为模型一次可接收的帧数：1 表示只能逐帧，
+    N > 1 表示静态 batch（不足 N 时补位），None 表示动态 batch 维。
+    输入可以是 RGB 帧或 NV12Frame，预处理直接写进复用的 batch 缓冲区。
+
+    infer 的输入就是 source host 当前共享帧时（见 app.core.frame_cache.frame_scope），
+    同一帧上相同模型文件、相同预处理的推理只执行一次，原始输出在工作流之间共享；
+    置信度、类别过滤与 NMS 仍按各自的配置在解析阶段完成，结果与单独推理一致。
+    """
+
+    batch_capacity: Optional[int] = 1
+    accepts_nv12 = True
+
+    def __init__(self, model_path: str, model_info: Dict[str, Any], config: Dict[str, Any]):
+        super().__init__(model_path, model_info, config)
+        self._preprocessor = None
+        self._batch_buffer = None
+        # batch 缓冲区在运行时调用返回前一直被占用，同一实例的并发推理需串行
+        self._batch_lock = threading.Lock()
+        self._model_key = None
+
+    def _create_preprocessor(self) -> InputPreprocessor:
+        raise NotImplementedError
+
+    def _input_preprocessor(self) -> InputPreprocessor:
+        preprocessor = self._preprocessor
+        if preprocessor is None or (preprocessor.width, preprocessor.height) != (self.input_width, self.input_height):
+            preprocessor = self._preprocessor = self._create_preprocessor()
+        return preprocessor
+
+    def _prepare_input(self, frame, out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, int, int]:
+        return self._input_preprocessor().prepare(frame, out=out)
+
+    def _acquire_batch(self, run_size: int) -> np.ndarray:
+        preprocessor = self._input_preprocessor()
+        batch = self._batch_buffer
+        if batch is None or batch.shape != (run_size, *preprocessor.tensor_shape) or batch.dtype != preprocessor.dtype:
+            batch = self._batch_buffer = preprocessor.new_batch(run_size)
+        return batch
+
+    def _run_batch(self, batch: np.ndarray) -> List[Any]:
+        raise NotImplementedError
+
+    def _inference_metadata(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def infer(self, frame: np.ndarray):
+        scope = current_frame_scope()
+        if scope is not None:
+            shared_key = self._shared_inference_key(scope, frame)
+            if shared_key is not None:
+                return self._infer_shared(scope, shared_key, frame)
+        return self._infer_frames([frame], [self.config])[0]
+
+    def infer_batch(self, frames: List[np.ndarray], configs: List[Dict[str, Any]]):
+        if not frames:
+            return []
+        if len(frames) != len(configs):
+            raise ValueError("frames/configs batch length mismatch")
+        return self._infer_frames(frames, configs)
+
+    def _shared_inference_key(self, scope, frame) -> Optional[Tuple]:
+        """输入是当前共享帧时返回可跨工作流复用的推理 key，否则返回 None。"""
+        source = frame.data if isinstance(frame, NV12Frame) else frame
+        image_kind = scope.images.image_kind(source)
+        if image_kind is None:
+            return None
+        if self._model_key is None:
+            self._model_key = os.path.realpath(str(self.model_path))
+        preprocessor = self._input_preprocessor()
+        return (
+            "letterbox_outputs",
+            self.name,
+            self._model_key,
+            image_kind,
+            preprocessor.width,
+            preprocessor.height,
+            preprocessor.color,
+            preprocessor.layout,
+            preprocessor.dtype.str,
+            preprocessor.normalize,
+            preprocessor.keep_ratio,
+        )
+
+    def _infer_shared(self, scope, shared_key: Tuple, frame):
+        (outputs, geometries, run_size), dedup_hit = scope.shared_result(
+            shared_key,
+            lambda: self._run_shared_chunk(frame),
+        )
+        detections, details, metadata = self._parse_chunk(
+            [frame], [self.config], outputs, geometries, run_size
+        )[0]
+        metadata["inference_dedup"] = dedup_hit
+        return detections, details, metadata
+
+    def _run_shared_chunk(self, frame):
+        outputs, geometries, run_size = self._run_chunk([frame])
+        # 输出会被其他工作流的解析读取，防止被原地修改
+        for output in outputs:
+            if isinstance(output, np.ndarray):
+                output.setflags(write=False)
+        return outputs, geometries, run_size
+
+    def _infer_frames(self, frames: List[np.ndarray], configs: List[Dict[str, Any]]):
+        results = []
+        start = 0
+        while start < len(frames):
+            capacity = self.batch_capacity or (len(frames) - start)
+            chunk_frames = frames[start:start + capacity]
+            chunk_configs = configs[start:start + capacity]
+            try:
+                results.extend(self._infer_chunk(chunk_frames, chunk_configs))
+            except _BatchOutputMismatch as exc:
+                if self.batch_capacity is not None:
+                    raise
+                # 输入声明为动态 batch，但输出没有对应的 batch 维：退回逐帧推理
+                logger.warning(f"[{self.name}] 模型不支持多帧 batch 输出，改为逐帧推理: {exc}")
+                self.batch_capacity = 1
+                continue
+            start += len(chunk_frames)
+        return results
+
+    def _infer_chunk(self, frames: List[np.ndarray], configs: List[Dict[str, Any]]):
+        outputs, geometries, run_size = self._run_chunk(frames)
+        return self._parse_chunk(frames, configs, outputs, geometries, run_size)
+
+    def _run_chunk(self, frames: List[np.ndarray]):
+        """预处理并执行一次运行时调用，返回 (outputs, 每帧的 (scale, pad_x, pad_y), run_size)。"""
+        run_size = max(len(frames), self.batch_capacity or 0)
+        with self._batch_lock:
+            batch = self._acquire_batch(run_size)
+            # 补位槽位保留上一次的内容即可，其输出会被丢弃
+            geometries = [
+                self._prepare_input(frame, out=batch[index])[1:]
+                for index, frame in enumerate(frames)
+            ]
+            outputs = self._run_batch(batch)
+        return outputs, geometries, run_size
+
+    def _parse_chunk(self, frames, configs, outputs, geometries, run_size: int):
+        results = []
+        adapter_config = self.output_adapter.config
+        try:
+            for index, (frame, config, (scale, pad_x, pad_y)) in enumerate(zip(frames, configs, geometries)):
+                self.output_adapter.config = config
+                detections, details, adapter_metadata = self.output_adapter.parse(
+                    outputs=_slice_batch_outputs(outputs, index, run_size),
+                    frame_shape=frame.shape,
+                    input_width=self.input_width,
+                    input_height=self.input_height,
+                    scale=scale,
+                    pad_x=pad_x,
+                    pad_y=pad_y,
+                )
+                metadata = {
+                    **self._inference_metadata(config),
+                    "batch_size": len(geometries),
+                    **adapter_metadata,
+                }
+                if run_size != len(geometries):
+                    metadata["padded_batch_size"] = run_size
+                results.append((detections, details, metadata))
+        finally:
+            self.output_adapter.config = adapter_config
+        return results
+
+
 class UltralyticsBackend(BaseYoloBackend):
     @property
     def name(self) -> str:
@@ -1412,26 +1992,66 @@ class SharedInferenceBackend(BaseYoloBackend):
         try:
             response = self.client.infer(frame, self.config)
         except SharedInferenceOverloaded as exc:
-            self._overload_count += 1
-            now = time.monotonic()
-            if now - self._last_overload_log_at >= 10.0:
-                logger.warning(
-                    f"共享推理队列已满，已丢弃 {self._overload_count} "
-                    f"个分析帧: {exc}"
-                )
-                self._overload_count = 0
-                self._last_overload_log_at = now
-            return [], [], {
-                "shared_inference": True,
-                "overloaded": True,
-                "inference_mode": "letterbox",
-                "nms_iou": float(self.config.get("nms_iou", 0.45)),
-            }
+            return self._overloaded_result(exc)
+        return self._response_result(response)
+
+    def infer_batch(self, frames: List[np.ndarray], configs: List[Dict[str, Any]]):
+        """流水线提交多帧（受客户端 max_in_flight 限制），由 model worker 合并成 batch。
+
+        单帧过载按 infer 的方式返回空结果；其他错误在所有已提交帧完成后抛出第一个。
+        """
+        from app.core.shared_inference import SharedInferenceOverloaded
+
+        if not frames:
+            return []
+        if len(frames) != len(configs):
+            raise ValueError("frames/configs batch length mismatch")
+
+        futures = []
+        for frame, config in zip(frames, configs):
+            try:
+                futures.append(self.client.infer_async(frame, config))
+            except SharedInferenceOverloaded as exc:
+                futures.append(exc)
+
+        results = []
+        first_error = None
+        for future in futures:
+            error = future if isinstance(future, BaseException) else future.exception()
+            if isinstance(error, SharedInferenceOverloaded):
+                results.append(self._overloaded_result(error))
+            elif error is not None:
+                first_error = first_error or error
+                results.append(None)
+            else:
+                results.append(self._response_result(future.result()))
+        if first_error is not None:
+            raise first_error
+        return results
+
+    def _response_result(self, response: Dict[str, Any]):
         metadata = dict(response.get("metadata") or {})
         metadata["shared_inference"] = True
         metadata["model_key"] = self.client.model_key
         return response.get("detections") or [], response.get("details") or [], metadata
 
+    def _overloaded_result(self, exc: Exception):
+        self._overload_count += 1
+        now = time.monotonic()
+        if now - self._last_overload_log_at >= 10.0:
+            logger.warning(
+                f"共享推理队列已满，已丢弃 {self._overload_count} "
+                f"个分析帧: {exc}"
+            )
+            self._overload_count = 0
+            self._last_overload_log_at = now
+        return [], [], {
+            "shared_inference": True,
+            "overloaded": True,
+            "inference_mode": "letterbox",
+            "nms_iou": float(self.config.get("nms_iou", 0.45)),
+        }
+
     def cleanup(self):
         if getattr(self, "client", None) is not None:
             self.client.close()
@@ -1535,20 +2155,25 @@ def _sahi_class_key(item: Dict[str, Any]) -> Any:
     return item.get("label") or item.get("label_name") or item.get("class_name")
 
 
-def _sahi_match_score(box_a: List[float], box_b: List[float], metric: str) -> float:
-    intersection_width = max(0.0, min(box_a[2], box_b[2]) - max(box_a[0], box_b[0]))
-    intersection_height = max(0.0, min(box_a[3], box_b[3]) - max(box_a[1], box_b[1]))
+def _sahi_match_scores(
+    box: np.ndarray,
+    area: float,
+    boxes: np.ndarray,
+    areas: np.ndarray,
+    metric: str,
+) -> np.ndarray:
+    """一个框与一组框的 IoS/IoU，无交集或分母为 0 时为 0。"""
+    intersection_width = np.maximum(0.0, np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0]))
+    intersection_height = np.maximum(0.0, np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1]))
     intersection = intersection_width * intersection_height
-    if intersection <= 0.0:
-        return 0.0
-
-    area_a = max(0.0, box_a[2] - box_a[0]) * max(0.0, box_a[3] - box_a[1])
-    area_b = max(0.0, box_b[2] - box_b[0]) * max(0.0, box_b[3] - box_b[1])
     if metric == "ios":
-        denominator = min(area_a, area_b)
+        denominator = np.minimum(area, areas)
     else:
-        denominator = area_a + area_b - intersection
-    return intersection / denominator if denominator > 0.0 else 0.0
+        denominator = area + areas - intersection
+    valid = (intersection > 0.0) & (denominator > 0.0)
+    scores = np.zeros(intersection.shape, dtype=np.float64)
+    np.divide(intersection, denominator, out=scores, where=valid)
+    return scores
 
 
 def merge_sahi_detections(
@@ -1557,35 +2182,47 @@ def merge_sahi_detections(
     match_threshold: float = 0.5,
     match_metric: str = "ios",
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-    """Apply class-aware greedy suppression across overlapping slices."""
+    """Apply class-aware greedy suppression across overlapping slices.
+
+    Candidates are visited once in confidence order; each kept box suppresses
+    the remaining same-class boxes it matches in a single array operation.
+    """
     detections = list(detections or [])
     details = list(details or [])
-    candidate_indices = [
-        index for index, item in enumerate(detections)
-        if _sahi_item_box(item) is not None
-    ]
-    candidate_indices.sort(
-        key=lambda index: float(detections[index].get("confidence", 0.0) or 0.0),
-        reverse=True,
-    )
+    candidate_indices = []
+    candidate_boxes = []
+    confidences = []
+    class_codes = []
+    class_code_map: Dict[Any, int] = {}
+    for index, item in enumerate(detections):
+        box = _sahi_item_box(item)
+        if box is None:
+            continue
+        candidate_indices.append(index)
+        candidate_boxes.append(box)
+        confidences.append(float(item.get("confidence", 0.0) or 0.0))
+        class_codes.append(class_code_map.setdefault(_sahi_class_key(item), len(class_code_map)))
+    if not candidate_indices:
+        return [], []
 
+    order = np.argsort(-np.asarray(confidences, dtype=np.float64), kind="stable")
+    indices = np.asarray(candidate_indices, dtype=np.int64)[order]
+    boxes = np.asarray(candidate_boxes, dtype=np.float64)[order]
+    codes = np.asarray(class_codes, dtype=np.int64)[order]
+    areas = np.maximum(0.0, boxes[:, 2] - boxes[:, 0]) * np.maximum(0.0, boxes[:, 3] - boxes[:, 1])
+
+    suppressed = np.zeros(indices.shape[0], dtype=bool)
     kept_indices: List[int] = []
-    for candidate_index in candidate_indices:
-        candidate = detections[candidate_index]
-        candidate_box = _sahi_item_box(candidate)
-        candidate_class = _sahi_class_key(candidate)
-        duplicate = False
-        for kept_index in kept_indices:
-            kept = detections[kept_index]
-            if _sahi_class_key(kept) != candidate_class:
-                continue
-            kept_box = _sahi_item_box(kept)
-            match_score = _sahi_match_score(candidate_box, kept_box, match_metric)
-            if match_score > 0.0 and match_score >= match_threshold:
-                duplicate = True
-                break
-        if not duplicate:
-            kept_indices.append(candidate_index)
+    for position in range(indices.shape[0]):
+        if suppressed[position]:
+            continue
+        kept_indices.append(int(indices[position]))
+        rest = position + 1
+        later = rest + np.flatnonzero((codes[rest:] == codes[position]) & ~suppressed[rest:])
+        if later.size == 0:
+            continue
+        scores = _sahi_match_scores(boxes[position], areas[position], boxes[later], areas[later], match_metric)
+        suppressed[later[(scores > 0.0) & (scores >= match_threshold)]] = True
 
     merged_detections = [detections[index] for index in kept_indices]
     merged_details = [details[index] for index in kept_indices if index < len(details)]
@@ -1625,15 +2262,26 @@ class SahiYoloBackend:
             max_slices=max_slices,
         )
 
+        full_frame_requested = bool(
+            self.config.get("sahi_include_full_frame", False)
+        )
+        full_frame_box = [0, 0, int(frame.shape[1]), int(frame.shape[0])]
+        full_frame_inference = full_frame_requested and not (
+            len(slice_boxes) == 1 and slice_boxes[0] == full_frame_box
+        )
+
+        inference_frames = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in slice_boxes]
+        inference_windows = list(enumerate(slice_boxes))
+        if full_frame_inference:
+            inference_frames.append(frame)
+            inference_windows.append((-1, full_frame_box))
+        results, batched = self._infer_frames(inference_frames)
+
         aggregated_detections: List[Dict[str, Any]] = []
         aggregated_details: List[Dict[str, Any]] = []
         base_metadata: Dict[str, Any] = {}
         overloaded_slices = 0
-
-        for slice_index, slice_box in enumerate(slice_boxes):
-            x1, y1, x2, y2 = slice_box
-            sliced_frame = frame[y1:y2, x1:x2]
-            detections, details, metadata = self.backend.infer(sliced_frame)
+        for (slice_index, slice_box), (detections, details, metadata) in zip(inference_windows, results):
             if not base_metadata and metadata:
                 base_metadata = dict(metadata)
             if (metadata or {}).get("overloaded"):
@@ -1650,32 +2298,6 @@ class SahiYoloBackend:
                 )
             )
 
-        full_frame_requested = bool(
-            self.config.get("sahi_include_full_frame", False)
-        )
-        full_frame_inference = full_frame_requested and not (
-            len(slice_boxes) == 1
-            and slice_boxes[0] == [0, 0, int(frame.shape[1]), int(frame.shape[0])]
-        )
-        if full_frame_inference:
-            detections, details, metadata = self.backend.infer(frame)
-            if not base_metadata and metadata:
-                base_metadata = dict(metadata)
-            if (metadata or {}).get("overloaded"):
-                overloaded_slices += 1
-            full_frame_box = [0, 0, int(frame.shape[1]), int(frame.shape[0])]
-            aggregated_detections.extend(
-                _remap_sahi_items(detections, full_frame_box, -1)
-            )
-            aggregated_details.extend(
-                _remap_sahi_items(
-                    details,
-                    full_frame_box,
-                    -1,
-                    annotate_slice=True,
-                )
-            )
-
         detections_before_merge = len(aggregated_detections)
         merged_detections, merged_details = merge_sahi_detections(
             aggregated_detections,
@@ -1699,8 +2321,17 @@ class SahiYoloBackend:
             "sahi_merge_threshold": float(self.config.get("sahi_merge_threshold", 0.5)),
             "sahi_detections_before_merge": detections_before_merge,
             "sahi_overloaded_slices": overloaded_slices,
+            "sahi_batched_inference": batched,
         }
 
+    def _infer_frames(self, frames: List[np.ndarray]):
+        """所有切片一次提交：原生 batch 后端合并为一次推理，共享推理并发排队；否则逐片推理。"""
+        infer_batch = getattr(self.backend, "infer_batch", None)
+        if len(frames) > 1 and callable(infer_batch):
+            config = getattr(self.backend, "config", None) or self.config
+            return infer_batch(frames, [config] * len(frames)), True
+        return [self.backend.infer(sliced_frame) for sliced_frame in frames], False
+
     def cleanup(self):
         backend = self.backend
         self.backend = None
@@ -1855,7 +2486,7 @@ def _reset_rknn_runtime_pool_for_tests() -> None:
                     entry.runtime.release()
 
 
-class RKNNBackend(BaseYoloBackend):
+class RKNNBackend(LetterboxBatchBackend):
     @property
     def name(self) -> str:
         return "rknn"
@@ -1863,41 +2494,33 @@ class RKNNBackend(BaseYoloBackend):
     def __init__(self, model_path: str, model_info: Dict[str, Any], config: Dict[str, Any]):
         super().__init__(model_path, model_info, config)
         self.rknn_input_format = (config.get("rknn_input_format") or "rgb").lower()
+        # RKNN 模型的 batch 在转换时固定（rknn_batch_size），运行时无法查询，由配置声明
+        self.batch_capacity = max(1, int(config.get("rknn_batch_size") or 1))
         self._runtime_key = None
         self._runtime_entry = None
         self._runtime_key, self._runtime_entry = _acquire_rknn_runtime(model_path, config)
         self.model = self._runtime_entry.runtime
 
-    def infer(self, frame: np.ndarray):
-        image, scale, pad_x, pad_y = _letterbox(frame, self.input_width, self.input_height)
-        if self.rknn_input_format == "bgr":
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    def _create_preprocessor(self) -> InputPreprocessor:
+        return InputPreprocessor(self.input_width, self.input_height, color=self.rknn_input_format)
 
-        image = np.expand_dims(np.ascontiguousarray(image), axis=0)
+    def _run_batch(self, batch: np.ndarray) -> List[Any]:
         entry = self._runtime_entry
         if entry is None:
             raise RuntimeError("RKNN backend 已关闭")
         with entry.inference_lock:
             with _rknn_native_call_lock():
-                outputs = self.model.inference(inputs=[image])
-        detections, details, adapter_metadata = self.output_adapter.parse(
-            outputs=outputs,
-            frame_shape=frame.shape,
-            input_width=self.input_width,
-            input_height=self.input_height,
-            scale=scale,
-            pad_x=pad_x,
-            pad_y=pad_y,
-        )
-        return detections, details, {
+                return self.model.inference(inputs=[batch])
+
+    def _inference_metadata(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        return {
             "inference_mode": "letterbox",
             "input_size": {
                 "width": int(self.input_width),
                 "height": int(self.input_height),
             },
             "rknn_input_format": self.rknn_input_format,
-            "nms_iou": float(self.config.get("nms_iou", 0.45)),
-            **adapter_metadata,
+            "nms_iou": float(config.get("nms_iou", 0.45)),
         }
 
     def cleanup(self):
@@ -1910,7 +2533,7 @@ class RKNNBackend(BaseYoloBackend):
             _release_rknn_runtime(key, entry)
 
 
-class ONNXRuntimeBackend(BaseYoloBackend):
+class ONNXRuntimeBackend(LetterboxBatchBackend):
     @property
     def name(self) -> str:
         return "onnxruntime"
@@ -1944,6 +2567,7 @@ class ONNXRuntimeBackend(BaseYoloBackend):
         if self.onnx_input_dtype == "uint8":
             self.onnx_normalize = False
         self._logged_signature = False
+        self.batch_capacity = self._resolve_batch_capacity(self.input_shape)
 
         if isinstance(self.input_shape, (list, tuple)) and len(self.input_shape) >= 4:
             height_index, width_index = (2, 3) if self.onnx_input_layout == "nchw" else (1, 2)
@@ -1966,6 +2590,16 @@ class ONNXRuntimeBackend(BaseYoloBackend):
                 return "nhwc"
         return "nchw"
 
+    @staticmethod
+    def _resolve_batch_capacity(input_shape: Any) -> Optional[int]:
+        """batch 维为正整数时是静态 batch；符号维（如 "batch"）或缺省维度视为动态 batch。"""
+        if not isinstance(input_shape, (list, tuple)) or len(input_shape) < 4:
+            return 1
+        batch_dim = input_shape[0]
+        if isinstance(batch_dim, int) and batch_dim > 0:
+            return batch_dim
+        return None
+
     @staticmethod
     def _resolve_input_dtype(requested_dtype: Any, runtime_type: Any) -> str:
         requested = str(requested_dtype or "auto").strip().lower()
@@ -1974,41 +2608,32 @@ class ONNXRuntimeBackend(BaseYoloBackend):
         normalized_runtime_type = str(runtime_type or "").strip().lower()
         return "uint8" if "uint8" in normalized_runtime_type else "float32"
 
-    def infer(self, frame: np.ndarray):
-        image, scale, pad_x, pad_y = _letterbox(frame, self.input_width, self.input_height)
-        if self.onnx_input_format == "bgr":
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-        tensor_dtype = np.uint8 if self.onnx_input_dtype == "uint8" else np.float32
-        tensor = image.astype(tensor_dtype)
-        if self.onnx_normalize:
-            tensor = tensor / 255.0
-
-        if self.onnx_input_layout == "nchw":
-            tensor = np.transpose(tensor, (2, 0, 1))
-            tensor = np.expand_dims(np.ascontiguousarray(tensor), axis=0)
-        else:
-            tensor = np.expand_dims(np.ascontiguousarray(tensor), axis=0)
+    def _create_preprocessor(self) -> InputPreprocessor:
+        return InputPreprocessor(
+            self.input_width,
+            self.input_height,
+            color=self.onnx_input_format,
+            layout=self.onnx_input_layout,
+            dtype=np.uint8 if self.onnx_input_dtype == "uint8" else np.float32,
+            normalize=self.onnx_normalize,
+        )
 
-        outputs = self.session.run(None, {self.input_name: tensor})
+    def _run_batch(self, batch: np.ndarray) -> List[Any]:
+        outputs = self.session.run(None, {self.input_name: batch})
         if not self._logged_signature:
             self._logged_signature = True
             logger.info(
                 f"[ONNXRuntimeBackend] 首次推理: input_name={self.input_name}, "
-                f"input_shape={self.input_shape}, tensor_shape={tensor.shape}, "
+                f"input_shape={self.input_shape}, tensor_shape={batch.shape}, "
+                f"batch_capacity={self.batch_capacity or 'dynamic'}, "
                 f"providers={self.session.get_providers()}, "
                 f"output_shapes={[np.asarray(out).shape for out in outputs]}"
             )
-        detections, details, adapter_metadata = self.output_adapter.parse(
-            outputs=outputs,
-            frame_shape=frame.shape,
-            input_width=self.input_width,
-            input_height=self.input_height,
-            scale=scale,
-            pad_x=pad_x,
-            pad_y=pad_y,
-        )
-        return detections, details, {
+        return outputs
+
+    def _inference_metadata(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        providers = self.session.get_providers()
+        return {
             "inference_mode": "letterbox",
             "input_size": {
                 "width": int(self.input_width),
@@ -2018,9 +2643,8 @@ class ONNXRuntimeBackend(BaseYoloBackend):
             "onnx_input_layout": self.onnx_input_layout,
             "onnx_input_dtype": self.onnx_input_dtype,
             "onnx_normalize": self.onnx_normalize,
-            "onnx_provider": self.session.get_providers()[0] if self.session.get_providers() else None,
-            "nms_iou": float(self.config.get("nms_iou", 0.45)),
-            **adapter_metadata,
+            "onnx_provider": providers[0] if providers else None,
+            "nms_iou": float(config.get("nms_iou", 0.45)),
         }
 
     def cleanup(self):
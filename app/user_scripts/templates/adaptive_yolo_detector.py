@@ -24,7 +24,7 @@ from app.user_scripts.common.roi import (
     remap_detections_to_full_frame,
     split_regions,
 )
-from app.user_scripts.common.yolo_backends import create_backend
+from app.user_scripts.common.yolo_backends import NV12Frame, create_backend
 
 
 SCRIPT_METADATA = {
@@ -244,6 +244,14 @@ SCRIPT_METADATA = {
             ],
             "description": "RKNNLite init_runtime 使用的 core_mask"
         },
+        "rknn_batch_size": {
+            "type": "int",
+            "label": "RKNN Batch",
+            "default": 1,
+            "min": 1,
+            "max": 16,
+            "description": "模型转换时的 rknn_batch_size；大于 1 时共享推理会把多帧合并为一次推理，不足时补零帧"
+        },
         "onnx_input_format": {
             "type": "select",
             "label": "ONNX输入颜色",
@@ -493,14 +501,34 @@ def process(
             "error_code": "model_not_initialized",
         })
 
+    backend = state["backend"]
+    effective_config = state.get("effective_config") or getattr(backend, "config", config)
+    roi_regions_effective = _prepare_roi_regions(effective_config, roi_regions)
+    pre_mask_regions, crop_infer_regions, post_filter_regions = split_regions(roi_regions_effective)
+    roi_modes = sorted({region.get("mode", ROI_MODE_POST_FILTER) for region in roi_regions_effective}) if roi_regions_effective else []
+
     frame_looks_rgb = (
         isinstance(frame, np.ndarray)
         and frame.ndim == 3
         and frame.shape[2] in (3, 4)
     )
+    # 整帧推理且不需要在 RGB 上做掩码/裁剪时，NV12 帧直接交给后端预处理
+    direct_nv12 = (
+        pixel_format == 'nv12'
+        and not frame_looks_rgb
+        and getattr(backend, "accepts_nv12", False)
+        and not pre_mask_regions
+        and not (crop_infer_regions and backend.name == "rknn")
+    )
     if pixel_format == 'nv12' and not frame_looks_rgb:
         try:
-            frame = nv12_to_rgb(frame, width=frame_width, height=frame_height)
+            if direct_nv12:
+                from app.core.frame_utils import ensure_frame_array, infer_frame_dimensions
+
+                width, height = infer_frame_dimensions(frame, pixel_format='nv12', width=frame_width, height=frame_height)
+                frame = NV12Frame(ensure_frame_array(frame, width, height, 'nv12'), width, height)
+            else:
+                frame = nv12_to_rgb(frame, width=frame_width, height=frame_height)
         except Exception as exc:
             logger.error(f"[自适应YOLO检测] NV12 转 RGB 失败: {exc}", exc_info=True)
             return build_result([], metadata={
@@ -511,7 +539,9 @@ def process(
 
     if isinstance(frame, np.ndarray) and frame.ndim == 3 and frame.shape[2] == 4:
         frame = frame[:, :, :3]
-    if not isinstance(frame, np.ndarray) or frame.ndim != 3 or frame.shape[2] != 3:
+    if not isinstance(frame, NV12Frame) and (
+        not isinstance(frame, np.ndarray) or frame.ndim != 3 or frame.shape[2] != 3
+    ):
         return build_result([], metadata={
             "error": (
                 f"不支持的输入帧格式: shape={getattr(frame, 'shape', None)}, "
@@ -521,11 +551,6 @@ def process(
             "pixel_format": pixel_format,
         })
 
-    backend = state["backend"]
-    effective_config = state.get("effective_config") or getattr(backend, "config", config)
-    roi_regions_effective = _prepare_roi_regions(effective_config, roi_regions)
-    _, crop_infer_regions, post_filter_regions = split_regions(roi_regions_effective)
-    roi_modes = sorted({region.get("mode", ROI_MODE_POST_FILTER) for region in roi_regions_effective}) if roi_regions_effective else []
     crop_infer_enabled = bool(crop_infer_regions) and backend.name == "rknn"
     crop_infer_fallback = bool(crop_infer_regions) and backend.name != "rknn"
 
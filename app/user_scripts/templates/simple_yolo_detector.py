@@ -24,6 +24,7 @@ import numpy as np
 from ultralytics import YOLO
 from typing import Any, Dict
 
+from app.core.algorithm import BaseAlgorithm
 from app.user_scripts.common.result import build_result
 from app.user_scripts.common.roi import apply_roi
 
@@ -102,22 +103,18 @@ def create_roi_mask(frame_shape: tuple, roi_regions: list) -> np.ndarray:
     """
     创建ROI掩码
 
+    坐标换算为绝对像素后交给 BaseAlgorithm 的进程内掩码缓存，
+    相同帧尺寸与热区配置只栅格化一次。
+
     Args:
         frame_shape: 图像尺寸 (height, width, channels)
         roi_regions: ROI区域列表
 
     Returns:
-        np.ndarray: 掩码图像，ROI内为255，外部为0
+        np.ndarray: 只读掩码图像，ROI内为255，外部为0；需要修改时先 copy()
     """
-    if not roi_regions:
-        # 没有ROI配置，返回全白掩码（全部区域有效）
-        return np.ones((frame_shape[0], frame_shape[1]), dtype=np.uint8) * 255
-
-    # 创建黑色掩码
-    mask = np.zeros((frame_shape[0], frame_shape[1]), dtype=np.uint8)
-
-    # 在ROI区域填充白色
-    for region in roi_regions:
+    regions = []
+    for region in roi_regions or []:
         # 支持两种数据格式：polygon 和 points
         polygon = region.get('polygon', []) or region.get('points', [])
 
@@ -134,12 +131,9 @@ def create_roi_mask(frame_shape: tuple, roi_regions: list) -> np.ndarray:
                 x = int(x)
                 y = int(y)
             points.append([x, y])
+        regions.append({'points': points})
 
-        if len(points) >= 3:
-            pts = np.array(points, dtype=np.int32)
-            cv2.fillPoly(mask, [pts], 255)
-
-    return mask
+    return BaseAlgorithm.create_roi_mask(frame_shape, regions)
 
 
 def apply_roi_mask(frame: np.ndarray, mask: np.ndarray) -> np.ndarray:
@@ -19,6 +19,7 @@ import numpy as np
 from ultralytics import YOLO
 from typing import Any, Dict, List
 
+from app.core.algorithm import BaseAlgorithm
 from app.user_scripts.common.result import build_result
 from app.user_scripts.common.roi import apply_roi
 
@@ -148,42 +149,17 @@ def create_roi_mask(frame_shape: tuple, roi_regions: list) -> np.ndarray:
     """
     创建ROI掩码
 
+    复用 BaseAlgorithm 的进程内掩码缓存：相同帧尺寸与热区配置只栅格化一次。
+
     Args:
         frame_shape: 图像尺寸 (height, width, channels)
-        roi_regions: ROI区域列表
+        roi_regions: ROI区域列表，支持 'polygon'/'points' 字段，
+                     相对坐标 [{"x": 0.1, "y": 0.2}, ...] 或绝对坐标 [[x1, y1], ...]
 
     Returns:
-        np.ndarray: 掩码图像，ROI内为255，外部为0
+        np.ndarray: 只读掩码图像，ROI内为255，外部为0；需要修改时先 copy()
     """
-    if not roi_regions:
-        # 没有ROI配置，返回全白掩码（全部区域有效）
-        return np.ones((frame_shape[0], frame_shape[1]), dtype=np.uint8) * 255
-
-    # 创建黑色掩码
-    mask = np.zeros((frame_shape[0], frame_shape[1]), dtype=np.uint8)
-    height, width = frame_shape[0], frame_shape[1]
-
-    # 在ROI区域填充白色
-    for region in roi_regions:
-        # 支持两种字段名：'polygon'（新格式）和 'points'（旧格式）
-        points = region.get('polygon', region.get('points', []))
-
-        if not points or len(points) < 3:
-            continue
-
-        # 检查坐标格式
-        # 如果是相对坐标格式 [{"x": 0.1, "y": 0.2}, ...]，转换为绝对坐标
-        if isinstance(points[0], dict):
-            # 相对坐标格式，需要转换为绝对坐标
-            pts = [[int(p['x'] * width), int(p['y'] * height)] for p in points]
-        else:
-            # 已经是绝对坐标格式 [[x1, y1], [x2, y2], ...]
-            pts = points
-
-        pts_array = np.array(pts, dtype=np.int32)
-        cv2.fillPoly(mask, [pts_array], 255)
-
-    return mask
+    return BaseAlgorithm.create_roi_mask(frame_shape, roi_regions)
 
 
 def apply_roi_mask(frame: np.ndarray, mask: np.ndarray) -> np.ndarray:
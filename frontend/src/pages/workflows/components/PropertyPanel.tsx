@@ -283,6 +283,8 @@ const PropertyPanel: React.FC<PropertyPanelProps> = ({
         formValues.executionMode = nodeConfig.execution_mode || node.data.executionMode || 'sync';
         formValues.intervalSeconds = nodeConfig.interval_seconds || 1;
         formValues.timeoutSeconds = nodeConfig.timeout_seconds || 30;
+        formValues.maxInFlight = nodeConfig.max_in_flight;
+        formValues.cacheTtlSeconds = nodeConfig.cache_ttl_seconds || 0;
         formValues.includeImage = nodeConfig.include_image !== false;
         formValues.includeUpstreamResults = nodeConfig.include_upstream_results !== false;
         formValues.payloadTemplate = JSON.stringify(nodeConfig.payload_template || {}, null, 2);
@@ -531,6 +533,12 @@ const PropertyPanel: React.FC<PropertyPanelProps> = ({
         config.execution_mode = values.executionMode || 'sync';
         config.interval_seconds = values.intervalSeconds;
         config.timeout_seconds = values.timeoutSeconds;
+        if (values.maxInFlight) {
+          config.max_in_flight = values.maxInFlight;
+        } else {
+          delete config.max_in_flight;
+        }
+        config.cache_ttl_seconds = values.cacheTtlSeconds || 0;
         config.include_image = values.includeImage !== false;
         config.include_upstream_results = values.includeUpstreamResults !== false;
         config.payload_template = values.payloadTemplate ? JSON.parse(values.payloadTemplate) : {};
@@ -545,6 +553,8 @@ const PropertyPanel: React.FC<PropertyPanelProps> = ({
         delete updatedData.executionMode;
         delete updatedData.intervalSeconds;
         delete updatedData.timeoutSeconds;
+        delete updatedData.maxInFlight;
+        delete updatedData.cacheTtlSeconds;
         delete updatedData.includeImage;
         delete updatedData.includeUpstreamResults;
         delete updatedData.payloadTemplate;
@@ -1191,11 +1201,12 @@ const PropertyPanel: React.FC<PropertyPanelProps> = ({
               <Form.Item
                 label="执行模式"
                 name="executionMode"
-                extra="同步等待会阻塞当前节点；异步提交只投递请求，不等待结果"
+                extra="同步等待会阻塞当前节点；异步提交只投递请求，不等待结果；最新结果在后台请求，节点直接返回最近一次完成的响应"
               >
                 <Select>
                   <Option value="sync">同步等待</Option>
                   <Option value="async_submit">异步提交</Option>
+                  <Option value="latest_result">最新结果</Option>
                 </Select>
               </Form.Item>
 
@@ -1213,6 +1224,22 @@ const PropertyPanel: React.FC<PropertyPanelProps> = ({
                 <InputNumber min={1} max={300} step={1} style={{ width: '100%' }} />
               </Form.Item>
 
+              <Form.Item
+                label="最大在途请求数"
+                name="maxInFlight"
+                extra="同一 endpoint 同时进行的请求上限，留空使用系统默认"
+              >
+                <InputNumber min={1} max={64} step={1} style={{ width: '100%' }} />
+              </Form.Item>
+
+              <Form.Item
+                label="结果缓存（秒）"
+                name="cacheTtlSeconds"
+                extra="请求体相同（不含帧时间戳）时复用响应，0 表示不缓存"
+              >
+                <InputNumber min={0} max={3600} step={1} style={{ width: '100%' }} />
+              </Form.Item>
+
               <Form.Item label="包含图片" name="includeImage" valuePropName="checked">
                 <Switch />
               </Form.Item>
@@ -3,6 +3,12 @@ import { Handle, Position } from 'reactflow';
 import { ApiOutlined } from '@ant-design/icons';
 import './BaseNode.css';
 
+const EXECUTION_MODE_LABELS: Record<string, string> = {
+  sync: '同步等待',
+  async_submit: '异步提交',
+  latest_result: '最新结果',
+};
+
 const ExternalApiNode = ({ data }: any) => {
   const executionMode = data.executionMode || 'sync';
 
@@ -19,7 +25,7 @@ const ExternalApiNode = ({ data }: any) => {
       )}
       <div className="node-meta">
         <span className="meta-label">模式:</span>
-        <span className="meta-value">{executionMode === 'async_submit' ? '异步提交' : '同步等待'}</span>
+        <span className="meta-value">{EXECUTION_MODE_LABELS[executionMode] || '同步等待'}</span>
       </div>
       {data.externalApiName && (
         <div className="node-meta">
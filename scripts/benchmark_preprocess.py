@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Compare the allocating and the fused YOLO input preprocessing paths.
+
+The allocating path is what the ONNX backend did before: NV12 -> BGR -> RGB at
+full resolution, letterbox into a fresh canvas, then astype, /255, transpose
+and ascontiguousarray. The fused path feeds the same NV12 frame to
+InputPreprocessor, which resizes the Y/UV planes, converts colour at model
+resolution and writes the normalized NCHW tensor into a reused batch slot.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from app.core.frame_utils import nv12_to_rgb, rgb_to_nv12  # noqa: E402
+from app.user_scripts.common.yolo_backends import InputPreprocessor, NV12Frame  # noqa: E402
+
+
+def allocating_preprocess(nv12, width, height, input_size):
+    frame = nv12_to_rgb(nv12, width=width, height=height)
+    scale = min(input_size / width, input_size / height)
+    resized_w = int(round(width * scale))
+    resized_h = int(round(height * scale))
+    resized = cv2.resize(frame, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+    canvas = np.zeros((input_size, input_size, 3), dtype=np.uint8)
+    pad_x = (input_size - resized_w) // 2
+    pad_y = (input_size - resized_h) // 2
+    canvas[pad_y:pad_y + resized_h, pad_x:pad_x + resized_w] = resized
+    tensor = canvas.astype(np.float32) / 255.0
+    return np.expand_dims(np.ascontiguousarray(np.transpose(tensor, (2, 0, 1))), axis=0)
+
+
+def measure(func, iterations, repeats):
+    func()
+    samples = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - started_at) * 1000.0 / iterations)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--input-size', type=int, default=640)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    yy, xx = np.mgrid[0:args.height, 0:args.width]
+    frame_rgb = np.stack([xx % 256, yy % 256, (xx + yy) // 8 % 256], axis=-1).astype(np.uint8)
+    nv12 = rgb_to_nv12(frame_rgb)
+
+    preprocessor = InputPreprocessor(
+        args.input_size, args.input_size, layout='nchw', dtype=np.float32, normalize=True
+    )
+    batch = preprocessor.new_batch(1)
+    source = NV12Frame(nv12, args.width, args.height)
+
+    expected = allocating_preprocess(nv12, args.width, args.height, args.input_size)
+    preprocessor.prepare(source, out=batch[0])
+    difference = float(np.abs(expected - batch).mean()) * 255.0
+
+    allocating_ms = measure(
+        lambda: allocating_preprocess(nv12, args.width, args.height, args.input_size),
+        args.iterations,
+        args.repeats,
+    )
+    fused_ms = measure(lambda: preprocessor.prepare(source, out=batch[0]), args.iterations, args.repeats)
+    print(f"frame={args.width}x{args.height} nv12 -> 1x3x{args.input_size}x{args.input_size} float32")
+    print(f"allocating path: {allocating_ms:8.2f} ms/frame")
+    print(f"fused path:      {fused_ms:8.2f} ms/frame")
+    print(f"speedup:         {allocating_ms / max(fused_ms, 1e-9):8.1f}x")
+    print(f"mean abs diff:   {difference:8.2f} (0-255 scale, chroma resampled before conversion)")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
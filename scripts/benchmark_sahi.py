@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Measure SAHI slice inference and cross-slice merging for 4/16/64 slices.
+
+The wrapped backend is synthetic: every runtime call costs a fixed round-trip
+overhead plus a per-image cost, which is what batching amortizes. Merging is
+timed against the previous per-pair greedy loop on the same detections.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np  # noqa: E402
+
+from app.user_scripts.common.yolo_backends import (  # noqa: E402
+    SahiYoloBackend,
+    _sahi_class_key,
+    _sahi_item_box,
+    merge_sahi_detections,
+)
+
+
+SLICE_SIZE = 320
+
+
+class _SyntheticBackend:
+    name = 'synthetic'
+    model_path = 'synthetic.onnx'
+    model_info = {}
+    model = None
+    classes = {0: 'person', 1: 'car'}
+    input_width = SLICE_SIZE
+    input_height = SLICE_SIZE
+    output_adapter = None
+
+    def __init__(self, call_overhead_ms, per_image_ms, detections_per_slice):
+        self.config = {'confidence': 0.5}
+        self.call_overhead = call_overhead_ms / 1000.0
+        self.per_image = per_image_ms / 1000.0
+        self.rng = np.random.default_rng(0)
+        self.detections_per_slice = detections_per_slice
+
+    def _detections(self):
+        boxes = self.rng.uniform(0, SLICE_SIZE - 40, size=(self.detections_per_slice, 2))
+        return [
+            {
+                'box': [float(x), float(y), float(x) + 40.0, float(y) + 80.0],
+                'confidence': float(self.rng.uniform(0.5, 1.0)),
+                'class': int(index % 2),
+            }
+            for index, (x, y) in enumerate(boxes)
+        ]
+
+    def infer(self, _frame):
+        time.sleep(self.call_overhead + self.per_image)
+        detections = self._detections()
+        return detections, [dict(item) for item in detections], {}
+
+    def cleanup(self):
+        pass
+
+
+class _SyntheticBatchBackend(_SyntheticBackend):
+    def infer_batch(self, frames, configs):
+        time.sleep(self.call_overhead + self.per_image * len(frames))
+        results = []
+        for _ in frames:
+            detections = self._detections()
+            results.append((detections, [dict(item) for item in detections], {}))
+        return results
+
+
+def greedy_merge(detections, details, match_threshold=0.5, match_metric='ios'):
+    """The per-pair greedy merge used before the array implementation."""
+    def match_score(box_a, box_b):
+        width = max(0.0, min(box_a[2], box_b[2]) - max(box_a[0], box_b[0]))
+        height = max(0.0, min(box_a[3], box_b[3]) - max(box_a[1], box_b[1]))
+        intersection = width * height
+        if intersection <= 0.0:
+            return 0.0
+        area_a = max(0.0, box_a[2] - box_a[0]) * max(0.0, box_a[3] - box_a[1])
+        area_b = max(0.0, box_b[2] - box_b[0]) * max(0.0, box_b[3] - box_b[1])
+        if match_metric == 'ios':
+            denominator = min(area_a, area_b)
+        else:
+            denominator = area_a + area_b - intersection
+        return intersection / denominator if denominator > 0.0 else 0.0
+
+    candidates = [index for index, item in enumerate(detections) if _sahi_item_box(item) is not None]
+    candidates.sort(key=lambda index: float(detections[index].get('confidence', 0.0) or 0.0), reverse=True)
+    kept = []
+    for index in candidates:
+        box = _sahi_item_box(detections[index])
+        key = _sahi_class_key(detections[index])
+        duplicate = False
+        for kept_index in kept:
+            if _sahi_class_key(detections[kept_index]) != key:
+                continue
+            score = match_score(box, _sahi_item_box(detections[kept_index]))
+            if score > 0.0 and score >= match_threshold:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(index)
+    return [detections[index] for index in kept], [details[index] for index in kept if index < len(details)]
+
+
+def median_ms(func, repeats):
+    samples = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started_at) * 1000.0)
+    return statistics.median(samples), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--slices', type=int, nargs='+', default=[4, 16, 64])
+    parser.add_argument('--call-overhead-ms', type=float, default=4.0)
+    parser.add_argument('--per-image-ms', type=float, default=1.0)
+    parser.add_argument('--detections-per-slice', type=int, default=30)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    config = {
+        'sahi_slice_width': SLICE_SIZE,
+        'sahi_slice_height': SLICE_SIZE,
+        'sahi_overlap_width_ratio': 0.0,
+        'sahi_overlap_height_ratio': 0.0,
+        'sahi_max_slices': max(args.slices),
+        'sahi_merge_threshold': 0.5,
+        'sahi_merge_metric': 'ios',
+    }
+    backend_args = (args.call_overhead_ms, args.per_image_ms, args.detections_per_slice)
+    print(f"{'slices':>6} {'serial ms':>10} {'batched ms':>11} {'dets':>6} {'greedy merge':>13} {'array merge':>12}")
+    for slice_count in args.slices:
+        side = max(1, int(round(slice_count ** 0.5)))
+        frame = np.zeros((side * SLICE_SIZE, (slice_count // side) * SLICE_SIZE, 3), dtype=np.uint8)
+        serial = SahiYoloBackend(_SyntheticBackend(*backend_args), config)
+        batched = SahiYoloBackend(_SyntheticBatchBackend(*backend_args), config)
+        serial_ms, _ = median_ms(lambda: serial.infer(frame), args.repeats)
+        batched_ms, (_, _, metadata) = median_ms(lambda: batched.infer(frame), args.repeats)
+
+        source = _SyntheticBatchBackend(*backend_args)
+        detections = []
+        for _ in range(metadata['sahi_slice_count']):
+            detections.extend(source._detections())
+        details = [dict(item) for item in detections]
+        greedy_ms, expected = median_ms(lambda: greedy_merge(detections, details), args.repeats)
+        array_ms, actual = median_ms(lambda: merge_sahi_detections(detections, details), args.repeats)
+        if actual != expected:
+            print('array merge differs from the greedy reference', file=sys.stderr)
+            return 1
+        print(
+            f"{metadata['sahi_slice_count']:>6} {serial_ms:>10.1f} {batched_ms:>11.1f} "
+            f"{len(detections):>6} {greedy_ms:>10.1f} ms {array_ms:>9.1f} ms"
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Compare per-item and vectorized tracker hot paths.
+
+Covers the pairwise IoU matrix (box_iou double loop vs NumPy broadcasting),
+class-aware association (per-label loops vs one matrix sliced per label), the
+Kalman predict/update step (one track at a time vs KalmanTrackStore batches),
+and reports ByteTracker per-frame cost on a crowded synthetic scene.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np  # noqa: E402
+
+import app.user_scripts.common.tracker as tracker_mod  # noqa: E402
+from app.user_scripts.common.byte_tracker import (  # noqa: E402
+    ByteTracker,
+    KalmanFilterXYAH,
+    KalmanTrackStore,
+    xyxy_to_xyah,
+)
+from app.user_scripts.common.tracker import (  # noqa: E402
+    ParsedDetection,
+    associate_class_aware,
+    box_iou,
+    new_track,
+    pairwise_iou,
+)
+
+
+LABELS = ("person", "car", "bicycle", "dog")
+
+
+def random_boxes(rng, count, extent):
+    xy = rng.uniform(0, extent, size=(count, 2))
+    wh = rng.uniform(10, 200, size=(count, 2))
+    return np.concatenate([xy, xy + wh], axis=1).tolist()
+
+
+def loop_pairwise_iou(track_boxes, det_boxes):
+    iou = np.zeros((len(track_boxes), len(det_boxes)), dtype=np.float64)
+    for i, track_box in enumerate(track_boxes):
+        for j, det_box in enumerate(det_boxes):
+            iou[i, j] = box_iou(track_box, det_box)
+    return iou
+
+
+def loop_class_aware(tracks, detections, iou_threshold):
+    """Per-label filtering with a per-label loop IoU matrix, as before vectorization."""
+    matches = []
+    for label in {track.label for track in tracks} & {det.label for det in detections}:
+        track_indices = [idx for idx, track in enumerate(tracks) if track.label == label]
+        det_indices = [idx for idx, det in enumerate(detections) if det.label == label]
+        iou = loop_pairwise_iou(
+            [tracks[idx].box for idx in track_indices],
+            [detections[idx].box for idx in det_indices],
+        )
+        local_matches, _, _ = tracker_mod.assign_by_iou(iou, iou_threshold)
+        matches.extend((track_indices[t], det_indices[d]) for t, d in local_matches)
+    return matches
+
+
+def loop_kalman_step(kf, states, measurements):
+    states = {track_id: kf.predict(*state) for track_id, state in states.items()}
+    for track_id, measurement in measurements.items():
+        states[track_id] = kf.update(*states[track_id], measurement)
+    return states
+
+
+def measure(func, repeats):
+    samples = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started_at)
+    return statistics.median(samples)
+
+
+def report(name, reference_s, vectorized_s):
+    print(
+        f"{name:<24} loop {reference_s * 1e3:9.3f} ms   vectorized {vectorized_s * 1e3:9.3f} ms"
+        f"   speedup {reference_s / max(vectorized_s, 1e-9):6.1f}x"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tracks', type=int, default=200)
+    parser.add_argument('--detections', type=int, default=200)
+    parser.add_argument('--frames', type=int, default=100, help='ByteTracker frames to simulate')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+    rng = np.random.default_rng(0)
+
+    track_boxes = random_boxes(rng, args.tracks, 1000.0)
+    det_boxes = random_boxes(rng, args.detections, 1000.0)
+    if not np.allclose(pairwise_iou(track_boxes, det_boxes), loop_pairwise_iou(track_boxes, det_boxes)):
+        print('vectorized IoU differs from box_iou', file=sys.stderr)
+        return 1
+    report(
+        f"IoU {args.tracks}x{args.detections}",
+        measure(lambda: loop_pairwise_iou(track_boxes, det_boxes), args.repeats),
+        measure(lambda: pairwise_iou(track_boxes, det_boxes), args.repeats),
+    )
+
+    tracks = [
+        new_track(idx + 1, ParsedDetection(box, 0.9, LABELS[idx % len(LABELS)], None, {}), 0.0, 4)
+        for idx, box in enumerate(track_boxes)
+    ]
+    detections = [
+        ParsedDetection(box, 0.9, LABELS[idx % len(LABELS)], None, {}) for idx, box in enumerate(det_boxes)
+    ]
+    report(
+        "class-aware association",
+        measure(lambda: loop_class_aware(tracks, detections, 0.3), args.repeats),
+        measure(lambda: associate_class_aware(tracks, detections, 0.3), args.repeats),
+    )
+
+    kf = KalmanFilterXYAH()
+    store = KalmanTrackStore(kf)
+    states = {}
+    for track_id, box in enumerate(track_boxes, start=1):
+        store.initiate(track_id, xyxy_to_xyah(box))
+        states[track_id] = kf.initiate(xyxy_to_xyah(box))
+    measured_ids = list(states)[::2]
+    measurement_rows = np.stack([xyxy_to_xyah(track_boxes[track_id - 1]) for track_id in measured_ids])
+    measurements = dict(zip(measured_ids, measurement_rows))
+
+    def batched_step():
+        store.predict_all()
+        store.update(measured_ids, measurement_rows)
+
+    report(
+        f"Kalman step {args.tracks} tracks",
+        measure(lambda: loop_kalman_step(kf, states, measurements), args.repeats),
+        measure(batched_step, args.repeats),
+    )
+
+    start = np.asarray(random_boxes(rng, args.tracks, 4000.0))
+    velocity = rng.uniform(-3, 3, size=(args.tracks, 2))
+    tracker = ByteTracker(min_hits=1, max_tracks=args.tracks * 2)
+    started_at = time.perf_counter()
+    for frame in range(args.frames):
+        offset = np.tile(velocity * frame, 2)
+        tracker.update(
+            [
+                {"box": box, "confidence": 0.9, "label": LABELS[idx % len(LABELS)]}
+                for idx, box in enumerate((start + offset).tolist())
+            ],
+            timestamp=frame,
+        )
+    elapsed = time.perf_counter() - started_at
+    print(f"ByteTracker {args.tracks} objects: {elapsed * 1e3 / args.frames:.3f} ms/frame over {args.frames} frames")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Compare full-scan and incremental sliding-window statistics in WindowDetector.
+
+Simulates one alert node fed at --fps for --seconds of frames with a --window
+second trigger window. Every frame adds a record and checks the condition, as
+the alert node does. The reference path filters the whole window and rescans it
+for the longest streak on every check (what WindowDetector did before); the
+incremental path is WindowDetector itself.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.window_detector import WindowDetector  # noqa: E402
+
+
+def build_frames(fps, seconds, seed=0):
+    rng = random.Random(seed)
+    frames = []
+    detected = False
+    for index in range(int(fps * seconds)):
+        # 命中/未命中成段出现，接近真实场景
+        if rng.random() < 0.05:
+            detected = not detected
+        frames.append((1_000_000.0 + index / fps, detected))
+    return frames
+
+
+def run_reference(frames, window):
+    records = []
+    results = []
+    for timestamp, detected in frames:
+        records.append((timestamp, detected, None))
+        window_records = [record for record in records if record[0] >= timestamp - window]
+        detection_count = sum(1 for _, hit, _ in window_records if hit)
+        longest = streak = 0
+        for _, hit, _ in window_records:
+            streak = streak + 1 if hit else 0
+            longest = max(longest, streak)
+        results.append((len(window_records), detection_count, longest))
+        # 保留窗口内记录即可，避免参考实现因列表无限增长而失真
+        if len(records) > 2 * len(window_records):
+            records = window_records
+    return results
+
+
+def run_incremental(frames, window):
+    detector = WindowDetector()
+    detector.load_trigger_condition(1, 'alert', {'enable': True, 'window_size': window, 'mode': 'ratio', 'threshold': 0.5})
+    results = []
+    for timestamp, detected in frames:
+        detector.add_record(1, 'alert', timestamp, detected)
+        _, stats = detector.check_condition(1, 'alert', timestamp)
+        results.append((stats['total_count'], stats['detection_count'], stats['max_consecutive']))
+    return results
+
+
+def measure(func, repeats):
+    samples = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started_at)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--window', type=float, default=300.0)
+    parser.add_argument('--seconds', type=float, default=600.0, help='simulated stream length')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    frames = build_frames(args.fps, args.seconds)
+    if run_reference(frames, args.window) != run_incremental(frames, args.window):
+        print('incremental stats differ from the full-scan reference', file=sys.stderr)
+        return 1
+
+    reference_s = measure(lambda: run_reference(frames, args.window), args.repeats)
+    incremental_s = measure(lambda: run_incremental(frames, args.window), args.repeats)
+    per_frame = 1_000_000.0 / len(frames)
+    print(f"frames={len(frames)} fps={args.fps:g} window={args.window:g}s records/window={int(args.fps * args.window)}")
+    print(f"full scan:   {reference_s * per_frame:8.1f} us/frame")
+    print(f"incremental: {incremental_s * per_frame:8.1f} us/frame")
+    print(f"speedup:     {reference_s / max(incremental_s, 1e-9):8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
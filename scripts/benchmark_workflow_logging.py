@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Measure per-frame WorkflowExecutor overhead with frame debug logs on and off.
+
+The workflow is source -> roi -> 3 parallel algorithms -> function -> condition ->
+alert, with fake algorithms returning a fixed batch of detections so the timing
+covers only scheduling, caching and logging.
+"""
+
+import argparse
+import io
+import logging
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np  # noqa: E402
+
+from app.core.execution_log_collector import ExecutionLogCollector  # noqa: E402
+from app.core.workflow_executor import WorkflowExecutor, frame_logger  # noqa: E402
+from app.core.workflow_types import create_node_data  # noqa: E402
+
+
+class _FixedAlgorithm:
+    def __init__(self, detection_count):
+        self._detections = [
+            {
+                'box': [i, i, i + 20, i + 40],
+                'confidence': 0.9,
+                'label_name': 'person',
+                'class': 0,
+            }
+            for i in range(detection_count)
+        ]
+
+    def process(self, frame, roi_regions, upstream_results=None):
+        return {'detections': [dict(item) for item in self._detections], 'metadata': {}}
+
+
+def _workflow(algorithm_count):
+    nodes = [
+        {'id': 'source', 'type': 'source', 'dataId': 1},
+        {
+            'id': 'roi',
+            'type': 'roi_draw',
+            'data': {
+                'roi_regions': [
+                    {'name': 'zone', 'mode': 'post_filter', 'polygon': [[0, 0], [640, 0], [640, 360], [0, 360]]},
+                ],
+            },
+        },
+        {'id': 'merge', 'type': 'function', 'config': {'function_name': 'area_ratio_frame', 'threshold': 0.01, 'operator': 'greater_than'}},
+        {'id': 'check', 'type': 'condition', 'data': {'target_count': 1, 'comparison_type': '>='}},
+        {'id': 'alert', 'type': 'alert'},
+    ]
+    connections = [{'from': 'source', 'to': 'roi'}]
+    for index in range(algorithm_count):
+        algo_id = f'algo_{index}'
+        nodes.append({'id': algo_id, 'type': 'algorithm', 'dataId': index + 1, 'config': {'interval_seconds': 0}})
+        connections.append({'from': 'roi', 'to': algo_id})
+    connections += [
+        {'from': 'algo_0', 'to': 'merge'},
+        {'from': 'merge', 'to': 'check'},
+        {'from': 'check', 'to': 'alert', 'condition': 'true'},
+    ]
+    return {'nodes': nodes, 'connections': connections}
+
+
+def build_executor(algorithm_count=3, detection_count=20):
+    workflow_data = _workflow(algorithm_count)
+    executor = WorkflowExecutor.__new__(WorkflowExecutor)
+    executor.workflow_id = 'bench'
+    executor.test_mode = False
+    executor.workflow_data = workflow_data
+    executor._state_lock = threading.Lock()
+    executor.nodes = {node['id']: create_node_data(node) for node in workflow_data['nodes']}
+    executor.connections = workflow_data['connections']
+    executor.execution_graph = defaultdict(list)
+    executor._build_execution_graph()
+    executor.node_results_cache = {}
+    executor.condition_diagnostics_cache = {}
+    executor.execution_results = {}
+    executor.executed_nodes = []
+    executor.skipped_nodes = set()
+    executor._in_progress_nodes = set()
+    executor._node_completion_events = {}
+    executor.node_last_exec_time = {}
+    executor.algorithms = {}
+    executor.algorithm_configs = {}
+    executor.algorithm_datamap = {}
+    executor.algorithm_roi_configs = {}
+    executor.external_api_configs = {}
+    executor._latest_algorithm_results = {}
+    for index in range(algorithm_count):
+        algo_id = f'algo_{index}'
+        executor.algorithms[algo_id] = _FixedAlgorithm(detection_count)
+        executor.algorithm_configs[algo_id] = {'algorithm_id': index + 1}
+        executor.algorithm_datamap[algo_id] = {
+            'name': algo_id,
+            'algorithm_type': 'script',
+            'label_color': '#FF0000',
+            'interval_seconds': 0,
+        }
+    executor.node_handlers = {
+        'source': executor._handle_source_node,
+        'roi_draw': executor._handle_roi_draw_node,
+        'algorithm': executor._handle_algorithm_node,
+        'function': executor._handle_function_node,
+        'condition': executor._handle_condition_node,
+        'alert': lambda node_id, context: context,
+    }
+    return executor
+
+
+def run_frame(executor, frame):
+    context = {
+        'frame': frame,
+        'frame_nv12': frame,
+        'frame_timestamp': time.time(),
+        'roi_regions': [],
+        'log_collector': ExecutionLogCollector(),
+    }
+    with executor._state_lock:
+        executor.executed_nodes.clear()
+        executor.skipped_nodes.clear()
+        executor.execution_results.clear()
+        executor._in_progress_nodes.clear()
+        executor._node_completion_events.clear()
+    executor._execute_by_topology_levels(executor=None, context=context)
+
+
+def measure(executor, frames, repeats):
+    frame = np.zeros((360, 640, 3), dtype=np.uint8)
+    for _ in range(min(frames, 50)):
+        run_frame(executor, frame)
+    samples = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        for _ in range(frames):
+            run_frame(executor, frame)
+        samples.append((time.perf_counter() - started_at) * 1e6 / frames)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--algorithms', type=int, default=3)
+    parser.add_argument('--detections', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    executor = build_executor(max(1, args.algorithms), args.detections)
+    # 模拟 workflow_debug.log：handler 会真正格式化每条记录
+    sink = logging.StreamHandler(io.StringIO())
+    sink.setLevel(logging.DEBUG)
+    original_level = frame_logger.level
+    frame_logger.addHandler(sink)
+    frame_logger.propagate = False
+    try:
+        frame_logger.setLevel(logging.INFO)
+        disabled_us = measure(executor, args.frames, args.repeats)
+        frame_logger.setLevel(logging.DEBUG)
+        enabled_us = measure(executor, args.frames, args.repeats)
+    finally:
+        frame_logger.removeHandler(sink)
+        frame_logger.propagate = True
+        frame_logger.setLevel(original_level)
+
+    print(f"nodes={len(executor.nodes)} algorithms={max(1, args.algorithms)} detections/algo={args.detections}")
+    print(f"frame logs disabled: {disabled_us:8.1f} us/frame")
+    print(f"frame logs enabled:  {enabled_us:8.1f} us/frame")
+    print(f"logging overhead:    {enabled_us - disabled_us:8.1f} us/frame")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
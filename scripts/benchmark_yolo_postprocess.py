@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Compare the per-row and array-based YOLO output decoding paths.
+
+Feeds a synthetic YOLOv8-style dense head (1 x (4 + classes) x anchors) through
+both paths: the reference per-row decode (one dict per anchor, then NMS) and
+YoloOutputAdapter.parse, which thresholds, decodes and runs NMS on whole arrays.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np  # noqa: E402
+
+from app.user_scripts.common.yolo_backends import (  # noqa: E402
+    YoloOutputAdapter,
+    _build_detections_from_rows,
+    _collect_row_blocks_from_dense_outputs,
+    _row_items_from_blocks,
+)
+
+
+FRAME_SHAPE = (1080, 1920, 3)
+INPUT_SIZE = 640
+
+
+def build_output(anchors, class_count, positives, seed=0):
+    rng = np.random.default_rng(seed)
+    output = np.empty((1, 4 + class_count, anchors), dtype=np.float32)
+    output[0, 0:2] = rng.uniform(0, INPUT_SIZE, size=(2, anchors))
+    output[0, 2:4] = rng.uniform(8, 160, size=(2, anchors))
+    # 已经过 sigmoid 的类别分数，绝大多数 anchor 低于阈值
+    output[0, 4:] = rng.uniform(0.0, 0.2, size=(class_count, anchors))
+    hits = rng.choice(anchors, size=min(positives, anchors), replace=False)
+    output[0, 4 + rng.integers(0, class_count, size=hits.size), hits] = rng.uniform(0.5, 0.99, size=hits.size)
+    return output
+
+
+def decode_rows(adapter, outputs, scale, pad_x, pad_y):
+    row_items = _row_items_from_blocks(_collect_row_blocks_from_dense_outputs(outputs))
+    return _build_detections_from_rows(
+        row_items=row_items,
+        classes=adapter.classes,
+        config=adapter.config,
+        frame_shape=FRAME_SHAPE,
+        input_width=INPUT_SIZE,
+        input_height=INPUT_SIZE,
+        scale=scale,
+        pad_x=pad_x,
+        pad_y=pad_y,
+        class_count=adapter.class_count,
+        bbox_format=adapter.bbox_format,
+        score_mode=adapter.score_mode,
+    )
+
+
+def decode_arrays(adapter, outputs, scale, pad_x, pad_y):
+    detections, details, _ = adapter.parse(
+        outputs=outputs,
+        frame_shape=FRAME_SHAPE,
+        input_width=INPUT_SIZE,
+        input_height=INPUT_SIZE,
+        scale=scale,
+        pad_x=pad_x,
+        pad_y=pad_y,
+    )
+    return detections, details
+
+
+def measure(func, iterations, repeats):
+    func()
+    samples = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - started_at) * 1000.0 / iterations)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--anchors', type=int, default=8400)
+    parser.add_argument('--classes', type=int, default=80)
+    parser.add_argument('--positives', type=int, default=60)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    class_count = max(1, args.classes)
+    adapter = YoloOutputAdapter(
+        model_info={},
+        config={'confidence': 0.45, 'nms_iou': 0.45},
+        classes={index: f'class_{index}' for index in range(class_count)},
+        input_width=INPUT_SIZE,
+        input_height=INPUT_SIZE,
+    )
+    outputs = [build_output(args.anchors, class_count, args.positives)]
+    scale = INPUT_SIZE / max(FRAME_SHAPE[:2])
+    pad_y = (INPUT_SIZE - int(round(FRAME_SHAPE[0] * scale))) // 2
+    call_args = (adapter, outputs, scale, 0, pad_y)
+
+    row_result = decode_rows(*call_args)
+    array_result = decode_arrays(*call_args)
+    if row_result != array_result:
+        print('array decode differs from the per-row reference', file=sys.stderr)
+        return 1
+
+    row_ms = measure(lambda: decode_rows(*call_args), args.iterations, args.repeats)
+    array_ms = measure(lambda: decode_arrays(*call_args), args.iterations, args.repeats)
+    print(f"output=1x{4 + class_count}x{args.anchors} detections={len(array_result[0])}")
+    print(f"per-row decode: {row_ms:8.2f} ms/frame")
+    print(f"array decode:   {array_ms:8.2f} ms/frame")
+    print(f"speedup:        {row_ms / max(array_ms, 1e-9):8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
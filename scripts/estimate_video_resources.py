@@ -15,9 +15,11 @@ from app.config import (  # noqa: E402
     ANALYSIS_TARGET_FPS,
     DECODER_OUTPUT_QUEUE_SIZE,
     RECORDING_BUFFER_DURATION,
+    RECORDING_BUFFER_MODE,
     RECORDING_COMPRESSED_MAX_BYTES,
     RECORDING_ENABLED,
     RECORDING_FPS,
+    RECORDING_PACKET_BUFFER_MB,
     VIDEO_FRAME_PIXEL_FORMAT,
 )
 from app.core.resource_estimator import (  # noqa: E402
@@ -83,6 +85,8 @@ def build_settings(args) -> ResourceSettings:
         recording_fps=args.recording_fps,
         recording_buffer_duration=args.recording_seconds,
         recording_compressed_max_bytes=args.recording_max_frame_bytes,
+        recording_buffer_mode=args.recording_buffer_mode,
+        recording_packet_buffer_bytes=args.recording_packet_buffer_mb * 1024 * 1024,
     )
 
 
@@ -154,6 +158,8 @@ def main() -> int:
     parser.add_argument('--recording-fps', type=int, default=RECORDING_FPS)
     parser.add_argument('--recording-seconds', type=int, default=RECORDING_BUFFER_DURATION)
     parser.add_argument('--recording-max-frame-bytes', type=int, default=RECORDING_COMPRESSED_MAX_BYTES)
+    parser.add_argument('--recording-buffer-mode', choices=('jpeg', 'packet'), default=RECORDING_BUFFER_MODE)
+    parser.add_argument('--recording-packet-buffer-mb', type=int, default=RECORDING_PACKET_BUFFER_MB)
     args = parser.parse_args()
 
     settings = build_settings(args)
@@ -0,0 +1,137 @@
+import io
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import source_workflow_host
+from app.core.orchestrator import OutputReader
+from app.core.workflow_executor import WorkflowExecutor
+from app.source_workflow_host import AdaptiveFrameScheduler, SourceWorkflowHost, WorkflowRunner
+
+
+@pytest.fixture(autouse=True)
+def replan_every_run(monkeypatch):
+    monkeypatch.setattr(source_workflow_host, "ADAPTIVE_REPLAN_INTERVAL_SECONDS", 0.0)
+    monkeypatch.setattr(source_workflow_host, "ADAPTIVE_EWMA_ALPHA", 1.0)
+
+
+def _scheduler(**kwargs):
+    scheduler = AdaptiveFrameScheduler(10, stride_candidates={"detector", "ocr"}, **kwargs)
+    scheduler._next_replan_at = 0.0
+    return scheduler
+
+
+def test_fast_workflow_runs_every_frame_and_every_node():
+    scheduler = _scheduler()
+
+    assert scheduler.record_run(40.0, {"detector": 30, "ocr": 5}, time.time()) is False
+
+    assert (scheduler.frame_stride, scheduler.node_strides) == (1, {})
+    assert all(scheduler.should_submit() for _ in range(5))
+
+
+def test_heavy_node_gets_a_stride_while_cheap_nodes_keep_every_frame():
+    scheduler = _scheduler()
+
+    # 预算 90ms；检测节点 200ms，其余 20ms -> 检测节点每 3 帧执行一次
+    assert scheduler.record_run(220.0, {"detector": 200, "ocr": 0}, time.time()) is True
+    assert (scheduler.frame_stride, scheduler.node_strides) == (1, {"detector": 3})
+
+    # 降频后测得的是摊销耗时，重新规划时乘回步长，结果保持稳定
+    assert scheduler.record_run(20.0 + 200.0 / 3, {"detector": 200.0 / 3}, time.time()) is False
+    assert scheduler.node_strides == {"detector": 3}
+
+    assert scheduler.record_run(30.0, {"detector": 10}, time.time()) is True
+    assert (scheduler.frame_stride, scheduler.node_strides) == (1, {})
+
+
+def test_frame_stride_drops_frames_when_cheap_nodes_exceed_the_budget():
+    scheduler = _scheduler()
+
+    scheduler.record_run(250.0, {"detector": 10, "ocr": 10}, time.time())
+
+    assert scheduler.frame_stride == 3
+    assert scheduler.node_strides == {}
+    assert [scheduler.should_submit() for _ in range(6)] == [False, False, True, False, False, True]
+    status = scheduler.snapshot(dropped_frames=4)
+    assert status["target_fps"] == pytest.approx(10 / 3, abs=0.01)
+    assert (status["submitted_frames"], status["skipped_frames"], status["dropped_frames"]) == (2, 4, 4)
+
+
+def test_disabled_scheduler_only_collects_statistics():
+    scheduler = _scheduler(enabled=False)
+
+    assert scheduler.record_run(500.0, {"detector": 480}, time.time() - 0.2) is False
+
+    status = scheduler.snapshot()
+    assert (status["frame_stride"], status["node_strides"]) == (1, {})
+    assert status["run_once_ms"] == 500.0
+    assert status["lag_ms"] >= 200.0
+    assert status["completed_runs"] == 1
+
+
+def test_executor_skips_strided_nodes_between_executions():
+    executor = WorkflowExecutor.__new__(WorkflowExecutor)
+    executor.workflow_id = 1
+    executor.set_node_strides({"detector": 3, "tracker": 1})
+
+    assert executor.node_strides == {"detector": 3}
+    assert [executor._consume_node_stride("detector") for _ in range(6)] == [True, False, False, True, False, False]
+    assert executor._consume_node_stride("tracker") is True
+
+    executor.set_node_strides({})
+    assert executor._consume_node_stride("detector") is True
+
+
+def test_runner_counts_replaced_frames_and_applies_new_strides():
+    executor = SimpleNamespace(
+        stop=lambda: None,
+        last_run_once_ms=220.0,
+        get_last_run_node_times=lambda: {"detector": 200},
+        set_node_strides=lambda strides: applied.append(dict(strides)),
+    )
+    applied = []
+    runner = WorkflowRunner(SimpleNamespace(id=3), executor, scheduler=_scheduler())
+
+    runner.submit_frame(object(), 1.0)
+    runner.submit_frame(object(), 2.0)
+    runner._record_schedule(time.time())
+
+    assert runner.dropped_frames == 1
+    assert applied == [{"detector": 3}]
+    status = runner.get_status()
+    assert (status["workflow_id"], status["dropped_frames"], status["node_strides"]) == (3, 1, {"detector": 3})
+
+
+def test_host_publishes_status_line_and_orchestrator_keeps_it_out_of_logs(monkeypatch):
+    printed = []
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: printed.append(args[0]))
+    host = SourceWorkflowHost.__new__(SourceWorkflowHost)
+    host.source_id = 7
+    host.analysis_fps = 10
+    host._status_next_publish_at = 0.0
+    host.runners = {3: WorkflowRunner(SimpleNamespace(id=3), SimpleNamespace(stop=lambda: None), scheduler=_scheduler())}
+
+    host._publish_status()
+    host._publish_status()
+
+    assert len(printed) == 1
+    line = printed[0]
+    assert line.startswith("SOURCE_HOST_STATUS:7:")
+    assert json.loads(line.split(":", 2)[2])["workflows"][0]["workflow_id"] == 3
+
+    received = []
+    logged = []
+    process = SimpleNamespace(stdout=io.StringIO(f"{line}\nhello\n"))
+    reader = OutputReader(
+        process,
+        "SourceHost-7",
+        on_line=lambda text: received.append(text) or text.startswith("SOURCE_HOST_STATUS:"),
+        target_logger=SimpleNamespace(info=logged.append, error=logged.append),
+    )
+    reader.run()
+
+    assert received == [line, "hello"]
+    assert logged == ["[SourceHost-7] hello"]
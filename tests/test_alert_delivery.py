@@ -1,5 +1,7 @@
 import base64
+import threading
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 from PIL import Image
 from peewee import SqliteDatabase
@@ -60,7 +62,7 @@ def test_inline_delivery_embeds_bounded_jpeg(tmp_path, monkeypatch):
         monkeypatch.setattr(alert_delivery, "FRAME_SAVE_PATH", str(tmp_path / "frames"))
         monkeypatch.setattr(alert_delivery, "get_public_media_config", lambda: config)
         monkeypatch.setattr(alert_delivery, "format_alert_message", _message)
-        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event: published.append(event) or True)
+        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event, **_: published.append(event) or True)
 
         worker = alert_delivery.AlertDeliveryWorker()
         assert worker.run_once() is True
@@ -106,7 +108,7 @@ def test_object_storage_sends_created_then_media_ready(tmp_path, monkeypatch):
         monkeypatch.setattr(alert_delivery, "get_public_media_config", lambda: config)
         monkeypatch.setattr(alert_delivery, "format_alert_message", _message)
         monkeypatch.setattr(alert_delivery, "get_node_id", lambda: "box-1")
-        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event: published.append(event) or True)
+        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event, **_: published.append(event) or True)
         monkeypatch.setattr(
             alert_delivery,
             "upload_alert_image",
@@ -155,7 +157,7 @@ def test_url_delivery_uses_url_fields_without_base64(tmp_path, monkeypatch):
         published = []
         monkeypatch.setattr(alert_delivery, "get_public_media_config", lambda: config)
         monkeypatch.setattr(alert_delivery, "format_alert_message", _message)
-        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event: published.append(event) or True)
+        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event, **_: published.append(event) or True)
 
         assert alert_delivery.AlertDeliveryWorker().run_once() is True
 
@@ -185,7 +187,7 @@ def test_failed_publish_is_scheduled_for_retry(tmp_path, monkeypatch):
         config = PublicMediaConfig(delivery_mode="url", async_max_attempts=3)
         monkeypatch.setattr(alert_delivery, "get_public_media_config", lambda: config)
         monkeypatch.setattr(alert_delivery, "format_alert_message", _message)
-        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event: False)
+        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event, **_: False)
 
         assert alert_delivery.AlertDeliveryWorker().run_once() is True
         task = AlertDeliveryTask.get_by_id(task.id)
@@ -216,7 +218,7 @@ def test_inline_unreadable_image_degrades_to_text_alert(tmp_path, monkeypatch):
         monkeypatch.setattr(alert_delivery, "FRAME_SAVE_PATH", str(tmp_path / "frames"))
         monkeypatch.setattr(alert_delivery, "get_public_media_config", lambda: config)
         monkeypatch.setattr(alert_delivery, "format_alert_message", _message)
-        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event: published.append(event) or True)
+        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event, **_: published.append(event) or True)
 
         assert alert_delivery.AlertDeliveryWorker().run_once() is True
 
@@ -248,7 +250,119 @@ def test_stale_processing_task_is_recovered_during_runtime(tmp_path, monkeypatch
         config = PublicMediaConfig(delivery_mode="url")
         monkeypatch.setattr(alert_delivery, "get_public_media_config", lambda: config)
         monkeypatch.setattr(alert_delivery, "format_alert_message", _message)
-        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event: True)
+        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", lambda event, **_: True)
 
         assert alert_delivery.AlertDeliveryWorker().run_once() is True
         assert AlertDeliveryTask.get_by_id(task.id).status == "succeeded"
+
+
+def _pending_task(alert, event_type="alert.created", **fields):
+    now = datetime.now()
+    values = {
+        "alert": alert,
+        "event_type": event_type,
+        "delivery_mode": "url",
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+        "updated_at": now,
+    }
+    values.update(fields)
+    return AlertDeliveryTask.create(**values)
+
+
+def test_batch_is_claimed_at_once_and_sent_concurrently(tmp_path, monkeypatch):
+    test_db = SqliteDatabase(":memory:")
+    models = [VideoSource, Workflow, Alert, AlertDeliveryTask]
+    with test_db.bind_ctx(models):
+        test_db.create_tables(models)
+        first = _create_alert(tmp_path)
+        alerts = [first] + [
+            Alert.create(video_source=first.video_source, alert_time=datetime.now(), alert_type="person")
+            for _ in range(4)
+        ]
+        tasks = [_pending_task(alert) for alert in alerts]
+        config = PublicMediaConfig(delivery_mode="url", async_max_attempts=3)
+        barrier = threading.Barrier(3, timeout=5)
+        threads = set()
+        received_configs = []
+
+        def publish(event, **delivery_config):
+            received_configs.append(delivery_config)
+            if event["alert_id"] == alerts[1].id:
+                return False
+            if event["alert_id"] in (alerts[0].id, alerts[2].id, alerts[3].id):
+                barrier.wait()
+            threads.add(threading.get_ident())
+            return True
+
+        monkeypatch.setattr(alert_delivery, "get_public_media_config", lambda: config)
+        monkeypatch.setattr(alert_delivery, "format_alert_message", _message)
+        monkeypatch.setattr(alert_delivery, "publish_alert_to_mq", publish)
+        mq_config = SimpleNamespace(provider="http")
+        provider_config = object()
+        config_reads = []
+        monkeypatch.setattr(alert_delivery, "get_message_queue_config", lambda: config_reads.append("mq") or mq_config)
+        monkeypatch.setattr(
+            alert_delivery,
+            "load_provider_config",
+            lambda provider: config_reads.append(provider) or provider_config,
+        )
+
+        worker = alert_delivery.AlertDeliveryWorker(batch_size=4, concurrency=3)
+        try:
+            assert worker.run_once() is True
+            statuses = [AlertDeliveryTask.get_by_id(task.id).status for task in tasks]
+            assert statuses == ["succeeded", "retrying", "succeeded", "succeeded", "pending"]
+            assert len(threads) == 3
+            retried = AlertDeliveryTask.get_by_id(tasks[1].id)
+            assert (retried.attempts, retried.locked_at) == (1, None)
+
+            # 通道配置每批只在 worker 线程读取一次，发送线程只收到已读取的配置
+            assert config_reads == ["mq", "http"]
+            assert received_configs == [{"config": mq_config, "provider_config": provider_config}] * 4
+
+            assert worker.run_once() is True
+            assert AlertDeliveryTask.get_by_id(tasks[4].id).status == "succeeded"
+            assert worker.run_once() is False
+        finally:
+            worker.stop()
+
+
+def test_rabbitmq_sender_pool_stays_serial():
+    worker = alert_delivery.AlertDeliveryWorker(concurrency=4)
+    try:
+        assert worker._sender_pool("rabbitmq")._max_workers == 1
+        assert worker._sender_pool("mqtt")._max_workers == 4
+        assert worker._sender_pool("mqtt") is worker._senders["mqtt"]
+    finally:
+        worker.stop()
+
+
+def test_delivery_stats_report_backlog_throughput_and_latency(tmp_path):
+    test_db = SqliteDatabase(":memory:")
+    models = [VideoSource, Workflow, Alert, AlertDeliveryTask]
+    with test_db.bind_ctx(models):
+        test_db.create_tables(models)
+        alert = _create_alert(tmp_path)
+        now = datetime.now()
+        _pending_task(alert, next_attempt_at=now - timedelta(seconds=30))
+        _pending_task(alert, event_type="alert.media.ready", next_attempt_at=now + timedelta(minutes=5))
+        for index, seconds in enumerate((1, 3)):
+            other = Alert.create(video_source=alert.video_source, alert_time=now, alert_type="person")
+            _pending_task(
+                other,
+                status="succeeded",
+                created_at=now - timedelta(seconds=seconds + index),
+                completed_at=now - timedelta(seconds=index),
+            )
+
+        stats = alert_delivery.get_delivery_stats()
+
+        assert (stats["pending"], stats["backlog"]) == (2, 1)
+        assert 29 <= stats["oldest_due_age_seconds"] <= 40
+        assert stats["delivered_in_window"] == 2
+        assert stats["throughput_per_minute"] == 0.4
+        assert stats["latency_avg_seconds"] == 2.0
+        assert stats["latency_p95_seconds"] == 3.0
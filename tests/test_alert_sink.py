@@ -0,0 +1,155 @@
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from peewee import SqliteDatabase
+
+from app.core import alert_delivery, alert_sink
+from app.core.alert_sink import AlertJob, AlertSink, persist_alert_jobs
+from app.core.database_models import Alert, AlertDeliveryTask, VideoSource, Workflow
+
+
+MODELS = [VideoSource, Workflow, Alert, AlertDeliveryTask]
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    # worker 线程各自连接数据库，不能用 :memory:
+    test_db = SqliteDatabase(str(tmp_path / "alerts.db"), check_same_thread=False)
+    monkeypatch.setattr(alert_delivery, "get_message_queue_config", lambda: SimpleNamespace(enabled=True))
+    monkeypatch.setattr(alert_delivery, "get_public_media_config", lambda: SimpleNamespace(delivery_mode="url"))
+    with test_db.bind_ctx(MODELS):
+        test_db.create_tables(MODELS)
+        yield VideoSource.create(name="Camera", source_code="camera-1", source_url="rtsp://camera/live")
+    test_db.close()
+
+
+def _job(source, key, message, media=(), publish=True, recorder=None):
+    return AlertJob(
+        key,
+        media=media,
+        alert_fields={
+            "video_source": source,
+            "alert_time": datetime.now(),
+            "alert_type": "person",
+            "alert_message": message,
+        },
+        recorder=recorder,
+        recording={"source_id": source.id, "trigger_time": 0.0, "pre_seconds": 1, "post_seconds": 1} if recorder else None,
+        publish=publish,
+    )
+
+
+def test_persist_writes_media_before_alerts_and_enqueues_delivery(source):
+    written = []
+
+    class Recorder:
+        def start_recording(self, alert_id, **kwargs):
+            assert Alert.select().where(Alert.id == alert_id).exists()
+            return f"{kwargs['source_id']}/alert_{alert_id}.mp4"
+
+    jobs = [
+        _job(source, "a", "first", media=(lambda: written.append("first"),), recorder=Recorder()),
+        _job(source, "a", "second", publish=False),
+        AlertJob("a", media=(lambda: written.append("window"),)),
+    ]
+    persist_alert_jobs(jobs)
+
+    assert written == ["first", "window"]
+    alerts = list(Alert.select().order_by(Alert.id))
+    assert [alert.alert_message for alert in alerts] == ["first", "second"]
+    assert alerts[0].alert_video == f"{source.id}/alert_{alerts[0].id}.mp4"
+    assert alerts[1].alert_video is None
+    assert [task.alert_id for task in AlertDeliveryTask.select()] == [alerts[0].id]
+    assert jobs[0].alert.id == alerts[0].id
+
+
+def test_failed_batch_falls_back_to_single_inserts(source):
+    bad = _job(source, "a", "bad")
+    bad.alert_fields["video_source"] = None
+    jobs = [_job(source, "a", "good-1"), bad, _job(source, "a", "good-2")]
+
+    persist_alert_jobs(jobs)
+
+    assert [alert.alert_message for alert in Alert.select().order_by(Alert.id)] == ["good-1", "good-2"]
+    assert jobs[1].alert is None
+
+
+def test_failed_delivery_batch_does_not_restart_recordings(source, monkeypatch):
+    started = []
+
+    class Recorder:
+        def start_recording(self, alert_id, **kwargs):
+            started.append(alert_id)
+            return f"{kwargs['source_id']}/alert_{alert_id}.mp4"
+
+    original_enqueue = alert_sink.enqueue_alert_deliveries
+
+    def flaky_enqueue(alerts, **kwargs):
+        if len(alerts) > 1:
+            raise RuntimeError("outbox unavailable")
+        return original_enqueue(alerts, **kwargs)
+
+    monkeypatch.setattr(alert_sink, "enqueue_alert_deliveries", flaky_enqueue)
+    jobs = [_job(source, "a", f"alert-{index}", recorder=Recorder()) for index in range(3)]
+
+    persist_alert_jobs(jobs)
+
+    alerts = list(Alert.select().order_by(Alert.id))
+    assert started == [alert.id for alert in alerts]
+    assert [alert.alert_video for alert in alerts] == [f"{source.id}/alert_{alert.id}.mp4" for alert in alerts]
+    assert sorted(task.alert_id for task in AlertDeliveryTask.select()) == [alert.id for alert in alerts]
+
+
+def test_sink_preserves_order_per_key_and_reports_backpressure(source):
+    release = threading.Event()
+    sink = AlertSink(workers=2, queue_size=1, batch_size=8, name="test-alert")
+    try:
+        # 第一个 job 卡住 worker，后续提交填满队列并进入背压等待
+        sink.submit(AlertJob(("cam", "node-1"), media=(release.wait,)))
+        submitted = threading.Thread(
+            target=lambda: [sink.submit(_job(source, ("cam", "node-1"), f"alert-{index}")) for index in range(5)],
+        )
+        submitted.start()
+        submitted.join(timeout=0.3)
+        assert submitted.is_alive()
+        release.set()
+        submitted.join(timeout=5)
+        assert sink.flush(timeout=5)
+
+        messages = [alert.alert_message for alert in Alert.select().order_by(Alert.id)]
+        assert messages == [f"alert-{index}" for index in range(5)]
+        stats = sink.get_stats()
+        assert stats["submitted"] == 6
+        assert stats["alerts_persisted"] == 5
+        assert stats["alerts_failed"] == 0
+        assert stats["backpressure_waits"] >= 1
+        assert stats["depth"] == 0
+    finally:
+        release.set()
+        sink.close(timeout=5)
+
+
+def test_closed_sink_persists_inline(source):
+    sink = AlertSink(workers=1, queue_size=1, batch_size=4)
+    sink.close(timeout=5)
+
+    sink.submit(_job(source, "a", "late"))
+
+    assert [alert.alert_message for alert in Alert.select()] == ["late"]
+
+
+def test_sink_logs_persisted_alert_with_job_prefix(source, monkeypatch):
+    logged = []
+    monkeypatch.setattr(alert_sink.logger, "info", logged.append)
+    sink = AlertSink(workers=1, queue_size=4, batch_size=4)
+    try:
+        job = _job(source, "a", "hello")
+        job.log_prefix = "[Workflow-3]"
+        sink.submit(job)
+        assert sink.flush(timeout=5)
+    finally:
+        sink.close(timeout=5)
+
+    assert logged == [f"[Workflow-3] Alert 创建成功，ID: {job.alert.id}"]
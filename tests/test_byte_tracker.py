@@ -104,7 +104,7 @@ def test_duplicate_passthrough_ids_are_remapped():
     ids = {item.track_id for item in result}
     assert len(ids) == 2
     assert 1 in ids
-    assert len(tracker._kf_state) == 2
+    assert len(tracker._kf_store) == 2
 
 
 def test_unix_timestamps_keep_id():
@@ -120,7 +120,7 @@ def test_reset_clears_kalman_state():
     tracker.update([_det([0, 0, 20, 40])], timestamp=1)
     tracker.reset()
     assert tracker.tracks == []
-    assert tracker._kf_state == {}
+    assert len(tracker._kf_store) == 0
     result = tracker.update([_det([80, 0, 100, 40])], timestamp=2)
     assert result[0].track_id == 1
 
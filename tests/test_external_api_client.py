@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+from app.core import external_api_client
+from app.core.external_api_client import (
+    ExternalApiBusyError,
+    ExternalApiClient,
+    LatencyHistogram,
+    request_cache_key,
+)
+
+
+class _FakeResponse:
+    def __init__(self, body, status_code=200):
+        self._body = body
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'application/json'}
+        self.closed = False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"http {self.status_code}")
+
+    def json(self):
+        return self._body
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeSession:
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+
+    def request(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        return _FakeResponse({'echo': kwargs['json'].get('scene'), 'n': len(self.calls)})
+
+    def close(self):
+        pass
+
+
+def test_requests_reuse_one_session_and_record_latency():
+    session = _FakeSession()
+    client = ExternalApiClient('http://api/infer', max_in_flight=2, session=session)
+
+    for _ in range(3):
+        response = client.request('POST', {'X-Key': '1'}, {'scene': 'gate'}, timeout=5)
+
+    assert response == {
+        'status_code': 200,
+        'headers': {'Content-Type': 'application/json'},
+        'body': {'echo': 'gate', 'n': 3},
+    }
+    assert [call['url'] for call in session.calls] == ['http://api/infer'] * 3
+    stats = client.get_stats()
+    assert (stats['in_flight'], stats['errors'], stats['cache_hits']) == (0, 0, 0)
+    assert stats['latency']['count'] == 3
+    assert stats['latency']['buckets']['le_10'] == 3
+
+
+def test_in_flight_limit_rejects_non_blocking_requests():
+    gate = threading.Event()
+    client = ExternalApiClient('http://api/slow', max_in_flight=1, session=_FakeSession(gate))
+    worker = threading.Thread(target=client.request, args=('POST', {}, {}, 5))
+    worker.start()
+    deadline = time.monotonic() + 5
+    while client.get_stats()['in_flight'] == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+    with pytest.raises(ExternalApiBusyError):
+        client.request('POST', {}, {}, 5, block=False)
+    with pytest.raises(ExternalApiBusyError):
+        client.request('POST', {}, {}, 0.01)
+
+    gate.set()
+    worker.join(timeout=5)
+    assert client.get_stats()['busy_rejections'] == 2
+    assert client.request('POST', {}, {}, 5, block=False)['status_code'] == 200
+
+
+def test_request_timeout_is_what_remains_after_waiting_for_a_slot():
+    gate = threading.Event()
+    session = _FakeSession(gate)
+    client = ExternalApiClient('http://api/slow', max_in_flight=1, session=session)
+    worker = threading.Thread(target=client.request, args=('POST', {}, {}, 5))
+    worker.start()
+    deadline = time.monotonic() + 5
+    while client.get_stats()['in_flight'] == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+    threading.Timer(0.2, gate.set).start()
+    client.request('POST', {}, {}, 2)
+    worker.join(timeout=5)
+
+    assert session.calls[0]['timeout'] == pytest.approx(5, abs=0.1)
+    assert 0 < session.calls[1]['timeout'] <= 1.85
+
+
+def test_ttl_cache_ignores_frame_timestamp_and_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(external_api_client.time, 'monotonic', lambda: now[0])
+    session = _FakeSession()
+    client = ExternalApiClient('http://api/infer', max_in_flight=1, session=session)
+
+    first = client.request('POST', {}, {'scene': 'a', 'frame_timestamp': 1.0}, 5, cache_ttl_seconds=10)
+    again = client.request('POST', {}, {'scene': 'a', 'frame_timestamp': 2.0}, 5, cache_ttl_seconds=10)
+    other = client.request('POST', {}, {'scene': 'b', 'frame_timestamp': 2.0}, 5, cache_ttl_seconds=10)
+    now[0] += 11
+    expired = client.request('POST', {}, {'scene': 'a', 'frame_timestamp': 3.0}, 5, cache_ttl_seconds=10)
+
+    assert again is first
+    assert other['body']['echo'] == 'b'
+    assert expired['body']['n'] == 3
+    assert client.get_stats()['cache_hits'] == 1
+    assert request_cache_key('POST', 'u', {'a': 1, 'frame_timestamp': 1}) == request_cache_key('POST', 'u', {'a': 1})
+
+
+def test_histogram_quantiles_use_bucket_upper_bounds():
+    histogram = LatencyHistogram((10, 100))
+    for latency in (5, 6, 50, 500):
+        histogram.observe(latency)
+
+    snapshot = histogram.snapshot()
+    assert snapshot['buckets'] == {'le_10': 2, 'le_100': 1, 'le_inf': 1}
+    assert (snapshot['p50_ms'], snapshot['p95_ms'], snapshot['max_ms']) == (10.0, 500.0, 500)
+
+
+def test_clients_are_shared_per_endpoint_and_reported():
+    external_api_client.close_external_api_clients()
+    try:
+        client = external_api_client.get_external_api_client(3, 'http://api/a', 2)
+        assert external_api_client.get_external_api_client(3, 'http://api/a', 5) is client
+        assert client.max_in_flight == 5
+        assert external_api_client.get_external_api_client(3, 'http://api/b', 2) is not client
+
+        stats = external_api_client.get_external_api_stats()
+        assert [(item['external_api_id'], item['endpoint_url']) for item in stats] == [
+            (3, 'http://api/a'),
+            (3, 'http://api/b'),
+        ]
+    finally:
+        external_api_client.close_external_api_clients()
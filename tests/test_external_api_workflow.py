@@ -230,3 +230,63 @@ def test_external_api_hit_without_boxes_is_preserved_in_detection_log():
     assert collector.logs[-1]['metadata']['has_detection'] is True
     assert collector.logs[-1]['metadata']['detection_count'] == 0
     assert '命中，但未返回目标明细' in collector.logs[-1]['content']
+
+
+class _InlineExecutor:
+    def submit(self, fn, *args, **kwargs):
+        fn(*args, **kwargs)
+
+
+def test_latest_result_mode_returns_previous_response_without_blocking():
+    executor = WorkflowExecutor.__new__(WorkflowExecutor)
+    executor.workflow_id = 1
+    executor.video_source = None
+    executor.connections = []
+    executor.node_results_cache = {}
+    executor.external_api_latest = {}
+    executor.external_api_pending = set()
+    executor.external_api_datamap = {'ext_1': {'id': 9, 'name': 'Remote API', 'enabled': True}}
+    executor.external_api_configs = {
+        'ext_1': {
+            'execution_mode': 'latest_result',
+            'include_image': False,
+            'include_upstream_results': False,
+            'output_mapping': {},
+        }
+    }
+    executor._state_lock = threading.Lock()
+    deferred = _FakeAsyncExecutor()
+    executor._async_submit_executor = deferred
+    calls = []
+
+    def submit(node_id, payload, block=True):
+        calls.append((payload['frame_timestamp'], block))
+        return {'status_code': 200, 'body': {'detections': [{'bbox': [1, 2, 3, 4], 'score': 0.8}]}}
+
+    executor._submit_external_api_request = submit
+    context = {'frame': np.zeros((8, 8, 3), dtype=np.uint8)}
+
+    first = executor._handle_external_api_node('ext_1', {**context, 'frame_timestamp': 1.0})
+    assert first['result']['metadata']['result_available'] is False
+    assert first['result']['metadata']['submitted'] is True
+
+    # 上一个请求仍在途：不再提交，也不阻塞
+    second = executor._handle_external_api_node('ext_1', {**context, 'frame_timestamp': 2.0})
+    assert second['result']['metadata']['submitted'] is False
+    assert len(deferred.calls) == 1
+
+    fn, args, _ = deferred.calls[0]
+    fn(*args)
+    assert calls == [(1.0, True)]
+    assert executor.external_api_pending == set()
+
+    executor._async_submit_executor = _InlineExecutor()
+    third = executor._handle_external_api_node('ext_1', {**context, 'frame_timestamp': 3.0})
+    assert third['has_detection'] is True
+    assert third['result']['detections'][0]['box'] == [1, 2, 3, 4]
+    metadata = third['result']['metadata']
+    assert (metadata['result_available'], metadata['submitted'], metadata['execution_mode']) == (
+        True, True, 'latest_result'
+    )
+    assert metadata['result_age_seconds'] >= 0
+    assert executor.node_results_cache['ext_1'] is third
@@ -0,0 +1,296 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from app.core import frame_cache
+from app.core.frame_cache import DerivedFrameImages, SharedFrameCache, frame_scope
+from app.core.frame_utils import (
+    bgr_to_nv12,
+    nv12_to_bgr,
+    nv12_to_rgb,
+    rgb_to_nv12,
+    rgb_to_yuv420p,
+    yuv420p_to_rgb,
+)
+from app.core.workflow_executor import FrameExecutionContext
+from app.source_workflow_host import SourceWorkflowHost, WorkflowRunner
+from app.user_scripts.common import yolo_backends
+from app.user_scripts.common.yolo_backends import NV12Frame
+
+
+WIDTH = 64
+HEIGHT = 48
+
+
+def _frame_rgb():
+    rng = np.random.default_rng(4)
+    return rng.integers(0, 256, size=(HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+def test_single_pass_conversions_match_bgr_round_trip():
+    frame_rgb = _frame_rgb()
+    frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
+
+    nv12 = rgb_to_nv12(frame_rgb)
+    np.testing.assert_array_equal(nv12, bgr_to_nv12(frame_bgr))
+    np.testing.assert_array_equal(
+        nv12_to_rgb(nv12),
+        cv2.cvtColor(nv12_to_bgr(nv12), cv2.COLOR_BGR2RGB),
+    )
+
+    yuv420p = rgb_to_yuv420p(frame_rgb)
+    np.testing.assert_array_equal(yuv420p, cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2YUV_I420))
+    np.testing.assert_array_equal(
+        yuv420p_to_rgb(yuv420p, width=WIDTH, height=HEIGHT),
+        cv2.cvtColor(cv2.cvtColor(yuv420p, cv2.COLOR_YUV2BGR_I420), cv2.COLOR_BGR2RGB),
+    )
+
+
+def test_derived_images_convert_once_under_concurrency(monkeypatch):
+    nv12 = rgb_to_nv12(_frame_rgb())
+    calls = []
+    original = frame_cache.frame_to_rgb
+
+    def slow_frame_to_rgb(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.05)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(frame_cache, "frame_to_rgb", slow_frame_to_rgb)
+    cache = SharedFrameCache()
+    derived = cache.publish(nv12, 1.0, "nv12", refs=4)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(derived.rgb())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert results[0].flags.writeable is False
+    np.testing.assert_array_equal(results[0], nv12_to_rgb(nv12))
+    stats = cache.get_stats()
+    assert (stats["conversions"], stats["hits"]) == (1, 3)
+
+
+def test_resized_variants_are_cached_per_size_and_color():
+    frame_rgb = _frame_rgb()
+    derived = DerivedFrameImages(rgb_to_nv12(frame_rgb), 1.0, "nv12")
+
+    small = derived.resized(32, 24)
+    assert derived.resized(32, 24) is small
+    assert small.shape == (24, 32, 3)
+    np.testing.assert_array_equal(small, cv2.resize(derived.rgb(), (32, 24), interpolation=cv2.INTER_AREA))
+    small_bgr = derived.resized(32, 24, color="bgr")
+    np.testing.assert_array_equal(small_bgr, small[:, :, ::-1])
+    assert derived.resized(WIDTH, HEIGHT) is derived.rgb()
+
+
+def test_entry_is_dropped_when_last_reference_is_released():
+    cache = SharedFrameCache()
+    derived = cache.publish(rgb_to_nv12(_frame_rgb()), 5.0, "nv12", refs=2)
+    derived.rgb()
+
+    derived.release()
+    assert cache.get(5.0) is derived
+    derived.release()
+    assert cache.get(5.0) is None
+    assert derived.refs == 0
+    assert derived._images == {}
+    # 多余的 release 不会变成负数
+    derived.release()
+    assert derived.refs == 0
+
+
+def test_cache_keeps_at_most_max_frames():
+    cache = SharedFrameCache(max_frames=2)
+    nv12 = rgb_to_nv12(_frame_rgb())
+    for timestamp in (1.0, 2.0, 3.0):
+        cache.publish(nv12, timestamp, "nv12", refs=1)
+
+    assert cache.get(1.0) is None
+    assert cache.get_stats()["live_frames"] == 2
+
+
+def test_frame_contexts_share_derived_images_across_workflows():
+    nv12 = rgb_to_nv12(_frame_rgb())
+    cache = SharedFrameCache()
+    derived = cache.publish(nv12, 1.0, "nv12", refs=2)
+    contexts = [
+        FrameExecutionContext({
+            "frame_nv12": nv12,
+            "frame_pixel_format": "nv12",
+            "frame_derived": derived,
+        })
+        for _ in range(2)
+    ]
+
+    assert contexts[0].get("frame") is contexts[1].get("frame")
+    assert contexts[0]["frame_bgr"] is contexts[1]["frame_bgr"]
+    assert contexts[0].get_resized_frame(16, 12) is contexts[1].get_resized_frame(16, 12)
+    assert cache.get_stats()["conversions"] == 3
+
+
+def test_frame_context_resizes_locally_without_shared_cache():
+    frame_rgb = nv12_to_rgb(rgb_to_nv12(_frame_rgb()))
+    context = FrameExecutionContext({
+        "frame_nv12": rgb_to_nv12(_frame_rgb()),
+        "frame_pixel_format": "nv12",
+    })
+
+    resized = context.get_resized_frame(16, 12)
+
+    assert context.get_resized_frame(16, 12) is resized
+    np.testing.assert_array_equal(resized, cv2.resize(frame_rgb, (16, 12), interpolation=cv2.INTER_AREA))
+
+
+def test_runner_releases_frames_that_are_replaced_or_dropped():
+    executor = SimpleNamespace(stop=lambda: None)
+    runner = WorkflowRunner(SimpleNamespace(id=1), executor)
+    cache = SharedFrameCache()
+    nv12 = rgb_to_nv12(_frame_rgb())
+    first = cache.publish(nv12, 1.0, "nv12", refs=1)
+    second = cache.publish(nv12, 2.0, "nv12", refs=1)
+
+    assert runner.submit_frame(nv12, 1.0, derived_images=first) is True
+    assert runner.submit_frame(nv12, 2.0, derived_images=second) is True
+    assert first.refs == 0
+    assert second.refs == 1
+
+    runner.stop()
+    assert second.refs == 0
+    assert runner.submit_frame(nv12, 3.0) is False
+    assert cache.get_stats()["live_frames"] == 0
+
+
+class _FakePinnedFrame:
+    def __init__(self):
+        self.refs = 1
+
+    def retain(self):
+        self.refs += 1
+        return self
+
+    def release(self):
+        self.refs -= 1
+
+
+@pytest.mark.parametrize("shared_cache", [True, False])
+def test_host_keeps_slot_pinned_until_every_runner_releases_the_frame(shared_cache):
+    nv12 = rgb_to_nv12(_frame_rgb())
+    host = SourceWorkflowHost.__new__(SourceWorkflowHost)
+    host.running = True
+    host.frame_pixel_format = "nv12"
+    host.frame_cache = SharedFrameCache() if shared_cache else None
+    host.runners = {
+        workflow_id: WorkflowRunner(SimpleNamespace(id=workflow_id), SimpleNamespace(stop=lambda: None))
+        for workflow_id in (1, 2)
+    }
+    pinned = _FakePinnedFrame()
+
+    host._dispatch_frame(nv12, 1.0, pinned=pinned)
+    pinned.release()
+    assert pinned.refs == 1
+
+    runners = list(host.runners.values())
+    runners[0].stop()
+    assert pinned.refs == 1
+    runners[1].stop()
+    assert pinned.refs == 0
+
+
+class _CountingSession:
+    runs = 0
+
+    def __init__(self, _path, providers=None):
+        self.providers = providers or ["CPUExecutionProvider"]
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="images", shape=[1, 3, 32, 32], type="tensor(float)")]
+
+    def get_providers(self):
+        return self.providers
+
+    def run(self, _outputs, inputs):
+        type(self).runs += 1
+        output = np.zeros((1, 8, 6), dtype=np.float32)
+        output[0, 0] = [2, 2, 10, 10, 0.5, 0]
+        output[0, 1] = [12, 4, 30, 20, 0.9, 1]
+        return [output]
+
+
+@pytest.fixture
+def onnx_backend(monkeypatch):
+    _CountingSession.runs = 0
+    monkeypatch.setattr(yolo_backends, "ort", SimpleNamespace(InferenceSession=_CountingSession))
+    monkeypatch.setattr(yolo_backends, "ONNXRUNTIME_IMPORT_ERROR", None)
+
+    def build(confidence, model_path="model.onnx"):
+        config = yolo_backends.normalize_backend_config({"confidence": confidence})
+        return yolo_backends.ONNXRuntimeBackend(model_path, {}, config)
+
+    return build
+
+
+def _shared_nv12_frame(refs=2):
+    nv12 = rgb_to_nv12(_frame_rgb())
+    cache = SharedFrameCache()
+    return cache, cache.publish(nv12, 1.0, "nv12", refs=refs)
+
+
+def test_backends_share_inference_on_the_same_frame(onnx_backend):
+    loose, strict = onnx_backend(0.3), onnx_backend(0.7)
+    cache, derived = _shared_nv12_frame()
+    expected = [backend.infer(NV12Frame(derived.frame, WIDTH, HEIGHT)) for backend in (loose, strict)]
+    assert _CountingSession.runs == 2
+
+    results = []
+    for backend in (loose, strict):
+        with frame_scope(derived) as scope:
+            results.append(backend.infer(NV12Frame(derived.frame.view(), WIDTH, HEIGHT)))
+        assert scope.inference_requests == 1
+
+    assert _CountingSession.runs == 3
+    assert [len(details) for _, details, _ in results] == [2, 1]
+    for (detections, details, metadata), (expected_detections, expected_details, _) in zip(results, expected):
+        assert detections == expected_detections
+        assert details == expected_details
+    assert [metadata["inference_dedup"] for _, _, metadata in results] == [False, True]
+    assert scope.inference_dedup_hits == 1
+    stats = cache.get_stats()
+    assert (stats["inference_requests"], stats["inference_dedup_hits"]) == (2, 1)
+    assert stats["inference_dedup_rate"] == 0.5
+
+
+def test_shared_rgb_frame_is_deduplicated_separately_from_nv12(onnx_backend):
+    first, second = onnx_backend(0.5), onnx_backend(0.5)
+    _, derived = _shared_nv12_frame(refs=3)
+
+    with frame_scope(derived):
+        first.infer(NV12Frame(derived.frame, WIDTH, HEIGHT))
+        first.infer(derived.rgb())
+        _, _, metadata = second.infer(derived.rgb())
+
+    assert _CountingSession.runs == 2
+    assert metadata["inference_dedup"] is True
+
+
+def test_other_inputs_and_models_are_not_deduplicated(onnx_backend):
+    first, other_model = onnx_backend(0.5), onnx_backend(0.5, model_path="other.onnx")
+    _, derived = _shared_nv12_frame()
+
+    with frame_scope(derived) as scope:
+        first.infer(NV12Frame(derived.frame, WIDTH, HEIGHT))
+        other_model.infer(NV12Frame(derived.frame, WIDTH, HEIGHT))
+        _, _, metadata = first.infer(NV12Frame(derived.frame.copy(), WIDTH, HEIGHT))
+
+    assert _CountingSession.runs == 3
+    assert "inference_dedup" not in metadata
+    assert (scope.inference_requests, scope.inference_dedup_hits) == (2, 0)
+    assert frame_cache.current_frame_scope() is None
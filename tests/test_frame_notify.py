@@ -0,0 +1,126 @@
+import multiprocessing
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.core.frame_notify import SharedSequenceNotifier, futex_available
+from app.core.ringbuffer import VideoRingBuffer
+
+
+WIDTH = 8
+HEIGHT = 4
+
+
+def _create_buffer(prefix):
+    try:
+        return VideoRingBuffer(
+            name=f"{prefix}_{time.time_ns() % 1000000}",
+            width=WIDTH,
+            height=HEIGHT,
+            pixel_format="nv12",
+            fps=2,
+            duration_seconds=2,
+            create=True,
+        )
+    except PermissionError:
+        pytest.skip("shared_memory create is not permitted in this sandbox")
+
+
+def _frame(value):
+    return np.full((HEIGHT * 3 // 2, WIDTH), value, dtype=np.uint8)
+
+
+def _write_after_delay(buffer_name, delay, timestamp):
+    buffer = VideoRingBuffer(
+        name=buffer_name,
+        width=WIDTH,
+        height=HEIGHT,
+        pixel_format="nv12",
+        fps=2,
+        duration_seconds=2,
+        create=False,
+    )
+    try:
+        time.sleep(delay)
+        buffer.write(_frame(5), timestamp=timestamp)
+    finally:
+        buffer.close()
+
+
+def test_wait_for_newer_returns_none_after_timeout_without_writes():
+    buffer = _create_buffer("notify_timeout")
+    try:
+        buffer.write(_frame(1), timestamp=10.0)
+
+        started_at = time.monotonic()
+        assert buffer.wait_for_newer(10.0, 0.05) is None
+        assert time.monotonic() - started_at >= 0.05
+
+        frame, timestamp = buffer.wait_for_newer(None, 0.05)
+        assert timestamp == 10.0
+        assert np.array_equal(frame, _frame(1))
+    finally:
+        buffer.close()
+        buffer.unlink()
+
+
+def test_wait_for_newer_wakes_on_write_from_another_process():
+    buffer = _create_buffer("notify_process")
+    context = multiprocessing.get_context("spawn")
+    writer = context.Process(target=_write_after_delay, args=(buffer.name, 0.2, 42.0))
+    try:
+        sequence = buffer.frame_sequence()
+        writer.start()
+        started_at = time.monotonic()
+        result = buffer.wait_for_newer(None, 10.0)
+        waited = time.monotonic() - started_at
+
+        assert result is not None
+        frame, timestamp = result
+        assert timestamp == 42.0
+        assert np.array_equal(frame, _frame(5))
+        assert buffer.frame_sequence() == sequence + 1
+        writer.join(timeout=10.0)
+        assert writer.exitcode == 0
+        # 由写端唤醒返回，而不是等到超时
+        assert waited < 10.0
+    finally:
+        if writer.is_alive():
+            writer.terminate()
+        buffer.close()
+        buffer.unlink()
+
+
+@pytest.mark.parametrize("use_futex", [True, False])
+def test_sequence_notifier_wakes_waiting_thread(use_futex):
+    if use_futex and not futex_available():
+        pytest.skip("futex is not available on this platform")
+    storage = bytearray(8)
+    notifier = SharedSequenceNotifier(memoryview(storage), 0, use_futex=use_futex)
+    results = []
+
+    def wait():
+        started_at = time.monotonic()
+        changed = notifier.wait_for_change(0, 5.0)
+        results.append((changed, time.monotonic() - started_at))
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    time.sleep(0.05)
+    assert notifier.publish() == 1
+    waiter.join(timeout=5.0)
+
+    assert results
+    changed, waited = results[0]
+    assert changed is True
+    assert waited < 1.0
+    assert notifier.wait_for_change(0, 0.0) is True
+    assert notifier.wait_for_change(1, 0.01) is False
+    notifier.close()
+
+
+def test_sequence_notifier_rejects_unaligned_offset():
+    with pytest.raises(ValueError):
+        SharedSequenceNotifier(memoryview(bytearray(8)), 1)
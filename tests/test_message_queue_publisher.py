@@ -14,8 +14,8 @@ def test_disabled_message_queue_does_not_publish(monkeypatch):
         "get_message_queue_config",
         lambda: MessageQueueConfig(enabled=False, provider="mqtt"),
     )
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_mqtt", lambda data: calls.append("mqtt"))
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_rabbitmq", lambda data: calls.append("rabbitmq"))
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_mqtt", lambda data, config=None: calls.append("mqtt"))
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_rabbitmq", lambda data, config=None: calls.append("rabbitmq"))
 
     assert message_queue_publisher.publish_alert_to_mq({}) is False
     assert calls == []
@@ -29,8 +29,8 @@ def test_mqtt_provider_never_double_publishes(monkeypatch):
         "get_message_queue_config",
         lambda: MessageQueueConfig(enabled=True, provider="mqtt"),
     )
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_mqtt", lambda data: calls.append("mqtt") or True)
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_rabbitmq", lambda data: calls.append("rabbitmq") or True)
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_mqtt", lambda data, config=None: calls.append("mqtt") or True)
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_rabbitmq", lambda data, config=None: calls.append("rabbitmq") or True)
 
     assert message_queue_publisher.publish_alert_to_mq({}) is True
     assert calls == ["mqtt"]
@@ -44,8 +44,8 @@ def test_rabbitmq_provider_never_double_publishes(monkeypatch):
         "get_message_queue_config",
         lambda: MessageQueueConfig(enabled=True, provider="rabbitmq"),
     )
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_mqtt", lambda data: calls.append("mqtt") or True)
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_rabbitmq", lambda data: calls.append("rabbitmq") or True)
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_mqtt", lambda data, config=None: calls.append("mqtt") or True)
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_rabbitmq", lambda data, config=None: calls.append("rabbitmq") or True)
 
     assert message_queue_publisher.publish_alert_to_mq({}) is True
     assert calls == ["rabbitmq"]
@@ -59,9 +59,9 @@ def test_http_provider_never_double_publishes(monkeypatch):
         "get_message_queue_config",
         lambda: MessageQueueConfig(enabled=True, provider="http"),
     )
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_mqtt", lambda data: calls.append("mqtt") or True)
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_rabbitmq", lambda data: calls.append("rabbitmq") or True)
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_http", lambda data: calls.append("http") or True)
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_mqtt", lambda data, config=None: calls.append("mqtt") or True)
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_rabbitmq", lambda data, config=None: calls.append("rabbitmq") or True)
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_http", lambda data, config=None: calls.append("http") or True)
 
     assert message_queue_publisher.publish_alert_to_mq({}) is True
     assert calls == ["http"]
@@ -76,8 +76,8 @@ def test_selector_changes_disconnect_inactive_publishers(monkeypatch):
     ))
     disconnects = []
     monkeypatch.setattr(message_queue_publisher, "get_message_queue_config", lambda: next(selectors))
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_mqtt", lambda data: True)
-    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_rabbitmq", lambda data: True)
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_mqtt", lambda data, config=None: True)
+    monkeypatch.setattr(message_queue_publisher, "publish_alert_to_rabbitmq", lambda data, config=None: True)
     monkeypatch.setattr(message_queue_publisher, "reload_mqtt_publisher", lambda: disconnects.append("mqtt"))
     monkeypatch.setattr(message_queue_publisher, "reload_rabbitmq_publisher", lambda: disconnects.append("rabbitmq"))
 
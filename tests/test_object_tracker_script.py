@@ -222,3 +222,48 @@ def test_old_script_signature_ignores_frame_timestamp():
     result = algo.process(frame, frame_timestamp=99)
     assert result["detections"] == []
     assert "frame_timestamp" not in captured["kwargs"]
+
+
+def test_script_signature_is_resolved_once_and_refreshed_on_swap(monkeypatch):
+    import app.core.script_loader as script_loader_module
+
+    signature_calls = []
+    original_signature = script_loader_module.inspect.signature
+
+    def _counting_signature(func):
+        signature_calls.append(func)
+        return original_signature(func)
+
+    monkeypatch.setattr(script_loader_module.inspect, "signature", _counting_signature)
+    captured = []
+
+    def process_func(frame, frame_timestamp=None, **kwargs):
+        captured.append(("v1", frame_timestamp))
+        return {"detections": []}
+
+    def reloaded_process_func(frame, pixel_format=None):
+        captured.append(("v2", pixel_format))
+        return {"detections": []}
+
+    algo = ScriptAlgorithm.__new__(ScriptAlgorithm)
+    algo.config = {"source_id": 0}
+    algo.process_func = process_func
+    algo.executor = _FakeExecutor()
+    algo.hook_manager = _FakeHookManager()
+    algo.algorithm_id = None
+    algo.script_state = None
+    algo.script_path = "inline.py"
+    algo._empty_detection_count = 0
+    algo._last_empty_detection_log_at = 0.0
+    algo.resolved_config = algo.config
+
+    frame = np.zeros((8, 10, 3), dtype=np.uint8)
+    for timestamp in range(3):
+        algo.process(frame, frame_timestamp=timestamp)
+    assert signature_calls == [process_func]
+
+    algo.process_func = reloaded_process_func
+    algo.process(frame, frame_timestamp=3)
+    assert signature_calls == [process_func, reloaded_process_func]
+    assert captured[:3] == [("v1", 0), ("v1", 1), ("v1", 2)]
+    assert captured[3][0] == "v2"
@@ -798,3 +798,121 @@ def test_ocr_crop_does_not_apply_roi_pre_mask(monkeypatch):
     )
 
     assert captured["frames"][0][0, 0].tolist() == [7, 8, 9]
+
+
+def test_ocr_crop_cuts_nv12_regions_without_full_frame_conversion(monkeypatch):
+    pytest.importorskip("cv2")
+    from app.core.frame_utils import nv12_to_rgb, rgb_to_nv12
+
+    captured = _patch_ocr_backend(monkeypatch)
+    monkeypatch.setattr(
+        "app.plugins.ocr_algorithm.frame_to_rgb",
+        lambda *_args, **_kwargs: pytest.fail("upstream crops must not convert the whole frame"),
+    )
+    frame_rgb = np.random.default_rng(5).integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+    frame_nv12 = rgb_to_nv12(frame_rgb)
+    expected_rgb = nv12_to_rgb(frame_nv12)
+    algorithm = _make_crop_ocr_algorithm(pixel_format="nv12")
+
+    result = algorithm.process(
+        frame_nv12,
+        upstream_results={
+            "yolo_1": {"detections": [
+                {"box": [3, 5, 30, 41], "confidence": 0.9},
+                {"box": [40, 10, 64, 48], "confidence": 0.8},
+            ]}
+        },
+    )
+
+    assert result["metadata"]["crop_boxes"] == [[3, 5, 30, 41], [40, 10, 64, 48]]
+    np.testing.assert_array_equal(captured["frames"][0], expected_rgb[5:41, 3:30])
+    np.testing.assert_array_equal(captured["frames"][1], expected_rgb[10:48, 40:64])
+
+
+def test_ocr_crop_sends_all_crops_in_one_batch_call(monkeypatch):
+    captured = _patch_ocr_backend(monkeypatch)
+    batches = []
+
+    def infer_crops(crops):
+        batches.append([crop.shape for crop in crops])
+        return [
+            ([{"text": f"T{index}", "confidence": 0.9, "box": [1, 1, 3, 3]}], [], {"shared_inference": True})
+            for index, _crop in enumerate(crops)
+        ]
+
+    algorithm = _make_crop_ocr_algorithm()
+    algorithm.backend.infer_crops = infer_crops
+    result = algorithm.process(
+        np.zeros((40, 60, 3), dtype=np.uint8),
+        upstream_results={
+            "yolo_1": {"detections": [
+                {"box": [0, 0, 10, 10], "confidence": 0.9},
+                {"box": [20, 0, 50, 20], "confidence": 0.8},
+            ]}
+        },
+    )
+
+    assert captured["frames"] == []
+    assert batches == [[(10, 10, 3), (20, 30, 3)]]
+    assert [item["text"] for item in result["detections"]] == ["T0", "T1"]
+    assert result["detections"][1]["box"] == [21.0, 1.0, 23.0, 3.0]
+    assert result["metadata"]["batched_inference"] is True
+    assert result["metadata"]["successful_inferences"] == 2
+
+
+def test_ocr_crop_batch_failure_marks_every_crop_failed(monkeypatch):
+    _patch_ocr_backend(monkeypatch)
+    algorithm = _make_crop_ocr_algorithm()
+
+    def infer_crops(_crops):
+        raise RuntimeError("npu lost")
+
+    algorithm.backend.infer_crops = infer_crops
+    result = algorithm.process(
+        np.zeros((40, 40, 3), dtype=np.uint8),
+        upstream_results={"yolo_1": {"detections": [{"box": [0, 0, 10, 10], "confidence": 0.9}]}},
+    )
+
+    assert result["metadata"]["ocr_checked"] is False
+    assert result["metadata"]["error"] == "npu lost"
+
+
+def test_shared_ocr_backend_packs_crops_into_one_request(monkeypatch):
+    from app.core import ocr_backend
+    from app.core.shared_inference import OCR_CROP_SHAPES_KEY, _client_request_config
+
+    class WorkerBackend:
+        def infer(self, crop):
+            height, width = crop.shape[:2]
+            text = str(int(crop[0, 0, 0]))
+            return [{"text": text, "box": [0, 0, width, height]}] * (1 + int(crop[0, 0, 0]) % 2), [], {"text_count": 1}
+
+    requests = []
+
+    class FakeClient:
+        model_key = "ocr-key"
+
+        def infer(self, frame, config):
+            # 与 worker 的处理路径一致：按 shape 拆开、逐图推理、合并为一条响应
+            requests.append((frame.shape, config))
+            crops = ocr_backend.unpack_ocr_crops(frame, config[OCR_CROP_SHAPES_KEY])
+            detections, details, metadata = ocr_backend.merge_ocr_crop_results(
+                ocr_backend.infer_ocr_crops(WorkerBackend(), crops)
+            )
+            return {"ok": True, "detections": detections, "details": details, "metadata": {**metadata, "batch_size": 3}}
+
+    backend = ocr_backend.SharedOCRBackend.__new__(ocr_backend.SharedOCRBackend)
+    backend.client = FakeClient()
+    backend.device = "auto"
+    crops = [np.full((4, 6, 3), value, dtype=np.uint8) for value in (1, 2, 3)]
+    crops[1] = np.full((8, 2, 3), 2, dtype=np.uint8)
+
+    results = backend.infer_crops(crops)
+
+    assert requests == [((4 * 6 * 3 * 2 + 8 * 2 * 3,), {OCR_CROP_SHAPES_KEY: [[4, 6, 3], [8, 2, 3], [4, 6, 3]]})]
+    assert [[item["text"] for item in detections] for detections, _, _ in results] == [["1", "1"], ["2"], ["3", "3"]]
+    assert results[1][0][0]["box"] == [0, 0, 2, 8]
+    assert all(metadata["batch_size"] == 3 and metadata["model_key"] == "ocr-key" for _, _, metadata in results)
+    spec = {"backend": "paddleocr"}
+    assert _client_request_config(spec, {}) == {}
+    assert _client_request_config(spec, {OCR_CROP_SHAPES_KEY: [[1, 1, 3]]}) == {OCR_CROP_SHAPES_KEY: [[1, 1, 3]]}
@@ -103,3 +103,73 @@ def test_rknn_ocr_backend_runs_synthetic_det_and_rec_without_npu():
     assert detections[0]["confidence"] > 0.7
     assert metadata["backend"] == "rknn_ocr"
     assert metadata["full_text"] == "AB"
+
+
+@pytest.mark.parametrize("input_format", ["rgb", "bgr"])
+def test_rknn_ocr_detection_input_reuses_buffer_and_matches_resize(input_format):
+    cv2 = pytest.importorskip("cv2")
+    backend = RKNNOcrBackend.__new__(RKNNOcrBackend)
+    backend.ocr_config = {}
+    backend.device = "auto"
+    backend.rknn_input_format = input_format
+    backend.det_width = 48
+    backend.det_height = 32
+    backend.character_dict_path = "/built-in/ppocr_keys_v1.txt"
+    backend._det_entry = SimpleNamespace(name="det")
+    backend._rec_entry = SimpleNamespace(name="rec")
+    det_inputs = []
+
+    def fake_infer_runtime(_self, _entry, image):
+        det_inputs.append(image)
+        return []
+
+    backend._infer_runtime = MethodType(fake_infer_runtime, backend)
+    frame = np.random.default_rng(2).integers(0, 256, size=(60, 100, 3), dtype=np.uint8)
+
+    backend.infer(frame)
+    expected = cv2.resize(frame, (48, 32))
+    if input_format == "bgr":
+        expected = cv2.cvtColor(expected, cv2.COLOR_RGB2BGR)
+    np.testing.assert_array_equal(det_inputs[0], expected)
+
+    backend.infer(frame[::-1].copy())
+    assert det_inputs[1] is det_inputs[0]
+
+
+def test_rknn_ocr_recognizes_lines_of_all_crops_after_detection():
+    pytest.importorskip("cv2")
+    backend = RKNNOcrBackend.__new__(RKNNOcrBackend)
+    backend.ocr_config = {"detection_threshold": 0.3, "box_threshold": 0.5, "unclip_ratio": 1.5}
+    backend.device = "auto"
+    backend.rknn_input_format = "rgb"
+    backend.det_width = 32
+    backend.det_height = 32
+    backend.rec_width = 32
+    backend.rec_height = 8
+    backend.characters = ["A", "B"]
+    backend.character_dict_path = "/built-in/ppocr_keys_v1.txt"
+    backend._det_entry = SimpleNamespace(name="det")
+    backend._rec_entry = SimpleNamespace(name="rec")
+
+    text_map = np.zeros((1, 1, 32, 32), dtype=np.float32)
+    text_map[:, :, 8:24, 6:26] = 0.95
+    empty_map = np.zeros((1, 1, 32, 32), dtype=np.float32)
+    logits = np.array([[[0.1, 0.8, 0.1], [0.9, 0.05, 0.05], [0.1, 0.1, 0.8]]], dtype=np.float32)
+    det_maps = iter([text_map, empty_map, text_map])
+    calls = []
+
+    def fake_infer_runtime(self, entry, image):
+        calls.append((entry.name, image))
+        return [next(det_maps)] if entry is self._det_entry else [logits]
+
+    backend._infer_runtime = MethodType(fake_infer_runtime, backend)
+    crops = [np.zeros((64, 64, 3), dtype=np.uint8) for _ in range(3)]
+
+    results = backend.infer_crops(crops)
+
+    assert [name for name, _ in calls] == ["det", "det", "det", "rec", "rec"]
+    rec_inputs = [image for name, image in calls if name == "rec"]
+    assert all(image.shape == (8, 32, 3) and image.dtype == np.float32 for image in rec_inputs)
+    assert rec_inputs[0].base is rec_inputs[1].base is backend._rec_batch
+    assert [[item["text"] for item in detections] for detections, _, _ in results] == [["AB"], [], ["AB"]]
+    assert [metadata["full_text"] for _, _, metadata in results] == ["AB", "", "AB"]
@@ -0,0 +1,183 @@
+import subprocess
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import app.core.video_recorder as video_recorder_module
+from app.core.packet_ringbuffer import (
+    AnnexBAccessUnitParser,
+    PacketRecordingSink,
+    PacketRingBuffer,
+)
+from app.core.video_recorder import (
+    VideoRecorder,
+    build_ffmpeg_remux_command,
+    estimate_packet_fps,
+)
+
+
+SPS = b'\x67\x42\x00\x1f\x01'
+PPS = b'\x68\xce\x3c\x01'
+IDR = b'\x65\x88\x84\x01'
+P_SLICE = b'\x41\x9a\x02\x01'
+# first_mb_in_slice != 0：同一帧的第二个 slice
+P_SLICE_CONTINUATION = b'\x41\x1a\x02\x01'
+
+
+def _annexb(*nals):
+    return b''.join(b'\x00\x00\x00\x01' + nal for nal in nals)
+
+
+def _create_buffer(prefix, **kwargs):
+    try:
+        return PacketRingBuffer(name=f"{prefix}_{time.time_ns() % 1000000}", create=True, **kwargs)
+    except PermissionError:
+        pytest.skip("shared_memory create is not permitted in this sandbox")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1000])
+def test_parser_splits_access_units_across_chunk_boundaries(chunk_size):
+    stream = _annexb(SPS, PPS, IDR, P_SLICE, P_SLICE_CONTINUATION, P_SLICE, IDR)
+    parser = AnnexBAccessUnitParser('h264')
+
+    units = []
+    for index in range(0, len(stream), chunk_size):
+        units += parser.feed(stream[index:index + chunk_size], now=float(index))
+    units += parser.flush(now=999.0)
+
+    assert [keyframe for _, keyframe, _ in units] == [True, False, False, True]
+    assert units[0][0] == _annexb(SPS, PPS, IDR)
+    assert units[1][0] == _annexb(P_SLICE, P_SLICE_CONTINUATION)
+    assert units[2][0] == _annexb(P_SLICE)
+    # 后续关键帧没有携带参数集，补上最近一次的 SPS/PPS
+    assert units[3][0] == _annexb(SPS, PPS, IDR)
+
+
+def test_parser_does_not_mark_keyframe_without_parameter_sets():
+    parser = AnnexBAccessUnitParser('h264')
+    units = parser.feed(_annexb(IDR, P_SLICE)) + parser.flush()
+
+    assert [keyframe for _, keyframe, _ in units] == [False, False]
+
+
+def test_parser_detects_h265_irap_access_units():
+    vps = b'\x40\x01\x0c\x01'
+    sps = b'\x42\x01\x01\x01'
+    pps = b'\x44\x01\xc1\x01'
+    idr = b'\x26\x01\xaf\x01'
+    trail = b'\x02\x01\xd0\x01'
+    parser = AnnexBAccessUnitParser('hevc')
+
+    units = parser.feed(_annexb(vps, sps, pps, idr, trail, idr)) + parser.flush()
+
+    assert [keyframe for _, keyframe, _ in units] == [True, False, True]
+    assert units[2][0] == _annexb(vps, sps, pps, idr)
+
+
+def test_packet_buffer_aligns_time_range_to_previous_keyframe():
+    buffer = _create_buffer("packet_range")
+    try:
+        for index in range(10):
+            keyframe = index % 4 == 0
+            buffer.write(bytes([index]) * 16, timestamp=100.0 + index, keyframe=keyframe)
+
+        packets = buffer.get_packets_in_time_range(106.0, 108.0)
+        assert [timestamp for _, timestamp, _ in packets] == [104.0, 105.0, 106.0, 107.0, 108.0]
+        assert packets[0][2] is True
+        assert packets[0][0] == bytes([4]) * 16
+
+        unaligned = buffer.get_packets_in_time_range(106.0, 108.0, align_to_keyframe=False)
+        assert [timestamp for _, timestamp, _ in unaligned] == [106.0, 107.0, 108.0]
+
+        attached = PacketRingBuffer(name=buffer.name, create=False)
+        try:
+            assert attached.codec == 'h264'
+            assert attached.capacity == buffer.capacity
+            assert attached.get_stats()['total_packets_written'] == 10
+        finally:
+            attached.close()
+    finally:
+        buffer.close()
+        buffer.unlink()
+
+
+def test_packet_buffer_drops_entries_overwritten_in_data_arena():
+    buffer = _create_buffer("packet_wrap", duration_seconds=10, data_capacity_bytes=1024 * 1024)
+    payload_size = 200 * 1024
+    try:
+        for index in range(8):
+            payload = bytes([index]) * payload_size
+            buffer.write(payload, timestamp=float(index), keyframe=index % 2 == 0)
+
+        stats = buffer.get_stats()
+        assert stats['total_packets_written'] == 8
+        # 数据区只能容纳最近 5 个访问单元
+        assert stats['count'] == 5
+
+        packets = buffer.get_packets_in_time_range(0.0, 10.0)
+        assert [timestamp for _, timestamp, _ in packets] == [4.0, 5.0, 6.0, 7.0]
+        # 跨越数据区末尾的访问单元也能完整读出
+        assert all(payload == bytes([int(timestamp)]) * payload_size for payload, timestamp, _ in packets)
+
+        with pytest.raises(ValueError):
+            buffer.write(b'\x00' * (buffer.data_capacity // 4 + 1), timestamp=9.0, keyframe=True)
+    finally:
+        buffer.close()
+        buffer.unlink()
+
+
+def test_packet_recording_sink_writes_parsed_access_units():
+    buffer = _create_buffer("packet_sink")
+    sink = PacketRecordingSink(buffer)
+    try:
+        sink.send_packet(_annexb(SPS, PPS, IDR, P_SLICE))
+        sink.send_packet(_annexb(P_SLICE))
+        # 最后一个访问单元要等下一帧开始才能确定边界
+        sink.send_packet(_annexb(P_SLICE))
+
+        assert sink.access_units_written == 2
+        assert sink.keyframes_written == 1
+        assert buffer.get_stats()['count'] == 2
+    finally:
+        buffer.close()
+        buffer.unlink()
+
+
+def test_build_ffmpeg_remux_command_copies_stream_into_mp4():
+    command = build_ffmpeg_remux_command('ffmpeg', '/tmp/out.mp4', 'h264', 12.5)
+
+    assert command[command.index('-f') + 1] == 'h264'
+    assert command[command.index('-framerate') + 1] == '12.500'
+    assert command[command.index('-c:v') + 1] == 'copy'
+    assert 'avc1' in command
+    assert '+faststart' in command
+    assert command[-1] == '/tmp/out.mp4'
+
+
+def test_estimate_packet_fps_uses_arrival_times_and_default():
+    assert estimate_packet_fps([0.0, 0.1, 0.2, 0.3, 0.4], default_fps=5) == pytest.approx(10.0)
+    assert estimate_packet_fps([1.0], default_fps=5) == 5.0
+    assert estimate_packet_fps([1.0, 1.0], default_fps=5) == 5.0
+
+
+def test_video_recorder_remuxes_packets_without_reencoding(tmp_path, monkeypatch):
+    recorder = VideoRecorder(buffer=SimpleNamespace(codec='h264'), save_dir=str(tmp_path), fps=5)
+    output_path = tmp_path / 'clip.mp4'
+    calls = []
+
+    def fake_run(command, input=None, **kwargs):
+        calls.append((command, input))
+        output_path.write_bytes(b'mp4')
+        return subprocess.CompletedProcess(command, 0, stderr=b'')
+
+    monkeypatch.setattr(video_recorder_module.shutil, 'which', lambda _name: '/usr/bin/ffmpeg')
+    monkeypatch.setattr(video_recorder_module.subprocess, 'run', fake_run)
+
+    packets = [(b'\x00\x00\x00\x01a', 1.0, True), (b'\x00\x00\x00\x01b', 1.5, False)]
+    assert recorder._remux_packets(packets, str(output_path)) is True
+
+    command, stdin = calls[0]
+    assert stdin == b'\x00\x00\x00\x01a\x00\x00\x00\x01b'
+    assert command[command.index('-framerate') + 1] == '2.000'
+    assert command[command.index('-c:v') + 1] == 'copy'
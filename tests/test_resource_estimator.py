@@ -1,3 +1,4 @@
+from app.core.packet_ringbuffer import PacketRingBuffer
 from app.core.resource_estimator import (
     ResourceSettings,
     SourceProfile,
@@ -69,3 +70,23 @@ def test_estimate_resource_summary_sums_sources():
 def test_format_bytes_uses_binary_units():
     assert format_bytes(1024) == "1.00 KB"
     assert format_bytes(1024 * 1024) == "1.00 MB"
+
+
+def test_estimate_source_resources_uses_packet_buffer_size_in_packet_mode():
+    estimate = estimate_source_resources(
+        SourceProfile(name="cam-1", width=1920, height=1080, source_fps=25),
+        ResourceSettings(
+            pixel_format="nv12",
+            analysis_target_fps=2,
+            analysis_buffer_seconds=3,
+            decoder_output_queue_size=2,
+            recording_enabled=True,
+            recording_fps=3,
+            recording_buffer_duration=30,
+            recording_compressed_max_bytes=512 * 1024,
+            recording_buffer_mode="packet",
+            recording_packet_buffer_bytes=16 * 1024 * 1024,
+        ),
+    )
+
+    assert estimate.recording_buffer_bytes == PacketRingBuffer.size_bytes(30, 16 * 1024 * 1024)
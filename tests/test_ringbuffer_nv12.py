@@ -4,7 +4,7 @@ import numpy as np
 import pytest
 
 from app.core.frame_utils import get_frame_size_bytes, get_storage_shape
-from app.core.ringbuffer import VideoRingBuffer
+from app.core.ringbuffer import VideoRingBuffer, find_time_range_positions
 
 
 def test_nv12_helpers_report_expected_size_and_shape():
@@ -141,3 +141,103 @@ def test_peek_if_newer_can_return_read_only_shared_memory_view():
     finally:
         buffer.close()
         buffer.unlink()
+
+
+def test_find_time_range_positions_handles_wraparound_and_unordered_timestamps():
+    # 槽位 2 开始的 4 帧：12, 13, 10(回绕到槽位 0), 11
+    timestamps = np.array([14.0, 15.0, 12.0, 13.0], dtype=np.float64)
+    positions, ordered = find_time_range_positions(timestamps, read_idx=2, count=4, start_time=13.0, end_time=14.5)
+    assert list(ordered) == [12.0, 13.0, 14.0, 15.0]
+    assert list(positions) == [1, 2]
+    assert not np.shares_memory(ordered, timestamps)
+
+    positions, _ = find_time_range_positions(timestamps, read_idx=2, count=4, start_time=20.0, end_time=30.0)
+    assert list(positions) == []
+
+    unordered = np.array([5.0, 3.0, 4.0, 6.0], dtype=np.float64)
+    positions, _ = find_time_range_positions(unordered, read_idx=0, count=4, start_time=3.5, end_time=5.0)
+    assert list(positions) == [0, 2]
+
+
+def test_iter_frames_in_time_range_yields_lazily_across_wraparound(monkeypatch):
+    width = 8
+    height = 4
+    buffer_name = f"nv12_range_{time.time_ns() % 1000000}"
+
+    try:
+        buffer = VideoRingBuffer(
+            name=buffer_name,
+            width=width,
+            height=height,
+            pixel_format="nv12",
+            fps=2,
+            duration_seconds=2,
+            create=True,
+        )
+    except PermissionError:
+        pytest.skip("shared_memory create is not permitted in this sandbox")
+
+    try:
+        for value in range(6):
+            buffer.write(np.full((height * 3 // 2, width), value, dtype=np.uint8), timestamp=100.0 + value)
+
+        original_copy = buffer._frame_from_shm
+        copy_count = []
+
+        def track_copy(offset):
+            copy_count.append(offset)
+            return original_copy(offset)
+
+        monkeypatch.setattr(buffer, "_frame_from_shm", track_copy)
+
+        frames = buffer.iter_frames_in_time_range(102.5, 104.0)
+        frame, timestamp = next(frames)
+        assert timestamp == 103.0
+        assert int(frame[0, 0]) == 3
+        assert len(copy_count) == 1
+
+        frame, timestamp = next(frames)
+        assert timestamp == 104.0
+        assert int(frame[0, 0]) == 4
+        assert next(frames, None) is None
+        assert len(copy_count) == 2
+
+        # 已被覆盖的帧不在范围内
+        assert buffer.get_frames_in_time_range(100.0, 101.0) == []
+        assert [ts for _, ts in buffer.get_recent_frames(1.0)] == [104.0, 105.0]
+    finally:
+        buffer.close()
+        buffer.unlink()
+
+
+def test_compressed_ringbuffer_time_range_uses_timestamp_index():
+    from app.core.compressed_ringbuffer import CompressedVideoRingBuffer
+
+    width = 16
+    height = 8
+    buffer_name = f"compressed_range_{time.time_ns() % 1000000}"
+    try:
+        buffer = CompressedVideoRingBuffer(
+            name=buffer_name,
+            width=width,
+            height=height,
+            pixel_format="bgr24",
+            fps=2,
+            duration_seconds=2,
+            create=True,
+            max_frame_bytes=64 * 1024,
+        )
+    except PermissionError:
+        pytest.skip("shared_memory create is not permitted in this sandbox")
+
+    try:
+        for value in range(6):
+            buffer.write(np.full((height, width, 3), value * 40, dtype=np.uint8), timestamp=200.0 + value)
+
+        frames = buffer.iter_frames_in_time_range(202.0, 203.5)
+        assert [timestamp for _, timestamp in frames] == [202.0, 203.0]
+        assert [timestamp for _, timestamp in buffer.get_recent_frames(1.0)] == [204.0, 205.0]
+        assert buffer.get_frames_in_time_range(300.0, 400.0) == []
+    finally:
+        buffer.close()
+        buffer.unlink()
@@ -0,0 +1,249 @@
+import multiprocessing
+import time
+
+import numpy as np
+import pytest
+
+from app.core.ringbuffer import VideoRingBuffer
+
+
+# 帧足够大，单次 memcpy 远长于读端一次拷贝的间隔，没有 seqlock 时很容易读到撕裂帧
+WIDTH = 640
+HEIGHT = 480
+FPS = 2
+DURATION_SECONDS = 1
+
+
+def _open_buffer(name, create):
+    return VideoRingBuffer(
+        name=name,
+        width=WIDTH,
+        height=HEIGHT,
+        pixel_format="nv12",
+        fps=FPS,
+        duration_seconds=DURATION_SECONDS,
+        create=create,
+    )
+
+
+def _writer(name, stop_event, frame_count):
+    buffer = _open_buffer(name, create=False)
+    frame = np.empty(buffer.frame_shape, dtype=np.uint8)
+    try:
+        for sequence in range(1, frame_count + 1):
+            if stop_event.is_set():
+                break
+            frame.fill(sequence % 256)
+            buffer.write(frame, timestamp=float(sequence))
+    finally:
+        stop_event.set()
+        buffer.close()
+
+
+def _frame_is_consistent(frame, timestamp):
+    expected = int(timestamp) % 256
+    return int(frame.min()) == expected and int(frame.max()) == expected
+
+
+def _reader(name, stop_event, results, use_views):
+    buffer = _open_buffer(name, create=False)
+    reads = 0
+    torn = 0
+    try:
+        while not stop_event.is_set():
+            # 读最旧的槽位，它正是写端下一个要覆盖的位置
+            for index in (0, -1):
+                if use_views:
+                    result = buffer.peek_view_with_version(index)
+                    if result is None:
+                        continue
+                    view, timestamp, version = result
+                    frame = np.array(view)
+                    del view
+                    if not buffer.is_version_current(version):
+                        continue
+                else:
+                    result = buffer.peek_with_timestamp(index)
+                    if result is None:
+                        continue
+                    frame, timestamp = result
+                reads += 1
+                if not _frame_is_consistent(frame, timestamp):
+                    torn += 1
+    finally:
+        results.put((reads, torn, buffer.get_stats()['torn_read_retries']))
+        buffer.close()
+
+
+def test_seqlock_readers_never_observe_torn_frames_across_processes():
+    name = f"seqlock_{time.time_ns() % 1000000}"
+    try:
+        buffer = _open_buffer(name, create=True)
+    except PermissionError:
+        pytest.skip("shared_memory create is not permitted in this sandbox")
+
+    context = multiprocessing.get_context("spawn")
+    stop_event = context.Event()
+    results = context.Queue()
+    readers = [
+        context.Process(target=_reader, args=(name, stop_event, results, use_views))
+        for use_views in (False, True)
+    ]
+    writer = context.Process(target=_writer, args=(name, stop_event, 3000))
+    try:
+        for reader in readers:
+            reader.start()
+        # 等读端进程启动后再开始写入
+        time.sleep(1.0)
+        writer.start()
+        writer.join(timeout=60.0)
+        stop_event.set()
+
+        reports = [results.get(timeout=30.0) for _ in readers]
+        for reader in readers:
+            reader.join(timeout=10.0)
+
+        assert writer.exitcode == 0
+        assert all(reader.exitcode == 0 for reader in readers)
+        assert all(reads > 0 for reads, _, _ in reports)
+        assert [torn for _, torn, _ in reports] == [0, 0]
+    finally:
+        stop_event.set()
+        for process in [writer, *readers]:
+            if process.is_alive():
+                process.terminate()
+        buffer.close()
+        buffer.unlink()
+
+
+def test_slot_version_detects_overwrite_of_zero_copy_view():
+    name = f"seqlock_version_{time.time_ns() % 1000000}"
+    try:
+        buffer = _open_buffer(name, create=True)
+    except PermissionError:
+        pytest.skip("shared_memory create is not permitted in this sandbox")
+
+    frame = np.zeros(buffer.frame_shape, dtype=np.uint8)
+    try:
+        buffer.write(frame, timestamp=1.0)
+        view, timestamp, version = buffer.peek_view_with_version(-1)
+        assert timestamp == 1.0
+        assert version.sequence % 2 == 0
+        assert buffer.is_version_current(version) is True
+
+        # 容量为 2：再写两帧后最初的槽位被覆盖
+        buffer.write(frame, timestamp=2.0)
+        assert buffer.is_version_current(version) is True
+        buffer.write(frame, timestamp=3.0)
+        assert buffer.is_version_current(version) is False
+        del view
+    finally:
+        buffer.close()
+        buffer.unlink()
+
+
+def test_writer_skips_pinned_slot_until_it_is_released():
+    name = f"seqlock_pin_{time.time_ns() % 1000000}"
+    try:
+        buffer = _open_buffer(name, create=True)
+    except PermissionError:
+        pytest.skip("shared_memory create is not permitted in this sandbox")
+
+    frame = np.empty(buffer.frame_shape, dtype=np.uint8)
+    pinned = None
+    try:
+        frame.fill(1)
+        buffer.write(frame, timestamp=1.0)
+        pinned = buffer.pin_if_newer(None)
+        assert pinned.timestamp == 1.0
+        assert buffer.pin_if_newer(1.0) is None
+
+        # 容量为 2：钉住期间写端只轮流改写另一个槽位
+        for sequence in (2, 3, 4):
+            frame.fill(sequence)
+            buffer.write(frame, timestamp=float(sequence))
+            assert _frame_is_consistent(pinned.frame, pinned.timestamp)
+            latest, timestamp = buffer.peek_with_timestamp(-1)
+            assert timestamp == float(sequence)
+            assert _frame_is_consistent(latest, timestamp)
+
+        stats = buffer.get_stats()
+        assert (stats['pinned_slots'], stats['pin_count'], stats['pin_skips']) == (1, 1, 2)
+        assert stats['count'] == 2
+
+        pinned.retain()
+        pinned.release()
+        assert buffer.get_pin_stats()['pinned_slots'] == 1
+        pinned.release()
+        pinned.release()
+        stats = buffer.get_pin_stats()
+        assert (stats['pinned_slots'], stats['pins_acquired']) == (0, 1)
+        assert stats['pin_hold_max_ms'] > 0.0
+
+        frame.fill(5)
+        buffer.write(frame, timestamp=5.0)
+        assert [timestamp for _, timestamp in buffer.get_recent_frames(10.0)] == [4.0, 5.0]
+    finally:
+        del pinned
+        buffer.close()
+        buffer.unlink()
+
+
+def _pinning_reader(name, stop_event, results):
+    buffer = _open_buffer(name, create=False)
+    reads = 0
+    torn = 0
+    last_timestamp = None
+    try:
+        while not stop_event.is_set():
+            pinned = buffer.wait_and_pin_newer(last_timestamp, 0.1)
+            if pinned is None:
+                continue
+            last_timestamp = pinned.timestamp
+            # 持有时间超过写端覆盖整个缓冲区所需的时间
+            time.sleep(0.002)
+            reads += 1
+            if not _frame_is_consistent(pinned.frame, pinned.timestamp):
+                torn += 1
+            pinned.release()
+            del pinned
+    finally:
+        results.put((reads, torn, buffer.get_stats()['pinned_slots']))
+        buffer.close()
+
+
+def test_pinned_views_stay_consistent_while_writer_laps_buffer():
+    name = f"seqlock_pin_mp_{time.time_ns() % 1000000}"
+    try:
+        buffer = _open_buffer(name, create=True)
+    except PermissionError:
+        pytest.skip("shared_memory create is not permitted in this sandbox")
+
+    context = multiprocessing.get_context("spawn")
+    stop_event = context.Event()
+    results = context.Queue()
+    reader = context.Process(target=_pinning_reader, args=(name, stop_event, results))
+    writer = context.Process(target=_writer, args=(name, stop_event, 3000))
+    try:
+        reader.start()
+        time.sleep(1.0)
+        writer.start()
+        writer.join(timeout=60.0)
+        stop_event.set()
+
+        reads, torn, pinned_slots = results.get(timeout=30.0)
+        reader.join(timeout=10.0)
+
+        assert writer.exitcode == 0
+        assert reader.exitcode == 0
+        assert reads > 0
+        assert torn == 0
+        assert pinned_slots == 0
+        assert buffer.get_stats()['pin_skips'] > 0
+    finally:
+        stop_event.set()
+        for process in (writer, reader):
+            if process.is_alive():
+                process.terminate()
+        buffer.close()
+        buffer.unlink()
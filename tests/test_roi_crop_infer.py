@@ -3,6 +3,7 @@ import importlib.util
 import sys
 import types
 from pathlib import Path
+from typing import NamedTuple
 
 import numpy as np
 import pytest
@@ -10,6 +11,7 @@ import pytest
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 ALGORITHM_PATH = PROJECT_ROOT / "app" / "core" / "algorithm.py"
+ROI_MASK_CACHE_PATH = PROJECT_ROOT / "app" / "core" / "roi_mask_cache.py"
 ROI_PATH = PROJECT_ROOT / "app" / "user_scripts" / "common" / "roi.py"
 ADAPTIVE_PATH = PROJECT_ROOT / "app" / "user_scripts" / "templates" / "adaptive_yolo_detector.py"
 
@@ -108,14 +110,24 @@ def load_roi_module():
     fake_cv2_compat = types.ModuleType("app.core.cv2_compat")
     fake_cv2_compat.cv2 = cv2_stub
     fake_cv2_compat.require_cv2 = lambda: cv2_stub
+    fake_config = types.ModuleType("app.config")
+    fake_config.ROI_MASK_CACHE_MAX_MB = 16
     overrides = {
         "cv2": cv2_stub,
         "app": fake_app,
+        "app.config": fake_config,
         "app.core": fake_app_core,
         "app.core.cv2_compat": fake_cv2_compat,
+        "app.core.roi_mask_cache": None,
     }
 
     with patched_sys_modules(overrides):
+        cache_spec = importlib.util.spec_from_file_location("app.core.roi_mask_cache", ROI_MASK_CACHE_PATH)
+        cache_module = importlib.util.module_from_spec(cache_spec)
+        assert cache_spec.loader is not None
+        sys.modules["app.core.roi_mask_cache"] = cache_module
+        cache_spec.loader.exec_module(cache_module)
+
         algorithm_spec = importlib.util.spec_from_file_location("app.core.algorithm", ALGORITHM_PATH)
         algorithm_module = importlib.util.module_from_spec(algorithm_spec)
         assert algorithm_spec.loader is not None
@@ -130,6 +142,16 @@ def load_roi_module():
     return roi_module
 
 
+class FakeNV12Frame(NamedTuple):
+    data: np.ndarray
+    width: int
+    height: int
+
+    @property
+    def shape(self):
+        return (self.height, self.width, 3)
+
+
 def load_adaptive_module(roi_module):
     fake_app = types.ModuleType("app")
     fake_app.logger = types.SimpleNamespace(
@@ -155,6 +177,7 @@ def load_adaptive_module(roi_module):
     }
     fake_backends = types.ModuleType("app.user_scripts.common.yolo_backends")
     fake_backends.create_backend = lambda *args, **kwargs: None
+    fake_backends.NV12Frame = FakeNV12Frame
 
     overrides = {
         "app": fake_app,
@@ -429,6 +452,56 @@ def test_process_crop_infer_uses_original_frame_when_mixed_with_pre_mask():
     assert int(np.sum(backend.frames[0])) > 0
 
 
+@pytest.mark.parametrize(
+    ("roi_mode", "expects_nv12"),
+    [(None, True), ("post_filter", True), ("pre_mask", False)],
+)
+def test_process_passes_nv12_frame_to_backend_unless_pre_mask_needs_rgb(roi_mode, expects_nv12):
+    roi_module = load_roi_module()
+    adaptive_module = load_adaptive_module(roi_module)
+    fake_app = types.ModuleType("app")
+    fake_app.logger = types.SimpleNamespace(
+        info=lambda *args, **kwargs: None,
+        warning=lambda *args, **kwargs: None,
+        error=lambda *args, **kwargs: None,
+        exception=lambda *args, **kwargs: None,
+    )
+
+    class Backend:
+        name = "onnxruntime"
+        accepts_nv12 = True
+
+        def __init__(self):
+            self.frames = []
+
+        def infer(self, frame):
+            self.frames.append(frame)
+            return [], [], {}
+
+    backend = Backend()
+    nv12 = np.zeros((30, 40), dtype=np.uint8)
+    fake_app_core = types.ModuleType("app.core")
+    fake_frame_utils = types.ModuleType("app.core.frame_utils")
+    fake_frame_utils.nv12_to_rgb = lambda value, width=None, height=None: np.zeros((20, 40, 3), dtype=np.uint8)
+    fake_frame_utils.infer_frame_dimensions = lambda value, pixel_format=None, width=None, height=None: (40, 20)
+    fake_frame_utils.ensure_frame_array = lambda value, width, height, pixel_format: value
+    with patched_sys_modules({
+        "app": fake_app,
+        "app.core": fake_app_core,
+        "app.core.frame_utils": fake_frame_utils,
+    }):
+        result = adaptive_module.process(
+            frame=nv12,
+            config={},
+            roi_regions=[_square_region(0, 0, 10, 10, mode=roi_mode)] if roi_mode else None,
+            state={"backend": backend, "model_path": "dummy.onnx"},
+        )
+
+    assert len(backend.frames) == 1
+    assert isinstance(backend.frames[0], FakeNV12Frame) is expects_nv12
+    assert result["metadata"]["image_size"] == {"height": 20, "width": 40}
+
+
 def test_process_returns_structured_error_when_backend_inference_fails():
     roi_module = load_roi_module()
     adaptive_module = load_adaptive_module(roi_module)
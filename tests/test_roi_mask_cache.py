@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from app.core.algorithm import BaseAlgorithm
+from app.core.roi_mask_cache import RoiMaskCache, roi_mask_cache
+from app.user_scripts.common.roi import filter_items_by_regions
+
+
+def _region(points, **extra):
+    return {"points": points, "mode": "post_filter", **extra}
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    roi_mask_cache.clear()
+    roi_mask_cache.get_stats(reset=True)
+    yield
+    roi_mask_cache.clear()
+
+
+def test_mask_is_cached_read_only_and_keyed_by_shape_and_points():
+    region = _region([[10, 10], [60, 10], [60, 40], [10, 40]])
+
+    first = BaseAlgorithm.create_roi_mask((100, 120, 3), [region])
+    again = BaseAlgorithm.create_roi_mask((100, 120), [dict(region)])
+    other_shape = BaseAlgorithm.create_roi_mask((200, 120, 3), [region])
+    moved = BaseAlgorithm.create_roi_mask((100, 120, 3), [_region([[11, 10], [60, 10], [60, 40], [10, 40]])])
+
+    assert again is first
+    assert other_shape is not first and other_shape.shape == (200, 120)
+    assert moved is not first
+    assert not first.flags.writeable
+    with pytest.raises(ValueError):
+        first[0, 0] = 1
+    assert first[20, 20] == 255 and first[5, 5] == 0
+
+    stats = roi_mask_cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 3)
+    assert stats["hit_rate"] == pytest.approx(0.25)
+
+
+def test_empty_and_invalid_regions_keep_previous_semantics():
+    assert BaseAlgorithm.create_roi_mask((10, 10), []).min() == 255
+    assert BaseAlgorithm.create_roi_mask((10, 10), [_region([[1, 1], [2, 2]])]).max() == 0
+
+
+def test_integral_counts_match_mask_slices():
+    rng = np.random.default_rng(0)
+    entry = BaseAlgorithm.get_roi_mask(
+        (90, 160, 3),
+        [_region([[5, 5], [150, 20], [120, 85], [15, 60]]), _region([{"x": 0.1, "y": 0.5}, {"x": 0.3, "y": 0.9}, {"x": 0.05, "y": 0.95}])],
+    )
+    for _ in range(50):
+        x1, x2 = sorted(rng.integers(0, 161, size=2))
+        y1, y2 = sorted(rng.integers(0, 91, size=2))
+        assert entry.count_nonzero(x1, y1, x2, y2) == np.count_nonzero(entry.mask[y1:y2, x1:x2])
+
+
+def test_ioa_filter_matches_pixel_count():
+    region = _region([[20, 20], [80, 20], [80, 70], [20, 70]])
+    detections = [
+        {"box": [25, 25, 40, 40], "label": "inside"},
+        {"box": [0, 0, 40, 40], "label": "partial"},
+        {"box": [85, 75, 99, 99], "label": "outside"},
+    ]
+
+    kept = filter_items_by_regions(detections, (100, 100, 3), [region], metric="ioa", threshold=0.2)
+    kept_again = filter_items_by_regions(detections, (100, 100, 3), [region], metric="ioa", threshold=0.2)
+
+    assert [item["label"] for item in kept] == ["inside", "partial"]
+    assert kept_again == kept
+    assert roi_mask_cache.get_stats()["hits"] == 1
+
+
+def test_cache_evicts_least_recently_used_within_byte_budget():
+    cache = RoiMaskCache(max_bytes=250)
+    first = cache.get("a", lambda: np.zeros((10, 10), dtype=np.uint8))
+    cache.get("b", lambda: np.zeros((10, 10), dtype=np.uint8))
+    assert cache.get("a", lambda: pytest.fail("should hit")) is first
+
+    cache.get("c", lambda: np.zeros((10, 10), dtype=np.uint8))
+    stats = cache.get_stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1 and stats["bytes"] == 200
+    assert cache.get("a", lambda: pytest.fail("should hit")) is first
+
+    # 积分图计入预算：(11 x 11) int32 使总量超出上限，按 LRU 淘汰直到回到预算内
+    assert first.integral.shape == (11, 11)
+    stats = cache.get_stats()
+    assert stats["entries"] == 0 and stats["bytes"] == 0
+
+    oversized = cache.get("big", lambda: np.zeros((20, 20), dtype=np.uint8))
+    assert not oversized.mask.flags.writeable
+    assert cache.get_stats()["misses"] == 4
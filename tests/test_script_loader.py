@@ -137,6 +137,41 @@ class ScriptLoaderSecurityTests(unittest.TestCase):
         self.assertNotIn(module_name, sys.modules)
         self.assertNotIn(("broken.py", "workflow-bad"), loader._isolated_cache)
 
+    def test_call_layout_is_memoized_until_reload(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        script_path = Path(temp_dir.name) / "layout.py"
+        script_path.write_text(
+            textwrap.dedent(
+                """
+                SCRIPT_METADATA = {"name": "layout", "version": "v1.0"}
+
+                def process(frame, config, frame_rgb=None, **kwargs):
+                    return {"detections": []}
+                """
+            ),
+            encoding="utf-8",
+        )
+
+        loader = ScriptLoader(temp_dir.name)
+        module, _metadata = loader.load("layout.py", isolate_key="workflow-a")
+        layout = loader.get_call_layout("layout.py", isolate_key="workflow-a")
+
+        self.assertIs(layout.func, module.process)
+        self.assertEqual(layout.param_names, ("frame", "config", "frame_rgb", "kwargs"))
+        self.assertTrue(layout.accepts("frame_rgb"))
+        self.assertEqual(
+            layout.build_kwargs({"frame": 1, "config": 2, "state": 3, "frame_bgr": 4}),
+            {"frame": 1, "config": 2},
+        )
+        self.assertIs(loader.get_call_layout("layout.py", isolate_key="workflow-a"), layout)
+        self.assertIsNone(loader.get_call_layout("layout.py", isolate_key="workflow-b"))
+
+        reloaded, _metadata = loader.load("layout.py", reload=True, isolate_key="workflow-a")
+        reloaded_layout = loader.get_call_layout("layout.py", isolate_key="workflow-a")
+        self.assertIsNot(reloaded_layout, layout)
+        self.assertIs(reloaded_layout.func, reloaded.process)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,13 +1,24 @@
 import os
+import threading
 import time
 
+import numpy as np
+
 import app.core.shared_inference as shared_inference_module
 from app.core.gpu_placement import (
     GpuDeviceSnapshot,
     GpuPlacementBroker,
 )
 from app.core.ocr_backend import build_ocr_model_spec
-from app.core.shared_inference import _ModelRegistry, build_model_spec, model_key
+from app.core.shared_inference import (
+    SharedInferenceClient,
+    SharedInferenceServer,
+    _AttachedSlabCache,
+    _FrameSlabPool,
+    _ModelRegistry,
+    build_model_spec,
+    model_key,
+)
 
 
 def _fake_worker(spec, base_config, request_queue, result_queue, gpu_assignment=None):
@@ -91,6 +102,34 @@ def _gpu0_runtime_oom_worker(spec, base_config, request_queue, result_queue, gpu
     })
 
 
+def _reverse_batch_worker(spec, base_config, request_queue, result_queue, gpu_assignment=None):
+    # Answers only once three requests are queued, newest first: a client that
+    # can keep just one request in flight would never complete a batch.
+    result_queue.put({
+        "kind": "worker_ready",
+        "key": model_key(spec),
+        "pid": os.getpid(),
+    })
+    attached = _AttachedSlabCache()
+    while True:
+        batch = []
+        while len(batch) < 3:
+            request = request_queue.get()
+            if request is None:
+                return
+            batch.append(request)
+        for request in reversed(batch):
+            pixel = int(attached.frame_view(request).reshape(-1)[0])
+            result_queue.put({
+                "kind": "result",
+                "request_id": request["request_id"],
+                "ok": True,
+                "detections": [{"pixel": pixel}],
+                "details": [],
+                "metadata": {"batch_size": len(batch)},
+            })
+
+
 class _FakeGpuProvider:
     def devices(self):
         return [
@@ -676,3 +715,170 @@ def test_runtime_cuda_oom_moves_future_requests_to_another_gpu(tmp_path):
         assert registry.slots[acquired["model_key"]].gpu_assignment.gpu_index == 1
     finally:
         registry.close()
+
+
+def test_frame_slab_pool_reuses_released_slabs():
+    pool = _FrameSlabPool(capacity=1)
+    try:
+        first, first_reused = pool.acquire(1000)
+        first_name = first.name
+        pool.release(first)
+        second, second_reused = pool.acquire(900)
+        larger, larger_reused = pool.acquire(second.size + 1)
+
+        assert first_reused is False
+        assert second_reused is True
+        assert second.name == first_name
+        assert larger_reused is False
+
+        # A full pool keeps the larger slab so later big frames still hit.
+        pool.release(second)
+        pool.release(larger)
+        assert [slab.size for slab in pool.free] == [larger.size]
+        assert pool.stats()["slab_reuse_count"] == 1
+        assert pool.stats()["slab_miss_count"] == 2
+    finally:
+        pool.close()
+
+
+def test_model_worker_infers_directly_on_client_slab(monkeypatch, tmp_path):
+    model = tmp_path / "model.pt"
+    model.write_bytes(b"weights")
+    spec = build_model_spec(str(model), {}, {"model_id": 32})
+    pool = _FrameSlabPool(capacity=1)
+    slab, _reused = pool.acquire(12)
+    frame = np.arange(12, dtype=np.uint8).reshape(2, 2, 3)
+    np.ndarray(frame.shape, dtype=frame.dtype, buffer=slab.segment.buf)[...] = frame
+    observed = {}
+    responses = []
+
+    class FakeBackend:
+        name = "ultralytics"
+        model = None
+
+        def infer(self, received):
+            if received.shape == frame.shape:
+                observed["writeable"] = received.flags.writeable
+                observed["owns_data"] = received.flags.owndata
+                observed["pixels"] = received.tolist()
+            return [], [], {}
+
+        def cleanup(self):
+            pass
+
+    requests = [
+        {
+            "request_id": "slab-request",
+            "shm_name": slab.name,
+            "slab_reused": False,
+            "shape": frame.shape,
+            "dtype": frame.dtype.str,
+            "config": {},
+        },
+        None,
+    ]
+
+    class RequestQueue:
+        @staticmethod
+        def get(timeout=None):
+            return requests.pop(0)
+
+    class ResultQueue:
+        @staticmethod
+        def put(value):
+            responses.append(value)
+
+    monkeypatch.setattr(
+        shared_inference_module,
+        "_create_model_worker_backend",
+        lambda *_args, **_kwargs: FakeBackend(),
+    )
+    try:
+        shared_inference_module._model_worker_main(
+            spec, {}, RequestQueue(), ResultQueue()
+        )
+    finally:
+        pool.discard(slab)
+        pool.close()
+
+    assert observed == {
+        "writeable": False,
+        "owns_data": False,
+        "pixels": frame.tolist(),
+    }
+    assert responses[-1]["request_id"] == "slab-request"
+    assert responses[-1]["ok"] is True
+
+
+def test_registry_stats_report_slab_reuse_and_miss(tmp_path):
+    model = tmp_path / "model.pt"
+    model.write_bytes(b"weights")
+    spec = build_model_spec(str(model), {}, {"model_id": 33})
+    registry = _ModelRegistry(queue_size=2, idle_seconds=60, worker_target=_fake_worker)
+    try:
+        acquired = registry.acquire(spec, {})
+        for index, reused in enumerate((False, True, True)):
+            response = registry.submit(
+                acquired["model_key"],
+                {"request_id": f"slab-{index}", "slab_reused": reused},
+                timeout=2,
+            )
+            assert response["ok"] is True
+
+        stats = registry.stats()
+        assert stats["models"][0]["slab_reuse_count"] == 2
+        assert stats["models"][0]["slab_miss_count"] == 1
+        assert stats["frame_slabs"] == {
+            "reuse_count": 2,
+            "miss_count": 1,
+            "reuse_ratio": 0.6667,
+        }
+    finally:
+        registry.close()
+
+
+def _serve_registry(socket_path, registry):
+    server = SharedInferenceServer.__new__(SharedInferenceServer)
+    server.socket_path = str(socket_path)
+    server.running = True
+    server.registry = registry
+    server.listener = None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(server.socket_path):
+        if time.monotonic() > deadline:
+            raise AssertionError("shared inference server did not start")
+        time.sleep(0.01)
+    return server
+
+
+def test_client_keeps_multiple_frames_in_flight(tmp_path):
+    model = tmp_path / "model.pt"
+    model.write_bytes(b"weights")
+    spec = build_model_spec(str(model), {}, {"model_id": 34})
+    registry = _ModelRegistry(
+        queue_size=4, idle_seconds=60, worker_target=_reverse_batch_worker
+    )
+    server = _serve_registry(tmp_path / "s.sock", registry)
+    client = SharedInferenceClient(
+        spec=spec,
+        socket_path=server.socket_path,
+        timeout=5,
+        startup_timeout=5,
+        max_in_flight=3,
+    )
+    try:
+        frames = [np.full((4, 4, 3), value, dtype=np.uint8) for value in (7, 8, 9)]
+        responses = client.infer_many(frames, {"confidence": 0.5})
+
+        assert [item["detections"][0]["pixel"] for item in responses] == [7, 8, 9]
+        assert {item["metadata"]["batch_size"] for item in responses} == {3}
+
+        futures = [client.infer_async(frame, {}) for frame in frames]
+        assert [
+            future.result(timeout=5)["detections"][0]["pixel"] for future in futures
+        ] == [7, 8, 9]
+        assert client.slabs.stats()["slab_reuse_count"] == 3
+    finally:
+        client.close()
+        server.close()
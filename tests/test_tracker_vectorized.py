@@ -0,0 +1,133 @@
+"""Tracker hot paths: vectorized results must match the per-item loops they replaced.
+
+Timings live in `scripts/benchmark_trackers.py`.
+"""
+
+import numpy as np
+
+import app.user_scripts.common.tracker as tracker_mod
+from app.user_scripts.common.byte_tracker import ByteTracker, KalmanFilterXYAH, KalmanTrackStore, xyxy_to_xyah
+from app.user_scripts.common.tracker import (
+    ParsedDetection,
+    associate_class_aware,
+    box_iou,
+    new_track,
+    pairwise_iou,
+)
+
+
+def _random_boxes(rng, count, extent=1920.0):
+    xy = rng.uniform(0, extent, size=(count, 2))
+    wh = rng.uniform(10, 200, size=(count, 2))
+    return np.concatenate([xy, xy + wh], axis=1).tolist()
+
+
+def _loop_pairwise_iou(track_boxes, det_boxes):
+    iou = np.zeros((len(track_boxes), len(det_boxes)), dtype=np.float64)
+    for i, track_box in enumerate(track_boxes):
+        for j, det_box in enumerate(det_boxes):
+            iou[i, j] = box_iou(track_box, det_box)
+    return iou
+
+
+def _loop_class_aware(tracks, detections, iou_threshold):
+    matches = []
+    unmatched_tracks = set(range(len(tracks)))
+    unmatched_dets = set(range(len(detections)))
+    for label in {track.label for track in tracks} & {det.label for det in detections}:
+        track_indices = [idx for idx, track in enumerate(tracks) if track.label == label]
+        det_indices = [idx for idx, det in enumerate(detections) if det.label == label]
+        local_matches, _, _ = tracker_mod.associate_by_iou(
+            [tracks[idx].box for idx in track_indices],
+            [detections[idx].box for idx in det_indices],
+            iou_threshold,
+        )
+        for local_t, local_d in local_matches:
+            matches.append((track_indices[local_t], det_indices[local_d]))
+            unmatched_tracks.discard(track_indices[local_t])
+            unmatched_dets.discard(det_indices[local_d])
+    return matches, sorted(unmatched_tracks), sorted(unmatched_dets)
+
+
+def test_pairwise_iou_matches_box_iou():
+    rng = np.random.default_rng(0)
+    tracks = _random_boxes(rng, 150, extent=600.0)
+    dets = _random_boxes(rng, 150, extent=600.0)
+    # 退化框：零面积与反向坐标
+    tracks[0] = [10.0, 10.0, 10.0, 50.0]
+    dets[0] = [40.0, 40.0, 20.0, 20.0]
+
+    np.testing.assert_allclose(pairwise_iou(tracks, dets), _loop_pairwise_iou(tracks, dets), atol=1e-12)
+    assert pairwise_iou([], dets).shape == (0, 150)
+
+
+def test_class_aware_association_matches_per_label_loop(monkeypatch):
+    monkeypatch.setattr(tracker_mod, "_linear_sum_assignment", None)
+    rng = np.random.default_rng(1)
+    labels = ["person", "car", "bicycle", "dog"]
+    track_boxes = _random_boxes(rng, 120, extent=800.0)
+    tracks = [
+        new_track(idx + 1, ParsedDetection(box, 0.9, labels[idx % 4], None, {}), 0.0, 4)
+        for idx, box in enumerate(track_boxes)
+    ]
+    jitter = rng.normal(0, 4.0, size=(120, 4))
+    detections = [
+        ParsedDetection((np.asarray(box) + jitter[idx]).tolist(), 0.9, labels[(idx * 3) % 4], None, {})
+        for idx, box in enumerate(track_boxes)
+    ]
+
+    matches, unmatched_tracks, unmatched_dets = associate_class_aware(tracks, detections, 0.3)
+    ref_matches, ref_tracks, ref_dets = _loop_class_aware(tracks, detections, 0.3)
+    assert sorted(matches) == sorted(ref_matches)
+    assert unmatched_tracks == ref_tracks
+    assert unmatched_dets == ref_dets
+
+
+def test_batched_kalman_store_matches_single_track_filter():
+    rng = np.random.default_rng(2)
+    kf = KalmanFilterXYAH()
+    store = KalmanTrackStore(kf, capacity=4)
+    boxes = _random_boxes(rng, 40)
+    reference = {}
+    for track_id, box in enumerate(boxes, start=1):
+        store.initiate(track_id, xyxy_to_xyah(box))
+        reference[track_id] = kf.initiate(xyxy_to_xyah(box))
+
+    for _ in range(5):
+        store.predict_all()
+        reference = {track_id: kf.predict(*state) for track_id, state in reference.items()}
+        updated = list(reference)[::2]
+        measurements = np.stack(
+            [xyxy_to_xyah((np.asarray(boxes[track_id - 1]) + rng.normal(0, 2.0, 4)).tolist()) for track_id in updated]
+        )
+        store.update(updated, measurements)
+        for track_id, measurement in zip(updated, measurements):
+            reference[track_id] = kf.update(*reference[track_id], measurement)
+
+    store.retain(list(reference)[5:])
+    assert len(store) == 35
+    for track_id in list(reference)[5:]:
+        mean, cov = store.get(track_id)
+        np.testing.assert_allclose(mean, reference[track_id][0], rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(cov, reference[track_id][1], rtol=1e-9, atol=1e-9)
+    assert store.get(1) is None
+
+
+def test_bytetrack_crowded_scene_keeps_ids():
+    rng = np.random.default_rng(3)
+    count = 100
+    start = np.asarray(_random_boxes(rng, count, extent=4000.0))
+    velocity = rng.uniform(-3, 3, size=(count, 2))
+    tracker = ByteTracker(min_hits=1, max_tracks=count * 2)
+
+    for frame in range(60):
+        offset = np.tile(velocity * frame, 2)
+        detections = [
+            {"box": box, "confidence": 0.9, "label": "person" if idx % 2 else "car"}
+            for idx, box in enumerate((start + offset).tolist())
+        ]
+        tracks = tracker.update(detections, timestamp=frame)
+
+    assert len(tracks) == count
+    assert {track.track_id for track in tracks} == set(range(1, count + 1))
+    assert len(tracker._kf_store) == count
@@ -0,0 +1,76 @@
+import random
+
+from app.core.window_detector import WindowDetector
+
+
+def _reference_stats(records, current_time, window_size):
+    window = [record for record in records if record[0] >= current_time - window_size]
+    detections = sum(1 for _, detected, _ in window if detected)
+    longest = streak = 0
+    for _, detected, _ in window:
+        streak = streak + 1 if detected else 0
+        longest = max(longest, streak)
+    return len(window), detections, longest, window
+
+
+def _enable(detector, window_size, mode="ratio", threshold=0.5):
+    detector.load_trigger_condition(
+        1, "alert", {"enable": True, "window_size": window_size, "mode": mode, "threshold": threshold}
+    )
+
+
+def test_incremental_stats_match_full_window_scan():
+    rng = random.Random(7)
+    detector = WindowDetector()
+    detector.max_records_per_buffer = 500
+    _enable(detector, window_size=20)
+    records = []
+    timestamp = 1000.0
+    for index in range(3000):
+        timestamp += rng.uniform(0.01, 0.2)
+        detected = rng.random() < (0.8 if (index // 50) % 2 else 0.2)
+        image_path = f"frame_{index}.jpg" if detected and rng.random() < 0.5 else None
+        detector.add_record(1, "alert", timestamp, detected, image_path)
+        records.append((timestamp, detected, image_path))
+        records = records[-detector.max_records_per_buffer:]
+
+        if index % 7:
+            continue
+        current_time = timestamp
+        total, detections, longest, window = _reference_stats(records, current_time, 20)
+        stats = detector.get_stats(1, "alert", current_time)
+        assert (stats["total_count"], stats["detection_count"], stats["max_consecutive"]) == (total, detections, longest)
+        assert detector.get_window_records(1, "alert", current_time) == window
+        assert detector.get_detection_records(1, "alert", current_time) == [r for r in window if r[1]]
+
+
+def test_check_condition_modes_and_expiry():
+    detector = WindowDetector()
+    _enable(detector, window_size=10, mode="consecutive", threshold=3)
+    for second, detected in enumerate([True, True, False, True, True, True, False]):
+        detector.add_record(1, "alert", 100.0 + second, detected)
+
+    passed, stats = detector.check_condition(1, "alert", 106.0)
+    assert passed is True
+    assert stats["max_consecutive"] == 3
+    assert stats["detection_count"] == 5
+
+    # 窗口滑过后最长连续段随之过期
+    passed, stats = detector.check_condition(1, "alert", 114.5)
+    assert passed is False
+    assert stats["total_count"] == 2
+    assert stats["max_consecutive"] == 1
+
+
+def test_update_last_image_path_and_clear_buffer():
+    detector = WindowDetector()
+    _enable(detector, window_size=30)
+    detector.add_record(1, "alert", 10.0, True)
+    detector.update_last_image_path(1, "alert", "cam/frame.jpg")
+
+    assert detector.get_detection_records(1, "alert", 11.0) == [(10.0, True, "cam/frame.jpg")]
+
+    detector.clear_buffer(1, "alert")
+    _enable(detector, window_size=30)
+    assert detector.get_stats(1, "alert", 11.0)["total_count"] == 0
+    assert detector.get_memory_usage()["total_records"] == 0
@@ -662,3 +662,70 @@ def test_parallel_dual_path_process_runs_once():
     assert results[0] is not None and results[1] is not None
     assert results[0].get('has_detection') is True
     assert results[1].get('has_detection') is True
+
+
+def test_execution_plan_is_compiled_once_across_frames(monkeypatch):
+    from app.core import workflow_executor as workflow_executor_module
+
+    compile_calls = []
+    original_compile = workflow_executor_module.compile_workflow_plan
+
+    def _counting_compile(*args, **kwargs):
+        compile_calls.append(args)
+        return original_compile(*args, **kwargs)
+
+    monkeypatch.setattr(workflow_executor_module, 'compile_workflow_plan', _counting_compile)
+    executor, yolo, ocr = _banner_graph(None, yolo_dets=[BOX], ocr_dets=[OCR_DET])
+    for _ in range(3):
+        _run(executor)
+
+    assert yolo.call_count == 3
+    assert ocr.call_count == 3
+    assert len(compile_calls) == 1
+
+    executor._build_execution_graph()
+    _run(executor)
+    assert len(compile_calls) == 2
+
+
+class _ReprCounter:
+    def __init__(self):
+        self.calls = 0
+
+    def __repr__(self):
+        self.calls += 1
+        return '<repr-counter>'
+
+
+def test_frame_debug_logs_do_not_format_results_when_frame_logs_disabled():
+    import logging
+
+    from app.core.workflow_executor import frame_logger
+
+    counter = _ReprCounter()
+    executor, yolo, _ocr = _banner_graph(None, yolo_dets=[BOX])
+    yolo._metadata = {'payload': counter}
+    records = []
+
+    class _FormattingHandler(logging.Handler):
+        def emit(self, record):
+            records.append(record.getMessage())
+
+    handler = _FormattingHandler(level=logging.DEBUG)
+    original_level = frame_logger.level
+    frame_logger.addHandler(handler)
+    try:
+        frame_logger.setLevel(logging.INFO)
+        _run(executor)
+        assert yolo.call_count == 1
+        assert counter.calls == 0
+        assert records == []
+
+        frame_logger.setLevel(logging.DEBUG)
+        _run(executor)
+    finally:
+        frame_logger.removeHandler(handler)
+        frame_logger.setLevel(original_level)
+
+    assert counter.calls > 0
+    assert any('<repr-counter>' in message for message in records)
@@ -0,0 +1,264 @@
+import io
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import source_workflow_host
+from app.core.orchestrator import Orchestrator
+from app.core.workflow_runtime import diff_workflow_signatures
+from app.source_workflow_host import SourceWorkflowHost
+
+
+SOURCE_ID = 7
+
+
+def _workflow(workflow_id, config_version, source_id=SOURCE_ID, is_active=True):
+    return SimpleNamespace(
+        id=workflow_id,
+        config_version=config_version,
+        is_active=is_active,
+        is_template=False,
+        data_dict={"nodes": [{"id": "source_1", "type": "source", "dataId": source_id}]},
+    )
+
+
+class _FakeExecutor:
+    def __init__(self, workflow_id):
+        self.workflow_id = workflow_id
+        self.events = []
+
+    def stop(self):
+        self.events.append("stop")
+
+    def begin_drain(self):
+        self.events.append("begin_drain")
+
+    def cleanup(self):
+        self.events.append("cleanup")
+
+    def get_stride_candidates(self):
+        return set()
+
+
+@pytest.fixture
+def host(monkeypatch):
+    database = {}
+    built = []
+    printed = []
+
+    def build_executor(workflow_id, alert_sink=None):
+        if database[workflow_id].config_version < 0:
+            raise RuntimeError("broken config")
+        executor = _FakeExecutor(workflow_id)
+        built.append(executor)
+        return executor
+
+    def get_by_id(workflow_id):
+        if workflow_id not in database:
+            raise source_workflow_host.Workflow.DoesNotExist()
+        return database[workflow_id]
+
+    monkeypatch.setattr(source_workflow_host, "WorkflowExecutor", build_executor)
+    monkeypatch.setattr(source_workflow_host.Workflow, "get_by_id", get_by_id)
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: printed.append(args[0]))
+
+    instance = SourceWorkflowHost.__new__(SourceWorkflowHost)
+    instance.source_id = SOURCE_ID
+    instance.source = SimpleNamespace(source_code="cam-7")
+    instance.analysis_fps = 10
+    instance.node_executor = None
+    instance.alert_sink = None
+    instance.runners = {}
+    instance.workflows = {}
+    instance.failed_workflows = {}
+    instance.control_commands = source_workflow_host.queue.Queue()
+    instance._deferred_commands = []
+    instance._reloads = {}
+    instance.reload_executor = source_workflow_host.ThreadPoolExecutor(max_workers=1)
+    instance.database = database
+    instance.built = built
+    instance.printed = printed
+    yield instance
+    for runner in instance.runners.values():
+        runner.stop()
+    instance.reload_executor.shutdown(wait=True)
+
+
+def _load(host, workflow):
+    host.database[workflow.id] = workflow
+    host.workflows[workflow.id] = workflow
+    host._activate_workflow(workflow, executor=_FakeExecutor(workflow.id))
+    return host.runners[workflow.id]
+
+
+def _send(host, *commands):
+    for command in commands:
+        host.control_commands.put(command)
+    deadline = time.monotonic() + 5.0
+    host._apply_control_commands()
+    while host._reloads or host._deferred_commands:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+        host._apply_control_commands()
+    acks = [json.loads(line.split(":", 2)[2]) for line in host.printed if line.startswith("SOURCE_HOST_ACK:")]
+    host.printed.clear()
+    return acks
+
+
+def test_signature_diff_removes_first_then_replaces_then_adds():
+    commands = diff_workflow_signatures(((1, 1), (2, 1), (3, 4)), ((2, 2), (3, 4), (5, 1)))
+
+    assert commands == [
+        {"command": "remove", "workflow_id": 1},
+        {"command": "replace", "workflow_id": 2, "config_version": 2},
+        {"command": "add", "workflow_id": 5, "config_version": 1},
+    ]
+    assert diff_workflow_signatures(None, ((1, 1),)) == [
+        {"command": "add", "workflow_id": 1, "config_version": 1}
+    ]
+
+
+def test_replace_swaps_only_the_changed_runner(host):
+    untouched = _load(host, _workflow(1, 1))
+    old = _load(host, _workflow(2, 1))
+    host.database[2] = _workflow(2, 2)
+
+    acks = _send(host, {"command": "replace", "workflow_id": 2, "config_version": 2})
+
+    assert acks == [{"command": "replace", "workflow_id": 2, "config_version": 2, "ok": True, "status": "loaded"}]
+    assert host.runners[1] is untouched and untouched.executor.events == []
+    assert old.executor.events == ["stop", "begin_drain", "cleanup"]
+    assert host.runners[2] is not old
+    assert host.runners[2].executor is host.built[-1]
+    assert host.runners[2].workflow.config_version == 2
+
+
+def test_repeated_or_stale_commands_are_idempotent(host):
+    runner = _load(host, _workflow(1, 3))
+
+    acks = _send(
+        host,
+        {"command": "add", "workflow_id": 1, "config_version": 3},
+        {"command": "remove", "workflow_id": 9},
+        {"command": "add", "workflow_id": 4, "config_version": 1},
+        {"command": "restart", "workflow_id": 1},
+    )
+
+    assert [(ack["ok"], ack.get("status"), ack.get("error")) for ack in acks] == [
+        (True, "unchanged", None),
+        (True, "not_loaded", None),
+        (False, None, "workflow not found"),
+        (False, None, "unknown command 'restart'"),
+    ]
+    assert host.runners == {1: runner}
+    assert host.built == []
+
+
+def test_add_and_remove_in_one_batch_are_applied_in_order(host):
+    _load(host, _workflow(1, 1))
+    host.database[2] = _workflow(2, 1)
+
+    acks = _send(
+        host,
+        {"command": "add", "workflow_id": 2, "config_version": 1},
+        {"command": "remove", "workflow_id": 2},
+        {"command": "remove", "workflow_id": 1},
+    )
+
+    assert [(ack["command"], ack["workflow_id"], ack["status"]) for ack in acks] == [
+        ("add", 2, "loaded"),
+        ("remove", 1, "removed"),
+        ("remove", 2, "removed"),
+    ]
+    assert host.runners == {} and host.workflows == {}
+    assert host.built[0].events == ["stop", "begin_drain", "cleanup"]
+
+
+def test_broken_replacement_is_isolated_for_retry(host):
+    old = _load(host, _workflow(1, 1))
+    host.database[1] = _workflow(1, -1)
+
+    acks = _send(host, {"command": "replace", "workflow_id": 1, "config_version": -1})
+
+    assert (acks[0]["ok"], acks[0]["status"], acks[0]["error"]) == (True, "retry_scheduled", "broken config")
+    assert old.executor.events == ["stop", "begin_drain", "cleanup"]
+    assert 1 not in host.runners
+    assert host.failed_workflows[1]["workflow"].config_version == -1
+
+
+def test_control_reader_queues_json_commands_and_skips_garbage(host):
+    stream = io.StringIO('{"command": "remove", "workflow_id": 3}\nnot json\n\n[1]\n')
+
+    host._start_control_reader(stream).join(timeout=1)
+
+    assert host.control_commands.get_nowait() == {"command": "remove", "workflow_id": 3}
+    assert host.control_commands.empty()
+
+
+class _FakeOrchestratorProcess:
+    pid = 4321
+
+    def __init__(self, fail=False):
+        self.stdin = io.StringIO()
+        if fail:
+            self.stdin.close()
+
+    def poll(self):
+        return None
+
+
+def _orchestrator(monkeypatch, process, admitted=True):
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.externally_reaped = {}
+    orchestrator.workflow_hosts = {SOURCE_ID: {"process": process, "workflow_ids": [1, 2]}}
+    orchestrator.workflow_host_signatures = {SOURCE_ID: ((1, 1), (2, 1))}
+    committed = []
+    evaluated = []
+    orchestrator.inference_admission = SimpleNamespace(
+        commit=lambda source_id, shared, local_model_ids=(): committed.append((set(shared), tuple(local_model_ids)))
+    )
+    monkeypatch.setattr(
+        orchestrator,
+        "_workflow_start_allowed",
+        lambda source_id, workflows: (evaluated.append([w.id for w in workflows]) or admitted, set(), ()),
+        raising=False,
+    )
+    monkeypatch.setattr(
+        orchestrator,
+        "_workflow_model_requirements",
+        lambda workflows: ({10}, tuple(w.id for w in workflows)),
+        raising=False,
+    )
+    return orchestrator, committed, evaluated
+
+
+def test_orchestrator_sends_only_the_changed_workflows(monkeypatch):
+    process = _FakeOrchestratorProcess()
+    orchestrator, committed, evaluated = _orchestrator(monkeypatch, process)
+    workflows = [_workflow(2, 2), _workflow(3, 1)]
+
+    assert orchestrator._reload_source_host_workflows(SOURCE_ID, ((1, 1), (2, 1)), workflows) is True
+
+    sent = [json.loads(line) for line in process.stdin.getvalue().splitlines()]
+    assert [(command["command"], command["workflow_id"]) for command in sent] == [
+        ("remove", 1), ("replace", 2), ("add", 3)
+    ]
+    assert evaluated == [[2, 3]]
+    assert committed == [({10}, (2, 3))]
+    assert orchestrator.workflow_host_signatures[SOURCE_ID] == ((2, 2), (3, 1))
+    assert orchestrator.workflow_hosts[SOURCE_ID]["workflow_ids"] == [2, 3]
+
+
+def test_orchestrator_defers_when_admission_rejects_and_falls_back_on_broken_pipe(monkeypatch):
+    process = _FakeOrchestratorProcess()
+    orchestrator, committed, _ = _orchestrator(monkeypatch, process, admitted=False)
+
+    assert orchestrator._reload_source_host_workflows(SOURCE_ID, ((1, 1),), [_workflow(1, 2)]) is True
+    assert process.stdin.getvalue() == ""
+    assert orchestrator.workflow_host_signatures[SOURCE_ID] == ((1, 1), (2, 1))
+
+    broken, _, _ = _orchestrator(monkeypatch, _FakeOrchestratorProcess(fail=True))
+    assert broken._reload_source_host_workflows(SOURCE_ID, ((1, 1),), [_workflow(1, 2)]) is False
+    assert broken.workflow_host_signatures[SOURCE_ID] == ((1, 1), (2, 1))
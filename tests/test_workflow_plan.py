@@ -0,0 +1,69 @@
+from app.core.workflow_plan import compile_workflow_plan
+from app.core.workflow_types import (
+    AlertNodeData,
+    AlgorithmNodeData,
+    FunctionNodeData,
+    SourceNodeData,
+    TimeScheduleNodeData,
+)
+
+
+def _conn(src, dst, condition=None):
+    return {'from': src, 'to': dst, 'condition': condition}
+
+
+def _nodes():
+    return {
+        'source': SourceNodeData(node_id='source'),
+        'schedule': TimeScheduleNodeData(node_id='schedule'),
+        'yolo': AlgorithmNodeData(node_id='yolo'),
+        'ocr': AlgorithmNodeData(node_id='ocr'),
+        'merge': FunctionNodeData(node_id='merge'),
+        'alert': AlertNodeData(node_id='alert'),
+    }
+
+
+def _connections():
+    return [
+        _conn('source', 'schedule'),
+        _conn('schedule', 'yolo', 'true'),
+        _conn('source', 'ocr'),
+        _conn('yolo', 'merge'),
+        _conn('ocr', 'merge'),
+        _conn('merge', 'alert'),
+    ]
+
+
+def test_plan_levels_exclude_branch_terminals_and_mark_serial_levels():
+    plan = compile_workflow_plan(_nodes(), _connections())
+
+    assert plan.levels == (('source',), ('ocr', 'schedule'), ('yolo',), ('merge',))
+    assert plan.level_parallel == (True, True, True, False)
+    assert plan.source_node_ids == ('source',)
+    assert plan.time_schedule_node_ids == ('schedule',)
+
+
+def test_plan_adjacency_matches_connection_scan_order():
+    connections = _connections() + [_conn('yolo', 'merge')]
+    plan = compile_workflow_plan(_nodes(), connections)
+
+    assert plan.upstream_of('merge') == ('yolo', 'ocr', 'yolo')
+    assert plan.first_upstream('alert') == 'merge'
+    assert plan.upstream_of('source') == ()
+    assert plan.successors['source'] == (('schedule', None), ('ocr', None))
+    assert plan.has_gated_incoming('yolo') is True
+    assert plan.has_gated_incoming('ocr') is False
+    assert plan.first_gated_incoming('yolo') == ('schedule', 'true')
+    assert plan.first_gated_incoming('ocr') == (None, None)
+
+
+def test_plan_ancestors_and_handlers_are_resolved_per_node():
+    def handle_algorithm(node_id, context):
+        return context
+
+    plan = compile_workflow_plan(_nodes(), _connections(), {'algorithm': handle_algorithm})
+
+    assert plan.ancestors_of('alert') == {'alert', 'merge', 'yolo', 'ocr', 'schedule', 'source'}
+    assert plan.ancestors_of('ocr') == {'ocr', 'source'}
+    assert plan.ancestors_of('unknown') == {'unknown'}
+    assert plan.handlers == {'yolo': handle_algorithm, 'ocr': handle_algorithm}
@@ -39,10 +39,12 @@ def _load_yolo_output_adapter():
     cv2_stub.dnn = _DnnModule()
     cv2_stub.INTER_LINEAR = 1
     cv2_stub.COLOR_RGB2BGR = 2
-    cv2_stub.resize = lambda _frame, size, interpolation=None: np.zeros(
+    cv2_stub.COLOR_YUV2RGB_NV12 = 3
+    cv2_stub.COLOR_YUV2BGR_NV12 = 4
+    cv2_stub.resize = lambda _frame, size, dst=None, interpolation=None: np.zeros(
         (size[1], size[0], 3), dtype=np.uint8
     )
-    cv2_stub.cvtColor = lambda frame, _code: frame[:, :, ::-1]
+    cv2_stub.cvtColor = lambda frame, _code, dst=None: frame[:, :, ::-1]
 
     fake_app = types.ModuleType("app")
     fake_app.logger = types.SimpleNamespace(
@@ -233,6 +235,159 @@ class BackendConfigTests(unittest.TestCase):
         wrapped_backend.cleanup()
         self.assertTrue(backend.cleaned)
 
+    @staticmethod
+    def _reference_greedy_merge(detections, details, match_threshold, match_metric):
+        def box_of(item):
+            box = item.get("box")
+            if not isinstance(box, (list, tuple)) or len(box) < 4:
+                return None
+            return [float(value) for value in box[:4]]
+
+        def score(box_a, box_b):
+            iw = max(0.0, min(box_a[2], box_b[2]) - max(box_a[0], box_b[0]))
+            ih = max(0.0, min(box_a[3], box_b[3]) - max(box_a[1], box_b[1]))
+            inter = iw * ih
+            if inter <= 0.0:
+                return 0.0
+            area_a = max(0.0, box_a[2] - box_a[0]) * max(0.0, box_a[3] - box_a[1])
+            area_b = max(0.0, box_b[2] - box_b[0]) * max(0.0, box_b[3] - box_b[1])
+            denominator = min(area_a, area_b) if match_metric == "ios" else area_a + area_b - inter
+            return inter / denominator if denominator > 0.0 else 0.0
+
+        indices = [index for index, item in enumerate(detections) if box_of(item) is not None]
+        indices.sort(key=lambda index: float(detections[index].get("confidence", 0.0) or 0.0), reverse=True)
+        kept = []
+        for index in indices:
+            key = YOLO_BACKENDS._sahi_class_key(detections[index])
+            if not any(
+                YOLO_BACKENDS._sahi_class_key(detections[other]) == key
+                and score(box_of(detections[index]), box_of(detections[other])) >= match_threshold
+                and score(box_of(detections[index]), box_of(detections[other])) > 0.0
+                for other in kept
+            ):
+                kept.append(index)
+        return [detections[index] for index in kept], [details[index] for index in kept if index < len(details)]
+
+    def test_sahi_vectorized_merge_matches_greedy_reference(self):
+        rng = np.random.default_rng(21)
+        detections = []
+        for index in range(300):
+            x1, y1 = rng.uniform(0, 400, size=2).round(1)
+            width, height = rng.uniform(0, 60, size=2).round(1)
+            item = {
+                "box": [x1, y1, x1 + width, y1 + height],
+                # 保留重复置信度，验证排序稳定性
+                "confidence": float(rng.integers(1, 20)) / 20.0,
+            }
+            if index % 3 == 0:
+                item["label"] = "person" if index % 2 else "car"
+            else:
+                item["class"] = int(rng.integers(0, 3))
+            detections.append(item)
+        detections.append({"box": None, "confidence": 1.0, "class": 0})
+        details = [dict(item, index=index) for index, item in enumerate(detections)][:-5]
+
+        for metric in ("ios", "iou"):
+            for threshold in (0.0, 0.3, 0.5):
+                with self.subTest(metric=metric, threshold=threshold):
+                    expected = self._reference_greedy_merge(detections, details, threshold, metric)
+                    actual = YOLO_BACKENDS.merge_sahi_detections(
+                        detections,
+                        details,
+                        match_threshold=threshold,
+                        match_metric=metric,
+                    )
+                    self.assertLess(len(expected[0]), len(detections))
+                    self.assertEqual(actual, expected)
+
+    def test_sahi_backend_submits_all_slices_as_one_batch(self):
+        class Backend:
+            name = "onnxruntime"
+            model_path = "model.onnx"
+            model_info = {}
+            model = object()
+            classes = {}
+            input_width = 20
+            input_height = 20
+            output_adapter = None
+            config = {"confidence": 0.5}
+
+            def __init__(self):
+                self.batches = []
+
+            def infer(self, _frame):
+                raise AssertionError("slices must be batched")
+
+            def infer_batch(self, frames, configs):
+                self.batches.append([frame.shape for frame in frames])
+                return [
+                    ([{"box": [1, 1, 5, 5], "confidence": 0.9, "class": index}], [], {"batch_size": len(frames)})
+                    for index in range(len(frames))
+                ]
+
+            def cleanup(self):
+                pass
+
+        config = YOLO_BACKENDS.normalize_backend_config({
+            "inference_mode": "sahi",
+            "sahi_slice_width": 20,
+            "sahi_slice_height": 20,
+            "sahi_overlap_width_ratio": 0,
+            "sahi_overlap_height_ratio": 0,
+            "sahi_include_full_frame": True,
+        })
+        backend = Backend()
+        wrapped_backend = YOLO_BACKENDS.SahiYoloBackend(backend, config)
+
+        detections, _, metadata = wrapped_backend.infer(np.zeros((40, 60, 3), dtype=np.uint8))
+
+        self.assertEqual(len(backend.batches), 1)
+        self.assertEqual(backend.batches[0], [(20, 20, 3)] * 6 + [(40, 60, 3)])
+        self.assertTrue(metadata["sahi_batched_inference"])
+        self.assertEqual(metadata["sahi_inference_count"], 7)
+        self.assertEqual(metadata["batch_size"], 7)
+        self.assertEqual(sorted(item["box"] for item in detections)[:2], [[1.0, 1.0, 5.0, 5.0], [1.0, 1.0, 5.0, 5.0]])
+        self.assertEqual(len(detections), 7)
+
+    def test_shared_backend_pipelines_batch_and_reports_overload_per_frame(self):
+        from concurrent.futures import Future
+
+        from app.core.shared_inference import SharedInferenceOverloaded
+
+        class Client:
+            model_key = "model-key"
+
+            def __init__(self):
+                self.submitted = []
+
+            def infer_async(self, frame, config):
+                self.submitted.append(frame.shape)
+                future = Future()
+                if len(self.submitted) == 2:
+                    future.set_exception(SharedInferenceOverloaded("model queue full"))
+                else:
+                    future.set_result({
+                        "detections": [{"box": [0, 0, 1, 1]}],
+                        "details": [],
+                        "metadata": {"batch_size": 3},
+                    })
+                return future
+
+        backend = YOLO_BACKENDS.SharedInferenceBackend.__new__(YOLO_BACKENDS.SharedInferenceBackend)
+        backend.config = {"nms_iou": 0.45}
+        backend.client = Client()
+        backend._overload_count = 0
+        backend._last_overload_log_at = float("-inf")
+        frames = [np.zeros((4, 4, 3), dtype=np.uint8) for _ in range(3)]
+
+        results = backend.infer_batch(frames, [backend.config] * 3)
+
+        self.assertEqual(len(backend.client.submitted), 3)
+        self.assertEqual([len(detections) for detections, _, _ in results], [1, 0, 1])
+        self.assertTrue(results[1][2]["overloaded"])
+        self.assertEqual(results[0][2]["model_key"], "model-key")
+        self.assertEqual(results[2][2]["batch_size"], 3)
+
     def test_sahi_backend_rejects_excessive_slice_count(self):
         class Backend:
             name = "onnxruntime"
@@ -330,6 +485,132 @@ class BackendConfigTests(unittest.TestCase):
         backend.cleanup()
         self.assertIsNone(backend.model)
 
+    def _onnx_batch_backend(self, batch_dim, batched_outputs=True):
+        class InputDefinition:
+            name = "images"
+            shape = [batch_dim, 3, 64, 64]
+            type = "tensor(float)"
+
+        class Session:
+            def __init__(self, _path, providers=None):
+                self.providers = providers or ["CPUExecutionProvider"]
+                self.batch_shapes = []
+
+            def get_inputs(self):
+                return [InputDefinition()]
+
+            def get_providers(self):
+                return self.providers
+
+            def run(self, _outputs, inputs):
+                batch = inputs["images"]
+                self.batch_shapes.append(batch.shape)
+                # 每张图一个检测框，框的 x 坐标编码图在 batch 中的位置
+                count = batch.shape[0] if batched_outputs else 1
+                output = np.zeros((count, 1, 6), dtype=np.float32)
+                for index in range(count):
+                    output[index, 0] = [index * 10 + 1, 1, index * 10 + 5, 5, 0.9, 0]
+                return [output]
+
+        YOLO_BACKENDS.ort = types.SimpleNamespace(InferenceSession=Session)
+        YOLO_BACKENDS.ONNXRUNTIME_IMPORT_ERROR = None
+        return YOLO_BACKENDS.ONNXRuntimeBackend(
+            "model.onnx",
+            {},
+            YOLO_BACKENDS.normalize_backend_config({"confidence": 0.5}),
+        )
+
+    def test_onnx_backend_runs_dynamic_batch_in_one_session_call(self):
+        backend = self._onnx_batch_backend("batch")
+        frames = [np.zeros((64, 64, 3), dtype=np.uint8) for _ in range(3)]
+        configs = [dict(backend.config) for _ in frames]
+
+        results = backend.infer_batch(frames, configs)
+
+        self.assertIsNone(backend.batch_capacity)
+        self.assertEqual(backend.session.batch_shapes, [(3, 3, 64, 64)])
+        self.assertEqual([details[0]["box"][0] for _, details, _ in results], [1.0, 11.0, 21.0])
+        self.assertEqual({metadata["batch_size"] for _, _, metadata in results}, {3})
+        self.assertNotIn("padded_batch_size", results[0][2])
+
+    def test_onnx_backend_pads_static_batch_and_chunks_large_groups(self):
+        backend = self._onnx_batch_backend(4)
+        frames = [np.zeros((64, 64, 3), dtype=np.uint8) for _ in range(5)]
+
+        results = backend.infer_batch(frames, [backend.config] * 5)
+
+        self.assertEqual(backend.batch_capacity, 4)
+        self.assertEqual(backend.session.batch_shapes, [(4, 3, 64, 64), (4, 3, 64, 64)])
+        self.assertEqual([details[0]["box"][0] for _, details, _ in results], [1.0, 11.0, 21.0, 31.0, 1.0])
+        self.assertEqual([metadata["batch_size"] for _, _, metadata in results], [4, 4, 4, 4, 1])
+        self.assertEqual(results[4][2]["padded_batch_size"], 4)
+
+        _, details, metadata = backend.infer(frames[0])
+        self.assertEqual(len(details), 1)
+        self.assertEqual(metadata["padded_batch_size"], 4)
+
+    def test_onnx_backend_falls_back_to_single_frames_without_batched_outputs(self):
+        backend = self._onnx_batch_backend("batch", batched_outputs=False)
+        frames = [np.zeros((64, 64, 3), dtype=np.uint8) for _ in range(2)]
+
+        results = backend.infer_batch(frames, [backend.config] * 2)
+
+        self.assertEqual(backend.batch_capacity, 1)
+        self.assertEqual(
+            backend.session.batch_shapes,
+            [(2, 3, 64, 64), (1, 3, 64, 64), (1, 3, 64, 64)],
+        )
+        self.assertEqual([metadata["batch_size"] for _, _, metadata in results], [1, 1])
+
+    def test_rknn_backend_batches_frames_up_to_configured_batch_size(self):
+        class RKNNLite:
+            NPU_CORE_AUTO = 0
+
+            def __init__(self):
+                self.batch_shapes = []
+
+            def load_rknn(self, _path):
+                return 0
+
+            def init_runtime(self, core_mask=None):
+                return 0
+
+            def inference(self, inputs):
+                batch = inputs[0]
+                self.batch_shapes.append(batch.shape)
+                return [np.tile(
+                    np.array([[[1, 1, 5, 5, 0.9, 0]]], dtype=np.float32),
+                    (batch.shape[0], 1, 1),
+                )]
+
+            def release(self):
+                pass
+
+        original_runtime = YOLO_BACKENDS.RKNNLite
+        original_error = YOLO_BACKENDS.RKNNLITE_IMPORT_ERROR
+        YOLO_BACKENDS._reset_rknn_runtime_pool_for_tests()
+        YOLO_BACKENDS.RKNNLite = RKNNLite
+        YOLO_BACKENDS.RKNNLITE_IMPORT_ERROR = None
+        try:
+            config = YOLO_BACKENDS.normalize_backend_config({"confidence": 0.5, "rknn_batch_size": "2"})
+            backend = YOLO_BACKENDS.RKNNBackend("model.rknn", {"input_shape": [1, 3, 32, 32]}, config)
+            frames = [np.zeros((32, 32, 3), dtype=np.uint8) for _ in range(3)]
+
+            results = backend.infer_batch(frames, [config] * 3)
+
+            self.assertEqual(backend.model.batch_shapes, [(2, 32, 32, 3), (2, 32, 32, 3)])
+            self.assertEqual([metadata["batch_size"] for _, _, metadata in results], [2, 2, 1])
+            self.assertTrue(all(len(details) == 1 for _, details, _ in results))
+            backend.cleanup()
+        finally:
+            YOLO_BACKENDS._reset_rknn_runtime_pool_for_tests()
+            YOLO_BACKENDS.RKNNLite = original_runtime
+            YOLO_BACKENDS.RKNNLITE_IMPORT_ERROR = original_error
+
+    def test_rknn_batch_size_must_be_positive(self):
+        with self.assertRaisesRegex(ValueError, "rknn_batch_size"):
+            YOLO_BACKENDS.normalize_backend_config({"rknn_batch_size": 0})
+
     def test_rknn_backend_releases_runtime_when_initialization_fails(self):
         class RKNNLite:
             NPU_CORE_AUTO = 0
@@ -655,5 +936,291 @@ class YoloOutputAdapterTests(unittest.TestCase):
         self.assertEqual(details, [])
 
 
+
+class VectorizedDecodeParityTests(unittest.TestCase):
+    FRAME_SHAPE = (360, 640, 3)
+
+    def _decode_both(self, blocks, config, class_count, bbox_format="auto", score_mode="auto", classes=None):
+        kwargs = dict(
+            classes=classes or {0: "person", 1: "helmet"},
+            config=config,
+            frame_shape=self.FRAME_SHAPE,
+            input_width=640,
+            input_height=640,
+            scale=1.0,
+            pad_x=0,
+            pad_y=140,
+            class_count=class_count,
+            bbox_format=bbox_format,
+            score_mode=score_mode,
+        )
+        expected = YOLO_BACKENDS._build_detections_from_rows(
+            row_items=YOLO_BACKENDS._row_items_from_blocks(blocks),
+            **kwargs,
+        )
+        actual = YOLO_BACKENDS._build_detections_from_blocks(blocks=blocks, **kwargs)
+        return expected, actual
+
+    @staticmethod
+    def _random_rows(rng, count, attr_count, normalized_boxes=False):
+        rows = rng.uniform(-6.0, 6.0, size=(count, attr_count)).astype(np.float32)
+        if normalized_boxes:
+            rows[:, :4] = rng.uniform(0.0, 1.0, size=(count, 4))
+        else:
+            rows[:, :2] = rng.uniform(0.0, 640.0, size=(count, 2))
+            rows[:, 2:4] = rng.uniform(4.0, 200.0, size=(count, 2))
+        return rows
+
+    def test_score_modes_match_row_path(self):
+        rng = np.random.default_rng(7)
+        class_count = 6
+        cases = [
+            ("class_only", "xywh", 4 + class_count),
+            ("objectness_class", "xywh", 5 + class_count),
+            ("auto", "auto", 4 + class_count),
+            ("auto", "auto", 5 + class_count),
+            ("auto", "xyxy", 5),
+            ("auto", "auto", 14),
+        ]
+        for score_mode, bbox_format, attr_count in cases:
+            with self.subTest(score_mode=score_mode, attr_count=attr_count):
+                blocks = [
+                    YOLO_BACKENDS._RowBlock(self._random_rows(rng, 400, attr_count), 0),
+                    YOLO_BACKENDS._RowBlock(self._random_rows(rng, 300, attr_count, normalized_boxes=True), 1, 1),
+                ]
+                expected, actual = self._decode_both(
+                    blocks,
+                    {"confidence": 0.55},
+                    class_count,
+                    bbox_format=bbox_format,
+                    score_mode=score_mode,
+                )
+                self.assertGreater(len(expected[0]), 0)
+                self.assertEqual(actual, expected)
+
+    def test_flat_rows_and_class_filter_match_row_path(self):
+        rng = np.random.default_rng(11)
+        rows = self._random_rows(rng, 500, 7)
+        rows[:, 4] = rng.uniform(0.0, 1.0, size=500)
+        rows[:250, 5] = rng.integers(0, 3, size=250)
+        blocks = [YOLO_BACKENDS._RowBlock(rows, 0)]
+
+        for score_mode in ("flat", "auto"):
+            with self.subTest(score_mode=score_mode):
+                expected, actual = self._decode_both(
+                    blocks,
+                    {"confidence": 0.4, "class_filter": [1, 2], "label_name": "target"},
+                    class_count=0,
+                    score_mode=score_mode,
+                    classes={1: "helmet"},
+                )
+                self.assertGreater(len(expected[0]), 0)
+                self.assertEqual(actual, expected)
+
+    def test_real_nms_matches_row_path(self):
+        if importlib.util.find_spec("cv2") is None:
+            self.skipTest("opencv is unavailable")
+        import cv2
+
+        rng = np.random.default_rng(3)
+        rows = self._random_rows(rng, 2000, 4 + 80)
+        blocks = [YOLO_BACKENDS._RowBlock(rows, 0)]
+        original_cv2 = YOLO_BACKENDS.cv2
+        YOLO_BACKENDS.cv2 = cv2
+        try:
+            expected, actual = self._decode_both(blocks, {"confidence": 0.5, "nms_iou": 0.45}, class_count=80)
+        finally:
+            YOLO_BACKENDS.cv2 = original_cv2
+        self.assertGreater(len(expected[0]), 0)
+        self.assertLess(len(expected[0]), 2000)
+        self.assertEqual(actual, expected)
+
+    def test_adapter_profiles_produce_same_blocks_as_rows(self):
+        adapter = YoloOutputAdapter(
+            model_info={},
+            config={
+                "confidence": 0.5,
+                "model_postprocess": {"strides": [16], "reg_max": 4, "layout": "channels_first"},
+            },
+            classes={0: "person", 1: "helmet"},
+            input_width=64,
+            input_height=64,
+        )
+        rng = np.random.default_rng(5)
+        box_output = rng.normal(size=(1, 16, 4, 4)).astype(np.float32)
+        cls_output = rng.normal(scale=4.0, size=(1, 2, 4, 4)).astype(np.float32)
+
+        blocks = adapter._collect_row_blocks([box_output, cls_output], "head_dfl")
+        bbox_format, score_mode = adapter._resolve_decode_modes("head_dfl")
+        self.assertEqual((bbox_format, score_mode), ("xyxy", "class_only"))
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual(blocks[0].rows.shape, (16, 6))
+        self.assertEqual(blocks[0].rows.dtype, np.float32)
+
+        expected, actual = self._decode_both(
+            blocks,
+            adapter.config,
+            adapter.class_count,
+            bbox_format=bbox_format,
+            score_mode=score_mode,
+        )
+        self.assertGreater(len(expected[0]), 0)
+        self.assertEqual(actual, expected)
+
+
+class InputPreprocessorTests(unittest.TestCase):
+    def setUp(self):
+        if importlib.util.find_spec("cv2") is None:
+            self.skipTest("opencv is unavailable")
+        import cv2
+
+        self.cv2 = cv2
+        self.original_cv2 = YOLO_BACKENDS.cv2
+        YOLO_BACKENDS.cv2 = cv2
+
+    def tearDown(self):
+        YOLO_BACKENDS.cv2 = self.original_cv2
+
+    def _reference(self, frame, width, height, color, layout, dtype, normalize):
+        """逐步分配的旧预处理流程：letterbox -> cvtColor -> astype -> /255 -> transpose。"""
+        cv2 = self.cv2
+        src_h, src_w = frame.shape[:2]
+        scale = min(width / src_w, height / src_h)
+        resized_w = int(round(src_w * scale))
+        resized_h = int(round(src_h * scale))
+        resized = cv2.resize(frame, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+        canvas = np.zeros((height, width, 3), dtype=np.uint8)
+        pad_x = (width - resized_w) // 2
+        pad_y = (height - resized_h) // 2
+        canvas[pad_y:pad_y + resized_h, pad_x:pad_x + resized_w] = resized
+        if color == "bgr":
+            canvas = cv2.cvtColor(canvas, cv2.COLOR_RGB2BGR)
+        tensor = canvas.astype(dtype)
+        if normalize:
+            tensor = tensor / 255.0
+        if layout == "nchw":
+            tensor = np.transpose(tensor, (2, 0, 1))
+        return np.ascontiguousarray(tensor), scale, pad_x, pad_y
+
+    @staticmethod
+    def _smooth_rgb(height, width):
+        yy, xx = np.mgrid[0:height, 0:width]
+        return np.stack([xx * 1.5, yy * 2.5, xx + yy], axis=-1).astype(np.uint8)
+
+    @staticmethod
+    def _nv12(frame_rgb):
+        from app.core.frame_utils import rgb_to_nv12
+
+        return rgb_to_nv12(frame_rgb)
+
+    def test_matches_allocating_pipeline_for_all_input_formats(self):
+        rng = np.random.default_rng(5)
+        frames = [
+            rng.integers(0, 256, size=(72, 128, 3), dtype=np.uint8),
+            rng.integers(0, 256, size=(128, 50, 3), dtype=np.uint8),
+            rng.integers(0, 256, size=(64, 64, 3), dtype=np.uint8),
+        ]
+        for color in ("rgb", "bgr"):
+            for layout in ("nchw", "nhwc"):
+                for dtype, normalize in ((np.float32, True), (np.float32, False), (np.uint8, False)):
+                    preprocessor = YOLO_BACKENDS.InputPreprocessor(
+                        64, 48, color=color, layout=layout, dtype=dtype, normalize=normalize
+                    )
+                    batch = preprocessor.new_batch(2)
+                    # 连续处理不同宽高比的帧，补边区域必须每次重新清零
+                    for frame in frames:
+                        with self.subTest(color=color, layout=layout, dtype=dtype, shape=frame.shape):
+                            expected = self._reference(frame, 64, 48, color, layout, dtype, normalize)
+                            tensor, scale, pad_x, pad_y = preprocessor.prepare(frame)
+                            self.assertEqual((scale, pad_x, pad_y), expected[1:])
+                            self.assertEqual(tensor.dtype, expected[0].dtype)
+                            np.testing.assert_array_equal(tensor, expected[0])
+
+                            slot, *_ = preprocessor.prepare(frame, out=batch[1])
+                            self.assertTrue(np.shares_memory(slot, batch))
+                            np.testing.assert_array_equal(batch[1], expected[0])
+
+    def test_reuses_buffers_between_calls(self):
+        preprocessor = YOLO_BACKENDS.InputPreprocessor(32, 32, layout="nchw", dtype=np.float32, normalize=True)
+        frame = np.full((16, 32, 3), 255, dtype=np.uint8)
+
+        first, *_ = preprocessor.prepare(frame)
+        second, *_ = preprocessor.prepare(frame)
+
+        self.assertIs(first, second)
+        self.assertEqual(first.shape, (3, 32, 32))
+        self.assertEqual(float(first[:, 16, 16].min()), 1.0)
+        self.assertEqual(float(first[:, 0, 0].max()), 0.0)
+
+    def test_nv12_input_matches_converted_rgb_frame(self):
+        frame_rgb = self._smooth_rgb(90, 160)
+        nv12 = self._nv12(frame_rgb)
+        converted = self.cv2.cvtColor(nv12, self.cv2.COLOR_YUV2RGB_NV12)
+        # 64x48 为偶数缩放尺寸，62x37 需要先缩放到偶数尺寸再裁剪
+        for width, height in ((64, 48), (62, 37)):
+            for color in ("rgb", "bgr"):
+                with self.subTest(size=(width, height), color=color):
+                    preprocessor = YOLO_BACKENDS.InputPreprocessor(width, height, color=color)
+                    expected, *geometry = self._reference(converted, width, height, color, "nhwc", np.uint8, False)
+                    tensor, *actual_geometry = preprocessor.prepare(YOLO_BACKENDS.NV12Frame(nv12, 160, 90))
+                    self.assertEqual(actual_geometry, geometry)
+                    difference = np.abs(tensor.astype(np.int16) - expected.astype(np.int16))
+                    self.assertLess(float(difference.mean()), 2.0)
+                    _, pad_x, pad_y = geometry
+                    if pad_y:
+                        self.assertEqual(int(tensor[:pad_y].max()), 0)
+                    if pad_x:
+                        self.assertEqual(int(tensor[:, :pad_x].max()), 0)
+
+    def test_stretch_mode_fills_whole_canvas(self):
+        frame = np.random.default_rng(1).integers(0, 256, size=(40, 100, 3), dtype=np.uint8)
+        preprocessor = YOLO_BACKENDS.InputPreprocessor(32, 32, keep_ratio=False)
+
+        tensor, _, pad_x, pad_y = preprocessor.prepare(frame)
+
+        self.assertEqual((pad_x, pad_y), (0, 0))
+        np.testing.assert_array_equal(tensor, self.cv2.resize(frame, (32, 32)))
+
+    def test_onnx_backend_accepts_nv12_frames(self):
+        class InputDefinition:
+            name = "images"
+            shape = [1, 3, 32, 32]
+            type = "tensor(float)"
+
+        class Session:
+            def __init__(self, _path, providers=None):
+                self.tensors = []
+
+            def get_inputs(self):
+                return [InputDefinition()]
+
+            def get_providers(self):
+                return ["CPUExecutionProvider"]
+
+            def run(self, _outputs, inputs):
+                self.tensors.append(np.array(inputs["images"]))
+                return [np.array([[[4, 8, 12, 16, 0.9, 0]]], dtype=np.float32)]
+
+        YOLO_BACKENDS.ort = types.SimpleNamespace(InferenceSession=Session)
+        YOLO_BACKENDS.ONNXRUNTIME_IMPORT_ERROR = None
+        backend = YOLO_BACKENDS.ONNXRuntimeBackend(
+            "model.onnx",
+            {},
+            YOLO_BACKENDS.normalize_backend_config({"confidence": 0.5}),
+        )
+        frame_rgb = self._smooth_rgb(32, 64)
+        nv12 = self._nv12(frame_rgb)
+
+        rgb_detections, _, _ = backend.infer(self.cv2.cvtColor(nv12, self.cv2.COLOR_YUV2RGB_NV12))
+        nv12_detections, _, _ = backend.infer(YOLO_BACKENDS.NV12Frame(nv12, 64, 32))
+
+        self.assertTrue(backend.accepts_nv12)
+        self.assertEqual(nv12_detections, rgb_detections)
+        self.assertEqual(rgb_detections[0]["box"], [8.0, 0.0, 24.0, 16.0])
+        rgb_tensor, nv12_tensor = backend.session.tensors
+        self.assertEqual(nv12_tensor.shape, (1, 3, 32, 32))
+        self.assertLess(float(np.abs(rgb_tensor - nv12_tensor).mean()), 2.0 / 255.0)
+
+
 if __name__ == "__main__":
     unittest.main()